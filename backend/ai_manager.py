@@ -14,8 +14,15 @@ import json
 import logging
 import os
 from typing import Dict, Any, Optional, List
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from datetime import datetime
+from app.core.database import get_engine
+from app.core.settings import AI_MEMORY_HYDRATE_MESSAGES, AI_MEMORY_WRITE_BEHIND
+from app.domain.ai.conversation_memory_store import (
+    fetch_recent_messages,
+    get_conversation_memory_store,
+    get_message_writer,
+)
 
 try:
     from ai_enhancements import ConversationMemory, MessageType
@@ -239,12 +246,13 @@ class AIEnhancementManager:
     
     def __init__(self, db_url: str, model):
         self.db_url = db_url
-        self.engine = create_engine(db_url)
+        self.engine = get_engine("oltp", db_url)
         self.model = model
         self.response_enhancer = ResponseEnhancer(model)
         
-        # Cache for conversation memories
-        self.memory_cache = {}
+        # Bounded, process-wide cache of conversation memories shared by all managers
+        self.memory_cache = get_conversation_memory_store()
+        self.message_writer = get_message_writer() if AI_MEMORY_WRITE_BEHIND else None
         
         # Dubai real estate knowledge base (from enhanced version)
         self.dubai_knowledge = {
@@ -314,6 +322,7 @@ class AIEnhancementManager:
             # Add user message to memory
             message_type = MessageType.DOCUMENT if file_upload else MessageType.TEXT
             memory.add_message('user', message, message_type, file_upload)
+            self._remember_latest_message(session_id, memory)
             
             # Process file upload if present
             file_analysis = None
@@ -344,9 +353,7 @@ class AIEnhancementManager:
             
             # Add AI response to memory
             memory.add_message('assistant', enhanced_response, MessageType.TEXT)
-            
-            # Update memory cache
-            self.memory_cache[session_id] = memory
+            self._remember_latest_message(session_id, memory)
             
             return {
                 'response': enhanced_response,
@@ -375,47 +382,55 @@ class AIEnhancementManager:
     
     def _get_conversation_memory(self, session_id: str) -> ConversationMemory:
         """Get or create conversation memory for a session"""
-        if session_id in self.memory_cache:
-            return self.memory_cache[session_id]
+        memory = self.memory_cache.get(session_id)
+        if memory is not None:
+            return memory
         
-        # Try to load from database
+        # Cold miss: hydrate from the database in one round trip
+        memory = ConversationMemory(session_id=session_id)
         try:
+            # Messages still queued for this session must be visible to the reload
+            if self.message_writer is not None and self.message_writer.has_pending(session_id):
+                self.message_writer.flush()
+            
             with self.engine.connect() as conn:
-                result = conn.execute(text("""
-                    SELECT id FROM conversations 
-                    WHERE session_id = :session_id AND is_active = TRUE
-                """), {"session_id": session_id})
-                row = result.fetchone()
-                
-                memory = ConversationMemory(session_id=session_id)
-                if row:
-                    memory.conversation_id = row[0]
-                    
-                    # Load recent messages
-                    messages_result = conn.execute(text("""
-                        SELECT role, content, message_type, metadata, timestamp
-                        FROM messages 
-                        WHERE conversation_id = :conversation_id
-                        ORDER BY timestamp DESC 
-                        LIMIT 20
-                    """), {"conversation_id": row[0]})
-                    
-                    for msg_row in messages_result:
-                        memory.add_message(
-                            role=msg_row[0],
-                            content=msg_row[1],
-                            message_type=MessageType(msg_row[2]),
-                            metadata=json.loads(msg_row[3]) if msg_row[3] else None
-                        )
-                
-                self.memory_cache[session_id] = memory
-                return memory
+                conversation_id, rows = fetch_recent_messages(conn, session_id, AI_MEMORY_HYDRATE_MESSAGES)
+            
+            memory.conversation_id = conversation_id
+            for msg_row in rows:
+                metadata = msg_row.metadata
+                if isinstance(metadata, str):
+                    metadata = json.loads(metadata) if metadata else None
+                memory.add_message(
+                    role=msg_row.role,
+                    content=msg_row.content,
+                    message_type=MessageType(msg_row.message_type),
+                    metadata=metadata
+                )
+                # Keep the stored time rather than the hydration time
+                if msg_row.timestamp is not None:
+                    timestamp = msg_row.timestamp
+                    memory.messages[-1]['timestamp'] = timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp)
                 
         except Exception as e:
             logger.error(f"Error loading conversation memory: {e}")
             memory = ConversationMemory(session_id=session_id)
-            self.memory_cache[session_id] = memory
-            return memory
+        
+        self.memory_cache.put(session_id, memory)
+        return memory
+    
+    def _remember_latest_message(self, session_id: str, memory: ConversationMemory):
+        """Queue the newest message for persistence and re-account the session's size"""
+        if self.message_writer is not None and memory.conversation_id:
+            self.message_writer.enqueue(session_id, memory.conversation_id, memory.messages[-1])
+        self.memory_cache.put(session_id, memory)
+    
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Conversation memory usage for sizing workers"""
+        return {
+            'memory_cache': self.memory_cache.get_stats(),
+            'message_writer': self.message_writer.get_stats() if self.message_writer is not None else None
+        }
     
     def _process_file_upload(self, file_upload: Dict) -> Optional[Dict]:
         """Process file upload for analysis"""
@@ -626,8 +641,7 @@ IMPORTANT: Provide specific Dubai real estate information, actual prices, and ac
     def clear_conversation_memory(self, session_id: str) -> bool:
         """Clear conversation memory for a session"""
         try:
-            if session_id in self.memory_cache:
-                del self.memory_cache[session_id]
+            self.memory_cache.discard(session_id)
             return True
         except Exception as e:
             logger.error(f"Error clearing conversation memory: {e}")
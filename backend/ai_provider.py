@@ -11,9 +11,14 @@ Usage:
     result = provider.generate_content(prompt)
     text = getattr(result, "text", None) or getattr(result, "content", None)
 
+All calls go through app.infrastructure.integrations.llm_gateway, which
+shares one client per provider and adds concurrency limits, in-flight
+request coalescing and a response cache.
+
 Configuration (env variables):
-    OPENAI_API_KEY (required)
+    OPENAI_API_KEY (required unless LLM_PROVIDER=fake)
     OPENAI_MODEL (default: gpt-4o-mini)
+    LLM_PROVIDER=fake serves deterministic offline responses for load tests
 """
 from __future__ import annotations
 
@@ -21,6 +26,9 @@ import os
 from types import SimpleNamespace
 from typing import Any
 
+from app.core.settings import LLM_PROVIDER
+from app.infrastructure.integrations.llm_gateway import get_llm_gateway
+
 
 class AIProviderBase:
     """Base interface for AI providers."""
@@ -29,60 +37,38 @@ class AIProviderBase:
         raise NotImplementedError
 
 
-class OpenAIProvider(AIProviderBase):
-    def __init__(self, api_key: str, model_name: str):
-        # Support both the legacy and new OpenAI clients gracefully
-        self._api_key = api_key
-        self._model = model_name
-        try:
-            # Newer SDK style
-            from openai import OpenAI  # type: ignore
-            self._client = OpenAI(api_key=api_key)
-            self._mode = "new"
-        except Exception:
-            # Legacy SDK fallback
-            import openai  # type: ignore
-            openai.api_key = api_key
-            self._openai = openai
-            self._mode = "legacy"
+class GatewayProvider(AIProviderBase):
+    """Provider backed by the shared LLM gateway (pooling, dedupe, caching)."""
+
+    def __init__(self, provider: str, model_name: str):
+        self._model = get_llm_gateway().get_model(provider, model_name)
 
     def generate_content(self, prompt: str) -> Any:
         # Normalize output to object with `.text`
         try:
-            if getattr(self, "_mode", "legacy") == "new":
-                # New SDK responses API
-                try:
-                    # Prefer Responses API when available
-                    resp = self._client.responses.create(
-                        model=self._model,
-                        input=prompt,
-                    )
-                    content = resp.output_text  # Unified text accessor
-                except Exception:
-                    # Fallback to chat.completions
-                    resp = self._client.chat.completions.create(
-                        model=self._model,
-                        messages=[{"role": "user", "content": prompt}],
-                    )
-                    content = resp.choices[0].message.content
-            else:
-                # Legacy SDK chat completion
-                resp = self._openai.ChatCompletion.create(
-                    model=self._model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7,
-                )
-                content = resp["choices"][0]["message"]["content"]
-
-            return SimpleNamespace(text=content)
+            return self._model.generate_content(prompt)
         except Exception as e:
             # Surface an informative error while keeping interface consistent
             return SimpleNamespace(text=f"[AI Error] {e}")
 
+    async def generate_content_async(self, prompt: str) -> Any:
+        try:
+            return await self._model.generate_content_async(prompt)
+        except Exception as e:
+            return SimpleNamespace(text=f"[AI Error] {e}")
+
+
+class OpenAIProvider(GatewayProvider):
+    def __init__(self, api_key: str, model_name: str):
+        # The gateway owns the OpenAI client; the key is read from OPENAI_API_KEY
+        super().__init__("openai", model_name)
+
 
 def get_ai_provider() -> AIProviderBase:
-    api_key = os.getenv("OPENAI_API_KEY", "").strip()
     model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini").strip()
+    if LLM_PROVIDER == "fake":
+        return GatewayProvider("fake", model_name)
+    api_key = os.getenv("OPENAI_API_KEY", "").strip()
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is required for PropertyPro AI")
     return OpenAIProvider(api_key=api_key, model_name=model_name)
@@ -7,7 +7,9 @@ the secure architecture patterns of main_secure.py.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional, Union
 from sqlalchemy import text
@@ -447,6 +449,49 @@ def get_rag_service():
         print(f"Error initializing RAG service: {e}")
         return None
 
+def _get_accessible_session(session_id: str, current_user: User):
+    """Load an active chat session and check the user may access it"""
+    with get_db_connection() as conn:
+        session_result = conn.execute(text("""
+            SELECT id, session_id, role, title, user_id
+            FROM conversations 
+            WHERE session_id = :session_id AND is_active = TRUE
+        """), {"session_id": session_id})
+        
+        session_row = session_result.fetchone()
+        if not session_row:
+            raise HTTPException(status_code=404, detail="Chat session not found")
+        
+        if current_user.role != "admin" and session_row[4] != current_user.id:
+            raise HTTPException(status_code=403, detail="Access denied to this session")
+        
+        return session_row
+
+def _save_chat_exchange(conversation_id: int, request: ChatRequest, response_text: str, metadata: Dict[str, Any]):
+    """Persist the user message and assistant response of one chat turn"""
+    with get_db_connection() as conn:
+        conn.execute(text("""
+            INSERT INTO messages (conversation_id, role, content, message_type, metadata)
+            VALUES (:conversation_id, 'user', :content, 'text', :metadata)
+        """), {
+            "conversation_id": conversation_id,
+            "content": request.message,
+            "metadata": json.dumps({"file_upload": request.file_upload}) if request.file_upload else None
+        })
+        
+        conn.execute(text("""
+            INSERT INTO messages (conversation_id, role, content, message_type, metadata)
+            VALUES (:conversation_id, 'assistant', :content, 'text', :metadata)
+        """), {
+            "conversation_id": conversation_id,
+            "content": response_text,
+            "metadata": json.dumps(metadata)
+        })
+
+def _sse_event(payload: Dict[str, Any]) -> str:
+    """Format a payload as a server-sent event"""
+    return f"data: {json.dumps(payload)}\n\n"
+
 # Router Endpoints
 
 @router.post("", response_model=ChatSessionResponse)
@@ -758,20 +803,7 @@ async def chat_with_session(
             raise HTTPException(status_code=500, detail="RAG service not available")
         
         # Verify session exists and user has access
-        with get_db_connection() as conn:
-            session_result = conn.execute(text("""
-                SELECT id, session_id, role, title, user_id
-                FROM conversations 
-                WHERE session_id = :session_id AND is_active = TRUE
-            """), {"session_id": session_id})
-            
-            session_row = session_result.fetchone()
-            if not session_row:
-                raise HTTPException(status_code=404, detail="Chat session not found")
-            
-            # Check if user has access to this session
-            if current_user.role != "admin" and session_row[4] != current_user.id:
-                raise HTTPException(status_code=403, detail="Access denied to this session")
+        session_row = _get_accessible_session(session_id, current_user)
         
         # Check for report generation request first
         report_request = chat_report_integration.detect_report_request(request.message)
@@ -793,29 +825,10 @@ async def chat_with_session(
             )
         
         # Save messages to database
-        with get_db_connection() as conn:
-            # Save user message
-            conn.execute(text("""
-                INSERT INTO messages (conversation_id, role, content, message_type, metadata)
-                VALUES (:conversation_id, 'user', :content, 'text', :metadata)
-            """), {
-                "conversation_id": session_row[0],
-                "content": request.message,
-                "metadata": json.dumps({"file_upload": request.file_upload}) if request.file_upload else None
-            })
-            
-            # Save assistant response
-            conn.execute(text("""
-                INSERT INTO messages (conversation_id, role, content, message_type, metadata)
-                VALUES (:conversation_id, 'assistant', :content, 'text', :metadata)
-            """), {
-                "conversation_id": session_row[0],
-                "content": response_text,
-                "metadata": json.dumps({
-                    "sources": ["Dubai Real Estate Database", "Market Analysis Reports"],
-                    "enhanced": True
-                })
-            })
+        _save_chat_exchange(session_row[0], request, response_text, {
+            "sources": ["Dubai Real Estate Database", "Market Analysis Reports"],
+            "enhanced": True
+        })
         
         # Optional entity detection
         detected_entities = None
@@ -866,6 +879,79 @@ async def chat_with_session(
         print(f"Error in enhanced chat endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/{session_id}/chat/stream")
+async def stream_chat_with_session(
+    session_id: str,
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Streaming chat endpoint (server-sent events).
+    Emits ``token`` events as the model produces text and a final ``done`` event.
+    Retrieval, generation and database writes all run in the threadpool so a
+    slow completion never blocks the event loop.
+    """
+    start_time = time.time()
+    
+    rag_service = await run_in_threadpool(get_rag_service)
+    if not rag_service:
+        raise HTTPException(status_code=500, detail="RAG service not available")
+    
+    session_row = await run_in_threadpool(_get_accessible_session, session_id, current_user)
+    
+    async def event_stream():
+        chunks = []
+        first_token_time = None
+        try:
+            report_request = chat_report_integration.detect_report_request(request.message)
+            if report_request:
+                report_data = await run_in_threadpool(chat_report_integration.generate_report, report_request)
+                if report_data:
+                    text_chunks = iter([chat_report_integration.format_report_response(report_data)])
+                else:
+                    text_chunks = iter(["I'm sorry, I couldn't generate the report at this time. Please try again later."])
+            else:
+                text_chunks = rag_service.stream_response(
+                    message=request.message,
+                    role=current_user.role,
+                    session_id=session_id
+                )
+            
+            async for chunk in iterate_in_threadpool(text_chunks):
+                if first_token_time is None:
+                    first_token_time = time.time()
+                chunks.append(chunk)
+                yield _sse_event({"type": "token", "content": chunk})
+            
+            response_text = "".join(chunks).strip()
+            response_time = time.time() - start_time
+            await run_in_threadpool(_save_chat_exchange, session_row[0], request, response_text, {
+                "sources": ["Dubai Real Estate Database", "Market Analysis Reports"],
+                "enhanced": True,
+                "streamed": True
+            })
+            
+            yield _sse_event({
+                "type": "done",
+                "session_id": session_id,
+                "message_id": str(uuid.uuid4()),
+                "timestamp": datetime.utcnow().isoformat() + 'Z',
+                "metadata": {
+                    "response_time": response_time,
+                    "time_to_first_token": (first_token_time - start_time) if first_token_time else None,
+                    "enhanced": True
+                }
+            })
+        except Exception as e:
+            print(f"Error in streaming chat endpoint: {e}")
+            yield _sse_event({"type": "error", "detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Reelly test endpoint removed
 
 @router.delete("/{session_id}")
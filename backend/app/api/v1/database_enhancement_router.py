@@ -14,6 +14,7 @@ from datetime import datetime
 from database_enhancement_optimizer import DatabaseEnhancementOptimizer
 from database_index_optimizer import DatabaseIndexOptimizer
 from migrations.data_migration_script import DataMigrationManager
+from app.core.database import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -173,9 +174,9 @@ async def get_database_status(
 async def analyze_schema():
     """Analyze current database schema and provide recommendations"""
     try:
-        from sqlalchemy import create_engine, text
+        from sqlalchemy import text
         
-        engine = create_engine(os.getenv("DATABASE_URL"))
+        engine = get_engine("analytics", os.getenv("DATABASE_URL"))
         
         with engine.connect() as conn:
             # Get table information
@@ -257,9 +258,9 @@ async def analyze_schema():
 async def validate_data_integrity():
     """Validate data integrity across all tables"""
     try:
-        from sqlalchemy import create_engine, text
+        from sqlalchemy import text
         
-        engine = create_engine(os.getenv("DATABASE_URL"))
+        engine = get_engine("analytics", os.getenv("DATABASE_URL"))
         validation_results = {}
         
         with engine.connect() as conn:
@@ -305,9 +306,9 @@ async def validate_data_integrity():
 async def get_performance_metrics():
     """Get database performance metrics"""
     try:
-        from sqlalchemy import create_engine, text
+        from sqlalchemy import text
         
-        engine = create_engine(os.getenv("DATABASE_URL"))
+        engine = get_engine("analytics", os.getenv("DATABASE_URL"))
         
         with engine.connect() as conn:
             # Get table statistics
@@ -382,9 +383,9 @@ async def get_performance_metrics():
 async def _get_schema_status():
     """Get schema status information"""
     try:
-        from sqlalchemy import create_engine, text
+        from sqlalchemy import text
         
-        engine = create_engine(os.getenv("DATABASE_URL"))
+        engine = get_engine("analytics", os.getenv("DATABASE_URL"))
         
         with engine.connect() as conn:
             # Check if enhanced tables exist
@@ -424,9 +425,9 @@ async def _get_schema_status():
 async def _get_data_status():
     """Get data status information"""
     try:
-        from sqlalchemy import create_engine, text
+        from sqlalchemy import text
         
-        engine = create_engine(os.getenv("DATABASE_URL"))
+        engine = get_engine("analytics", os.getenv("DATABASE_URL"))
         
         with engine.connect() as conn:
             # Get table counts
@@ -452,9 +453,9 @@ async def _get_data_status():
 async def _get_performance_status():
     """Get performance status information"""
     try:
-        from sqlalchemy import create_engine, text
+        from sqlalchemy import text
         
-        engine = create_engine(os.getenv("DATABASE_URL"))
+        engine = get_engine("analytics", os.getenv("DATABASE_URL"))
         
         with engine.connect() as conn:
             # Get index count
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from datetime import datetime
-from app.core.database import check_db_connection
+from app.core.database import check_db_connection, get_pool_stats
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
@@ -15,3 +15,11 @@ async def health_v1():
             "database": "ok" if db_ok else "down"
         }
     }
+
+@router.get("/db-pools")
+async def database_pool_health():
+    """Connection pool utilisation per workload for this worker process"""
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "pools": get_pool_stats()
+    }
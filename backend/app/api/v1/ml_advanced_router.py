@@ -6,10 +6,13 @@ FastAPI router for advanced machine learning model endpoints
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
-from typing import Dict, Any, Optional
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional
+from datetime import datetime
 import logging
 
 from ml.services.advanced_ml_service import advanced_ml_service
+from app.core.settings import VALUATION_BATCH_MAX_SIZE
 from auth.middleware import get_current_user
 from auth.models import User
 
@@ -198,6 +201,42 @@ async def predict_property_price(
         logger.error(f"❌ Error making property price prediction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@ml_advanced_router.post("/predict/property-prices/batch")
+async def predict_property_prices_batch(
+    properties: List[Dict[str, Any]],
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Value a batch of properties (portfolio or CMA comparables) with one model call"""
+    if not properties:
+        raise HTTPException(status_code=400, detail="At least one property is required")
+    if len(properties) > VALUATION_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {VALUATION_BATCH_MAX_SIZE} properties can be valued per request"
+        )
+    
+    try:
+        def predict() -> List[Dict[str, Any]]:
+            # Imported in the worker thread: the first import loads the models
+            from ml.advanced_ml_models import advanced_ml_models
+            return advanced_ml_models.predict_property_prices(properties)
+        
+        predictions = await run_in_threadpool(predict)
+        failed = sum(1 for prediction in predictions if 'error' in prediction)
+        
+        return {
+            "status": "success" if failed < len(predictions) else "error",
+            "predictions": predictions,
+            "total": len(predictions),
+            "failed": failed,
+            "user_id": current_user.id,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error making batch property price prediction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @ml_advanced_router.get("/models/performance")
 async def get_model_performance(
     model_name: Optional[str] = None,
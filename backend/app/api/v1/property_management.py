@@ -8,7 +8,9 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.database import get_db
+from cache_manager import cache_manager
 from app.core.middleware import get_current_user, require_agent_or_admin
+from app.domain.listings.property_index import PropertyRecord, get_property_index
 from app.domain.listings.enhanced_real_estate_models import (
     EnhancedProperty,
     ListingHistory,
@@ -114,6 +116,20 @@ def _property_to_response(prop: EnhancedProperty) -> PropertyResponse:
         area_sqft=float(prop.area_sqft) if prop.area_sqft is not None else None,
     )
 
+
+def _record_to_response(record: PropertyRecord) -> PropertyResponse:
+    return PropertyResponse(
+        id=record.id,
+        title=record.title or "",
+        description=record.description or "",
+        price=float(record.price or 0),
+        location=record.location or "",
+        property_type=record.property_type or "Unknown",
+        bedrooms=record.bedrooms or 0,
+        bathrooms=record.bathrooms or 0,
+        area_sqft=record.area_sqft,
+    )
+
 @router.get("/", response_model=List[PropertyResponse])
 async def get_all_properties(db: Session = Depends(get_db)):
     """Get all properties from the database"""
@@ -149,6 +165,7 @@ async def create_property(property_data: PropertyCreate, db: Session = Depends(g
         db.add(prop)
         db.commit()
         db.refresh(prop)
+        get_property_index().refresh_ids([prop.id])
 
         return _property_to_response(prop)
     except SQLAlchemyError as exc:
@@ -167,12 +184,39 @@ async def search_properties(
     min_area_sqft: Optional[float] = Query(None, description="Minimum area in sqft"),
     max_area_sqft: Optional[float] = Query(None, description="Maximum area in sqft"),
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(20, ge=1, le=100, description="Number of results to return")
+    limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
+    db: Session = Depends(get_db)
 ):
     """Advanced property search with multiple filters and pagination"""
 
     _validate_range(min_price, max_price, "Price")
     _validate_range(min_area_sqft, max_area_sqft, "Area (sqft)")
+    offset = (page - 1) * limit
+
+    index_result = get_property_index().search(
+        price_min=min_price,
+        price_max=max_price,
+        bedrooms=bedrooms,
+        bathrooms=bathrooms,
+        property_type=property_type,
+        location=location,
+        area_min=min_area_sqft,
+        area_max=max_area_sqft,
+        order_by="id",
+        descending=True,
+        limit=limit,
+        offset=offset,
+    )
+    if index_result is not None:
+        return PropertySearchResponse(
+            properties=[_record_to_response(record) for record in index_result.records],
+            pagination=PaginationMeta(
+                page=page,
+                limit=limit,
+                total=index_result.total,
+                pages=(index_result.total + limit - 1) // limit,
+            ),
+        )
 
     try:
         query = select(EnhancedProperty).where(EnhancedProperty.is_deleted.is_(False))
@@ -196,7 +240,6 @@ async def search_properties(
 
         total_count = db.execute(query.with_only_columns(func.count()).order_by(None)).scalar_one()
 
-        offset = (page - 1) * limit
         rows = db.execute(query.order_by(EnhancedProperty.id.desc()).offset(offset).limit(limit)).scalars().all()
 
         return PropertySearchResponse(
@@ -284,6 +327,7 @@ async def update_property(property_id: int, property_data: PropertyUpdate, db: S
             raise HTTPException(status_code=404, detail="Property not found")
 
         updated = False
+        previous_location = property_obj.location
 
         if property_data.title is not None:
             property_obj.title = property_data.title.strip()
@@ -324,6 +368,8 @@ async def update_property(property_id: int, property_data: PropertyUpdate, db: S
         db.add(property_obj)
         db.commit()
         db.refresh(property_obj)
+        cache_manager.invalidate_property(property_id, locations=[previous_location, property_obj.location])
+        get_property_index().refresh_ids([property_id])
 
         return _property_to_response(property_obj)
     except HTTPException:
@@ -347,6 +393,8 @@ async def delete_property(property_id: int, db: Session = Depends(get_db)):
         property_obj.is_deleted = True
         db.add(property_obj)
         db.commit()
+        cache_manager.invalidate_property(property_id, locations=[property_obj.location])
+        get_property_index().refresh_ids([property_id])
 
         return {"message": "Property deleted successfully"}
     except HTTPException:
@@ -422,6 +470,8 @@ async def update_property_status(
         db.add(history_entry)
         db.add(property_obj)
         db.commit()
+        cache_manager.invalidate_property(property_id, locations=[property_obj.location])
+        get_property_index().refresh_ids([property_id])
 
         return {"message": f"Property {property_id} status updated to {new_status}."}
     except HTTPException:
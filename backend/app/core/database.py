@@ -1,36 +1,122 @@
 """
 Database connection and session management for authentication
+
+Also hosts the process-wide engine registry. Every service gets its engine
+from ``get_engine(workload)`` so one worker holds a known, bounded number of
+connections per workload instead of one QueuePool per module.
 """
 
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from contextlib import contextmanager
 import logging
-from typing import Generator
-from app.core.settings import DATABASE_URL
+import threading
+from typing import Generator, Dict, Any, Optional, Tuple
+from app.core.settings import (
+    DATABASE_URL, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_OLTP_SIZE, DB_POOL_OLTP_OVERFLOW,
+    DB_POOL_ANALYTICS_SIZE, DB_POOL_ANALYTICS_OVERFLOW,
+    DB_POOL_INGESTION_SIZE, DB_POOL_INGESTION_OVERFLOW
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create database engine with better connection management
-# Use StaticPool only for SQLite (primarily tests). For Postgres and others,
-# fall back to default QueuePool.
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL,
-        poolclass=StaticPool,
-        connect_args={"check_same_thread": False} if ":memory:" in DATABASE_URL or DATABASE_URL.startswith("sqlite:///") else {},
-        echo=False,
-    )
-else:
-    engine = create_engine(
-        DATABASE_URL,
+# Pool sizing per workload: request-path queries, reporting/optimizer scans, bulk loads
+WORKLOAD_POOLS: Dict[str, Dict[str, int]] = {
+    "oltp": {"pool_size": DB_POOL_OLTP_SIZE, "max_overflow": DB_POOL_OLTP_OVERFLOW},
+    "analytics": {"pool_size": DB_POOL_ANALYTICS_SIZE, "max_overflow": DB_POOL_ANALYTICS_OVERFLOW},
+    "ingestion": {"pool_size": DB_POOL_INGESTION_SIZE, "max_overflow": DB_POOL_INGESTION_OVERFLOW},
+}
+
+_engines: Dict[Tuple[str, str], Engine] = {}
+_engines_lock = threading.Lock()
+
+def _build_engine(database_url: str, workload: str) -> Engine:
+    """Create an engine with the pool settings of a workload"""
+    # Use StaticPool only for SQLite (primarily tests). For Postgres and others,
+    # use a QueuePool sized for the workload.
+    if database_url.startswith("sqlite"):
+        return create_engine(
+            database_url,
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False} if ":memory:" in database_url or database_url.startswith("sqlite:///") else {},
+            echo=False,
+        )
+    pool = WORKLOAD_POOLS[workload]
+    return create_engine(
+        database_url,
+        pool_size=pool["pool_size"],
+        max_overflow=pool["max_overflow"],
+        pool_timeout=DB_POOL_TIMEOUT,
         pool_pre_ping=True,
-        pool_recycle=3600,  # Recycle connections every hour
+        pool_recycle=DB_POOL_RECYCLE,
         echo=False  # Set to True for SQL debugging
     )
 
+def get_engine(workload: str = "oltp", database_url: Optional[str] = None) -> Engine:
+    """
+    Get the shared engine for a workload
+    
+    Args:
+        workload: One of ``oltp``, ``analytics`` or ``ingestion``
+        database_url: Database URL, defaults to DATABASE_URL
+        
+    Returns:
+        Engine shared by every caller with the same workload and URL
+    """
+    if workload not in WORKLOAD_POOLS:
+        raise ValueError(f"Unknown database workload: {workload}")
+    database_url = database_url or DATABASE_URL
+    key = (workload, database_url)
+    engine_ = _engines.get(key)
+    if engine_ is None:
+        with _engines_lock:
+            engine_ = _engines.get(key)
+            if engine_ is None:
+                engine_ = _build_engine(database_url, workload)
+                _engines[key] = engine_
+                logger.info(f"Created {workload} engine pool for {engine_.url.render_as_string(hide_password=True)}")
+    return engine_
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Get pool utilisation for every registered engine
+    """
+    stats = {}
+    for (workload, _), engine_ in list(_engines.items()):
+        pool = engine_.pool
+        name = f"{workload}:{engine_.url.render_as_string(hide_password=True)}"
+        entry: Dict[str, Any] = {"workload": workload, "pool_class": type(pool).__name__}
+        if hasattr(pool, "checkedout"):
+            size = pool.size()
+            checked_out = pool.checkedout()
+            capacity = size + max(pool._max_overflow, 0)
+            entry.update({
+                "pool_size": size,
+                "max_overflow": pool._max_overflow,
+                "checked_out": checked_out,
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "utilisation": round(checked_out / capacity, 3) if capacity else 0.0,
+            })
+        stats[name] = entry
+    return stats
+
+def dispose_engines():
+    """
+    Dispose every registered engine, e.g. after forking worker processes
+    """
+    with _engines_lock:
+        for engine_ in _engines.values():
+            engine_.dispose()
+        _engines.clear()
+
+# Default engine for request-path sessions
+engine = get_engine("oltp")
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -19,6 +19,12 @@ from .database import get_db
 from .models import User, UserSession, Role, Permission, AuditLog
 from .utils import verify_jwt_token, sanitize_input
 from .rate_limiter import RateLimiter
+from .principal_cache import (
+    get_principal_cache,
+    get_last_used_tracker,
+    principal_from_user,
+    user_from_principal,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -97,17 +103,33 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             )
             raise exc
 
-        elapsed = time.perf_counter() - start_time
-        self.logger.info(
-            "request_completed",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "elapsed_ms": round(elapsed * 1000, 2),
-            }
-        )
+        headers_ready = time.perf_counter()
+
+        # Log completion once the body has been sent so streamed responses report
+        # both time-to-first-byte and total duration.
+        async def timed_body(body_iterator):
+            first_byte_at = None
+            try:
+                async for chunk in body_iterator:
+                    if first_byte_at is None:
+                        first_byte_at = time.perf_counter()
+                    yield chunk
+            finally:
+                finished_at = time.perf_counter()
+                self.logger.info(
+                    "request_completed",
+                    extra={
+                        "request_id": request_id,
+                        "method": request.method,
+                        "path": request.url.path,
+                        "status_code": response.status_code,
+                        "headers_ms": round((headers_ready - start_time) * 1000, 2),
+                        "ttfb_ms": round(((first_byte_at or finished_at) - start_time) * 1000, 2),
+                        "elapsed_ms": round((finished_at - start_time) * 1000, 2),
+                    }
+                )
+
+        response.body_iterator = timed_body(response.body_iterator)
 
         if request_id:
             response.headers["X-Request-ID"] = request_id
@@ -149,8 +171,20 @@ def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        # Get user from database
+        token = credentials.credentials
         user_id = int(payload.get("sub"))
+        principal_cache = get_principal_cache()
+        
+        # Fast path: principal already authenticated for this token
+        principal = principal_cache.get(token)
+        if principal and principal["id"] == user_id:
+            locked_until = principal.get("locked_until")
+            if principal.get("is_active") and not (locked_until and locked_until > datetime.utcnow()):
+                get_last_used_tracker().touch(principal["session_id"])
+                return user_from_principal(User, principal, db)
+            principal_cache.invalidate_token(token)
+        
+        # Get user from database
         try:
             user = db.query(User).filter(User.id == user_id).first()
         except Exception as db_error:
@@ -187,7 +221,7 @@ def get_current_user(
         # Check if session is still valid
         session = db.query(UserSession).filter(
             UserSession.user_id == user.id,
-            UserSession.session_token == credentials.credentials,
+            UserSession.session_token == token,
             UserSession.is_active == True
         ).first()
         
@@ -198,9 +232,9 @@ def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        # Update session last used time
-        session.last_used = datetime.utcnow()
-        db.commit()
+        # Defer the last_used write to the batched flusher and cache the principal
+        get_last_used_tracker().touch(session.id)
+        principal_cache.set(token, principal_from_user(user, session))
         
         return user
         
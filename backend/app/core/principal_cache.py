@@ -0,0 +1,309 @@
+"""
+Authenticated principal cache for Dubai Real Estate RAG System
+
+Keeps the user/session facts needed by get_current_user in a short-TTL
+in-process cache backed by Redis, keyed by a hash of the bearer token, and
+batches session last_used updates into periodic background writes.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.settings import (
+    REDIS_URL,
+    AUTH_PRINCIPAL_CACHE_TTL,
+    AUTH_PRINCIPAL_LOCAL_TTL,
+    AUTH_LAST_USED_FLUSH_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+# User columns needed to authorise a request; everything else loads lazily
+PRINCIPAL_USER_FIELDS = (
+    "id", "email", "first_name", "last_name", "role", "brokerage_id",
+    "is_active", "email_verified", "locked_until", "created_at",
+)
+_DATETIME_FIELDS = {"locked_until", "created_at", "session_expires_at"}
+
+REDIS_KEY_PREFIX = "auth:principal"
+REDIS_RETRY_SECONDS = 30
+
+
+def hash_token(token: str) -> str:
+    """Return the cache key digest for a bearer token"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def principal_from_user(user, session) -> Dict[str, Any]:
+    """Snapshot the authorisation-relevant fields of a user and its session"""
+    principal = {field: getattr(user, field, None) for field in PRINCIPAL_USER_FIELDS}
+    principal["session_id"] = session.id
+    principal["session_expires_at"] = session.expires_at
+    return principal
+
+
+def user_from_principal(user_cls, principal: Dict[str, Any], db=None):
+    """
+    Rebuild a user instance from a cached principal without querying.
+
+    The instance is marked as already persisted and, when a session is given,
+    attached to it so unloaded columns and relationships still lazy-load.
+    """
+    user = user_cls(**{field: principal.get(field) for field in PRINCIPAL_USER_FIELDS})
+    make_transient_to_detached(user)
+    if db is not None:
+        try:
+            db.add(user)
+        except Exception as e:
+            logger.debug(f"Could not attach cached principal to session: {e}")
+    return user
+
+
+class PrincipalCache:
+    """Two-level (process + Redis) cache of authenticated principals"""
+
+    def __init__(self, ttl: int = AUTH_PRINCIPAL_CACHE_TTL, local_ttl: int = AUTH_PRINCIPAL_LOCAL_TTL,
+                 redis_url: Optional[str] = REDIS_URL):
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl, ttl)
+        self.redis_url = redis_url
+        self._local: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._user_tokens: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+
+    def _get_redis(self):
+        """Return a Redis client, or None while Redis is unavailable"""
+        if self._redis is not None or not self.redis_url:
+            return self._redis
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            import redis
+            client = redis.Redis.from_url(self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+            client.ping()
+            self._redis = client
+            logger.info("✅ Principal cache connected to Redis")
+        except Exception as e:
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            logger.warning(f"⚠️ Principal cache running without Redis: {e}")
+        return self._redis
+
+    def _redis_call(self, fn):
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            return fn(client)
+        except Exception as e:
+            logger.warning(f"⚠️ Principal cache Redis error: {e}")
+            self._redis = None
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            return None
+
+    @staticmethod
+    def _encode(principal: Dict[str, Any]) -> str:
+        return json.dumps({
+            k: v.isoformat() if isinstance(v, datetime) else v
+            for k, v in principal.items()
+        })
+
+    @staticmethod
+    def _decode(raw) -> Dict[str, Any]:
+        principal = json.loads(raw)
+        for field in _DATETIME_FIELDS:
+            if principal.get(field):
+                principal[field] = datetime.fromisoformat(principal[field])
+        return principal
+
+    def _ttl_for(self, principal: Dict[str, Any], ttl: int) -> int:
+        """Never cache a principal past its session expiry"""
+        expires_at = principal.get("session_expires_at")
+        if expires_at:
+            ttl = min(ttl, int((expires_at - datetime.utcnow()).total_seconds()))
+        return ttl
+
+    def _store_local(self, token_hash: str, principal: Dict[str, Any]):
+        ttl = self._ttl_for(principal, self.local_ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._local[token_hash] = (time.monotonic() + ttl, principal)
+            self._user_tokens.setdefault(principal["id"], set()).add(token_hash)
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached principal for a token, if still fresh"""
+        token_hash = hash_token(token)
+        with self._lock:
+            entry = self._local.get(token_hash)
+            if entry and entry[0] > time.monotonic():
+                self.stats["local_hits"] += 1
+                return entry[1]
+            if entry:
+                self._local.pop(token_hash, None)
+
+        raw = self._redis_call(lambda r: r.get(f"{REDIS_KEY_PREFIX}:{token_hash}"))
+        if raw:
+            principal = self._decode(raw)
+            if principal.get("session_expires_at") and principal["session_expires_at"] <= datetime.utcnow():
+                return None
+            self._store_local(token_hash, principal)
+            self.stats["redis_hits"] += 1
+            return principal
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, token: str, principal: Dict[str, Any]):
+        """Cache a freshly authenticated principal"""
+        token_hash = hash_token(token)
+        self._store_local(token_hash, principal)
+
+        ttl = self._ttl_for(principal, self.ttl)
+        if ttl <= 0:
+            return
+        user_key = f"{REDIS_KEY_PREFIX}:user:{principal['id']}"
+
+        def write(r):
+            pipe = r.pipeline()
+            pipe.setex(f"{REDIS_KEY_PREFIX}:{token_hash}", ttl, self._encode(principal))
+            pipe.sadd(user_key, token_hash)
+            pipe.expire(user_key, self.ttl)
+            pipe.execute()
+
+        self._redis_call(write)
+
+    def invalidate_token(self, token: str):
+        """Drop a single token's cached principal"""
+        token_hash = hash_token(token)
+        with self._lock:
+            entry = self._local.pop(token_hash, None)
+            if entry:
+                self._user_tokens.get(entry[1]["id"], set()).discard(token_hash)
+            self.stats["invalidations"] += 1
+        self._redis_call(lambda r: r.delete(f"{REDIS_KEY_PREFIX}:{token_hash}"))
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached principal belonging to a user"""
+        with self._lock:
+            for token_hash in self._user_tokens.pop(user_id, set()):
+                self._local.pop(token_hash, None)
+            self.stats["invalidations"] += 1
+
+        user_key = f"{REDIS_KEY_PREFIX}:user:{user_id}"
+
+        def purge(r):
+            token_hashes = r.smembers(user_key)
+            keys = [f"{REDIS_KEY_PREFIX}:{h.decode() if isinstance(h, bytes) else h}" for h in token_hashes]
+            r.delete(user_key, *keys)
+
+        self._redis_call(purge)
+
+    def clear(self):
+        """Clear the in-process level (used by tests and on shutdown)"""
+        with self._lock:
+            self._local.clear()
+            self._user_tokens.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "local_entries": len(self._local), "redis_enabled": self._redis is not None}
+
+
+class LastUsedTracker:
+    """Coalesces session last_used timestamps and writes them in batches"""
+
+    def __init__(self, flush_interval: float = AUTH_LAST_USED_FLUSH_INTERVAL, engine=None):
+        self.flush_interval = flush_interval
+        self._engine = engine
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.flushed = 0
+
+    def touch(self, session_id: int, when: Optional[datetime] = None):
+        """Record that a session was used; the write happens on the next flush"""
+        with self._lock:
+            self._pending[session_id] = when or datetime.utcnow()
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._thread is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="last-used-flusher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all pending last_used values in one executemany statement"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        engine = self._engine
+        if engine is None:
+            from app.core.database import get_engine
+            engine = get_engine("oltp")
+
+        rows = [{"session_id": sid, "last_used": ts} for sid, ts in pending.items()]
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE user_sessions SET last_used = :last_used WHERE id = :session_id"), rows)
+            self.flushed += len(rows)
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Failed to flush session last_used updates: {e}")
+            # Keep the newest timestamps for the next attempt
+            with self._lock:
+                for sid, ts in pending.items():
+                    if sid not in self._pending or self._pending[sid] < ts:
+                        self._pending[sid] = ts
+            return 0
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+
+_principal_cache: Optional[PrincipalCache] = None
+_last_used_tracker: Optional[LastUsedTracker] = None
+_singleton_lock = threading.Lock()
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get the process-wide principal cache"""
+    global _principal_cache
+    if _principal_cache is None:
+        with _singleton_lock:
+            if _principal_cache is None:
+                _principal_cache = PrincipalCache()
+    return _principal_cache
+
+
+def get_last_used_tracker() -> LastUsedTracker:
+    """Get the process-wide last_used batcher"""
+    global _last_used_tracker
+    if _last_used_tracker is None:
+        with _singleton_lock:
+            if _last_used_tracker is None:
+                _last_used_tracker = LastUsedTracker()
+                atexit.register(_last_used_tracker.stop)
+    return _last_used_tracker
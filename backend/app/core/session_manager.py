@@ -15,8 +15,9 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from collections import deque
 import asyncio
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
+from app.core.database import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +41,7 @@ class SessionManager:
     
     def __init__(self, db_url: str):
         self.db_url = db_url
-        self.engine = create_engine(db_url)
+        self.engine = get_engine("oltp", db_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
         # In-memory session cache for performance
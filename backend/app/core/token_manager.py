@@ -17,6 +17,7 @@ from sqlalchemy import text
 from database_manager import get_db_connection
 
 from app.core.settings import SECRET_KEY, ALGORITHM
+from app.core.principal_cache import get_principal_cache
 from auth.models import User
 
 logger = logging.getLogger(__name__)
@@ -189,8 +190,9 @@ class TokenManager:
             payload = self.verify_token(token)
             token_type = payload.get("type")
             
-            # Add to blacklist
+            # Add to blacklist and drop any cached principal for it
             token_blacklist.add(token)
+            get_principal_cache().invalidate_token(token)
             
             # If it's a refresh token, remove from user's active tokens
             if token_type == "refresh":
@@ -214,6 +216,8 @@ class TokenManager:
                     token_blacklist.add(token)
                 user_refresh_tokens[user_id].clear()
             
+            get_principal_cache().invalidate_user(user_id)
+            
             logger.info(f"Revoked all tokens for user {user_id}")
             return True
             
@@ -294,7 +298,8 @@ class TokenManager:
                 "users_with_tokens": len(user_refresh_tokens),
                 "max_refresh_tokens_per_user": MAX_REFRESH_TOKENS_PER_USER,
                 "access_token_expiry_minutes": ACCESS_TOKEN_EXPIRE_MINUTES,
-                "refresh_token_expiry_days": REFRESH_TOKEN_EXPIRE_DAYS
+                "refresh_token_expiry_days": REFRESH_TOKEN_EXPIRE_DAYS,
+                "principal_cache": get_principal_cache().get_stats()
             }
         except Exception as e:
             logger.error(f"Error getting token stats: {e}")
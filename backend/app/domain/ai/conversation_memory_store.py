@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Bounded conversation memory store for the AI enhancement manager
+Keeps ConversationMemory objects in a process-wide LRU capped by session
+count, estimated payload bytes and idle time, hydrates a cold session with a
+single query, and persists new messages write-behind in periodic batches.
+"""
+
+import atexit
+import json
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.settings import (
+    AI_MEMORY_MAX_SESSIONS,
+    AI_MEMORY_MAX_BYTES,
+    AI_MEMORY_IDLE_TTL,
+    AI_MEMORY_FLUSH_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rough per-object overheads (dict, deque slot, small fields) for size estimates
+_MEMORY_OVERHEAD = 2048
+_MESSAGE_OVERHEAD = 400
+
+HYDRATE_SQL = text("""
+    SELECT c.id AS conversation_id, m.id, m.role, m.content, m.message_type, m.metadata, m.timestamp
+    FROM conversations c
+    LEFT JOIN (
+        SELECT id, conversation_id, role, content, message_type, metadata, timestamp
+        FROM messages
+        WHERE conversation_id = (
+            SELECT id FROM conversations WHERE session_id = :session_id AND is_active = TRUE LIMIT 1
+        )
+        ORDER BY timestamp DESC, id DESC
+        LIMIT :limit
+    ) m ON m.conversation_id = c.id
+    WHERE c.session_id = :session_id AND c.is_active = TRUE
+""")
+
+INSERT_MESSAGE_SQL = text("""
+    INSERT INTO messages (conversation_id, role, content, message_type, metadata, timestamp)
+    VALUES (:conversation_id, :role, :content, :message_type, :metadata, :timestamp)
+""")
+
+
+def estimate_memory_bytes(memory) -> int:
+    """Approximate retained bytes of a ConversationMemory's payload"""
+    total = _MEMORY_OVERHEAD + sys.getsizeof(getattr(memory, "conversation_summary", "") or "")
+    for message in getattr(memory, "messages", ()):
+        total += _MESSAGE_OVERHEAD + sys.getsizeof(message.get("content") or "")
+        metadata = message.get("metadata")
+        if metadata:
+            total += len(json.dumps(metadata, default=str))
+    preferences = getattr(memory, "user_preferences", None)
+    if preferences:
+        total += len(json.dumps(preferences, default=str))
+    return total
+
+
+def fetch_recent_messages(conn, session_id: str, limit: int) -> Tuple[Optional[int], List[Any]]:
+    """
+    Load a session's conversation id and its newest ``limit`` messages in one
+    round trip. Messages are returned oldest first.
+    """
+    rows = conn.execute(HYDRATE_SQL, {"session_id": session_id, "limit": limit}).fetchall()
+    if not rows:
+        return None, []
+    messages = [row for row in rows if row.role is not None]
+    messages.sort(key=lambda row: (row.timestamp is None, row.timestamp, row.id))
+    return rows[0].conversation_id, messages
+
+
+@dataclass
+class _Entry:
+    memory: Any
+    size: int
+    last_access: float
+
+
+class ConversationMemoryStore:
+    """Process-wide LRU of conversation memories bounded by count, bytes and idle time"""
+
+    def __init__(self, max_sessions: int = AI_MEMORY_MAX_SESSIONS, max_bytes: int = AI_MEMORY_MAX_BYTES,
+                 idle_ttl: float = AI_MEMORY_IDLE_TTL, size_of=estimate_memory_bytes):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._size_of = size_of
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self.idle_ttl > 0 and now - entry.last_access > self.idle_ttl
+
+    def _drop(self, session_id: str) -> Optional[_Entry]:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _enforce_bounds(self, now: float):
+        # Idle entries sit at the head of the LRU order
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if not self._expired(entry, now):
+                break
+            self._drop(session_id)
+            self.stats["expirations"] += 1
+        # Always keep the most recent session, even if it alone exceeds max_bytes
+        while len(self._entries) > max(self.max_sessions, 0) or (self._bytes > self.max_bytes and len(self._entries) > 1):
+            session_id = next(iter(self._entries))
+            self._drop(session_id)
+            self.stats["evictions"] += 1
+
+    def get(self, session_id: str):
+        """Return a cached memory and mark it recently used"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and self._expired(entry, now):
+                self._drop(session_id)
+                self.stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            entry.last_access = now
+            self._entries.move_to_end(session_id)
+            self.stats["hits"] += 1
+            return entry.memory
+
+    def put(self, session_id: str, memory):
+        """Insert or re-account a memory (call again after it grows)"""
+        size = self._size_of(memory)
+        now = time.monotonic()
+        with self._lock:
+            self._drop(session_id)
+            self._entries[session_id] = _Entry(memory=memory, size=size, last_access=now)
+            self._bytes += size
+            self._enforce_bounds(now)
+
+    def discard(self, session_id: str) -> bool:
+        with self._lock:
+            return self._drop(session_id) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # Mapping-style access for callers that treated memory_cache as a dict
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._entries
+
+    def __getitem__(self, session_id: str):
+        memory = self.get(session_id)
+        if memory is None:
+            raise KeyError(session_id)
+        return memory
+
+    def __setitem__(self, session_id: str, memory):
+        self.put(session_id, memory)
+
+    def __delitem__(self, session_id: str):
+        if not self.discard(session_id):
+            raise KeyError(session_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def session_sizes(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Largest sessions by estimated bytes"""
+        with self._lock:
+            entries = sorted(self._entries.items(), key=lambda item: item[1].size, reverse=True)[:limit]
+            return [
+                {"session_id": session_id, "bytes": entry.size,
+                 "messages": len(getattr(entry.memory, "messages", ()))}
+                for session_id, entry in entries
+            ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "sessions": entries,
+                "bytes": self._bytes,
+                "avg_session_bytes": self._bytes // entries if entries else 0,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "idle_ttl": self.idle_ttl,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+                "largest_sessions": self.session_sizes(5),
+            }
+
+
+class MessageWriteBehind:
+    """Queues new conversation messages and inserts them in periodic batches"""
+
+    def __init__(self, flush_interval: float = AI_MEMORY_FLUSH_INTERVAL, engine=None):
+        self.flush_interval = flush_interval
+        self._engine = engine
+        self._pending: Deque[Tuple[str, Dict[str, Any]]] = deque()
+        self._pending_sessions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"written": 0, "failed_flushes": 0}
+
+    def enqueue(self, session_id: str, conversation_id: int, message: Dict[str, Any]):
+        """Queue one ConversationMemory message dict for insertion"""
+        timestamp = message.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        row = {
+            "conversation_id": conversation_id,
+            "role": message["role"],
+            "content": message["content"],
+            "message_type": message.get("type", "text"),
+            "metadata": json.dumps(message["metadata"], default=str) if message.get("metadata") else None,
+            "timestamp": timestamp or datetime.now(),
+        }
+        with self._lock:
+            self._pending.append((session_id, row))
+            self._pending_sessions[session_id] = self._pending_sessions.get(session_id, 0) + 1
+        self._ensure_worker()
+
+    def has_pending(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._pending_sessions
+
+    def _ensure_worker(self):
+        if self._thread is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="conversation-message-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """Insert every queued message in one executemany statement"""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+                self._pending.clear()
+            if not batch:
+                return 0
+
+            engine = self._engine
+            if engine is None:
+                from app.core.database import get_engine
+                engine = get_engine("oltp")
+
+            try:
+                with engine.begin() as conn:
+                    conn.execute(INSERT_MESSAGE_SQL, [row for _, row in batch])
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} conversation messages: {e}")
+                self.stats["failed_flushes"] += 1
+                # Put the batch back ahead of anything queued meanwhile, preserving order
+                with self._lock:
+                    self._pending.extendleft(reversed(batch))
+                return 0
+
+            with self._lock:
+                for session_id, _ in batch:
+                    remaining = self._pending_sessions.get(session_id, 0) - 1
+                    if remaining > 0:
+                        self._pending_sessions[session_id] = remaining
+                    else:
+                        self._pending_sessions.pop(session_id, None)
+            self.stats["written"] += len(batch)
+            return len(batch)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "pending": len(self._pending)}
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+
+_memory_store: Optional[ConversationMemoryStore] = None
+_message_writer: Optional[MessageWriteBehind] = None
+_singleton_lock = threading.Lock()
+
+
+def get_conversation_memory_store() -> ConversationMemoryStore:
+    """Get the process-wide conversation memory store"""
+    global _memory_store
+    if _memory_store is None:
+        with _singleton_lock:
+            if _memory_store is None:
+                _memory_store = ConversationMemoryStore()
+    return _memory_store
+
+
+def get_message_writer() -> MessageWriteBehind:
+    """Get the process-wide write-behind message writer"""
+    global _message_writer
+    if _message_writer is None:
+        with _singleton_lock:
+            if _message_writer is None:
+                _message_writer = MessageWriteBehind()
+                atexit.register(_message_writer.stop)
+    return _message_writer
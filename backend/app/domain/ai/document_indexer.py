@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Document chunking and embedding for the RAG collections
+Splits documents at section, paragraph and sentence boundaries with a short
+sentence overlap, embeds chunks from many documents in one call (locally with
+sentence-transformers, or by Chroma's collection function) and upserts them
+into the collection for the document type under stable per-chunk IDs.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.settings import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_DEVICE,
+    EMBEDDING_MODEL,
+    RAG_CHUNK_OVERLAP,
+    RAG_CHUNK_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Collection each classified document type is retrieved from (see RAGService collection mapping)
+DOC_TYPE_COLLECTIONS = {
+    'transaction_data': 'market_analysis',
+    'legal_document': 'regulatory_framework',
+    'market_report': 'market_analysis',
+    'property_listing': 'real_estate_docs',
+    'guideline_document': 'transaction_guidance',
+}
+DEFAULT_COLLECTION = 'comprehensive_data'
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+\S")
+_NUMBERED_HEADING = re.compile(r"^(\d+(\.\d+)*\.?|[IVX]+\.|Article\s+\d+|Section\s+\d+)\s+[A-Z][^.!?]*$")
+_MAX_HEADING_LENGTH = 80
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+
+@dataclass
+class TextChunk:
+    """One retrievable piece of a document"""
+    text: str
+    index: int
+    section: Optional[str] = None
+
+
+def _is_heading(line: str) -> bool:
+    if not line or len(line) > _MAX_HEADING_LENGTH:
+        return False
+    if _MARKDOWN_HEADING.match(line) or _NUMBERED_HEADING.match(line):
+        return True
+    letters = [c for c in line if c.isalpha()]
+    # "PAYMENT TERMS" or "Payment terms:" on a line of its own
+    return (len(letters) >= 3 and all(c.isupper() for c in letters)) or (line.endswith(':') and len(line.split()) <= 8)
+
+
+def split_sections(text: str) -> List[Tuple[Optional[str], List[str]]]:
+    """``(heading, paragraphs)`` in document order; text before the first heading has no heading"""
+    sections: List[Tuple[Optional[str], List[str]]] = []
+    heading, paragraphs = None, []
+    for block in _PARAGRAPH_BREAK.split(text):
+        lines: List[str] = []
+        for line in block.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if _is_heading(line):
+                if lines:
+                    paragraphs.append(" ".join(lines))
+                    lines = []
+                if paragraphs or heading is not None:
+                    sections.append((heading, paragraphs))
+                heading, paragraphs = line.lstrip('#').strip(), []
+            else:
+                lines.append(line)
+        if lines:
+            paragraphs.append(" ".join(lines))
+    if paragraphs or heading is not None:
+        sections.append((heading, paragraphs))
+    return sections
+
+
+def split_sentences(paragraph: str, max_length: int) -> List[str]:
+    """Sentences of a paragraph; a sentence longer than ``max_length`` is split between words"""
+    sentences = []
+    for sentence in _SENTENCE_END.split(paragraph):
+        while len(sentence) > max_length:
+            cut = sentence.rfind(' ', 0, max_length + 1)
+            if cut <= 0:
+                cut = max_length
+            sentences.append(sentence[:cut].rstrip())
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def chunk_text(text: str, chunk_size: int = RAG_CHUNK_SIZE, overlap: int = RAG_CHUNK_OVERLAP) -> List[TextChunk]:
+    """
+    Pack whole sentences into chunks of at most ``chunk_size`` characters.
+
+    A section starts a new chunk unless the current one is still under a
+    quarter of ``chunk_size``. When a chunk is closed because it is full, the
+    next one repeats its trailing sentences up to ``overlap`` characters.
+    """
+    if chunk_size <= 0 or not 0 <= overlap < chunk_size:
+        raise ValueError("chunk_size must be positive and overlap smaller than chunk_size")
+
+    chunks: List[TextChunk] = []
+    parts: List[Tuple[str, str]] = []  # (separator before, sentence)
+    length = 0
+    chunk_section: Optional[str] = None
+
+    def emit():
+        body = parts[0][1] + "".join(sep + sentence for sep, sentence in parts[1:])
+        chunks.append(TextChunk(text=body, index=len(chunks), section=chunk_section))
+
+    def tail() -> List[Tuple[str, str]]:
+        kept, size = [], 0
+        for sep, sentence in reversed(parts[1:]):
+            size += len(sentence) + len(sep)
+            if size > overlap:
+                break
+            kept.append((sep, sentence))
+        return kept[::-1]
+
+    for heading, paragraphs in split_sections(text):
+        if parts and length >= chunk_size // 4:
+            emit()
+            parts, length = [], 0
+        if not parts:
+            chunk_section = heading
+        units = [[heading]] if heading else []
+        units.extend(split_sentences(paragraph, chunk_size) for paragraph in paragraphs)
+        for unit in units:
+            for position, sentence in enumerate(unit):
+                sep = " " if position else "\n\n"
+                if parts and length + len(sep) + len(sentence) > chunk_size:
+                    emit()
+                    parts = tail()
+                    chunk_section = heading
+                    length = sum(len(s) + len(p) for p, s in parts) - (len(parts[0][0]) if parts else 0)
+                    if parts and length + len(sep) + len(sentence) > chunk_size:
+                        parts, length = [], 0
+                length += len(sentence) + (len(sep) if parts else 0)
+                parts.append((sep, sentence))
+    if parts:
+        emit()
+    return chunks
+
+
+def collection_for(doc_type: Optional[str]) -> str:
+    return DOC_TYPE_COLLECTIONS.get(doc_type or '', DEFAULT_COLLECTION)
+
+
+def document_id_for(content: str) -> str:
+    """Stable ID of a document without one of its own"""
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class SentenceTransformerEmbedder:
+    """Local embedding model; encodes a whole list of chunks per call"""
+
+    def __init__(self, model_name: str, device: Optional[str] = None, batch_size: int = 64):
+        from sentence_transformers import SentenceTransformer  # optional dependency
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device=device)
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(
+            texts, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False
+        ).tolist()
+
+
+_default_embedder: Optional[Embedder] = None
+_default_embedder_loaded = False
+_default_embedder_lock = threading.Lock()
+
+
+def get_default_embedder() -> Optional[Embedder]:
+    """The EMBEDDING_MODEL embedder, loaded once; None lets Chroma embed"""
+    global _default_embedder, _default_embedder_loaded
+    if not _default_embedder_loaded:
+        with _default_embedder_lock:
+            if not _default_embedder_loaded:
+                if EMBEDDING_MODEL:
+                    try:
+                        _default_embedder = SentenceTransformerEmbedder(EMBEDDING_MODEL, device=EMBEDDING_DEVICE)
+                        logger.info(f"Embedding chunks locally with {EMBEDDING_MODEL}")
+                    except Exception as e:
+                        logger.warning(f"Local embedding model {EMBEDDING_MODEL} unavailable, Chroma will embed: {e}")
+                _default_embedder_loaded = True
+    return _default_embedder
+
+
+@dataclass
+class IndexingStats:
+    """Totals of one ``index_documents`` call"""
+    documents: int = 0
+    failed_documents: int = 0
+    chunks: int = 0
+    embed_calls: int = 0
+    seconds: float = 0.0
+    collections: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class _PendingChunk:
+    collection: str
+    chunk_id: str
+    text: str
+    metadata: Dict[str, Any]
+
+
+class DocumentIndexer:
+    """
+    Chunks documents and upserts them into their Chroma collections.
+
+    Chunks from consecutive documents are buffered and sent ``batch_size`` at
+    a time: one embedding call, then one upsert per collection. Chunk IDs are
+    ``<document id>:<chunk index>``, so re-indexing a document overwrites its
+    chunks; chunks left over from a longer previous version are deleted.
+    """
+
+    def __init__(self, chroma_client, embedder: Optional[Embedder] = None,
+                 chunk_size: int = RAG_CHUNK_SIZE, overlap: int = RAG_CHUNK_OVERLAP,
+                 batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.chroma_client = chroma_client
+        self.embedder = embedder
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.batch_size = max(1, batch_size)
+        self._collections: Dict[str, Any] = {}
+
+    def _collection(self, name: str):
+        if name not in self._collections:
+            self._collections[name] = self.chroma_client.get_or_create_collection(name)
+        return self._collections[name]
+
+    def _prepare(self, document: Dict[str, Any]) -> Tuple[str, str, List[_PendingChunk]]:
+        content = document.get('content') or document.get('text') or ''
+        document_id = str(document.get('id') or document_id_for(content))
+        doc_type = document.get('doc_type') or 'unknown'
+        collection = document.get('collection') or collection_for(doc_type)
+        base = {
+            key: value for key, value in (document.get('metadata') or {}).items()
+            if isinstance(value, (str, int, float, bool))
+        }
+        chunks = chunk_text(content, self.chunk_size, self.overlap)
+        pending = []
+        for chunk in chunks:
+            metadata = dict(base, document_id=document_id, doc_type=doc_type,
+                            chunk_index=chunk.index, chunk_count=len(chunks))
+            if chunk.section:
+                metadata['section'] = chunk.section
+            pending.append(_PendingChunk(collection, f"{document_id}:{chunk.index}", chunk.text, metadata))
+        return document_id, collection, pending
+
+    def index_documents(self, documents: Iterable[Dict[str, Any]]) -> IndexingStats:
+        """
+        Index documents given as dicts with ``content`` (or ``text``) and
+        optional ``id``, ``doc_type``, ``collection`` and scalar ``metadata``.
+        A document that cannot be chunked is counted as failed; Chroma or
+        embedding errors propagate.
+        """
+        stats = IndexingStats()
+        started = time.perf_counter()
+        pending: List[_PendingChunk] = []
+        resized: List[Tuple[str, str, int]] = []  # (collection, document id, new chunk count)
+
+        for document in documents:
+            try:
+                document_id, collection, chunks = self._prepare(document)
+            except Exception as e:
+                stats.failed_documents += 1
+                logger.error(f"Could not chunk document {document.get('id')}: {e}")
+                continue
+            stats.documents += 1
+            pending.extend(chunks)
+            resized.append((collection, document_id, len(chunks)))
+            while len(pending) >= self.batch_size:
+                self._flush(pending[:self.batch_size], stats)
+                pending = pending[self.batch_size:]
+        if pending:
+            self._flush(pending, stats)
+        self._delete_stale(resized)
+
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def _flush(self, batch: Sequence[_PendingChunk], stats: IndexingStats):
+        embeddings = None
+        if self.embedder is not None:
+            embeddings = self.embedder([chunk.text for chunk in batch])
+            stats.embed_calls += 1
+
+        positions: Dict[str, List[int]] = defaultdict(list)
+        for position, chunk in enumerate(batch):
+            positions[chunk.collection].append(position)
+        for name, members in positions.items():
+            upsert = {
+                'ids': [batch[i].chunk_id for i in members],
+                'documents': [batch[i].text for i in members],
+                'metadatas': [batch[i].metadata for i in members],
+            }
+            if embeddings is not None:
+                upsert['embeddings'] = [embeddings[i] for i in members]
+            self._collection(name).upsert(**upsert)
+            stats.collections[name] = stats.collections.get(name, 0) + len(members)
+        stats.chunks += len(batch)
+
+    def _delete_stale(self, resized: Sequence[Tuple[str, str, int]]):
+        """Remove chunks past each document's new chunk count, one delete per collection"""
+        by_collection: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for collection, document_id, count in resized:
+            by_collection[collection].append(
+                {"$and": [{"document_id": document_id}, {"chunk_index": {"$gte": count}}]}
+            )
+        for name, clauses in by_collection.items():
+            for start in range(0, len(clauses), self.batch_size):
+                group = clauses[start:start + self.batch_size]
+                self._collection(name).delete(where=group[0] if len(group) == 1 else {"$or": group})
@@ -11,10 +11,12 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import chromadb
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import json
 import hashlib
-from cache_manager import cache_manager
+from cache_manager import cache_manager, property_tag, area_tag, collection_tag, ALL_PROPERTIES_TAG
+from app.core.database import get_engine
+from app.domain.listings.property_index import get_property_index
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +51,7 @@ class HybridSearchEngine:
     """Hybrid search engine combining vector and structured search"""
     
     def __init__(self, database_url: str, chroma_host: str = "localhost", chroma_port: int = 8000):
-        self.engine = create_engine(database_url)
+        self.engine = get_engine("oltp", database_url)
         self.chroma_client = self._initialize_chroma_client(chroma_host, chroma_port)
         self.cache_manager = cache_manager
         
@@ -95,35 +97,37 @@ class HybridSearchEngine:
         start_time = time.time()
         self.search_metrics["total_searches"] += 1
         
-        # Check cache first
+        # Serve from cache; concurrent misses for the same search share one computation
         cache_key = self._generate_search_cache_key(params)
-        cached_results = self.cache_manager.get_cached_property_search({
+        computed = False
+        
+        def run_search() -> List[Dict[str, Any]]:
+            nonlocal computed
+            computed = True
+            if params.search_type == SearchType.VECTOR_ONLY:
+                results = self._vector_search(params)
+                self.search_metrics["vector_searches"] += 1
+            elif params.search_type == SearchType.STRUCTURED_ONLY:
+                results = self._structured_search(params)
+                self.search_metrics["structured_searches"] += 1
+            else:  # HYBRID
+                results = self._hybrid_search(params)
+                self.search_metrics["hybrid_searches"] += 1
+            return [{**result.__dict__, "search_type": result.search_type.value} for result in results]
+        
+        cache_data = self.cache_manager.get_or_compute("property_search", {
             "cache_key": cache_key,
             "search_type": params.search_type.value
-        })
+        }, run_search, ttl=1800, tags=lambda data: self._cache_tags(params, data))
+        results = [
+            SearchResult(**{**result, "search_type": SearchType(result["search_type"])})
+            for result in cache_data or []
+        ]
         
-        if cached_results:
+        if not computed:
             self.search_metrics["cache_hits"] += 1
             logger.debug(f"Cache hit for search: {cache_key}")
-            return [SearchResult(**result) for result in cached_results]
-        
-        # Perform search based on type
-        if params.search_type == SearchType.VECTOR_ONLY:
-            results = self._vector_search(params)
-            self.search_metrics["vector_searches"] += 1
-        elif params.search_type == SearchType.STRUCTURED_ONLY:
-            results = self._structured_search(params)
-            self.search_metrics["structured_searches"] += 1
-        else:  # HYBRID
-            results = self._hybrid_search(params)
-            self.search_metrics["hybrid_searches"] += 1
-        
-        # Cache results
-        cache_data = [result.__dict__ for result in results]
-        self.cache_manager.cache_property_search({
-            "cache_key": cache_key,
-            "search_type": params.search_type.value
-        }, cache_data, ttl=1800)
+            return results
         
         # Update metrics
         execution_time = time.time() - start_time
@@ -131,6 +135,19 @@ class HybridSearchEngine:
         
         return results
     
+    def _cache_tags(self, params: SearchParams, results: List[Dict[str, Any]]) -> List[str]:
+        """Dependency tags so property writes and re-indexing invalidate this search"""
+        tags = [
+            property_tag(result["metadata"]["id"])
+            for result in results
+            if (result.get("metadata") or {}).get("id") is not None
+        ]
+        if params.search_type != SearchType.STRUCTURED_ONLY:
+            tags.append(collection_tag(self._get_collection_for_intent(params.intent)))
+        if params.search_type != SearchType.VECTOR_ONLY:
+            tags.append(area_tag(params.location) if params.location else ALL_PROPERTIES_TAG)
+        return tags
+    
     def _vector_search(self, params: SearchParams) -> List[SearchResult]:
         """Perform vector search using ChromaDB"""
         start_time = time.time()
@@ -218,41 +235,56 @@ class HybridSearchEngine:
             
             sql = " ".join(sql_parts)
             
-            with self.engine.connect() as conn:
-                db_results = conn.execute(text(sql), query_params)
+            # Answer from the in-memory property index; Postgres only when it is unavailable
+            index_result = get_property_index().search(
+                price_min=query_params.get('budget_min'),
+                price_max=query_params.get('budget_max'),
+                location=params.location,
+                property_type=params.property_type,
+                bedrooms_min=params.bedrooms or None,
+                bathrooms_min=params.bathrooms or None,
+                listing_status="live",
+                text_query=params.query,
+                limit=params.max_results
+            )
+            if index_result is not None:
+                db_results = index_result.records
+            else:
+                with self.engine.connect() as conn:
+                    db_results = conn.execute(text(sql), query_params).fetchall()
+            
+            for row in db_results:
+                # Create content string for consistency
+                content = f"""
+                Property: {row.title or 'Untitled'}
+                Location: {row.location or 'Not specified'}
+                Price: AED {row.price_aed:,.0f} if row.price_aed else 'Price on request'
+                Type: {row.property_type or 'Not specified'}
+                Bedrooms: {row.bedrooms or 'Not specified'}
+                Bathrooms: {row.bathrooms or 'Not specified'}
+                Area: {row.area_sqft or 'Not specified'} sq ft
+                Description: {row.description or 'No description available'}
+                """
                 
-                for row in db_results:
-                    # Create content string for consistency
-                    content = f"""
-                    Property: {row.title or 'Untitled'}
-                    Location: {row.location or 'Not specified'}
-                    Price: AED {row.price_aed:,.0f} if row.price_aed else 'Price on request'
-                    Type: {row.property_type or 'Not specified'}
-                    Bedrooms: {row.bedrooms or 'Not specified'}
-                    Bathrooms: {row.bathrooms or 'Not specified'}
-                    Area: {row.area_sqft or 'Not specified'} sq ft
-                    Description: {row.description or 'No description available'}
-                    """
-                    
-                    execution_time = time.time() - start_time
-                    
-                    results.append(SearchResult(
-                        content=content.strip(),
-                        source="postgresql_properties",
-                        relevance_score=0.9,  # High relevance for exact matches
-                        metadata={
-                            'id': row.id,
-                            'title': row.title,
-                            'price_aed': row.price_aed,
-                            'location': row.location,
-                            'property_type': row.property_type,
-                            'bedrooms': row.bedrooms,
-                            'bathrooms': row.bathrooms,
-                            'area_sqft': row.area_sqft
-                        },
-                        search_type=SearchType.STRUCTURED_ONLY,
-                        execution_time=execution_time
-                    ))
+                execution_time = time.time() - start_time
+                
+                results.append(SearchResult(
+                    content=content.strip(),
+                    source="postgresql_properties",
+                    relevance_score=0.9,  # High relevance for exact matches
+                    metadata={
+                        'id': row.id,
+                        'title': row.title,
+                        'price_aed': row.price_aed,
+                        'location': row.location,
+                        'property_type': row.property_type,
+                        'bedrooms': row.bedrooms,
+                        'bathrooms': row.bathrooms,
+                        'area_sqft': row.area_sqft
+                    },
+                    search_type=SearchType.STRUCTURED_ONLY,
+                    execution_time=execution_time
+                ))
         
         except Exception as e:
             logger.error(f"Error in structured search: {e}")
@@ -7,6 +7,8 @@ Handles document classification, content extraction, and data quality
 import logging
 import json
 import re
+import hashlib
+from difflib import SequenceMatcher
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import os
@@ -38,6 +40,16 @@ try:
 except ImportError:
     FUZZY_AVAILABLE = False
 
+# Near-duplicate detection
+from app.domain.ai.near_duplicate_index import (
+    NearDuplicateIndex,
+    find_duplicate_groups,
+    normalize_text,
+    normalize_value,
+    record_features,
+)
+from app.core.settings import DUPLICATE_INDEX_PATH, DUPLICATE_INDEX_NUM_PERM, DUPLICATE_INDEX_BANDS
+
 # PDF Processing
 try:
     import PyPDF2
@@ -53,23 +65,50 @@ except ImportError:
 
 # AI Integration
 try:
-    import google.generativeai as genai
-    from app.core.settings import GOOGLE_API_KEY, AI_MODEL
+    from app.infrastructure.integrations.llm_gateway import get_llm_gateway
+    from app.core.settings import AI_MODEL
     AI_AVAILABLE = True
-    genai.configure(api_key=GOOGLE_API_KEY)
-    model = genai.GenerativeModel(AI_MODEL)
+    model = get_llm_gateway().get_model("gemini", AI_MODEL)
 except ImportError:
     AI_AVAILABLE = False
     model = None
 
 logger = logging.getLogger(__name__)
 
+# Verified similarity (0-100) above which documents / transaction rows are duplicates
+DOCUMENT_DUPLICATE_THRESHOLD = 80
+# Estimated shingle Jaccard from which a registered document is a duplicate
+DOCUMENT_DUPLICATE_JACCARD = 0.5
+TRANSACTION_DUPLICATE_THRESHOLD = 90
+# Transaction candidates whose estimated share of equal fields is below this skip verification
+TRANSACTION_MIN_ESTIMATE = 0.5
+
+
+def _is_missing(value) -> bool:
+    if value is None:
+        return True
+    try:
+        return bool(value != value)  # NaN / NaT
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value.replace(",", ""))
+        return True
+    except ValueError:
+        return False
+
+
 class IntelligentDataProcessor:
     """Intelligent data processor with proper classification and duplicate detection"""
     
     def __init__(self):
         # Initialize ChromaDB client lazily
         self._chroma_client = None
+        # Persistent near-duplicate index of uploaded documents, loaded on first use
+        self._document_index = None
         
         # Document classification patterns
         self.classification_patterns = {
@@ -178,6 +217,17 @@ class IntelligentDataProcessor:
                 self._chroma_client = None
         return self._chroma_client
 
+    @property
+    def document_index(self) -> NearDuplicateIndex:
+        """Lazy initialization of the uploaded-document duplicate index"""
+        if self._document_index is None:
+            self._document_index = NearDuplicateIndex(
+                num_perm=DUPLICATE_INDEX_NUM_PERM,
+                bands=DUPLICATE_INDEX_BANDS,
+                path=DUPLICATE_INDEX_PATH or None
+            )
+        return self._document_index
+
     def _get_document_category(self, text_content: str) -> dict:
         """
         Uses AI to classify the document into a specific category.
@@ -347,24 +397,30 @@ Analyze the following content and respond ONLY with a single, clean JSON object
             
             logger.info(f"Document classified as: {category} with confidence {confidence}")
 
-            # 3. Route to the correct specialized extractor
+            # 3. Check against earlier uploads, then index this one
+            duplicates = self.detect_duplicates(content)
+            self.register_document(content)
+
+            # 4. Route to the correct specialized extractor
             if category == 'transaction_sheet':
-                return self._extract_transaction_data(content)
+                result = self._extract_transaction_data(content)
             elif category == 'legal_handbook':
-                return self._process_legal_document(content)
+                result = self._process_legal_document(content)
             elif category == 'market_report':
-                return self._process_market_report(content)
+                result = self._process_market_report(content)
             elif category == 'property_brochure':
-                return self._process_property_brochure(content)
+                result = self._process_property_brochure(content)
             else:
                 # Handle other categories or unknown types
-                return {
+                result = {
                     "status": "classified", 
                     "category": category, 
                     "confidence": confidence,
                     "content_length": len(content),
                     "extracted_at": datetime.now().isoformat()
                 }
+            result["duplicates"] = duplicates
+            return result
 
         except Exception as e:
             logger.error(f"Document processing failed: {e}")
@@ -414,26 +470,160 @@ Analyze the following content and respond ONLY with a single, clean JSON object
             "extracted_at": datetime.now().isoformat()
         }
 
-    def detect_duplicates(self, new_content: str, existing_contents: List[str]) -> List[dict]:
+    @staticmethod
+    def _similarity(a: str, b: str) -> int:
+        """Exact similarity (0-100) used to verify LSH candidates"""
+        if FUZZY_AVAILABLE:
+            return fuzz.ratio(a, b)
+        return round(SequenceMatcher(None, a, b).ratio() * 100)
+
+    def detect_duplicates(self, new_content: str, existing_contents: Optional[List[str]] = None) -> List[dict]:
         """
-        Detect potential duplicates using fuzzy matching
+        Detect potential duplicates using MinHash/LSH candidates and verification
+
+        Compares against ``existing_contents`` (matches carry their "index"),
+        verifying candidates with a fuzzy match of the texts. When omitted,
+        compares against the index of uploaded documents (matches carry their
+        "document_id"); those keep no text, so candidates are verified by the
+        shingle Jaccard their MinHash signatures estimate.
         """
-        if not FUZZY_AVAILABLE:
-            logger.warning("Fuzzy matching not available")
-            return []
-        
+        new_text = new_content.lower()
         duplicates = []
+        if existing_contents is None:
+            index = self.document_index
+            signature = index.signature(new_text)
+            for key in index.candidates(signature=signature):
+                estimate = index.estimated_similarity(signature, key)
+                if estimate >= DOCUMENT_DUPLICATE_JACCARD:
+                    duplicates.append({
+                        "document_id": key,
+                        "similarity": round(estimate * 100),
+                        "content_preview": (index.payload(key) or {}).get("preview", "")
+                    })
+            duplicates.sort(key=lambda d: -d["similarity"])
+            return duplicates
+
+        index = NearDuplicateIndex(num_perm=DUPLICATE_INDEX_NUM_PERM, bands=DUPLICATE_INDEX_BANDS)
         for i, existing_content in enumerate(existing_contents):
-            similarity = fuzz.ratio(new_content.lower(), existing_content.lower())
-            if similarity > 80:  # 80% similarity threshold
+            index.add(i, existing_content.lower())
+        for key in index.candidates(new_text):
+            similarity = self._similarity(new_text, existing_contents[key].lower())
+            if similarity > DOCUMENT_DUPLICATE_THRESHOLD:
                 duplicates.append({
-                    "index": i,
+                    "index": key,
                     "similarity": similarity,
-                    "content_preview": existing_content[:100] + "..."
+                    "content_preview": existing_contents[key][:100] + "..."
                 })
-        
+        duplicates.sort(key=lambda d: d["index"])
         return duplicates
 
+    def register_document(self, content: str) -> str:
+        """Add a document's signature and preview to the duplicate index; returns its content-derived ID"""
+        document_id = hashlib.sha1(normalize_text(content).encode("utf-8")).hexdigest()
+        self.document_index.add(document_id, content.lower(), payload={"preview": content[:100] + "..."})
+        return document_id
+
+    def clean_transaction_data(self, transactions: List[dict]) -> List[dict]:
+        """Strip text fields, turn NaN/NaT/blank values into None and drop empty rows"""
+        cleaned = []
+        for transaction in transactions:
+            record = {}
+            for key, value in transaction.items():
+                if isinstance(value, str):
+                    value = value.strip() or None
+                elif _is_missing(value):
+                    value = None
+                record[str(key).strip()] = value
+            if any(value is not None for value in record.values()):
+                cleaned.append(record)
+        return cleaned
+
+    def detect_duplicate_transactions(self, transactions: List[dict],
+                                      threshold: int = TRANSACTION_DUPLICATE_THRESHOLD) -> List[dict]:
+        """
+        Group near-duplicate transaction rows
+
+        LSH over the rows' field=value features finds candidates; a candidate
+        pair is verified field by field (see ``_transaction_similarity``).
+        """
+        normalized = [
+            {key: normalize_value(value) for key, value in transaction.items()}
+            for transaction in transactions
+        ]
+        groups = find_duplicate_groups(
+            [record_features(row) for row in normalized],
+            lambda i, j: self._transaction_similarity(normalized[i], normalized[j]),
+            threshold,
+            num_perm=DUPLICATE_INDEX_NUM_PERM,
+            bands=DUPLICATE_INDEX_BANDS,
+            min_estimate=TRANSACTION_MIN_ESTIMATE
+        )
+        return [
+            {
+                "group_id": group_id,
+                "indices": members,
+                "records": [transactions[i] for i in members],
+                "total_duplicates": len(members) - 1,
+                "similarity": similarity
+            }
+            for group_id, (members, similarity) in enumerate(groups, start=1)
+        ]
+
+    def _transaction_similarity(self, a: Dict[str, Optional[str]], b: Dict[str, Optional[str]]) -> int:
+        """
+        Lowest per-field similarity of two normalized rows: numbers must be
+        equal, text is compared with the fuzzy ratio, a value present on only
+        one side scores 0
+        """
+        lowest = 100
+        for field in a.keys() | b.keys():
+            left, right = a.get(field), b.get(field)
+            if left == right:
+                continue
+            if left is None or right is None or _is_number(left) or _is_number(right):
+                return 0
+            lowest = min(lowest, self._similarity(left, right))
+        return lowest
+
+    def generate_insights(self, transactions: List[dict]) -> dict:
+        """Field completeness and numeric ranges of a transaction file"""
+        fields = sorted({key for transaction in transactions for key in transaction})
+        total = len(transactions)
+        completeness = {}
+        numeric_summary = {}
+        for field in fields:
+            values = [transaction.get(field) for transaction in transactions]
+            present = [value for value in values if value is not None]
+            completeness[field] = round(len(present) / total, 3) if total else 0.0
+            numbers = [value for value in present if isinstance(value, (int, float)) and not isinstance(value, bool)]
+            if numbers:
+                numeric_summary[field] = {
+                    "min": min(numbers),
+                    "max": max(numbers),
+                    "average": sum(numbers) / len(numbers)
+                }
+        return {
+            "total_records": total,
+            "fields": fields,
+            "completeness": completeness,
+            "numeric_summary": numeric_summary
+        }
+
+    def generate_recommendations(self, duplicates: List[dict], transactions: List[dict]) -> List[str]:
+        """Follow-up actions for duplicate groups and sparsely filled fields"""
+        recommendations = []
+        if duplicates:
+            redundant = sum(group["total_duplicates"] for group in duplicates)
+            recommendations.append(
+                f"Review {len(duplicates)} duplicate groups ({redundant} redundant records) before importing"
+            )
+        for field, share in self.generate_insights(transactions)["completeness"].items():
+            if share < 0.9:
+                recommendations.append(f"Field '{field}' is empty in {round((1 - share) * 100)}% of records")
+        if not recommendations:
+            recommendations.append("No duplicates or incomplete fields found")
+        return recommendations
+
     def validate_data_quality(self, data: dict) -> dict:
         """
         Validate data quality and return quality metrics
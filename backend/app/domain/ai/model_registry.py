@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Versioned registry for trained model artifacts
+Each training run publishes an immutable version directory with a manifest;
+serving processes load the promoted version with joblib memory mapping so
+workers on one host share the artifact pages instead of each holding a copy.
+
+Layout under the registry root::
+
+    versions/<version>/manifest.json
+    versions/<version>/<artifact>.joblib
+    current.json        promoted version plus promotion history
+
+Publishing writes into a temporary directory that is renamed into place, and
+promotion and rollback replace ``current.json`` atomically, so readers only
+ever see a complete version. Promotion and rollback hold an exclusive lock on
+``.current.lock`` while they read and rewrite ``current.json``, so concurrent
+promotions from several processes never drop each other's history.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: promotions from one process at a time only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "current.json"
+LOCK_FILE = ".current.lock"
+# Promotions remembered for rollback
+HISTORY_LIMIT = 20
+
+
+class ModelRegistryError(Exception):
+    """Raised for unknown versions, incomplete artifacts or an empty rollback history"""
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Publish, promote, roll back and load versions of a set of artifacts.
+
+    Artifacts are grouped (e.g. ``models``, ``scalers``, ``encoders``) so a
+    loader can put each back where it came from. ``mmap_mode`` is passed to
+    ``joblib.load``; artifacts are dumped uncompressed so numpy arrays inside
+    them can be mapped read-only.
+    """
+
+    def __init__(self, root: str, mmap_mode: Optional[str] = 'r'):
+        self.root = Path(root)
+        self.versions_dir = self.root / "versions"
+        self.mmap_mode = mmap_mode or None
+
+    # Publishing
+    def publish(
+        self,
+        artifacts: Dict[str, Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]] = None,
+        promote: bool = False
+    ) -> str:
+        """
+        Write ``{group: {name: artifact}}`` as a new version and return its id.
+
+        The version becomes visible only once complete; it is served only after
+        ``promote`` (or ``promote=True`` here).
+        """
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        version = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:6]}"
+        staging = Path(tempfile.mkdtemp(prefix=f".{version}-", dir=self.versions_dir))
+        try:
+            manifest = {
+                'version': version,
+                'created_at': datetime.utcnow().isoformat(),
+                'metadata': metadata or {},
+                'artifacts': {}
+            }
+            for group, named in artifacts.items():
+                for name, artifact in named.items():
+                    filename = f"{name}.joblib"
+                    joblib.dump(artifact, staging / filename)
+                    manifest['artifacts'][name] = {
+                        'group': group,
+                        'file': filename,
+                        'sha256': _file_sha256(staging / filename),
+                        'bytes': (staging / filename).stat().st_size
+                    }
+            (staging / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+            os.chmod(staging, 0o755)
+            os.rename(staging, self.versions_dir / version)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"Published model version {version} ({len(manifest['artifacts'])} artifacts)")
+        if promote:
+            self.promote(version)
+        return version
+
+    # Promotion
+    def current_version(self) -> Optional[str]:
+        return self._read_current().get('version')
+
+    def promote(self, version: str):
+        """Serve ``version`` from now on; the previous one is kept for rollback"""
+        self.manifest(version)
+        with self._current_lock():
+            current = self._read_current()
+            history = current.get('history', [])
+            if current.get('version') and current['version'] != version:
+                history = [current['version']] + [v for v in history if v != current['version']]
+            self._write_current({
+                'version': version,
+                'promoted_at': datetime.utcnow().isoformat(),
+                'history': [v for v in history if v != version][:HISTORY_LIMIT]
+            })
+        logger.info(f"Promoted model version {version}")
+
+    def rollback(self) -> str:
+        """Go back to the previously promoted version and return it"""
+        with self._current_lock():
+            current = self._read_current()
+            history = [v for v in current.get('history', []) if (self.versions_dir / v / MANIFEST_FILE).exists()]
+            if not history:
+                raise ModelRegistryError("No earlier promoted model version to roll back to")
+            previous = history[0]
+            self._write_current({
+                'version': previous,
+                'promoted_at': datetime.utcnow().isoformat(),
+                'history': history[1:]
+            })
+        logger.info(f"Rolled back model version {current.get('version')} -> {previous}")
+        return previous
+
+    # Reading
+    def versions(self) -> List[str]:
+        """Published versions, oldest first"""
+        if not self.versions_dir.exists():
+            return []
+        return sorted(
+            entry.name for entry in self.versions_dir.iterdir()
+            if not entry.name.startswith('.') and (entry / MANIFEST_FILE).exists()
+        )
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        path = self.versions_dir / version / MANIFEST_FILE
+        if not path.exists():
+            raise ModelRegistryError(f"Unknown model version: {version}")
+        return json.loads(path.read_text())
+
+    def load(self, version: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Load a version (the promoted one by default) as ``{group: {name: artifact}}``"""
+        version = version or self.current_version()
+        if not version:
+            raise ModelRegistryError(f"No model version promoted in {self.root}")
+        manifest = self.manifest(version)
+        loaded: Dict[str, Dict[str, Any]] = {}
+        for name, entry in manifest['artifacts'].items():
+            path = self.versions_dir / version / entry['file']
+            if not path.exists():
+                raise ModelRegistryError(f"Model version {version} is missing {entry['file']}")
+            loaded.setdefault(entry['group'], {})[name] = joblib.load(path, mmap_mode=self.mmap_mode)
+        return loaded
+
+    def verify(self, version: str) -> bool:
+        """Whether every artifact of ``version`` matches its manifest checksum"""
+        manifest = self.manifest(version)
+        for entry in manifest['artifacts'].values():
+            path = self.versions_dir / version / entry['file']
+            if not path.exists() or _file_sha256(path) != entry['sha256']:
+                return False
+        return True
+
+    def prune(self, keep: int = 5) -> List[str]:
+        """Delete old versions beyond the newest ``keep``, never the promoted one or its rollback history"""
+        current = self._read_current()
+        protected = {current.get('version'), *current.get('history', [])}
+        versions = self.versions()
+        removed = [v for v in versions[:max(len(versions) - keep, 0)] if v not in protected]
+        for version in removed:
+            shutil.rmtree(self.versions_dir / version, ignore_errors=True)
+        return removed
+
+    @contextmanager
+    def _current_lock(self):
+        """Hold the registry's exclusive lock for a read-modify-write of ``current.json``"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / LOCK_FILE, 'a') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _read_current(self) -> Dict[str, Any]:
+        path = self.root / CURRENT_FILE
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text())
+
+    def _write_current(self, current: Dict[str, Any]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{CURRENT_FILE}-", dir=self.root)
+        try:
+            with os.fdopen(fd, 'w') as handle:
+                json.dump(current, handle, indent=2)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self.root / CURRENT_FILE)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Model artifact registry")
+    parser.add_argument("--root", default=os.getenv("ML_MODELS_DIR", "ml_models"), help="Registry directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List published versions")
+    promote_parser = commands.add_parser("promote", help="Serve a published version")
+    promote_parser.add_argument("version")
+    commands.add_parser("rollback", help="Serve the previously promoted version")
+    prune_parser = commands.add_parser("prune", help="Delete old unpromoted versions")
+    prune_parser.add_argument("--keep", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    registry = ModelRegistry(args.root)
+    if args.command == "list":
+        current = registry.current_version()
+        for version in registry.versions():
+            print(f"{'*' if version == current else ' '} {version}")
+    elif args.command == "promote":
+        registry.promote(args.version)
+    elif args.command == "rollback":
+        print(registry.rollback())
+    elif args.command == "prune":
+        for version in registry.prune(args.keep):
+            print(f"removed {version}")
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection with MinHash signatures and LSH banding
+Texts are reduced to character shingles and a fixed-size MinHash signature;
+banding the signatures into hash buckets finds candidate duplicates without
+scanning every stored item, and only those candidates are verified exactly.
+The index persists as a snapshot plus an append-only log of changes.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 32
+DEFAULT_SHINGLE_SIZE = 5
+
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+# Shingles hashed per block when computing a signature, bounds the temporary matrix
+_SIGNATURE_BLOCK = 4096
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return _WHITESPACE.sub(" ", str(text)).strip().lower()
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> Set[str]:
+    """Character shingles of normalized text; short texts are a single shingle"""
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def normalize_value(value: Any) -> Optional[str]:
+    """Comparable text of a field value; None for missing values, integral floats as integers"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return normalize_text(value) or None
+
+
+def record_features(record: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Set[str]:
+    """MinHash features of a row: one "field=value" token per present field, values normalized"""
+    features = set()
+    for field in (fields if fields is not None else record.keys()):
+        value = normalize_value(record.get(field))
+        if value is not None:
+            features.add(f"{normalize_text(field)}={value}")
+    return features
+
+
+def lsh_threshold(num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS) -> float:
+    """Jaccard similarity at which a pair becomes a candidate with probability ~1/2"""
+    return (1 / bands) ** (bands / num_perm)
+
+
+class MinHasher:
+    """MinHash over 64-bit shingle hashes with multiply-shift hash functions"""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        # Odd multipliers make (a * x + b) mod 2**64 >> 32 a universal family
+        self._a = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def _hash(shingle: str) -> int:
+        return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+    def signature(self, shingle_set: Iterable[str]) -> np.ndarray:
+        hashes = np.fromiter((self._hash(s) for s in shingle_set), dtype=np.uint64)
+        signature = np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        with np.errstate(over="ignore"):
+            for start in range(0, len(hashes), _SIGNATURE_BLOCK):
+                block = hashes[start:start + _SIGNATURE_BLOCK, None]
+                values = ((block * self._a + self._b) >> np.uint64(32)).astype(np.uint32)
+                np.minimum(signature, values.min(axis=0), out=signature)
+        return signature
+
+
+class NearDuplicateIndex:
+    """
+    Incrementally updatable MinHash/LSH index of keyed texts.
+
+    ``candidates`` returns the keys sharing at least one LSH band with a text;
+    callers verify those with an exact similarity. Each key may carry a
+    JSON-serialisable payload (e.g. the text needed for verification). With a
+    ``path`` every change is appended to ``<path>.log`` and ``save`` writes a
+    compact ``<path>.npz`` snapshot.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS,
+                 shingle_size: int = DEFAULT_SHINGLE_SIZE, path: Optional[str] = None,
+                 compact_after: int = 10000):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.path = path
+        self.compact_after = compact_after
+        self.hasher = MinHasher(num_perm)
+
+        self._lock = threading.RLock()
+        self._signatures: Dict[Any, np.ndarray] = {}
+        self._payloads: Dict[Any, Any] = {}
+        self._buckets: List[Dict[bytes, Set[Any]]] = [defaultdict(set) for _ in range(bands)]
+        self._log_entries = 0
+
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key) -> bool:
+        return key in self._signatures
+
+    # Signatures and buckets ----------------------------------------------
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(shingles(text, self.shingle_size))
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _insert(self, key, signature: np.ndarray, payload: Any):
+        if key in self._signatures:
+            self._discard(key)
+        self._signatures[key] = signature
+        if payload is not None:
+            self._payloads[key] = payload
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            band[band_key].add(key)
+
+    def _discard(self, key) -> bool:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return False
+        self._payloads.pop(key, None)
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = band.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del band[band_key]
+        return True
+
+    # Public API -------------------------------------------------------------
+
+    def add(self, key, text: Optional[str], payload: Any = None, signature: Optional[np.ndarray] = None) -> np.ndarray:
+        """Index (or re-index) ``key``; returns its signature"""
+        if signature is None:
+            signature = self.signature(text)
+        with self._lock:
+            self._insert(key, signature, payload)
+            self._append_log({"op": "add", "key": key, "sig": _encode(signature), "payload": payload})
+        return signature
+
+    def remove(self, key) -> bool:
+        with self._lock:
+            removed = self._discard(key)
+            if removed:
+                self._append_log({"op": "remove", "key": key})
+        return removed
+
+    def payload(self, key) -> Any:
+        return self._payloads.get(key)
+
+    def candidates(self, text: Optional[str] = None, signature: Optional[np.ndarray] = None) -> Set[Any]:
+        """Keys sharing at least one band with the text (or signature)"""
+        if signature is None:
+            signature = self.signature(text)
+        found: Set[Any] = set()
+        with self._lock:
+            for band, band_key in zip(self._buckets, self._band_keys(signature)):
+                bucket = band.get(band_key)
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def estimated_similarity(self, signature: np.ndarray, key) -> float:
+        """Jaccard estimate from signatures: the share of equal MinHash values"""
+        other = self._signatures.get(key)
+        return float(np.mean(signature == other)) if other is not None else 0.0
+
+    # Persistence ------------------------------------------------------------
+
+    def _append_log(self, entry: Dict[str, Any]):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(f"{self.path}.log", "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+            self._log_entries += 1
+        except OSError as e:
+            logger.warning(f"Could not append to duplicate index log {self.path}.log: {e}")
+            return
+        if self._log_entries >= self.compact_after:
+            self.save()
+
+    def save(self):
+        """Write a compact snapshot and truncate the change log"""
+        if not self.path:
+            return
+        with self._lock:
+            keys = list(self._signatures)
+            signatures = (np.stack([self._signatures[k] for k in keys]) if keys
+                          else np.zeros((0, self.num_perm), dtype=np.uint32))
+            meta = {
+                "num_perm": self.num_perm, "bands": self.bands, "shingle_size": self.shingle_size,
+                "keys": keys, "payloads": [self._payloads.get(k) for k in keys],
+            }
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp.npz"
+            np.savez(tmp_path, signatures=signatures, meta=np.array(json.dumps(meta, default=str)))
+            os.replace(tmp_path, f"{self.path}.npz")
+            try:
+                os.remove(f"{self.path}.log")
+            except FileNotFoundError:
+                pass
+            self._log_entries = 0
+
+    def _load(self):
+        snapshot = f"{self.path}.npz"
+        if os.path.exists(snapshot):
+            try:
+                with np.load(snapshot, allow_pickle=False) as data:
+                    meta = json.loads(str(data["meta"]))
+                    signatures = data["signatures"]
+                if (meta["num_perm"], meta["bands"], meta["shingle_size"]) != (self.num_perm, self.bands, self.shingle_size):
+                    logger.warning(f"Ignoring duplicate index {snapshot} built with different parameters")
+                    return
+                for key, signature, payload in zip(meta["keys"], signatures, meta["payloads"]):
+                    self._insert(key, signature.copy(), payload)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable duplicate index {snapshot}: {e}")
+
+        try:
+            with open(f"{self.path}.log", "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of an interrupted write
+                    if entry["op"] == "add":
+                        self._insert(entry["key"], _decode(entry["sig"]), entry.get("payload"))
+                    else:
+                        self._discard(entry["key"])
+                    self._log_entries += 1
+        except FileNotFoundError:
+            pass
+        logger.info(f"Loaded duplicate index {self.path} with {len(self)} items")
+
+
+def _encode(signature: np.ndarray) -> str:
+    return base64.b64encode(signature.astype(np.uint32).tobytes()).decode("ascii")
+
+
+def _decode(encoded: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.uint32).copy()
+
+
+def find_duplicate_groups(features: Sequence[Iterable[str]], verify: Callable[[int, int], float], threshold: float,
+                          num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS,
+                          min_estimate: float = 0.0) -> List[Tuple[List[int], float]]:
+    """
+    Group the positions of items (given as feature sets, e.g. shingles or
+    ``record_features``) whose verified similarity reaches ``threshold``.
+
+    Each item is only verified against its LSH candidates among the items
+    before it whose signature-estimated Jaccard is at least ``min_estimate``.
+    Returns ``(positions, lowest verified similarity)`` for every group of two
+    or more, groups in order of their first position.
+    """
+    index = NearDuplicateIndex(num_perm=num_perm, bands=bands)
+    parent = list(range(len(features)))
+    lowest: Dict[int, float] = {}
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signatures = np.empty((len(features), num_perm), dtype=np.uint32)
+
+    for position, item_features in enumerate(features):
+        signature = signatures[position] = index.hasher.signature(item_features)
+        candidates = sorted(index.candidates(signature=signature))
+        if candidates and min_estimate > 0:
+            estimates = (signatures[candidates] == signature).mean(axis=1)
+            candidates = [c for c, estimate in zip(candidates, estimates.tolist()) if estimate >= min_estimate]
+        for candidate in candidates:
+            a, b = root(candidate), root(position)
+            if a == b:
+                continue
+            similarity = verify(candidate, position)
+            if similarity >= threshold:
+                parent[b] = a
+                lowest[a] = min(similarity, lowest.get(a, similarity), lowest.pop(b, similarity))
+        index.add(position, None, signature=signature)
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for position in range(len(features)):
+        groups[root(position)].append(position)
+    return [(members, lowest[group]) for group, members in sorted(groups.items(), key=lambda g: g[1][0])
+            if len(members) > 1]
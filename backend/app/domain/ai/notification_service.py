@@ -13,9 +13,13 @@ import logging
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 import json
+import uuid
 from enum import Enum
 import asyncio
 
+from app.core.settings import NOTIFICATION_STORE_PATH, NOTIFICATION_RATE_CACHE_SIZE
+from app.domain.ai.notification_store import NotificationStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -48,11 +52,18 @@ class NotificationStatus(Enum):
 class SmartNotificationService:
     """Service for intelligent notifications and alerts"""
     
-    def __init__(self):
-        self.notifications = []
+    def __init__(self, store: Optional[NotificationStore] = None):
+        self._store = store
         self.notification_rules = self._load_notification_rules()
         self.user_preferences = {}
         self.alert_history = []
+    
+    @property
+    def store(self) -> NotificationStore:
+        """The notification store; the default one opens on first use, so importing the service creates no file"""
+        if self._store is None:
+            self._store = NotificationStore(NOTIFICATION_STORE_PATH, NOTIFICATION_RATE_CACHE_SIZE)
+        return self._store
         
     def _load_notification_rules(self) -> Dict[str, Any]:
         """Load notification rules and triggers"""
@@ -138,7 +149,7 @@ class SmartNotificationService:
             
             # Create notification
             notification = {
-                'id': f"notif_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{user_id}",
+                'id': f"notif_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{user_id}_{uuid.uuid4().hex[:8]}",
                 'type': notification_type,
                 'user_id': user_id,
                 'title': title,
@@ -154,7 +165,7 @@ class SmartNotificationService:
             }
             
             # Store notification
-            self.notifications.append(notification)
+            self.store.add(notification)
             
             # Log alert
             await self._log_alert(notification)
@@ -384,61 +395,64 @@ class SmartNotificationService:
         limit: int = 50
     ) -> List[Dict[str, Any]]:
         """Get notifications for a specific user with optional filters"""
+        page = await self.get_user_notifications_page(user_id, status, notification_type, priority, limit)
+        return page['notifications']
+    
+    async def get_user_notifications_page(
+        self,
+        user_id: int,
+        status: Optional[str] = None,
+        notification_type: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get one page of a user's notifications, newest first, and the cursor for the next page"""
         try:
-            filtered_notifications = []
-            
-            for notification in self.notifications:
-                if notification['user_id'] != user_id:
-                    continue
-                
-                # Apply filters
-                if status and notification['status'] != status:
-                    continue
-                if notification_type and notification['type'] != notification_type:
-                    continue
-                if priority and notification['priority'] != priority:
-                    continue
-                
-                filtered_notifications.append(notification)
-            
-            # Sort by creation date (newest first) and apply limit
-            sorted_notifications = sorted(
-                filtered_notifications,
-                key=lambda x: x['created_at'],
-                reverse=True
-            )[:limit]
-            
-            return sorted_notifications
+            notifications, next_cursor = self.store.query(
+                user_id, status, notification_type, priority, limit, cursor
+            )
+            return {'notifications': notifications, 'next_cursor': next_cursor}
             
         except Exception as e:
             logger.error(f"Error getting user notifications: {e}")
-            return []
+            return {'notifications': [], 'next_cursor': None}
     
     async def mark_notification_read(self, notification_id: str, user_id: int) -> bool:
         """Mark a notification as read"""
         try:
-            for notification in self.notifications:
-                if (notification['id'] == notification_id and 
-                    notification['user_id'] == user_id):
-                    notification['status'] = NotificationStatus.READ.value
-                    notification['read_at'] = datetime.now().isoformat()
-                    logger.info(f"Notification {notification_id} marked as read")
-                    return True
+            if self.store.set_status(user_id, NotificationStatus.READ.value, 'read_at', [notification_id]):
+                logger.info(f"Notification {notification_id} marked as read")
+                return True
             return False
         except Exception as e:
             logger.error(f"Error marking notification as read: {e}")
             return False
     
+    async def mark_notifications_read(
+        self,
+        user_id: int,
+        notification_ids: Optional[List[str]] = None,
+        notification_type: Optional[str] = None
+    ) -> int:
+        """Mark a user's active notifications as read (all, or only the given ids/type)"""
+        try:
+            marked = self.store.set_status(
+                user_id, NotificationStatus.READ.value, 'read_at', notification_ids,
+                from_status=NotificationStatus.ACTIVE.value, notification_type=notification_type
+            )
+            logger.info(f"Marked {marked} notifications as read for user {user_id}")
+            return marked
+        except Exception as e:
+            logger.error(f"Error marking notifications as read: {e}")
+            return 0
+    
     async def archive_notification(self, notification_id: str, user_id: int) -> bool:
         """Archive a notification"""
         try:
-            for notification in self.notifications:
-                if (notification['id'] == notification_id and 
-                    notification['user_id'] == user_id):
-                    notification['status'] = NotificationStatus.ARCHIVED.value
-                    notification['archived_at'] = datetime.now().isoformat()
-                    logger.info(f"Notification {notification_id} archived")
-                    return True
+            if self.store.set_status(user_id, NotificationStatus.ARCHIVED.value, 'archived_at', [notification_id]):
+                logger.info(f"Notification {notification_id} archived")
+                return True
             return False
         except Exception as e:
             logger.error(f"Error archiving notification: {e}")
@@ -447,12 +461,9 @@ class SmartNotificationService:
     async def delete_notification(self, notification_id: str, user_id: int) -> bool:
         """Delete a notification"""
         try:
-            for i, notification in enumerate(self.notifications):
-                if (notification['id'] == notification_id and 
-                    notification['user_id'] == user_id):
-                    del self.notifications[i]
-                    logger.info(f"Notification {notification_id} deleted")
-                    return True
+            if self.store.delete(notification_id, user_id):
+                logger.info(f"Notification {notification_id} deleted")
+                return True
             return False
         except Exception as e:
             logger.error(f"Error deleting notification: {e}")
@@ -461,26 +472,36 @@ class SmartNotificationService:
     async def get_notification_summary(self, user_id: int) -> Dict[str, Any]:
         """Get a summary of user notifications"""
         try:
-            user_notifications = [n for n in self.notifications if n['user_id'] == user_id]
-            
             summary = {
-                'total_notifications': len(user_notifications),
-                'unread_count': len([n for n in user_notifications if n['status'] == NotificationStatus.ACTIVE.value]),
-                'high_priority_count': len([n for n in user_notifications if n['priority'] == NotificationPriority.HIGH.value and n['status'] == NotificationStatus.ACTIVE.value]),
-                'urgent_count': len([n for n in user_notifications if n['priority'] == NotificationPriority.URGENT.value and n['status'] == NotificationStatus.ACTIVE.value]),
-                'action_required_count': len([n for n in user_notifications if n['action_required'] and n['status'] == NotificationStatus.ACTIVE.value]),
+                'total_notifications': 0,
+                'unread_count': 0,
+                'high_priority_count': 0,
+                'urgent_count': 0,
+                'action_required_count': 0,
                 'by_type': {},
                 'by_priority': {}
             }
             
-            # Count by type
-            for notification in user_notifications:
-                if notification['status'] == NotificationStatus.ACTIVE.value:
-                    notif_type = notification['type']
-                    summary['by_type'][notif_type] = summary['by_type'].get(notif_type, 0) + 1
-                    
-                    priority = notification['priority']
-                    summary['by_priority'][priority] = summary['by_priority'].get(priority, 0) + 1
+            # Counts come grouped by status, type, priority and action_required
+            for group in self.store.counts(user_id):
+                count = group['count']
+                summary['total_notifications'] += count
+                if group['status'] != NotificationStatus.ACTIVE.value:
+                    continue
+                
+                summary['unread_count'] += count
+                if group['priority'] == NotificationPriority.HIGH.value:
+                    summary['high_priority_count'] += count
+                if group['priority'] == NotificationPriority.URGENT.value:
+                    summary['urgent_count'] += count
+                if group['action_required']:
+                    summary['action_required_count'] += count
+                
+                notif_type = group['type']
+                summary['by_type'][notif_type] = summary['by_type'].get(notif_type, 0) + count
+                
+                priority = group['priority']
+                summary['by_priority'][priority] = summary['by_priority'].get(priority, 0) + count
             
             return summary
             
@@ -497,18 +518,11 @@ class SmartNotificationService:
         """Check if notification frequency limit is reached"""
         try:
             max_frequency_hours = rules.get('max_frequency_hours', 24)
-            cutoff_time = datetime.now() - timedelta(hours=max_frequency_hours)
-            
-            # Count recent notifications of this type for this user
-            recent_count = 0
-            for notification in self.notifications:
-                if (notification['user_id'] == user_id and
-                    notification['type'] == notification_type and
-                    notification['created_at'] > cutoff_time.isoformat()):
-                    recent_count += 1
             
             # Allow if under limit (default limit is 1 per frequency period)
-            return recent_count < 1
+            return self.store.within_limit(
+                user_id, notification_type, max_frequency_hours * 3600, rules.get('max_per_window', 1)
+            )
             
         except Exception as e:
             logger.error(f"Error checking frequency limit: {e}")
@@ -538,15 +552,7 @@ class SmartNotificationService:
     async def cleanup_expired_notifications(self) -> int:
         """Clean up expired notifications"""
         try:
-            expired_count = 0
-            current_time = datetime.now()
-            
-            for notification in self.notifications[:]:  # Copy list to avoid modification during iteration
-                if notification['expires_at']:
-                    expiry_time = datetime.fromisoformat(notification['expires_at'])
-                    if current_time > expiry_time:
-                        notification['status'] = NotificationStatus.EXPIRED.value
-                        expired_count += 1
+            expired_count = self.store.expire(NotificationStatus.EXPIRED.value)
             
             logger.info(f"Cleaned up {expired_count} expired notifications")
             return expired_count
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Indexed SQLite store for smart notifications
+Notifications live on disk, indexed by (user_id, status, type, created_at), so
+lookups, pagination and status changes touch only the rows they need and the
+worker keeps no per-notification state in memory. Frequency limits use a
+bounded in-memory sliding window per (user, type), seeded from the index on
+first use.
+"""
+
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Keys and order of the notification dicts the service returns
+NOTIFICATION_FIELDS = (
+    'id', 'type', 'user_id', 'title', 'message', 'priority', 'status', 'context_data',
+    'action_required', 'created_at', 'expires_at', 'read_at', 'archived_at'
+)
+
+# SQLite's default limit on bound parameters is 999
+_MAX_IDS_PER_STATEMENT = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    title TEXT,
+    message TEXT,
+    priority TEXT,
+    status TEXT NOT NULL,
+    context_data TEXT,
+    action_required INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    expires_at TEXT,
+    read_at TEXT,
+    archived_at TEXT,
+    created_ts REAL NOT NULL,
+    expires_ts REAL
+);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_status_type_created
+    ON notifications (user_id, status, type, created_ts);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_type_created
+    ON notifications (user_id, type, created_ts);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created
+    ON notifications (user_id, created_ts);
+CREATE INDEX IF NOT EXISTS idx_notifications_expires
+    ON notifications (expires_ts);
+"""
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def encode_cursor(created_ts: float, notification_id: str) -> str:
+    """Opaque cursor pointing just past a notification in newest-first order"""
+    return base64.urlsafe_b64encode(f"{created_ts!r}|{notification_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        created_ts, notification_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return float(created_ts), notification_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid notification cursor: {cursor}") from e
+
+
+class NotificationStore:
+    """
+    Notification rows plus per-(user, type) send windows.
+
+    ``path`` is the SQLite file; an empty path keeps the table in memory (no
+    persistence across restarts). ``rate_cache_size`` bounds how many
+    (user, type) windows are held; evicted windows are rebuilt from the index.
+    Windows are per process, so workers sharing one file each enforce the
+    limit on what they have seen plus what was on disk when the window loaded.
+    """
+
+    def __init__(self, path: str = "", rate_cache_size: int = 10000):
+        self.path = path
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.rate_cache_size = rate_cache_size
+        self._lock = threading.Lock()
+        self._windows: 'OrderedDict[Tuple[int, str], deque]' = OrderedDict()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, notification: Dict[str, Any]):
+        created_ts = _timestamp(notification['created_at'])
+        values = [notification.get(name) for name in NOTIFICATION_FIELDS]
+        values[NOTIFICATION_FIELDS.index('context_data')] = json.dumps(notification.get('context_data') or {}, default=str)
+        values[NOTIFICATION_FIELDS.index('action_required')] = int(bool(notification.get('action_required')))
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO notifications ({', '.join(NOTIFICATION_FIELDS)}, created_ts, expires_ts) "
+                f"VALUES ({', '.join('?' * len(NOTIFICATION_FIELDS))}, ?, ?)",
+                (*values, created_ts, _timestamp(notification.get('expires_at')))
+            )
+            window = self._windows.get((notification['user_id'], notification['type']))
+            if window is not None:
+                window.append(created_ts)
+
+    def get(self, notification_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM notifications WHERE id = ? AND user_id = ?", (notification_id, user_id)
+            ).fetchone()
+        return self._notification(row) if row else None
+
+    def query(
+        self,
+        user_id: int,
+        status: Optional[str] = None,
+        notification_type: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of a user's notifications, newest first.
+
+        Returns the page and the cursor for the next one (None on the last page).
+        """
+        clauses, params = ["user_id = ?"], [user_id]
+        for column, value in (('status', status), ('type', notification_type), ('priority', priority)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if cursor:
+            created_ts, notification_id = decode_cursor(cursor)
+            clauses.append("(created_ts < ? OR (created_ts = ? AND id < ?))")
+            params.extend([created_ts, created_ts, notification_id])
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM notifications WHERE {' AND '.join(clauses)} "
+                "ORDER BY created_ts DESC, id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1]['created_ts'], rows[limit - 1]['id']) if len(rows) > limit else None
+        return [self._notification(row) for row in rows[:limit]], next_cursor
+
+    def set_status(
+        self,
+        user_id: int,
+        status: str,
+        stamp_field: Optional[str] = None,
+        notification_ids: Optional[Iterable[str]] = None,
+        from_status: Optional[str] = None,
+        notification_type: Optional[str] = None
+    ) -> int:
+        """
+        Set ``status`` (and ``stamp_field`` to now) on a user's notifications.
+
+        Narrowed to ``notification_ids``, ``from_status`` and
+        ``notification_type`` when given; returns the number of rows changed.
+        """
+        assignments, params = ["status = ?"], [status]
+        if stamp_field:
+            assignments.append(f"{stamp_field} = ?")
+            params.append(datetime.now().isoformat())
+        clauses, filters = ["user_id = ?"], [user_id]
+        if from_status:
+            clauses.append("status = ?")
+            filters.append(from_status)
+        if notification_type:
+            clauses.append("type = ?")
+            filters.append(notification_type)
+        statement = f"UPDATE notifications SET {', '.join(assignments)} WHERE {' AND '.join(clauses)}"
+
+        changed = 0
+        with self._lock, self._conn:
+            if notification_ids is None:
+                return self._conn.execute(statement, (*params, *filters)).rowcount
+            notification_ids = list(notification_ids)
+            for start in range(0, len(notification_ids), _MAX_IDS_PER_STATEMENT):
+                chunk = notification_ids[start:start + _MAX_IDS_PER_STATEMENT]
+                changed += self._conn.execute(
+                    f"{statement} AND id IN ({', '.join('?' * len(chunk))})", (*params, *filters, *chunk)
+                ).rowcount
+        return changed
+
+    def delete(self, notification_id: str, user_id: int) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM notifications WHERE id = ? AND user_id = ?", (notification_id, user_id)
+            ).rowcount > 0
+
+    def counts(self, user_id: int) -> List[Dict[str, Any]]:
+        """Notification counts of a user grouped by status, type, priority and action_required"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, type, priority, action_required, COUNT(*) AS count FROM notifications "
+                "WHERE user_id = ? GROUP BY status, type, priority, action_required", (user_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def expire(self, expired_status: str) -> int:
+        """Move notifications past their expiry to ``expired_status``"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE notifications SET status = ? WHERE expires_ts < ? AND status != ?",
+                (expired_status, datetime.now().timestamp(), expired_status)
+            ).rowcount
+
+    def within_limit(self, user_id: int, notification_type: str, window_seconds: float, max_count: int = 1) -> bool:
+        """Whether fewer than ``max_count`` notifications were sent in the last ``window_seconds``"""
+        cutoff = datetime.now().timestamp() - window_seconds
+        key = (user_id, notification_type)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or window.maxlen != max_count:
+                rows = self._conn.execute(
+                    "SELECT created_ts FROM notifications WHERE user_id = ? AND type = ? AND created_ts > ? "
+                    "ORDER BY created_ts DESC LIMIT ?", (user_id, notification_type, cutoff, max_count)
+                ).fetchall()
+                window = deque(reversed([row['created_ts'] for row in rows]), maxlen=max_count)
+                self._windows[key] = window
+                if len(self._windows) > self.rate_cache_size:
+                    self._windows.popitem(last=False)
+            else:
+                self._windows.move_to_end(key)
+            while window and window[0] <= cutoff:
+                window.popleft()
+            return len(window) < max_count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _notification(row: sqlite3.Row) -> Dict[str, Any]:
+        notification = {name: row[name] for name in NOTIFICATION_FIELDS}
+        notification['context_data'] = json.loads(notification['context_data']) if notification['context_data'] else {}
+        notification['action_required'] = bool(notification['action_required'])
+        return notification
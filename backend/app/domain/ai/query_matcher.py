@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Precompiled intent and entity matching for query analysis
+Compiles every intent/entity regex once and derives, from each pattern's parse
+tree, the literal substrings any match must contain. One scan of the message
+for those literals decides which patterns can match at all, so most regexes
+never run; the survivors are evaluated with their compiled objects.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Hashable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants  # Python 3.11+
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse
+    import sre_constants
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+
+def _required_alternatives(parsed) -> Optional[List[str]]:
+    """
+    Return literals of which at least one must occur in any match of a parsed
+    sequence, or None when no such literal can be derived.
+
+    Literal runs, groups, required repeats and all-literal branches each yield
+    a candidate; the most selective candidate (longest shortest literal, then
+    fewest alternatives) wins.
+    """
+    candidates: List[List[str]] = []
+    run: List[str] = []
+
+    def flush():
+        if run:
+            candidates.append(["".join(run)])
+            run.clear()
+
+    for op, av in parsed:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            inner = _required_alternatives(av[-1])
+            if inner:
+                candidates.append(inner)
+        elif op is sre_constants.BRANCH:
+            alternatives: List[str] = []
+            for branch in av[1]:
+                inner = _required_alternatives(branch)
+                if not inner:
+                    alternatives = []
+                    break
+                alternatives.extend(inner)
+            if alternatives:
+                candidates.append(alternatives)
+        elif op in _REPEATS and av[0] >= 1:
+            inner = _required_alternatives(av[2])
+            if inner:
+                candidates.append(inner)
+    flush()
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda alts: (min(len(a) for a in alts), -len(alts)))
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[FrozenSet[str]]:
+    """
+    Casefolded literals of which at least one occurs in every match of ``pattern``.
+
+    Returns None (always evaluate the pattern) when nothing can be derived or
+    a literal is non-ASCII, where casefolding and re's IGNORECASE can disagree.
+    """
+    try:
+        alternatives = _required_alternatives(sre_parse.parse(pattern, flags))
+    except Exception:
+        return None
+    if not alternatives or not all(a.isascii() for a in alternatives):
+        return None
+    return frozenset(a.casefold() for a in alternatives)
+
+
+def findall_value(match: re.Match) -> str:
+    """The first element ``re.findall`` would report for this match"""
+    if match.re.groups == 0:
+        return match.group(0)
+    return match.group(1) or ""
+
+
+class PatternMatcher:
+    """Ordered groups of regexes sharing one literal prefilter"""
+
+    def __init__(self, groups: Mapping[Hashable, Sequence[str]], flags: int = re.IGNORECASE):
+        self.flags = flags
+        self.labels: List[Hashable] = list(groups)
+        self.patterns: Dict[Hashable, List[Tuple[re.Pattern, Optional[FrozenSet[str]]]]] = {
+            label: [(re.compile(p, flags), required_literals(p, flags)) for p in patterns]
+            for label, patterns in groups.items()
+        }
+        self.literals: Tuple[str, ...] = tuple(sorted({
+            literal
+            for compiled in self.patterns.values()
+            for _, gate in compiled if gate
+            for literal in gate
+        }))
+        self.max_patterns = max((len(p) for p in self.patterns.values()), default=0)
+
+    def scan(self, text: str) -> Set[str]:
+        """Literals from this matcher's vocabulary present in ``text``"""
+        folded = text.casefold()
+        return {literal for literal in self.literals if literal in folded}
+
+    def _candidates(self, label: Hashable, present: Set[str]) -> Iterator[re.Pattern]:
+        """Compiled patterns under ``label`` whose required literals are present"""
+        for compiled, gate in self.patterns[label]:
+            if gate is None or not gate.isdisjoint(present):
+                yield compiled
+
+    def scores(self, text: str, present: Optional[Set[str]] = None) -> Dict[Hashable, int]:
+        """Number of patterns per label that match anywhere in ``text``"""
+        if present is None:
+            present = self.scan(text)
+        return {
+            label: sum(1 for compiled in self._candidates(label, present) if compiled.search(text))
+            for label in self.labels
+        }
+
+    def first_matches(self, text: str, present: Optional[Set[str]] = None) -> Dict[Hashable, re.Match]:
+        """Leftmost match of the first matching pattern, per label"""
+        if present is None:
+            present = self.scan(text)
+        matches = {}
+        for label in self.labels:
+            for compiled in self._candidates(label, present):
+                match = compiled.search(text)
+                if match:
+                    matches[label] = match
+                    break
+        return matches
+
+    def first_label(self, text: str) -> Optional[Hashable]:
+        """First label, in declaration order, with any matching pattern"""
+        present = self.scan(text)
+        for label in self.labels:
+            if any(compiled.search(text) for compiled in self._candidates(label, present)):
+                return label
+        return None
+
+    def finditer(self, label: Hashable, text: str,
+                 present: Optional[Set[str]] = None) -> Iterator[Tuple[re.Pattern, re.Match]]:
+        """Every match of every pattern under ``label``, pattern by pattern"""
+        if present is None:
+            present = self.scan(text)
+        for compiled in self._candidates(label, present):
+            for match in compiled.finditer(text):
+                yield compiled, match
+
+
+@dataclass
+class QueryMatch:
+    """Intent scores and first-match entities for one message"""
+    intent_scores: Dict[Hashable, int]
+    entities: Dict[str, Any] = field(default_factory=dict)
+
+
+class QueryMatcher:
+    """Scores intents and extracts entities with a single literal scan"""
+
+    def __init__(self, intent_patterns: Mapping[Hashable, Sequence[str]],
+                 entity_patterns: Mapping[str, Sequence[str]], flags: int = re.IGNORECASE):
+        self.intents = PatternMatcher(intent_patterns, flags)
+        self.entities = PatternMatcher(entity_patterns, flags)
+        self.literals = tuple(sorted(set(self.intents.literals) | set(self.entities.literals)))
+
+    @property
+    def max_patterns(self) -> int:
+        return self.intents.max_patterns
+
+    def match(self, text: str) -> QueryMatch:
+        folded = text.casefold()
+        present = {literal for literal in self.literals if literal in folded}
+        return QueryMatch(
+            intent_scores=self.intents.scores(text, present),
+            entities={
+                entity_type: findall_value(match)
+                for entity_type, match in self.entities.first_matches(text, present).items()
+            },
+        )
+
@@ -5,15 +5,20 @@ Addresses core issues: conversational tone, data presentation, information archi
 """
 
 import os
-import re
 import time
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import chromadb
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import logging
 from dataclasses import dataclass
 from enum import Enum
 
+from app.domain.ai.retrieval_executor import get_retrieval_executor
+from app.domain.ai.query_matcher import QueryMatcher
+from app.infrastructure.integrations.llm_gateway import get_llm_gateway
+from app.core.database import get_engine
+from app.domain.listings.property_index import get_property_index
+
 # Reelly service removed
 
 logger = logging.getLogger(__name__)
@@ -175,7 +180,7 @@ class ContextItem:
 
 class EnhancedRAGService:
     def __init__(self):
-        self.engine = create_engine(os.getenv("DATABASE_URL"))
+        self.engine = get_engine("oltp", os.getenv("DATABASE_URL"))
         
         # Enhanced ChromaDB initialization with retry logic
         self.chroma_client = self._initialize_chroma_client()
@@ -322,6 +327,9 @@ class EnhancedRAGService:
                 r'\b(client|lead)\b.*\b(mentioned|said|expressed)\s+(.+)'
             ]
         }
+        
+        # Compile both pattern tables once; analyze_query runs them in a single pass
+        self.query_matcher = QueryMatcher(self.intent_patterns, self.entity_patterns)
     
     def _initialize_chroma_client(self, max_retries=5, retry_delay=2):
         """Initialize ChromaDB client with retry logic"""
@@ -347,31 +355,19 @@ class EnhancedRAGService:
         """Analyze user query to extract intent, entities, and parameters"""
         query_lower = query.lower()
         
-        # Determine intent
-        intent_scores = {}
-        for intent, patterns in self.intent_patterns.items():
-            score = 0
-            for pattern in patterns:
-                if re.search(pattern, query_lower, re.IGNORECASE):
-                    score += 1
-            intent_scores[intent] = score
+        # Score intents and extract entities in one pass over the query
+        match = self.query_matcher.match(query_lower)
+        intent_scores = match.intent_scores
         
         # Get the intent with highest score
         if intent_scores:
             intent = max(intent_scores, key=intent_scores.get)
-            confidence = intent_scores[intent] / max(len(patterns) for patterns in self.intent_patterns.values())
+            confidence = intent_scores[intent] / self.query_matcher.max_patterns
         else:
             intent = QueryIntent.GENERAL
             confidence = 0.0
         
-        # Extract entities
-        entities = {}
-        for entity_type, patterns in self.entity_patterns.items():
-            for pattern in patterns:
-                matches = re.findall(pattern, query_lower, re.IGNORECASE)
-                if matches:
-                    entities[entity_type] = matches[0] if isinstance(matches[0], str) else matches[0][0]
-                    break
+        entities = match.entities
         
         # Extract parameters
         parameters = self._extract_parameters(query_lower, entities)
@@ -506,44 +502,28 @@ class EnhancedRAGService:
             query + " investment"
         ]
         
-        for collection_name in collections:
-            try:
-                collection = self.chroma_client.get_collection(collection_name)
-                
-                # Query with multiple variations
-                all_results = []
-                for q_var in query_variations[:3]:  # Use top 3 variations
-                    try:
-                        results = collection.query(
-                            query_texts=[q_var],
-                            n_results=max_items * 2
-                        )
-                        
-                        if results['documents'] and results['documents'][0]:
-                            all_results.extend(results['documents'][0])
-                    except Exception as e:
-                        logger.warning(f"Error querying collection {collection_name} with variation '{q_var}': {e}")
-                        continue
+        # Each collection gets all variations in one batched query; collections run concurrently
+        results = get_retrieval_executor().query_collections(
+            self.chroma_client,
+            collections,
+            query_variations[:3],  # Use top 3 variations
+            n_results=max_items * 2
+        )
+        
+        query_keywords = query.lower().split()
+        for result in results:
+            for doc in result.documents:
+                # Calculate relevance score based on query similarity
+                score = 0.8
+                if any(keyword in doc.lower() for keyword in query_keywords):
+                    score += 0.1
                 
-                # Remove duplicates and add to context
-                seen_docs = set()
-                for doc in all_results:
-                    if doc not in seen_docs:
-                        seen_docs.add(doc)
-                        # Calculate relevance score based on query similarity
-                        score = 0.8
-                        if any(keyword in doc.lower() for keyword in query.lower().split()):
-                            score += 0.1
-                        
-                        context_items.append(ContextItem(
-                            content=doc,
-                            source=f"chroma_{collection_name}",
-                            relevance_score=score,
-                            metadata={"type": "document", "collection": collection_name}
-                        ))
-            except Exception as e:
-                logger.warning(f"Error querying collection {collection_name}: {e}")
-                continue
+                context_items.append(ContextItem(
+                    content=doc,
+                    source=f"chroma_{result.collection}",
+                    relevance_score=score,
+                    metadata={"type": "document", "collection": result.collection}
+                ))
         
         return context_items
 
@@ -1105,66 +1085,87 @@ IMPORTANT: Provide specific Dubai real estate information, actual prices, and ac
         
         if 'location' in parameters:
             sql_parts.append("AND location ILIKE :location")
+            query_params['location'] = f"%{parameters['location']}%"
         
         if 'property_type' in parameters:
             sql_parts.append("AND property_type ILIKE :property_type")
+            query_params['property_type'] = f"%{parameters['property_type']}%"
         
         if 'bedrooms' in parameters:
             sql_parts.append("AND bedrooms >= :bedrooms")
+            query_params['bedrooms'] = parameters['bedrooms']
         
         if 'bathrooms' in parameters:
             sql_parts.append("AND bathrooms >= :bathrooms")
+            query_params['bathrooms'] = parameters['bathrooms']
         
         sql_parts.append("ORDER BY price_aed ASC LIMIT :limit")
         query_params['limit'] = max_items
         
         try:
-            with self.engine.connect() as conn:
-                sql = " ".join(sql_parts)
-                result = conn.execute(text(sql), query_params)
-                
-                for row in result:
-                    try:
-                        # Handle null values safely
-                        title = row.title or 'Untitled'
-                        price_str = f"AED {row.price:,.0f}" if row.price and row.price > 0 else 'Price on request'
-                        property_type = row.property_type or 'Not specified'
-                        bedrooms = row.bedrooms or 'Not specified'
-                        bathrooms = row.bathrooms or 'Not specified'
-                        location = row.location or 'Location not specified'
-                        area_sqft = row.area_sqft or 'Not specified'
-                        description = row.description or 'No description available'
-                        
-                        content = f"""
-                        Property: {title}
-                        Price: {price_str}
-                        Type: {property_type}
-                        Bedrooms: {bedrooms}
-                        Bathrooms: {bathrooms}
-                        Location: {location}
-                        Area: {area_sqft} sqft
-                        Description: {description}
-                        """
-                    except Exception as format_error:
-                        logger.warning(f"Error formatting property content: {format_error}")
-                        content = f"Property in {row.location or 'Unknown location'}"
-                    
-                    context_items.append(ContextItem(
-                        content=content,
-                        source="properties",
-                        relevance_score=0.9,
-                        metadata={
-                            'type': 'property',
-                            'title': row.title,
-                            'price': row.price,
-                            'property_type': row.property_type,
-                            'bedrooms': row.bedrooms,
-                            'bathrooms': row.bathrooms,
-                            'location': row.location,
-                            'area_sqft': row.area_sqft
-                        }
-                    ))
+            # Serve from the in-memory property index; Postgres only when it is unavailable
+            price_min = query_params.get('budget_min')
+            if not parameters:
+                # Mirrors "price_aed > 0"; 0.01 AED is the smallest unit
+                price_min = 0.01
+            index_result = get_property_index().search(
+                price_min=price_min,
+                price_max=query_params.get('budget_max'),
+                location=parameters.get('location'),
+                property_type=parameters.get('property_type'),
+                bedrooms_min=parameters.get('bedrooms'),
+                bathrooms_min=parameters.get('bathrooms'),
+                include_deleted=True,
+                limit=max_items
+            )
+            if index_result is not None:
+                rows = index_result.records
+            else:
+                with self.engine.connect() as conn:
+                    rows = conn.execute(text(" ".join(sql_parts)), query_params).fetchall()
+            
+            for row in rows:
+                try:
+                    # Handle null values safely
+                    title = row.title or 'Untitled'
+                    price_str = f"AED {row.price:,.0f}" if row.price and row.price > 0 else 'Price on request'
+                    property_type = row.property_type or 'Not specified'
+                    bedrooms = row.bedrooms or 'Not specified'
+                    bathrooms = row.bathrooms or 'Not specified'
+                    location = row.location or 'Location not specified'
+                    area_sqft = row.area_sqft or 'Not specified'
+                    description = row.description or 'No description available'
                     
+                    content = f"""
+                    Property: {title}
+                    Price: {price_str}
+                    Type: {property_type}
+                    Bedrooms: {bedrooms}
+                    Bathrooms: {bathrooms}
+                    Location: {location}
+                    Area: {area_sqft} sqft
+                    Description: {description}
+                    """
+                except Exception as format_error:
+                    logger.warning(f"Error formatting property content: {format_error}")
+                    content = f"Property in {row.location or 'Unknown location'}"
+                
+                context_items.append(ContextItem(
+                    content=content,
+                    source="properties",
+                    relevance_score=0.9,
+                    metadata={
+                        'type': 'property',
+                        'title': row.title,
+                        'price': row.price,
+                        'property_type': row.property_type,
+                        'bedrooms': row.bedrooms,
+                        'bathrooms': row.bathrooms,
+                        'location': row.location,
+                        'area_sqft': row.area_sqft
+                    }
+                ))
+        
         except Exception as e:
             logger.warning(f"Error getting property context: {e}")
         
@@ -1286,26 +1287,22 @@ IMPORTANT: Provide specific Dubai real estate information, actual prices, and ac
         
         return context_items
 
-    def get_response(self, message: str, role: str = "client", session_id: str = None, user_name: str = "User") -> str:
-        """
-        Main method to generate a response using the RAG service.
-        This is the single source of truth for conversational AI responses.
-        """
-        try:
-            # 1. Analyze the query
-            analysis = self.analyze_query(message)
-            
-            # 2. Get relevant context with enhanced retrieval
-            context_items = self.get_relevant_context(message, analysis, max_items=8)
-            
-            # 3. Build enhanced context string
-            context = self.build_structured_context(context_items)
-            
-            # 4. Create enhanced prompt using the improved system prompt
-            system_prompt = get_system_prompt(role, analysis.intent, context, user_name)
-            
-            # 5. Build the complete prompt
-            full_prompt = f"""
+    def build_prompt(self, message: str, role: str = "client", user_name: str = "User") -> str:
+        """Run query analysis and retrieval, and assemble the full LLM prompt"""
+        # 1. Analyze the query
+        analysis = self.analyze_query(message)
+        
+        # 2. Get relevant context with enhanced retrieval
+        context_items = self.get_relevant_context(message, analysis, max_items=8)
+        
+        # 3. Build enhanced context string
+        context = self.build_structured_context(context_items)
+        
+        # 4. Create enhanced prompt using the improved system prompt
+        system_prompt = get_system_prompt(role, analysis.intent, context, user_name)
+        
+        # 5. Build the complete prompt
+        return f"""
 {system_prompt}
 
 ## USER QUERY:
@@ -1313,24 +1310,33 @@ IMPORTANT: Provide specific Dubai real estate information, actual prices, and ac
 
 ## RESPONSE:
 """
+
+    def _generate(self, full_prompt: str, stream: bool = False):
+        """Call the AI model through the shared LLM gateway"""
+        model = get_llm_gateway().get_model("gemini", 'gemini-1.5-flash')
+        
+        # Enhanced generation parameters for better quality
+        return model.generate_content(
+            full_prompt,
+            generation_config={
+                "temperature": 0.3,  # Lower temperature for more focused responses
+                "top_p": 0.9,
+                "top_k": 40,
+                "max_output_tokens": 2048,  # Allow longer, more detailed responses
+            },
+            stream=stream
+        )
+
+    def get_response(self, message: str, role: str = "client", session_id: str = None, user_name: str = "User") -> str:
+        """
+        Main method to generate a response using the RAG service.
+        This is the single source of truth for conversational AI responses.
+        """
+        try:
+            full_prompt = self.build_prompt(message, role, user_name)
             
             # 6. Generate response using AI model with enhanced parameters
-            import google.generativeai as genai
-            from app.core.settings import GOOGLE_API_KEY
-            
-            genai.configure(api_key=GOOGLE_API_KEY)
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            # Enhanced generation parameters for better quality
-            response = model.generate_content(
-                full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.3,  # Lower temperature for more focused responses
-                    top_p=0.9,
-                    top_k=40,
-                    max_output_tokens=2048,  # Allow longer, more detailed responses
-                )
-            )
+            response = self._generate(full_prompt)
             response_text = response.text.strip()
             
             return response_text
@@ -1338,3 +1344,20 @@ IMPORTANT: Provide specific Dubai real estate information, actual prices, and ac
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             return f"I apologize, but I encountered an error while processing your request. Please try again or contact support if the issue persists."
+
+    def stream_response(self, message: str, role: str = "client", session_id: str = None, user_name: str = "User") -> Iterator[str]:
+        """
+        Streaming variant of get_response that yields text chunks as the model produces them.
+        Blocking by design; async callers should iterate it off the event loop.
+        """
+        try:
+            full_prompt = self.build_prompt(message, role, user_name)
+            
+            for chunk in self._generate(full_prompt, stream=True):
+                text_chunk = getattr(chunk, "text", "")
+                if text_chunk:
+                    yield text_chunk
+                    
+        except Exception as e:
+            logger.error(f"Error streaming response: {e}")
+            yield "I apologize, but I encountered an error while processing your request. Please try again or contact support if the issue persists."
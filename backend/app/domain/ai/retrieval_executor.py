@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Parallel ChromaDB retrieval for the RAG service
+Sends every query variation for a collection as one batched request and fans
+collections out over a bounded, process-wide thread pool so a slow collection
+only costs its own timeout instead of the whole chat turn.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.core.settings import RAG_RETRIEVAL_MAX_WORKERS, RAG_COLLECTION_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CollectionResult:
+    """Documents returned by one collection for all query variations"""
+    collection: str
+    documents: List[str] = field(default_factory=list)
+    distances: List[float] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    timed_out: bool = False
+    error: Optional[str] = None
+
+
+class CollectionRetrievalExecutor:
+    """Runs batched collection queries concurrently with per-collection timeouts"""
+
+    def __init__(self, max_workers: int = RAG_RETRIEVAL_MAX_WORKERS, collection_timeout: float = RAG_COLLECTION_TIMEOUT):
+        self.max_workers = max_workers
+        self.collection_timeout = collection_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-retrieval")
+        self._stats_lock = threading.Lock()
+        self._stats = {"queries": 0, "collections": 0, "timeouts": 0, "errors": 0}
+
+    def _query_collection(self, chroma_client, collection_name: str, query_texts: List[str], n_results: int) -> CollectionResult:
+        """Query one collection with all variations in a single round trip"""
+        start = time.perf_counter()
+        result = CollectionResult(collection=collection_name)
+        try:
+            collection = chroma_client.get_collection(collection_name)
+            response = collection.query(query_texts=query_texts, n_results=n_results)
+
+            documents = response.get('documents') or []
+            distances = response.get('distances') or []
+            metadatas = response.get('metadatas') or []
+
+            # Flatten per-variation result lists, keeping first occurrence of each document
+            seen_docs = set()
+            for i, docs in enumerate(documents):
+                for j, doc in enumerate(docs or []):
+                    if doc in seen_docs:
+                        continue
+                    seen_docs.add(doc)
+                    result.documents.append(doc)
+                    result.distances.append(distances[i][j] if i < len(distances) and distances[i] else 0.5)
+                    result.metadatas.append(metadatas[i][j] if i < len(metadatas) and metadatas[i] and metadatas[i][j] else {})
+        except Exception as e:
+            logger.warning(f"Error querying collection {collection_name}: {e}")
+            result.error = str(e)
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    def query_collections(self, chroma_client, collections: List[str], query_texts: List[str],
+                          n_results: int, timeout: Optional[float] = None) -> List[CollectionResult]:
+        """
+        Query all collections concurrently and return results in collection order.
+        Collections that do not answer within the timeout are returned empty with
+        ``timed_out`` set, so callers always get partial results.
+        """
+        timeout = self.collection_timeout if timeout is None else timeout
+        futures = {
+            name: self._pool.submit(self._query_collection, chroma_client, name, query_texts, n_results)
+            for name in collections
+        }
+        # All collections start together, so a shared deadline is a per-collection timeout
+        wait(futures.values(), timeout=timeout)
+
+        results = []
+        timeouts = errors = 0
+        for name, future in futures.items():
+            if future.done():
+                result = future.result()
+                if result.error:
+                    errors += 1
+            else:
+                future.cancel()
+                logger.warning(f"Collection {name} did not respond within {timeout}s, continuing with partial results")
+                result = CollectionResult(collection=name, elapsed_ms=timeout * 1000, timed_out=True)
+                timeouts += 1
+            results.append(result)
+
+        with self._stats_lock:
+            self._stats["queries"] += 1
+            self._stats["collections"] += len(collections)
+            self._stats["timeouts"] += timeouts
+            self._stats["errors"] += errors
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retrieval counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({"max_workers": self.max_workers, "collection_timeout": self.collection_timeout})
+        return stats
+
+
+_executor: Optional[CollectionRetrievalExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_retrieval_executor() -> CollectionRetrievalExecutor:
+    """Get the process-wide retrieval executor"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = CollectionRetrievalExecutor()
+    return _executor
@@ -0,0 +1,362 @@
+"""
+In-memory columnar property index for Dubai Real Estate RAG System
+
+Keeps the filterable columns of the ``properties`` table in NumPy arrays so the
+structured filters used by chat context, hybrid search and the property search
+API (price/bedroom/area ranges, location and type matching, listing status)
+are answered with boolean-mask intersection instead of ILIKE scans in Postgres.
+The index is loaded once, refreshed incrementally on ``updated_at`` and can be
+refreshed for specific IDs right after a write. Callers fall back to Postgres
+whenever ``search`` returns None.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import bindparam, text
+
+from app.core.settings import (
+    PROPERTY_INDEX_ENABLED,
+    PROPERTY_INDEX_REFRESH_INTERVAL,
+    PROPERTY_INDEX_FULL_REFRESH_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = (
+    "id, title, description, price, price_aed, location, property_type, "
+    "bedrooms, bathrooms, area_sqft, listing_status, is_deleted, updated_at"
+)
+LOAD_SQL = f"SELECT {_COLUMNS} FROM properties"
+INCREMENTAL_SQL = f"SELECT {_COLUMNS} FROM properties WHERE updated_at > :since"
+BY_ID_SQL = text(f"SELECT {_COLUMNS} FROM properties WHERE id IN :ids").bindparams(bindparam("ids", expanding=True))
+
+# How long to wait before retrying after a failed load
+LOAD_RETRY_SECONDS = 30
+
+
+class PropertyRecord(NamedTuple):
+    """One indexed property; ``price`` is price_aed falling back to the legacy price"""
+    id: int
+    title: Optional[str]
+    description: Optional[str]
+    price: Optional[float]
+    price_aed: Optional[float]
+    location: Optional[str]
+    property_type: Optional[str]
+    bedrooms: Optional[int]
+    bathrooms: Optional[int]
+    area_sqft: Optional[float]
+    listing_status: Optional[str]
+    is_deleted: bool
+
+
+@dataclass
+class PropertySearchResult:
+    """Matching records for one page plus the total match count"""
+    total: int
+    records: List[PropertyRecord]
+
+
+def _to_float(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def _record_from_row(row) -> PropertyRecord:
+    price_aed = _to_float(row.price_aed)
+    return PropertyRecord(
+        id=int(row.id),
+        title=row.title,
+        description=row.description,
+        price=price_aed if price_aed is not None else _to_float(row.price),
+        price_aed=price_aed,
+        location=row.location,
+        property_type=row.property_type,
+        bedrooms=row.bedrooms,
+        bathrooms=row.bathrooms,
+        area_sqft=_to_float(row.area_sqft),
+        listing_status=row.listing_status,
+        is_deleted=bool(row.is_deleted),
+    )
+
+
+class _Categorical:
+    """Dictionary-encoded lower-cased string column"""
+
+    def __init__(self, values: List[Optional[str]]):
+        normalised = np.array([(v or "").strip().lower() for v in values], dtype=object)
+        if len(normalised):
+            self.categories, codes = np.unique(normalised, return_inverse=True)
+        else:
+            self.categories, codes = np.array([], dtype=object), np.array([], dtype=np.int64)
+        self.codes = codes.astype(np.int32)
+
+    def mask(self, needle: str, match: str) -> np.ndarray:
+        needle = needle.strip().lower()
+        if match == "exact":
+            hits = [i for i, c in enumerate(self.categories) if c == needle]
+        elif match == "prefix":
+            hits = [i for i, c in enumerate(self.categories) if c.startswith(needle)]
+        else:
+            hits = [i for i, c in enumerate(self.categories) if needle in c]
+        return np.isin(self.codes, hits)
+
+
+class _Snapshot:
+    """Immutable column arrays built from the current set of records"""
+
+    def __init__(self, records: List[PropertyRecord]):
+        self.records = records
+        self.ids = np.array([r.id for r in records], dtype=np.int64)
+        self.price = np.array([r.price for r in records], dtype=np.float64)
+        self.bedrooms = np.array([r.bedrooms for r in records], dtype=np.float64)
+        self.bathrooms = np.array([r.bathrooms for r in records], dtype=np.float64)
+        self.area_sqft = np.array([r.area_sqft for r in records], dtype=np.float64)
+        self.is_deleted = np.array([r.is_deleted for r in records], dtype=bool)
+        self.location = _Categorical([r.location for r in records])
+        self.property_type = _Categorical([r.property_type for r in records])
+        self.listing_status = _Categorical([r.listing_status for r in records])
+        self.text = [f"{r.title or ''}\n{r.description or ''}".lower() for r in records]
+
+    def __len__(self):
+        return len(self.records)
+
+
+class PropertyIndex:
+    """Columnar in-process index over the properties table"""
+
+    def __init__(self, engine=None, refresh_interval: float = PROPERTY_INDEX_REFRESH_INTERVAL,
+                 full_refresh_interval: float = PROPERTY_INDEX_FULL_REFRESH_INTERVAL,
+                 enabled: bool = PROPERTY_INDEX_ENABLED):
+        self._engine = engine
+        self.refresh_interval = refresh_interval
+        self.full_refresh_interval = full_refresh_interval
+        self.enabled = enabled
+
+        self._records: Dict[int, PropertyRecord] = {}
+        self._snapshot: Optional[_Snapshot] = None
+        self._high_watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._last_full_refresh = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        # Serialises snapshot rebuilds so a refresh_ids() cannot be lost to a concurrent refresh()
+        self._write_lock = threading.Lock()
+        self._refreshing = False
+        self.stats = {"queries": 0, "query_time_us": 0.0, "refreshes": 0, "full_refreshes": 0,
+                      "last_refresh_ms": 0.0, "fallbacks": 0}
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from app.core.database import get_engine
+            self._engine = get_engine("analytics")
+        return self._engine
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _apply(self, rows, full: bool):
+        with self._write_lock:
+            records = {} if full else dict(self._records)
+            watermark = None if full else self._high_watermark
+            for row in rows:
+                records[int(row.id)] = _record_from_row(row)
+                if row.updated_at is not None and (watermark is None or row.updated_at > watermark):
+                    watermark = row.updated_at
+            snapshot = _Snapshot(list(records.values()))
+            with self._lock:
+                self._records = records
+                self._snapshot = snapshot
+                self._high_watermark = watermark
+
+    def refresh(self, full: bool = False) -> bool:
+        """Reload changed rows (or everything) from Postgres"""
+        full = full or self._snapshot is None or self._high_watermark is None
+        start = time.perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                if full:
+                    rows = conn.execute(text(LOAD_SQL)).fetchall()
+                else:
+                    rows = conn.execute(text(INCREMENTAL_SQL), {"since": self._high_watermark}).fetchall()
+            self._apply(rows, full)
+        except Exception as e:
+            logger.warning(f"⚠️ Property index refresh failed: {e}")
+            self._retry_at = time.monotonic() + LOAD_RETRY_SECONDS
+            return False
+
+        now = time.monotonic()
+        self._last_refresh = now
+        if full:
+            self._last_full_refresh = now
+            self.stats["full_refreshes"] += 1
+        self.stats["refreshes"] += 1
+        self.stats["last_refresh_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        if full:
+            logger.info(f"✅ Property index loaded {len(self._records)} properties in {self.stats['last_refresh_ms']}ms")
+        return True
+
+    def refresh_ids(self, property_ids: Iterable[int]) -> bool:
+        """Re-read specific properties, e.g. right after a write"""
+        ids = [int(i) for i in property_ids if i is not None]
+        if not ids or self._snapshot is None:
+            return False
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(BY_ID_SQL, {"ids": ids}).fetchall()
+        except Exception as e:
+            logger.warning(f"⚠️ Property index refresh for {ids} failed: {e}")
+            return False
+
+        with self._write_lock:
+            records = dict(self._records)
+            for property_id in ids:
+                records.pop(property_id, None)
+            for row in rows:
+                records[int(row.id)] = _record_from_row(row)
+            snapshot = _Snapshot(list(records.values()))
+            with self._lock:
+                self._records = records
+                self._snapshot = snapshot
+        return True
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                due_full = time.monotonic() - self._last_full_refresh >= self.full_refresh_interval
+                self.refresh(full=due_full)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="property-index-refresh", daemon=True).start()
+
+    def _current_snapshot(self) -> Optional[_Snapshot]:
+        if not self.enabled:
+            return None
+        if self._snapshot is None:
+            if time.monotonic() < self._retry_at:
+                return None
+            with self._lock:
+                loading = self._refreshing
+                self._refreshing = True
+            if loading:
+                return None
+            try:
+                self.refresh(full=True)
+            finally:
+                self._refreshing = False
+        elif time.monotonic() - self._last_refresh >= self.refresh_interval:
+            self._refresh_in_background()
+        return self._snapshot
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def search(self, *, price_min: Optional[float] = None, price_max: Optional[float] = None,
+               bedrooms: Optional[int] = None, bedrooms_min: Optional[int] = None,
+               bathrooms: Optional[int] = None, bathrooms_min: Optional[int] = None,
+               area_min: Optional[float] = None, area_max: Optional[float] = None,
+               location: Optional[str] = None, property_type: Optional[str] = None,
+               match: str = "contains", listing_status: Optional[str] = None,
+               text_query: Optional[str] = None, include_deleted: bool = False,
+               order_by: str = "price", descending: bool = False,
+               limit: int = 10, offset: int = 0) -> Optional[PropertySearchResult]:
+        """
+        Filter and rank properties in memory.
+
+        ``match`` controls location/property_type matching: "contains" (ILIKE
+        '%x%' semantics), "prefix" or "exact". Returns None when the index is
+        unavailable so the caller can query Postgres instead.
+        """
+        snapshot = self._current_snapshot()
+        if snapshot is None:
+            self.stats["fallbacks"] += 1
+            return None
+
+        start = time.perf_counter()
+        mask = np.ones(len(snapshot), dtype=bool)
+        if not include_deleted:
+            mask &= ~snapshot.is_deleted
+        if price_min is not None:
+            mask &= snapshot.price >= price_min
+        if price_max is not None:
+            mask &= snapshot.price <= price_max
+        if bedrooms is not None:
+            mask &= snapshot.bedrooms == bedrooms
+        if bedrooms_min is not None:
+            mask &= snapshot.bedrooms >= bedrooms_min
+        if bathrooms is not None:
+            mask &= snapshot.bathrooms == bathrooms
+        if bathrooms_min is not None:
+            mask &= snapshot.bathrooms >= bathrooms_min
+        if area_min is not None:
+            mask &= snapshot.area_sqft >= area_min
+        if area_max is not None:
+            mask &= snapshot.area_sqft <= area_max
+        if location:
+            mask &= snapshot.location.mask(location, match)
+        if property_type:
+            mask &= snapshot.property_type.mask(property_type, match)
+        if listing_status:
+            mask &= snapshot.listing_status.mask(listing_status, "exact")
+
+        candidates = np.flatnonzero(mask)
+        if text_query and len(candidates):
+            needle = text_query.strip().lower()
+            keep = np.fromiter((needle in snapshot.text[i] for i in candidates), dtype=bool, count=len(candidates))
+            candidates = candidates[keep]
+
+        total = int(len(candidates))
+        k = min(offset + limit, total)
+        page: List[PropertyRecord] = []
+        if k > 0:
+            keys = snapshot.ids[candidates] if order_by == "id" else snapshot.price[candidates]
+            if descending:
+                keys = -keys
+            if k < total:
+                top = np.argpartition(keys, k - 1)[:k]
+                order = top[np.argsort(keys[top], kind="stable")]
+            else:
+                order = np.argsort(keys, kind="stable")
+            page = [snapshot.records[i] for i in candidates[order[offset:k]]]
+
+        self.stats["queries"] += 1
+        self.stats["query_time_us"] += (time.perf_counter() - start) * 1e6
+        return PropertySearchResult(total=total, records=page)
+
+    def get_stats(self) -> Dict[str, Any]:
+        queries = self.stats["queries"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "properties": len(self._records),
+            "avg_query_us": round(self.stats["query_time_us"] / queries, 1) if queries else 0.0,
+            "high_watermark": str(self._high_watermark) if self._high_watermark else None,
+        }
+
+
+_property_index: Optional[PropertyIndex] = None
+_property_index_lock = threading.Lock()
+
+
+def get_property_index() -> PropertyIndex:
+    """Get the process-wide property index"""
+    global _property_index
+    if _property_index is None:
+        with _property_index_lock:
+            if _property_index is None:
+                _property_index = PropertyIndex()
+    return _property_index
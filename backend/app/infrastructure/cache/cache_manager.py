@@ -1,35 +1,178 @@
 #!/usr/bin/env python3
 """
-Redis Cache Manager for Dubai Real Estate RAG System
+Tiered Cache Manager for Dubai Real Estate RAG System
 Handles caching of query results, context items, and user sessions for improved performance
+
+Entries live in a bounded in-process LRU (L1) in front of Redis (L2). Misses are
+recomputed once per key (single-flight in-process, Redis lock across workers) and
+hot entries are refreshed probabilistically shortly before they expire.
 """
 
 import redis
 import json
 import hashlib
 import logging
-from typing import Dict, List, Any, Optional, Union
-from datetime import datetime, timedelta
-import pickle
+import math
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable, Iterable, Set, Tuple, Union
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import urlparse
 import os
 from env_loader import load_env
 
+from app.core.settings import (
+    CACHE_L1_MAX_ENTRIES,
+    CACHE_L1_TTL,
+    CACHE_EARLY_REFRESH_BETA,
+    CACHE_LOCK_TIMEOUT,
+    REDIS_URL,
+)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 # Load environment variables from centralized loader
 load_env()
 
 logger = logging.getLogger(__name__)
 
+# Bumped whenever the stored envelope format changes so old blobs are ignored
+KEY_VERSION = "v2"
+COMPRESS_MIN_BYTES = 1024
+
+# Tag index sets outlive the longest entry TTL used by the typed helpers
+TAG_INDEX_TTL = 86400
+INVALIDATION_CHANNEL = f"cache:{KEY_VERSION}:invalidate"
+KNOWN_AREAS_KEY = f"{KEY_VERSION}:tags:areas"
+ALL_PROPERTIES_TAG = "properties"
+# Published on INVALIDATION_CHANNEL instead of a tag list when the cache is cleared
+CLEAR_ALL_MESSAGE = "*"
+
+TagSpec = Union[Iterable[str], Callable[[Any], Iterable[str]], None]
+
+# Types kept intact through both tiers (msgpack ext codes / JSON markers);
+# anything else msgpack or JSON cannot encode is stored as its str()
+_EXT_DECIMAL, _EXT_DATETIME, _EXT_DATE = 1, 2, 3
+_JSON_TYPE_KEY = "__cache_type__"
+
+
+def _encode_special(obj: Any) -> Tuple[Optional[int], str]:
+    if isinstance(obj, Decimal):
+        return _EXT_DECIMAL, str(obj)
+    if isinstance(obj, datetime):
+        return _EXT_DATETIME, obj.isoformat()
+    if isinstance(obj, date):
+        return _EXT_DATE, obj.isoformat()
+    return None, str(obj)
+
+
+def _decode_special(code: int, text: str) -> Any:
+    if code == _EXT_DECIMAL:
+        return Decimal(text)
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(text)
+    if code == _EXT_DATE:
+        return date.fromisoformat(text)
+    raise ValueError(f"Unknown cache value type: {code}")
+
+
+def _msgpack_default(obj: Any) -> Any:
+    code, text = _encode_special(obj)
+    return msgpack.ExtType(code, text.encode("utf-8")) if code is not None else text
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    return _decode_special(code, data.decode("utf-8"))
+
+
+def _json_default(obj: Any) -> Any:
+    code, text = _encode_special(obj)
+    return {_JSON_TYPE_KEY: code, "value": text} if code is not None else text
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if _JSON_TYPE_KEY in obj and len(obj) == 2:
+        return _decode_special(obj[_JSON_TYPE_KEY], obj["value"])
+    return obj
+
+
+def property_tag(property_id: Any) -> str:
+    """Tag for entries that contain or depend on a single property"""
+    return f"property:{property_id}"
+
+
+def area_tag(area: str) -> str:
+    """Tag for entries scoped to an area / location filter"""
+    return f"area:{str(area).strip().lower()}"
+
+
+def collection_tag(name: str) -> str:
+    """Tag for entries built from a ChromaDB collection"""
+    return f"collection:{name}"
+
+
+class _InFlight:
+    """A computation other callers for the same key can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
 class CacheManager:
-    """Redis cache manager for RAG system performance optimization"""
-    
-    def __init__(self, redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0):
-        """Initialize Redis connection"""
+    """Tiered L1/L2 cache manager for RAG system performance optimization"""
+
+    def __init__(self, redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0,
+                 l1_max_entries: int = CACHE_L1_MAX_ENTRIES, l1_ttl: int = CACHE_L1_TTL,
+                 early_refresh_beta: float = CACHE_EARLY_REFRESH_BETA, lock_timeout: float = CACHE_LOCK_TIMEOUT):
+        """Initialize the in-process tier and the Redis connection"""
+        self.l1_max_entries = l1_max_entries
+        self.l1_ttl = l1_ttl
+        self.early_refresh_beta = early_refresh_beta
+        self.lock_timeout = lock_timeout
+
+        # L1 holds the serialized envelope, so hits return a fresh copy with the
+        # same types an L2 hit would; the dict beside it keeps the entry's tags
+        self._l1: "OrderedDict[str, Tuple[float, Dict[str, Any], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._known_areas: Set[str] = set()
+        self._pubsub_thread = None
+        self._stats = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "l1_evictions": 0,
+            "early_refreshes": 0,
+            "coalesced": 0,
+            "lock_waits": 0,
+            "bytes_written": 0,
+            "bytes_read": 0,
+            "get_time_ms": 0.0,
+            "gets": 0,
+            "compute_time_ms": 0.0,
+            "computes": 0,
+            "tag_invalidations": 0,
+            "invalidated_entries": 0,
+        }
+
         try:
             self.redis_client = redis.Redis(
                 host=redis_host,
                 port=redis_port,
                 db=redis_db,
-                decode_responses=False,  # Keep binary for pickle
+                decode_responses=False,  # Values are binary envelopes
                 socket_connect_timeout=5,
                 socket_timeout=5
             )
@@ -38,394 +181,630 @@ class CacheManager:
             logger.info(f"✅ Redis cache connected successfully to {redis_host}:{redis_port}")
             self.cache_enabled = True
         except Exception as e:
-            logger.warning(f"⚠️ Redis cache not available: {e}")
+            logger.warning(f"⚠️ Redis cache not available, using in-process cache only: {e}")
             self.cache_enabled = False
             self.redis_client = None
-    
+
+        if self.cache_enabled:
+            self._start_invalidation_listener()
+
     def _generate_cache_key(self, prefix: str, data: Any) -> str:
         """Generate a unique cache key based on data"""
         if isinstance(data, str):
             data_str = data
         else:
             data_str = json.dumps(data, sort_keys=True, default=str)
-        
+
         # Create hash for consistent key generation
         hash_obj = hashlib.md5(data_str.encode('utf-8'))
         return f"{prefix}:{hash_obj.hexdigest()}"
-    
+
+    def _redis_key(self, cache_key: str) -> str:
+        return f"{KEY_VERSION}:{cache_key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{KEY_VERSION}:tag:{tag}"
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
     def _serialize_data(self, data: Any) -> bytes:
-        """Serialize data for Redis storage"""
+        """Serialize data for storage in either tier (msgpack or JSON, zlib when large)"""
+        if MSGPACK_AVAILABLE:
+            fmt, payload = b"m", msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+        else:
+            fmt, payload = b"j", json.dumps(data, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+        if len(payload) >= COMPRESS_MIN_BYTES:
+            fmt, payload = fmt.upper(), zlib.compress(payload, 1)
+        return fmt + payload
+
+    def _deserialize_data(self, data: bytes) -> Any:
+        """Deserialize data from either tier"""
+        fmt, payload = data[:1], data[1:]
+        if fmt.isupper():
+            payload = zlib.decompress(payload)
+            fmt = fmt.lower()
+        if fmt == b"m":
+            return msgpack.unpackb(payload, raw=False, ext_hook=_msgpack_ext_hook)
+        if fmt == b"j":
+            return json.loads(payload.decode("utf-8"), object_hook=_json_object_hook)
+        raise ValueError(f"Unknown cache encoding: {fmt!r}")
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def _l1_get(self, cache_key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._l1.get(cache_key)
+            if entry is None:
+                return None
+            expires_at, meta, raw = entry
+            if expires_at <= time.time():
+                del self._l1[cache_key]
+                self._unindex(cache_key, meta)
+                return None
+            self._l1.move_to_end(cache_key)
+            return raw
+
+    def _l1_set(self, cache_key: str, envelope: Dict[str, Any], raw: bytes):
+        expires_at = min(envelope["exp"], time.time() + self.l1_ttl)
+        meta = {"tags": envelope.get("tags") or []}
+        with self._lock:
+            previous = self._l1.pop(cache_key, None)
+            if previous is not None:
+                self._unindex(cache_key, previous[1])
+            self._l1[cache_key] = (expires_at, meta, raw)
+            for tag in meta["tags"]:
+                self._tag_index.setdefault(tag, set()).add(cache_key)
+            while len(self._l1) > self.l1_max_entries:
+                evicted_key, (_, evicted, _) = self._l1.popitem(last=False)
+                self._unindex(evicted_key, evicted)
+                self._stats["l1_evictions"] += 1
+
+    def _unindex(self, cache_key: str, meta: Dict[str, Any]):
+        """Remove a key from the local tag index (caller holds the lock)"""
+        for tag in meta.get("tags") or ():
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(cache_key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _drop_local_tags(self, tags: Iterable[str]) -> int:
+        """Drop every L1 entry carrying any of the tags"""
+        dropped = 0
+        with self._lock:
+            for tag in tags:
+                for cache_key in self._tag_index.pop(tag, set()):
+                    entry = self._l1.pop(cache_key, None)
+                    if entry is not None:
+                        self._unindex(cache_key, entry[1])
+                        dropped += 1
+        return dropped
+
+    def _lookup(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached envelope from L1, falling back to Redis"""
+        start = time.perf_counter()
         try:
-            return pickle.dumps(data)
+            raw = self._l1_get(cache_key)
+            if raw is not None:
+                self._stats["l1_hits"] += 1
+                return self._deserialize_data(raw)
+
+            if self.cache_enabled:
+                raw = self.redis_client.get(self._redis_key(cache_key))
+                if raw:
+                    envelope = self._deserialize_data(raw)
+                    self._stats["l2_hits"] += 1
+                    self._stats["bytes_read"] += len(raw)
+                    self._l1_set(cache_key, envelope, raw)
+                    return envelope
+
+            self._stats["misses"] += 1
+            return None
         except Exception as e:
-            logger.error(f"Error serializing data: {e}")
-            return json.dumps(data, default=str).encode('utf-8')
-    
-    def _deserialize_data(self, data: bytes) -> Any:
-        """Deserialize data from Redis storage"""
+            logger.error(f"Error reading cache key {cache_key}: {e}")
+            self._stats["misses"] += 1
+            return None
+        finally:
+            self._stats["gets"] += 1
+            self._stats["get_time_ms"] += (time.perf_counter() - start) * 1000
+
+    def _store(self, cache_key: str, value: Any, ttl: int, compute_time: float = 0.0,
+               tags: Optional[Iterable[str]] = None) -> bool:
+        """Write a value to both tiers and record it under its dependency tags"""
+        tags = sorted({tag for tag in tags or () if tag})
+        envelope = {"v": value, "exp": time.time() + ttl, "delta": compute_time, "tags": tags}
         try:
-            return pickle.loads(data)
+            serialized_data = self._serialize_data(envelope)
         except Exception as e:
-            logger.error(f"Error deserializing data: {e}")
-            return json.loads(data.decode('utf-8'))
-    
-    def cache_query_result(self, query: str, role: str, result: Dict[str, Any], ttl: int = 3600) -> bool:
-        """Cache query results with TTL"""
-        if not self.cache_enabled:
+            logger.error(f"Error serializing cache key {cache_key}: {e}")
             return False
-        
+        self._l1_set(cache_key, envelope, serialized_data)
+        self._stats["sets"] += 1
+
+        areas = [tag.split(":", 1)[1] for tag in tags if tag.startswith("area:")]
+        if areas:
+            with self._lock:
+                self._known_areas.update(areas)
+
+        if not self.cache_enabled:
+            return True
         try:
-            cache_key = self._generate_cache_key("query_result", {
-                "query": query,
-                "role": role
-            })
-            
-            cache_data = {
-                "result": result,
-                "timestamp": datetime.now().isoformat(),
-                "ttl": ttl
-            }
-            
-            serialized_data = self._serialize_data(cache_data)
-            self.redis_client.setex(cache_key, ttl, serialized_data)
-            
-            logger.debug(f"Cached query result: {cache_key}")
+            redis_key = self._redis_key(cache_key)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(redis_key, ttl, serialized_data)
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), redis_key)
+                pipe.expire(self._tag_key(tag), max(ttl, TAG_INDEX_TTL))
+            if areas:
+                pipe.sadd(KNOWN_AREAS_KEY, *areas)
+            pipe.execute()
+            self._stats["bytes_written"] += len(serialized_data)
             return True
-            
         except Exception as e:
-            logger.error(f"Error caching query result: {e}")
+            logger.error(f"Error writing cache key {cache_key}: {e}")
             return False
-    
-    def get_cached_query_result(self, query: str, role: str) -> Optional[Dict[str, Any]]:
-        """Retrieve cached query result"""
+
+    def _should_refresh_early(self, envelope: Dict[str, Any]) -> bool:
+        """Probabilistic early expiration (XFetch): likelier as expiry nears and for slow computations"""
+        delta = envelope.get("delta") or 0.0
+        if delta <= 0 or self.early_refresh_beta <= 0:
+            return False
+        return time.time() - delta * self.early_refresh_beta * math.log(1.0 - random.random()) >= envelope["exp"]
+
+    # ------------------------------------------------------------------
+    # Recomputation
+    # ------------------------------------------------------------------
+
+    def _acquire_lock(self, cache_key: str) -> Optional[str]:
+        """Take the cross-process recompute lock; returns a token, '' without Redis, None if held elsewhere"""
         if not self.cache_enabled:
-            return None
-        
+            return ""
+        token = os.urandom(8).hex()
         try:
-            cache_key = self._generate_cache_key("query_result", {
-                "query": query,
-                "role": role
-            })
-            
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                cache_data = self._deserialize_data(cached_data)
-                logger.debug(f"Cache hit for query: {cache_key}")
-                return cache_data["result"]
-            
-            return None
-            
+            acquired = self.redis_client.set(f"lock:{self._redis_key(cache_key)}", token, nx=True,
+                                             px=int(self.lock_timeout * 1000))
+            return token if acquired else None
         except Exception as e:
-            logger.error(f"Error retrieving cached query result: {e}")
-            return None
-    
-    def cache_context_items(self, query: str, intent: str, context_items: List[Dict[str, Any]], ttl: int = 1800) -> bool:
-        """Cache context items for faster retrieval"""
-        if not self.cache_enabled:
-            return False
-        
+            logger.warning(f"⚠️ Cache lock unavailable for {cache_key}: {e}")
+            return ""
+
+    def _release_lock(self, cache_key: str, token: str):
+        if not token or not self.cache_enabled:
+            return
+        lock_key = f"lock:{self._redis_key(cache_key)}"
         try:
-            cache_key = self._generate_cache_key("context_items", {
-                "query": query,
-                "intent": intent
-            })
-            
-            cache_data = {
-                "context_items": context_items,
-                "timestamp": datetime.now().isoformat(),
-                "ttl": ttl
-            }
-            
-            serialized_data = self._serialize_data(cache_data)
-            self.redis_client.setex(cache_key, ttl, serialized_data)
-            
-            logger.debug(f"Cached context items: {cache_key}")
-            return True
-            
+            if self.redis_client.get(lock_key) == token.encode():
+                self.redis_client.delete(lock_key)
         except Exception as e:
-            logger.error(f"Error caching context items: {e}")
-            return False
-    
-    def get_cached_context_items(self, query: str, intent: str) -> Optional[List[Dict[str, Any]]]:
-        """Retrieve cached context items"""
-        if not self.cache_enabled:
-            return None
-        
+            logger.warning(f"⚠️ Failed to release cache lock {lock_key}: {e}")
+
+    def _wait_for_peer(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Poll Redis while another worker recomputes the same key"""
+        self._stats["lock_waits"] += 1
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+            try:
+                raw = self.redis_client.get(self._redis_key(cache_key))
+            except Exception:
+                return None
+            if raw:
+                envelope = self._deserialize_data(raw)
+                self._stats["bytes_read"] += len(raw)
+                self._l1_set(cache_key, envelope, raw)
+                return envelope
+        return None
+
+    def _compute_and_store(self, cache_key: str, compute: Callable[[], Any], ttl: int, tags: TagSpec = None) -> Any:
+        start = time.perf_counter()
+        value = compute()
+        elapsed = time.perf_counter() - start
+        self._stats["computes"] += 1
+        self._stats["compute_time_ms"] += elapsed * 1000
+        if value is not None:
+            resolved_tags = tags(value) if callable(tags) else tags
+            self._store(cache_key, value, ttl, compute_time=elapsed, tags=resolved_tags)
+        return value
+
+    def _recompute(self, cache_key: str, compute: Callable[[], Any], ttl: int,
+                   stale: Optional[Dict[str, Any]] = None, tags: TagSpec = None) -> Any:
+        """Recompute a key once per process and once per cluster"""
+        with self._lock:
+            flight = self._in_flight.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[cache_key] = _InFlight()
+
+        if not leader:
+            # Someone in this process is already recomputing; serve stale or wait
+            if stale is not None:
+                return stale["v"]
+            self._stats["coalesced"] += 1
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
         try:
-            cache_key = self._generate_cache_key("context_items", {
-                "query": query,
-                "intent": intent
-            })
-            
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                cache_data = self._deserialize_data(cached_data)
-                logger.debug(f"Cache hit for context items: {cache_key}")
-                return cache_data["context_items"]
-            
-            return None
-            
+            token = self._acquire_lock(cache_key)
+            if token is None:
+                if stale is not None:
+                    flight.value = stale["v"]
+                    return flight.value
+                envelope = self._wait_for_peer(cache_key)
+                if envelope is not None:
+                    flight.value = envelope["v"]
+                    return flight.value
+            try:
+                flight.value = self._compute_and_store(cache_key, compute, ttl, tags)
+            finally:
+                if token:
+                    self._release_lock(cache_key, token)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(cache_key, None)
+            flight.event.set()
+
+    def get_or_compute(self, prefix: str, key_data: Any, compute: Callable[[], Any], ttl: int = 3600,
+                       tags: TagSpec = None) -> Any:
+        """
+        Return the cached value for (prefix, key_data), computing it on a miss.
+
+        Concurrent misses for the same key share one computation, and entries
+        close to expiry are refreshed early by a single caller while others
+        keep being served the cached value. None results are not cached.
+        tags may be a list or a callable deriving tags from the computed value.
+        """
+        cache_key = self._generate_cache_key(prefix, key_data)
+        envelope = self._lookup(cache_key)
+
+        if envelope is not None:
+            if not self._should_refresh_early(envelope):
+                return envelope["v"]
+            self._stats["early_refreshes"] += 1
+            return self._recompute(cache_key, compute, ttl, stale=envelope, tags=tags)
+
+        return self._recompute(cache_key, compute, ttl, tags=tags)
+
+    # ------------------------------------------------------------------
+    # Tag-based invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Drop every entry recorded under any of the tags.
+
+        Cost is proportional to the number of affected entries; other workers
+        drop their in-process copies via a pub/sub notification.
+        """
+        tags = sorted({tag for tag in tags if tag})
+        if not tags:
+            return 0
+
+        removed = self._drop_local_tags(tags)
+        if self.cache_enabled:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for tag in tags:
+                    pipe.smembers(self._tag_key(tag))
+                members = set()
+                for tag_members in pipe.execute():
+                    members.update(tag_members or ())
+
+                pipe = self.redis_client.pipeline(transaction=False)
+                if members:
+                    pipe.delete(*members)
+                pipe.delete(*[self._tag_key(tag) for tag in tags])
+                pipe.publish(INVALIDATION_CHANNEL, json.dumps(tags))
+                results = pipe.execute()
+                if members:
+                    removed = max(removed, results[0])
+            except Exception as e:
+                logger.error(f"Error invalidating cache tags {tags}: {e}")
+
+        self._stats["tag_invalidations"] += 1
+        self._stats["invalidated_entries"] += removed
+        logger.debug(f"Invalidated {removed} cache entries for tags: {tags}")
+        return removed
+
+    def _known_area_names(self) -> Set[str]:
+        with self._lock:
+            areas = set(self._known_areas)
+        if self.cache_enabled:
+            try:
+                areas.update(
+                    a.decode() if isinstance(a, bytes) else a
+                    for a in self.redis_client.smembers(KNOWN_AREAS_KEY)
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load cached area tags: {e}")
+        return areas
+
+    def invalidate_property(self, property_id: Any = None, locations: Iterable[Optional[str]] = ()) -> int:
+        """
+        Invalidate entries affected by a property write.
+
+        Covers entries containing the property, unfiltered property listings and
+        any cached area filter that matches one of the given locations (old and
+        new location when a property moves), mirroring the ILIKE filters used
+        by the search paths.
+        """
+        property_ids = [property_id] if property_id is not None else []
+        return self.invalidate_properties(property_ids, locations)
+
+    def invalidate_properties(self, property_ids: Iterable[Any], locations: Iterable[Optional[str]] = ()) -> int:
+        """Invalidate entries affected by a batch of property writes in one pass"""
+        tags = {ALL_PROPERTIES_TAG}
+        tags.update(property_tag(pid) for pid in property_ids if pid is not None)
+
+        locations = [loc.strip().lower() for loc in locations if loc]
+        if locations:
+            for area in self._known_area_names():
+                if any(area in loc for loc in locations):
+                    tags.add(area_tag(area))
+        return self.invalidate_tags(*tags)
+
+    def _start_invalidation_listener(self):
+        """Subscribe to invalidations published by other workers"""
+        try:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_invalidation_message})
+            self._pubsub_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
         except Exception as e:
-            logger.error(f"Error retrieving cached context items: {e}")
-            return None
-    
-    def cache_user_session(self, session_id: str, user_data: Dict[str, Any], ttl: int = 7200) -> bool:
-        """Cache user session data"""
-        if not self.cache_enabled:
-            return False
-        
+            logger.warning(f"⚠️ Cache invalidation listener not started: {e}")
+
+    def _on_invalidation_message(self, message: Dict[str, Any]):
         try:
-            cache_key = f"user_session:{session_id}"
-            
-            cache_data = {
-                "user_data": user_data,
-                "timestamp": datetime.now().isoformat(),
-                "ttl": ttl
-            }
-            
-            serialized_data = self._serialize_data(cache_data)
-            self.redis_client.setex(cache_key, ttl, serialized_data)
-            
-            logger.debug(f"Cached user session: {session_id}")
-            return True
-            
+            tags = json.loads(message["data"])
+            if tags == CLEAR_ALL_MESSAGE:
+                self._clear_local()
+            else:
+                self._drop_local_tags(tags)
         except Exception as e:
-            logger.error(f"Error caching user session: {e}")
+            logger.warning(f"⚠️ Ignoring malformed cache invalidation message: {e}")
+
+    # ------------------------------------------------------------------
+    # Typed helpers
+    # ------------------------------------------------------------------
+
+    def _set(self, cache_key: str, value: Any, ttl: int, label: str, tags: Optional[Iterable[str]] = None) -> bool:
+        try:
+            stored = self._store(cache_key, value, ttl, tags=tags)
+            logger.debug(f"Cached {label}: {cache_key}")
+            return stored
+        except Exception as e:
+            logger.error(f"Error caching {label}: {e}")
             return False
-    
+
+    def _get(self, cache_key: str, label: str) -> Any:
+        envelope = self._lookup(cache_key)
+        if envelope is not None:
+            logger.debug(f"Cache hit for {label}: {cache_key}")
+            return envelope["v"]
+        return None
+
+    def cache_query_result(self, query: str, role: str, result: Dict[str, Any], ttl: int = 3600) -> bool:
+        """Cache query results with TTL"""
+        cache_key = self._generate_cache_key("query_result", {"query": query, "role": role})
+        return self._set(cache_key, result, ttl, "query result")
+
+    def get_cached_query_result(self, query: str, role: str) -> Optional[Dict[str, Any]]:
+        """Retrieve cached query result"""
+        cache_key = self._generate_cache_key("query_result", {"query": query, "role": role})
+        return self._get(cache_key, "query")
+
+    def cache_context_items(self, query: str, intent: str, context_items: List[Dict[str, Any]], ttl: int = 1800,
+                            tags: Optional[Iterable[str]] = None) -> bool:
+        """Cache context items for faster retrieval"""
+        cache_key = self._generate_cache_key("context_items", {"query": query, "intent": intent})
+        return self._set(cache_key, context_items, ttl, "context items", tags)
+
+    def get_cached_context_items(self, query: str, intent: str) -> Optional[List[Dict[str, Any]]]:
+        """Retrieve cached context items"""
+        cache_key = self._generate_cache_key("context_items", {"query": query, "intent": intent})
+        return self._get(cache_key, "context items")
+
+    def cache_user_session(self, session_id: str, user_data: Dict[str, Any], ttl: int = 7200) -> bool:
+        """Cache user session data"""
+        return self._set(f"user_session:{session_id}", user_data, ttl, "user session")
+
     def get_cached_user_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached user session data"""
-        if not self.cache_enabled:
-            return None
-        
-        try:
-            cache_key = f"user_session:{session_id}"
-            
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                cache_data = self._deserialize_data(cached_data)
-                logger.debug(f"Cache hit for user session: {session_id}")
-                return cache_data["user_data"]
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error retrieving cached user session: {e}")
-            return None
-    
+        return self._get(f"user_session:{session_id}", "user session")
+
     def cache_frequent_queries(self, query_pattern: str, results: List[Dict[str, Any]], ttl: int = 86400) -> bool:
         """Cache frequently asked queries for faster response"""
-        if not self.cache_enabled:
-            return False
-        
-        try:
-            cache_key = self._generate_cache_key("frequent_query", query_pattern)
-            
-            cache_data = {
-                "results": results,
-                "timestamp": datetime.now().isoformat(),
-                "ttl": ttl
-            }
-            
-            serialized_data = self._serialize_data(cache_data)
-            self.redis_client.setex(cache_key, ttl, serialized_data)
-            
-            logger.debug(f"Cached frequent query: {query_pattern}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error caching frequent query: {e}")
-            return False
-    
+        cache_key = self._generate_cache_key("frequent_query", query_pattern)
+        return self._set(cache_key, results, ttl, "frequent query")
+
     def get_cached_frequent_query(self, query_pattern: str) -> Optional[List[Dict[str, Any]]]:
         """Retrieve cached frequent query results"""
-        if not self.cache_enabled:
-            return None
-        
-        try:
-            cache_key = self._generate_cache_key("frequent_query", query_pattern)
-            
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                cache_data = self._deserialize_data(cached_data)
-                logger.debug(f"Cache hit for frequent query: {query_pattern}")
-                return cache_data["results"]
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error retrieving cached frequent query: {e}")
-            return None
-    
-    def cache_property_search(self, search_params: Dict[str, Any], results: List[Dict[str, Any]], ttl: int = 1800) -> bool:
+        cache_key = self._generate_cache_key("frequent_query", query_pattern)
+        return self._get(cache_key, "frequent query")
+
+    def cache_property_search(self, search_params: Dict[str, Any], results: List[Dict[str, Any]], ttl: int = 1800,
+                              tags: Optional[Iterable[str]] = None) -> bool:
         """Cache property search results for faster retrieval"""
-        if not self.cache_enabled:
-            return False
-        
-        try:
-            cache_key = self._generate_cache_key("property_search", search_params)
-            
-            cache_data = {
-                "results": results,
-                "search_params": search_params,
-                "timestamp": datetime.now().isoformat(),
-                "ttl": ttl
-            }
-            
-            serialized_data = self._serialize_data(cache_data)
-            self.redis_client.setex(cache_key, ttl, serialized_data)
-            
-            logger.debug(f"Cached property search: {cache_key}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error caching property search: {e}")
-            return False
-    
+        cache_key = self._generate_cache_key("property_search", search_params)
+        return self._set(cache_key, results, ttl, "property search", tags)
+
     def get_cached_property_search(self, search_params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
         """Retrieve cached property search results"""
-        if not self.cache_enabled:
-            return None
-        
-        try:
-            cache_key = self._generate_cache_key("property_search", search_params)
-            
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                cache_data = self._deserialize_data(cached_data)
-                logger.debug(f"Cache hit for property search: {cache_key}")
-                return cache_data["results"]
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error retrieving cached property search: {e}")
-            return None
-    
+        cache_key = self._generate_cache_key("property_search", search_params)
+        return self._get(cache_key, "property search")
+
     def cache_market_data(self, area: str, property_type: str, data: Dict[str, Any], ttl: int = 3600) -> bool:
         """Cache market data for specific area and property type"""
-        if not self.cache_enabled:
-            return False
-        
-        try:
-            cache_key = f"market_data:{area}:{property_type}"
-            
-            cache_data = {
-                "data": data,
-                "area": area,
-                "property_type": property_type,
-                "timestamp": datetime.now().isoformat(),
-                "ttl": ttl
-            }
-            
-            serialized_data = self._serialize_data(cache_data)
-            self.redis_client.setex(cache_key, ttl, serialized_data)
-            
-            logger.debug(f"Cached market data: {cache_key}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error caching market data: {e}")
-            return False
-    
+        return self._set(f"market_data:{area}:{property_type}", data, ttl, "market data", [area_tag(area)])
+
     def get_cached_market_data(self, area: str, property_type: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached market data"""
-        if not self.cache_enabled:
-            return None
-        
-        try:
-            cache_key = f"market_data:{area}:{property_type}"
-            
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                cache_data = self._deserialize_data(cached_data)
-                logger.debug(f"Cache hit for market data: {cache_key}")
-                return cache_data["data"]
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error retrieving cached market data: {e}")
-            return None
-    
+        return self._get(f"market_data:{area}:{property_type}", "market data")
+
     def invalidate_cache_pattern(self, pattern: str) -> bool:
-        """Invalidate cache entries matching a pattern"""
+        """
+        Invalidate cache entries matching a pattern.
+
+        Walks the keyspace incrementally with SCAN; prefer invalidate_tags or
+        invalidate_property, which only touch the affected entries.
+        """
+        import fnmatch
+
+        with self._lock:
+            local_keys = [k for k in self._l1 if fnmatch.fnmatchcase(k, pattern)]
+            for key in local_keys:
+                _, meta, _ = self._l1.pop(key)
+                self._unindex(key, meta)
+
         if not self.cache_enabled:
-            return False
-        
+            return bool(local_keys)
+
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                self.redis_client.delete(*keys)
-                logger.info(f"Invalidated {len(keys)} cache entries matching pattern: {pattern}")
+            deleted = 0
+            batch = []
+            for key in self.redis_client.scan_iter(match=self._redis_key(pattern), count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += self.redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += self.redis_client.delete(*batch)
+            if deleted:
+                logger.info(f"Invalidated {deleted} cache entries matching pattern: {pattern}")
                 return True
-            return False
-            
+            return bool(local_keys)
+
         except Exception as e:
             logger.error(f"Error invalidating cache pattern: {e}")
             return False
-    
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
+        with self._lock:
+            counters = dict(self._stats)
+            l1_entries = len(self._l1)
+            cache_patterns: Dict[str, int] = {}
+            for key in self._l1:
+                prefix = key.split(":", 1)[0]
+                cache_patterns[prefix] = cache_patterns.get(prefix, 0) + 1
+
+        hits = counters["l1_hits"] + counters["l2_hits"]
+        lookups = hits + counters["misses"]
+        stats = {
+            "status": "enabled" if self.cache_enabled else "l1_only",
+            "total_keys": l1_entries,
+            "memory_usage": "N/A",
+            "connected_clients": 0,
+            "uptime": 0,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "miss_rate": round(counters["misses"] / lookups, 4) if lookups else 0.0,
+            "evictions": counters["l1_evictions"],
+            "expired_keys": 0,
+            "cache_patterns": cache_patterns,
+            "l1": {
+                "entries": l1_entries,
+                "max_entries": self.l1_max_entries,
+                "hits": counters["l1_hits"],
+                "evictions": counters["l1_evictions"],
+            },
+            "l2": {
+                "hits": counters["l2_hits"],
+                "bytes_read": counters["bytes_read"],
+                "bytes_written": counters["bytes_written"],
+            },
+            "misses": counters["misses"],
+            "sets": counters["sets"],
+            "early_refreshes": counters["early_refreshes"],
+            "coalesced": counters["coalesced"],
+            "lock_waits": counters["lock_waits"],
+            "tags": {
+                "indexed": len(self._tag_index),
+                "invalidations": counters["tag_invalidations"],
+                "invalidated_entries": counters["invalidated_entries"],
+            },
+            "avg_get_ms": round(counters["get_time_ms"] / counters["gets"], 3) if counters["gets"] else 0.0,
+            "avg_compute_ms": round(counters["compute_time_ms"] / counters["computes"], 3) if counters["computes"] else 0.0,
+            "serializer": "msgpack" if MSGPACK_AVAILABLE else "json",
+        }
+
         if not self.cache_enabled:
-            return {"status": "disabled"}
-        
+            return stats
+
         try:
             info = self.redis_client.info()
-            keys = self.redis_client.keys("*")
-            
-            stats = {
-                "status": "enabled",
-                "total_keys": len(keys),
+            stats.update({
+                "total_keys": self.redis_client.dbsize(),
                 "memory_usage": info.get("used_memory_human", "N/A"),
                 "connected_clients": info.get("connected_clients", 0),
                 "uptime": info.get("uptime_in_seconds", 0),
-                "cache_patterns": {
-                    "query_results": len([k for k in keys if k.startswith(b"query_result:")]),
-                    "context_items": len([k for k in keys if k.startswith(b"context_items:")]),
-                    "user_sessions": len([k for k in keys if k.startswith(b"user_session:")]),
-                    "frequent_queries": len([k for k in keys if k.startswith(b"frequent_query:")])
-                }
-            }
-            
+                "evictions": counters["l1_evictions"] + info.get("evicted_keys", 0),
+                "expired_keys": info.get("expired_keys", 0),
+            })
             return stats
-            
+
         except Exception as e:
             logger.error(f"Error getting cache stats: {e}")
-            return {"status": "error", "message": str(e)}
-    
+            stats["status"] = "error"
+            stats["message"] = str(e)
+            return stats
+
+    def _clear_local(self):
+        with self._lock:
+            self._l1.clear()
+            self._tag_index.clear()
+            self._known_areas.clear()
+
     def clear_all_cache(self) -> bool:
-        """Clear all cache entries"""
+        """Clear all cache entries, including other workers' in-process copies"""
+        self._clear_local()
+
         if not self.cache_enabled:
-            return False
-        
+            return True
+
         try:
             self.redis_client.flushdb()
+            self.redis_client.publish(INVALIDATION_CHANNEL, json.dumps(CLEAR_ALL_MESSAGE))
             logger.info("Cleared all cache entries")
             return True
-            
+
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
             return False
-    
+
     def health_check(self) -> Dict[str, Any]:
         """Check cache health and performance"""
         if not self.cache_enabled:
             return {"status": "disabled", "message": "Redis cache not available"}
-        
+
         try:
             start_time = datetime.now()
             self.redis_client.ping()
             ping_time = (datetime.now() - start_time).total_seconds() * 1000
-            
+
             stats = self.get_cache_stats()
             stats["ping_time_ms"] = ping_time
             stats["status"] = "healthy"
-            
+
             return stats
-            
+
         except Exception as e:
             return {"status": "unhealthy", "message": str(e)}
 
-# Global cache manager instance
-cache_manager = CacheManager()
+# Global cache manager instance, shared by every router and service in the worker
+_redis_url = urlparse(REDIS_URL)
+cache_manager = CacheManager(
+    redis_host=_redis_url.hostname or "localhost",
+    redis_port=_redis_url.port or 6379,
+    redis_db=int(_redis_url.path.lstrip('/') or 0)
+)
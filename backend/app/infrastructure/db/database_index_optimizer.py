@@ -9,10 +9,11 @@ import logging
 import time
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-from sqlalchemy import create_engine, text, MetaData, Table
+from sqlalchemy import text, MetaData, Table
 from sqlalchemy.exc import SQLAlchemyError
 import json
 from datetime import datetime
+from app.core.database import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +40,7 @@ class DatabaseIndexOptimizer:
     """Database index optimization and management system"""
     
     def __init__(self, database_url: str):
-        self.engine = create_engine(database_url)
+        self.engine = get_engine("analytics", database_url)
         self.metadata = MetaData()
         
         # Define high-priority indexes for real estate system
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+LLM Gateway - single entry point for all text generation
+Owns one long-lived client per provider and adds a bounded concurrency pool per
+provider, coalescing of identical in-flight prompts, a prompt-hash response
+cache with TTL and a deterministic fake provider for offline load tests.
+
+Usage:
+    from app.infrastructure.integrations.llm_gateway import get_llm_gateway
+    model = get_llm_gateway().get_model("gemini", "gemini-1.5-flash")
+    text = model.generate_content(prompt).text          # drop-in for genai.GenerativeModel
+    text = (await model.generate_content_async(prompt)).text
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, is_dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.settings import (
+    GOOGLE_API_KEY, LLM_PROVIDER, LLM_MAX_CONCURRENCY, LLM_CACHE_TTL,
+    LLM_CACHE_MAX_ENTRIES, LLM_FAKE_LATENCY_MS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend:
+    """Base interface for provider backends. Implementations must be thread-safe."""
+
+    name = "base"
+
+    def complete(self, model: str, prompt: str, options: Dict[str, Any]) -> str:
+        raise NotImplementedError
+
+    def stream(self, model: str, prompt: str, options: Dict[str, Any]) -> Iterator[str]:
+        # Providers without native streaming return the whole completion as one chunk
+        yield self.complete(model, prompt, options)
+
+
+class GeminiBackend(LLMBackend):
+    """Google Generative AI backend with cached model handles"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = GOOGLE_API_KEY):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_model(self, model: str):
+        with self._lock:
+            if model not in self._models:
+                self._models[model] = self._genai.GenerativeModel(model)
+            return self._models[model]
+
+    def complete(self, model: str, prompt: str, options: Dict[str, Any]) -> str:
+        response = self._get_model(model).generate_content(prompt, generation_config=options or None)
+        return response.text
+
+    def stream(self, model: str, prompt: str, options: Dict[str, Any]) -> Iterator[str]:
+        response = self._get_model(model).generate_content(prompt, generation_config=options or None, stream=True)
+        for chunk in response:
+            text_chunk = getattr(chunk, "text", "")
+            if text_chunk:
+                yield text_chunk
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI backend sharing one HTTP client across calls"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str):
+        from openai import OpenAI
+        self._client = OpenAI(api_key=api_key)
+
+    def complete(self, model: str, prompt: str, options: Dict[str, Any]) -> str:
+        try:
+            # Prefer Responses API when available
+            resp = self._client.responses.create(model=model, input=prompt)
+            return resp.output_text
+        except Exception:
+            resp = self._client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            return resp.choices[0].message.content
+
+    def stream(self, model: str, prompt: str, options: Dict[str, Any]) -> Iterator[str]:
+        stream = self._client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+        )
+        for event in stream:
+            delta = event.choices[0].delta.content if event.choices else None
+            if delta:
+                yield delta
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic offline backend: the same prompt always yields the same text"""
+
+    name = "fake"
+
+    def __init__(self, latency_ms: int = LLM_FAKE_LATENCY_MS):
+        self.latency_ms = latency_ms
+
+    def complete(self, model: str, prompt: str, options: Dict[str, Any]) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        digest = hashlib.sha256(f"{model}:{prompt}".encode("utf-8")).hexdigest()[:12]
+        last_line = next((line.strip() for line in reversed(prompt.splitlines()) if line.strip()), "")
+        return f"[{model}] Simulated response {digest} for: {last_line[:80]}"
+
+    def stream(self, model: str, prompt: str, options: Dict[str, Any]) -> Iterator[str]:
+        words = self.complete(model, prompt, options).split(" ")
+        for i, word in enumerate(words):
+            yield word if i == 0 else " " + word
+
+
+class _TTLCache:
+    """Small thread-safe LRU cache with per-entry expiry"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _ProviderPool:
+    """Per-provider backend, worker pool and counters"""
+
+    def __init__(self, backend: LLMBackend, max_concurrency: int):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"llm-{backend.name}")
+        # Streams run on caller threads, so they share the limit through a semaphore
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.stats = {"requests": 0, "backend_calls": 0, "cache_hits": 0, "coalesced": 0, "errors": 0, "streams": 0}
+
+
+class LLMGateway:
+    """Routes generation requests to provider backends with pooling, dedupe and caching"""
+
+    def __init__(self, default_provider: str = LLM_PROVIDER, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 cache_ttl: float = LLM_CACHE_TTL, cache_max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.default_provider = default_provider
+        self.max_concurrency = max_concurrency
+        self.cache = _TTLCache(cache_ttl, cache_max_entries)
+        self._pools: Dict[str, _ProviderPool] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _create_backend(self, provider: str) -> LLMBackend:
+        if provider == "gemini":
+            return GeminiBackend()
+        if provider == "openai":
+            api_key = os.getenv("OPENAI_API_KEY", "").strip()
+            if not api_key:
+                raise RuntimeError("OPENAI_API_KEY is required for the OpenAI provider")
+            return OpenAIBackend(api_key)
+        if provider == "fake":
+            return FakeBackend()
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+    def _resolve_provider(self, provider: Optional[str]) -> str:
+        # The fake provider replaces every backend so load tests never leave the box
+        if self.default_provider == "fake":
+            return "fake"
+        return provider or self.default_provider
+
+    def _get_pool(self, provider: str) -> _ProviderPool:
+        with self._lock:
+            pool = self._pools.get(provider)
+            if pool is None:
+                pool = _ProviderPool(self._create_backend(provider), self.max_concurrency)
+                self._pools[provider] = pool
+                logger.info(f"✅ LLM gateway initialised provider '{provider}' (max concurrency {self.max_concurrency})")
+            return pool
+
+    def register_backend(self, provider: str, backend: LLMBackend, max_concurrency: Optional[int] = None):
+        """Install a custom backend, e.g. a fake with specific latency"""
+        with self._lock:
+            self._pools[provider] = _ProviderPool(backend, max_concurrency or self.max_concurrency)
+
+    @staticmethod
+    def _normalise_options(options: Any) -> Dict[str, Any]:
+        if options is None:
+            return {}
+        if isinstance(options, dict):
+            return dict(options)
+        if is_dataclass(options):
+            return {k: v for k, v in asdict(options).items() if v is not None}
+        return dict(vars(options))
+
+    @staticmethod
+    def _cache_key(provider: str, model: str, prompt: str, options: Dict[str, Any]) -> str:
+        payload = json.dumps({"p": provider, "m": model, "o": options}, sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode("utf-8"))
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _execute(self, pool: _ProviderPool, key: str, model: str, prompt: str, options: Dict[str, Any], use_cache: bool) -> str:
+        with pool.slots:
+            pool.stats["backend_calls"] += 1
+            try:
+                text_response = pool.backend.complete(model, prompt, options)
+            except Exception:
+                pool.stats["errors"] += 1
+                raise
+        if use_cache:
+            self.cache.set(key, text_response)
+        return text_response
+
+    def _submit(self, provider: Optional[str], model: str, prompt: str, options: Any, use_cache: bool):
+        """Return either a cached string or a future shared by identical in-flight prompts"""
+        provider = self._resolve_provider(provider)
+        pool = self._get_pool(provider)
+        options = self._normalise_options(options)
+        key = self._cache_key(provider, model, prompt, options)
+        pool.stats["requests"] += 1
+
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                pool.stats["cache_hits"] += 1
+                return cached
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                pool.stats["coalesced"] += 1
+                return future
+            future = pool.executor.submit(self._execute, pool, key, model, prompt, options, use_cache)
+            self._in_flight[key] = future
+
+        def _release(_):
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+        future.add_done_callback(_release)
+        return future
+
+    def generate(self, prompt: str, provider: Optional[str] = None, model: Optional[str] = None,
+                 options: Any = None, use_cache: bool = True) -> str:
+        """Blocking generation through the provider pool"""
+        result = self._submit(provider, model or "", prompt, options, use_cache)
+        return result if isinstance(result, str) else result.result()
+
+    async def agenerate(self, prompt: str, provider: Optional[str] = None, model: Optional[str] = None,
+                        options: Any = None, use_cache: bool = True) -> str:
+        """Non-blocking generation: the backend call runs in the provider pool"""
+        result = self._submit(provider, model or "", prompt, options, use_cache)
+        return result if isinstance(result, str) else await asyncio.wrap_future(result)
+
+    def stream(self, prompt: str, provider: Optional[str] = None, model: Optional[str] = None,
+               options: Any = None) -> Iterator[str]:
+        """Yield completion chunks; holds a provider slot for the life of the stream"""
+        pool = self._get_pool(self._resolve_provider(provider))
+        options = self._normalise_options(options)
+        pool.stats["streams"] += 1
+        with pool.slots:
+            try:
+                yield from pool.backend.stream(model or "", prompt, options)
+            except Exception:
+                pool.stats["errors"] += 1
+                raise
+
+    def get_model(self, provider: Optional[str] = None, model: Optional[str] = None) -> "GatewayModel":
+        """Get a GenerativeModel-compatible handle bound to a provider and model"""
+        return GatewayModel(self, provider, model or "")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-provider counters and cache size"""
+        with self._lock:
+            providers = {
+                name: dict(pool.stats, max_concurrency=pool.max_concurrency)
+                for name, pool in self._pools.items()
+            }
+            in_flight = len(self._in_flight)
+        return {
+            "default_provider": self.default_provider,
+            "providers": providers,
+            "in_flight": in_flight,
+            "cache_entries": len(self.cache),
+            "cache_ttl": self.cache.ttl,
+        }
+
+
+class GatewayModel:
+    """Drop-in replacement for genai.GenerativeModel backed by the gateway"""
+
+    def __init__(self, gateway: LLMGateway, provider: Optional[str], model: str):
+        self.gateway = gateway
+        self.provider = provider
+        self.model_name = model
+
+    def generate_content(self, prompt: str, generation_config: Any = None, stream: bool = False, **kwargs):
+        if stream:
+            chunks = self.gateway.stream(prompt, self.provider, self.model_name, generation_config)
+            return (SimpleNamespace(text=chunk) for chunk in chunks)
+        return SimpleNamespace(text=self.gateway.generate(prompt, self.provider, self.model_name, generation_config))
+
+    async def generate_content_async(self, prompt: str, generation_config: Any = None, **kwargs):
+        return SimpleNamespace(text=await self.gateway.agenerate(prompt, self.provider, self.model_name, generation_config))
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the process-wide LLM gateway"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
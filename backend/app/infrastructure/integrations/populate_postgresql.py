@@ -7,11 +7,12 @@ This script populates all PostgreSQL tables with sample data for intelligent ass
 import os
 import sys
 import json
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from datetime import datetime, date
 import logging
 import bcrypt
 from dotenv import load_dotenv
+from app.core.database import get_engine
 
 # Load environment variables
 load_dotenv()
@@ -27,7 +28,7 @@ def hash_password(password: str) -> str:
 
 class PostgreSQLPopulator:
     def __init__(self, db_url: str):
-        self.engine = create_engine(db_url)
+        self.engine = get_engine("ingestion", db_url)
         
         # Sample data for each table
         self.sample_data = {
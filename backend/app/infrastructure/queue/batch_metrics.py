@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for the batch processor
+Defined once here so both import paths of the batch processor module share
+the same collectors.
+"""
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, generate_latest
+
+BATCH_ITEMS = Counter(
+    'batch_items_total', 'Batch job items handled; rate() gives items/sec', ['job_type', 'outcome']
+)
+BATCH_QUEUE_DEPTH = Gauge(
+    'batch_queue_depth_items', 'Items of running batch jobs not yet handled', ['job_type']
+)
+BATCH_ITEMS_PER_SECOND = Gauge(
+    'batch_job_items_per_second', 'Throughput of the latest checkpoint of a job type', ['job_type']
+)
+BATCH_JOBS = Counter(
+    'batch_jobs_total', 'Batch jobs that stopped, by final status', ['job_type', 'status']
+)
+
+__all__ = [
+    'BATCH_ITEMS', 'BATCH_QUEUE_DEPTH', 'BATCH_ITEMS_PER_SECOND', 'BATCH_JOBS',
+    'CONTENT_TYPE_LATEST', 'generate_latest',
+]
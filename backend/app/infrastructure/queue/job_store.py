@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+SQLite checkpoint store for batch jobs
+Keeps each unfinished job's items and which item offsets have completed, so a
+restarted worker resumes a job at the first unfinished item instead of
+starting over. The file is shared by all worker processes; each job row
+records the worker that owns it and until when its lease holds.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_FIELDS = (
+    'job_type', 'status', 'total_items', 'processed_items', 'failed_items', 'start_time',
+    'end_time', 'error_message', 'metadata', 'executor', 'parallelism'
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batch_jobs (
+    job_id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total_items INTEGER NOT NULL,
+    processed_items INTEGER NOT NULL DEFAULT 0,
+    failed_items INTEGER NOT NULL DEFAULT 0,
+    start_time TEXT,
+    end_time TEXT,
+    error_message TEXT,
+    metadata TEXT,
+    executor TEXT,
+    parallelism INTEGER,
+    owner TEXT,
+    lease_expires REAL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS batch_job_items (
+    job_id TEXT NOT NULL,
+    item_offset INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, item_offset)
+);
+"""
+
+# Columns added after the first release of the store, for files created before them
+_ADDED_COLUMNS = {'owner': 'TEXT', 'lease_expires': 'REAL'}
+
+
+class JobStore:
+    """
+    Job rows plus one row per item with a ``done`` flag.
+
+    Items are stored as JSON (values JSON cannot represent come back as
+    strings). ``checkpoint`` marks offsets done and saves the job counters in
+    one transaction, so a crash never loses or double-counts a checkpoint.
+
+    Writes to a job only apply while ``owner`` holds it: ``claim_jobs`` takes
+    over unfinished jobs of the types a worker can run that nobody holds or
+    whose lease has expired, in one UPDATE, so two workers never both resume
+    the same job. ``checkpoint``,
+    ``finish`` and ``delete_jobs`` return or act on owned jobs only, and a
+    worker that finds a job taken over stops writing to it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(batch_jobs)")}
+        with self._conn:
+            for name, kind in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE batch_jobs ADD COLUMN {name} {kind}")
+
+    def create_job(self, job_id: str, row: Dict[str, Any], items: Iterable[Any], owner: str, lease_expires: float):
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO batch_jobs (job_id, {', '.join(JOB_FIELDS)}, owner, lease_expires) "
+                f"VALUES (?{', ?' * len(JOB_FIELDS)}, ?, ?)",
+                (job_id, *self._values(row), owner, lease_expires)
+            )
+            self._conn.executemany(
+                "INSERT INTO batch_job_items (job_id, item_offset, payload) VALUES (?, ?, ?)",
+                ((job_id, offset, json.dumps(item, default=str)) for offset, item in enumerate(items))
+            )
+
+    def checkpoint(self, job_id: str, row: Dict[str, Any], done_offsets: Iterable[int], owner: str,
+                   lease_expires: float) -> bool:
+        """Mark item offsets done, save the job row and renew the lease; False if ``owner`` lost the job"""
+        with self._lock, self._conn:
+            if not self._save_row(job_id, row, owner, lease_expires):
+                return False
+            self._conn.executemany(
+                "UPDATE batch_job_items SET done = 1 WHERE job_id = ? AND item_offset = ?",
+                ((job_id, offset) for offset in done_offsets)
+            )
+            return True
+
+    def finish(self, job_id: str, row: Dict[str, Any], owner: str) -> bool:
+        """Save the final job row and drop its items; False if ``owner`` lost the job"""
+        with self._lock, self._conn:
+            if not self._save_row(job_id, row, owner, None):
+                return False
+            self._conn.execute("DELETE FROM batch_job_items WHERE job_id = ?", (job_id,))
+            return True
+
+    def claim_jobs(self, statuses: Iterable[str], job_types: Iterable[str], owner: str, lease_expires: float,
+                   now: float) -> List[Dict[str, Any]]:
+        """
+        Take over jobs of ``job_types`` in ``statuses`` that are unowned or
+        whose lease expired before ``now``; returns every such job ``owner`` holds
+        """
+        statuses, job_types = list(statuses), list(job_types)
+        if not job_types:
+            return []
+        where = (f"status IN ({', '.join('?' * len(statuses))}) "
+                 f"AND job_type IN ({', '.join('?' * len(job_types))})")
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE batch_jobs SET owner = ?, lease_expires = ? WHERE {where} "
+                "AND (owner IS NULL OR lease_expires IS NULL OR lease_expires < ?)",
+                (owner, lease_expires, *statuses, *job_types, now)
+            )
+            rows = self._conn.execute(
+                f"SELECT * FROM batch_jobs WHERE owner = ? AND {where} ORDER BY created_at",
+                (owner, *statuses, *job_types)
+            ).fetchall()
+        return self._jobs(rows)
+
+    def renew_leases(self, job_ids: Iterable[str], owner: str, lease_expires: float):
+        """Extend the lease on each of ``job_ids`` that ``owner`` still holds"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE batch_jobs SET lease_expires = ? WHERE job_id = ? AND owner = ?",
+                ((lease_expires, job_id, owner) for job_id in job_ids)
+            )
+
+    def unfinished_jobs(self, statuses: Iterable[str]) -> List[Dict[str, Any]]:
+        statuses = list(statuses)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM batch_jobs WHERE status IN ({', '.join('?' * len(statuses))}) ORDER BY created_at",
+                statuses
+            ).fetchall()
+        return self._jobs(rows)
+
+    def items(self, job_id: str) -> List[Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM batch_job_items WHERE job_id = ? ORDER BY item_offset", (job_id,)
+            ).fetchall()
+        return [json.loads(row['payload']) for row in rows]
+
+    def pending_offsets(self, job_id: str) -> List[int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_offset FROM batch_job_items WHERE job_id = ? AND done = 0 ORDER BY item_offset", (job_id,)
+            ).fetchall()
+        return [row['item_offset'] for row in rows]
+
+    def delete_jobs(self, job_ids: Iterable[str], owner: str):
+        owned = [(job_id, owner) for job_id in job_ids]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM batch_job_items WHERE job_id IN (SELECT job_id FROM batch_jobs WHERE job_id = ? AND owner = ?)",
+                owned
+            )
+            self._conn.executemany("DELETE FROM batch_jobs WHERE job_id = ? AND owner = ?", owned)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _save_row(self, job_id: str, row: Dict[str, Any], owner: str, lease_expires: Optional[float]) -> bool:
+        cursor = self._conn.execute(
+            f"UPDATE batch_jobs SET {', '.join(f'{name} = ?' for name in JOB_FIELDS)}, lease_expires = ? "
+            "WHERE job_id = ? AND owner = ?",
+            (*self._values(row), lease_expires, job_id, owner)
+        )
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def _values(row: Dict[str, Any]) -> List[Any]:
+        values = [row.get(name) for name in JOB_FIELDS]
+        values[JOB_FIELDS.index('metadata')] = json.dumps(row.get('metadata') or {}, default=str)
+        return values
+
+    @staticmethod
+    def _jobs(rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job['metadata'] = json.loads(job['metadata']) if job['metadata'] else {}
+            jobs.append(job)
+        return jobs
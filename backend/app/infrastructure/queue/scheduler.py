@@ -9,7 +9,7 @@ import sys
 import logging
 from datetime import datetime
 from typing import List, Dict, Any
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 import asyncio
@@ -18,8 +18,9 @@ import asyncio
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from ai_manager import AIEnhancementManager
-from app.core.settings import DATABASE_URL, GOOGLE_API_KEY, AI_MODEL
-import google.generativeai as genai
+from app.core.settings import DATABASE_URL, AI_MODEL
+from app.infrastructure.integrations.llm_gateway import get_llm_gateway
+from app.core.database import get_engine
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -29,11 +30,10 @@ class DailyBriefingScheduler:
     """Scheduler for daily briefing generation"""
     
     def __init__(self):
-        self.engine = create_engine(DATABASE_URL)
+        self.engine = get_engine("oltp", DATABASE_URL)
         
         # Configure Google Gemini
-        genai.configure(api_key=GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel(AI_MODEL)
+        self.model = get_llm_gateway().get_model("gemini", AI_MODEL)
         
         # Initialize AI Manager
         self.ai_manager = AIEnhancementManager(DATABASE_URL, self.model)
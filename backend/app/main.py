@@ -521,6 +521,33 @@ if include_rag_monitoring_routes:
     include_rag_monitoring_routes(app)
     logger.info("RAG monitoring routes included")
 
+# Resume batch ingestion jobs left unfinished by stopped workers
+@app.on_event("startup")
+async def resume_batch_jobs():
+    """Resume unfinished ingestion jobs, then keep claiming those whose worker's lease lapses"""
+    try:
+        from app.core.database import engine
+        from app.core.settings import BATCH_JOB_LEASE_SECONDS
+        from app.infrastructure.queue.batch_processor import DataIngestionBatchProcessor
+
+        chroma_client = chromadb.HttpClient(host=settings.chroma_host, port=settings.chroma_port)
+        app.state.ingestion_processor = DataIngestionBatchProcessor(engine, chroma_client)
+    except Exception as e:
+        logger.warning(f"Batch job resume disabled: {e}")
+        return
+
+    async def claim_lapsed_jobs():
+        while True:
+            try:
+                resumed = await asyncio.to_thread(app.state.ingestion_processor.resume_jobs)
+                if resumed:
+                    logger.info(f"Resumed {len(resumed)} unfinished batch jobs: {', '.join(resumed)}")
+            except Exception as e:
+                logger.error(f"Could not resume batch jobs: {e}")
+            await asyncio.sleep(BATCH_JOB_LEASE_SECONDS)
+
+    app.state.batch_resume_task = asyncio.create_task(claim_lapsed_jobs())
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -3,25 +3,18 @@ from app.core.models import Base
 Database connection and session management for authentication
 """
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
 from contextlib import contextmanager
 import logging
 from typing import Generator
 from config.settings import DATABASE_URL
+from app.core.database import get_engine
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create database engine with better connection management
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=StaticPool,
-    pool_pre_ping=True,
-    pool_recycle=3600,  # Recycle connections every hour
-    echo=False  # Set to True for SQL debugging
-)
+# Shared OLTP engine from the process-wide registry (StaticPool only for SQLite)
+engine = get_engine("oltp", DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -16,6 +16,12 @@ from .database import get_db
 from .models import User, UserSession, Role, Permission, AuditLog
 from .utils import verify_jwt_token, sanitize_input
 from .rate_limiter import RateLimiter
+from app.core.principal_cache import (
+    get_principal_cache,
+    get_last_used_tracker,
+    principal_from_user,
+    user_from_principal,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -90,8 +96,20 @@ def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        # Get user from database
+        token = credentials.credentials
         user_id = int(payload.get("sub"))
+        principal_cache = get_principal_cache()
+        
+        # Fast path: principal already authenticated for this token
+        principal = principal_cache.get(token)
+        if principal and principal["id"] == user_id:
+            locked_until = principal.get("locked_until")
+            if principal.get("is_active") and not (locked_until and locked_until > datetime.utcnow()):
+                get_last_used_tracker().touch(principal["session_id"])
+                return user_from_principal(User, principal, db)
+            principal_cache.invalidate_token(token)
+        
+        # Get user from database
         try:
             user = db.query(User).filter(User.id == user_id).first()
         except Exception as db_error:
@@ -128,7 +146,7 @@ def get_current_user(
         # Check if session is still valid
         session = db.query(UserSession).filter(
             UserSession.user_id == user.id,
-            UserSession.session_token == credentials.credentials,
+            UserSession.session_token == token,
             UserSession.is_active == True
         ).first()
         
@@ -139,9 +157,9 @@ def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        # Update session last used time
-        session.last_used = datetime.utcnow()
-        db.commit()
+        # Defer the last_used write to the batched flusher and cache the principal
+        get_last_used_tracker().touch(session.id)
+        principal_cache.set(token, principal_from_user(user, session))
         
         return user
         
@@ -19,6 +19,7 @@ from .utils import (
 )
 from .middleware import rate_limit, log_audit_event
 from .rate_limiter import rate_limiter
+from app.core.principal_cache import get_principal_cache
 # from .simple_dev_auth import get_or_create_dev_user, create_dev_login_response, is_development_mode
 
 logger = logging.getLogger(__name__)
@@ -279,6 +280,7 @@ async def login(
         
         if existing_session:
             existing_session.is_active = False
+            get_principal_cache().invalidate_token(existing_session.session_token)
         
         session = UserSession(
             user_id=user.id,
@@ -357,6 +359,7 @@ async def logout(
         if session:
             session.is_active = False
             db.commit()
+            get_principal_cache().invalidate_token(token)
             
             # Log audit event
             audit_log = AuditLog(
@@ -437,6 +440,7 @@ async def refresh_token(
         new_refresh_token = generate_refresh_token(user.id)
         
         # Update session
+        get_principal_cache().invalidate_token(session.session_token)
         session.session_token = new_access_token
         session.refresh_token = new_refresh_token
         session.expires_at = datetime.utcnow() + timedelta(minutes=30)
@@ -569,6 +573,7 @@ async def reset_password(
         })
         
         db.commit()
+        get_principal_cache().invalidate_user(user.id)
         
         # Log audit event
         audit_log = AuditLog(
@@ -647,6 +652,7 @@ async def refresh_access_token(
         ).first()
         
         if session:
+            get_principal_cache().invalidate_token(current_token)
             session.session_token = access_token
             session.expires_at = datetime.utcnow() + timedelta(minutes=30)
             db.commit()
@@ -6,20 +6,30 @@ Handles efficient processing of large datasets with progress tracking and async
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Callable, Generator
+import pickle
+import socket
+import uuid
+from typing import List, Dict, Any, Optional, Callable, Generator, Iterator, Set
 from datetime import datetime, timedelta
 import json
 import time
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
 from dataclasses import dataclass
 from enum import Enum
 import threading
 from queue import Queue
 import os
 from pathlib import Path
+from cache_manager import cache_manager, collection_tag
+from app.core.settings import BATCH_JOB_STORE_PATH, BATCH_JOB_LEASE_SECONDS, BATCH_EXECUTOR, BATCH_ITEM_PARALLELISM
+from app.domain.ai.document_indexer import DocumentIndexer, get_default_embedder
+from app.infrastructure.queue.batch_metrics import BATCH_ITEMS, BATCH_ITEMS_PER_SECOND, BATCH_JOBS, BATCH_QUEUE_DEPTH
+from app.infrastructure.queue.job_store import JobStore
 
 logger = logging.getLogger(__name__)
 
+EXECUTORS = ("thread", "process")
+
 class BatchStatus(Enum):
     PENDING = "pending"
     PROCESSING = "processing"
@@ -27,6 +37,8 @@ class BatchStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+UNFINISHED_STATUSES = (BatchStatus.PENDING.value, BatchStatus.PROCESSING.value)
+
 @dataclass
 class BatchJob:
     """Represents a batch processing job"""
@@ -42,24 +54,189 @@ class BatchJob:
     end_time: Optional[datetime] = None
     error_message: Optional[str] = None
     metadata: Dict[str, Any] = None
+    executor: str = "thread"
+    parallelism: int = 1
+
+def _run_items(processor_func: Callable, items: List[Any], job_id: str) -> int:
+    """Process items one by one and return how many failed; module level so process pools can pickle it"""
+    failed = 0
+    for item in items:
+        try:
+            processor_func(item)
+        except Exception as e:
+            failed += 1
+            logger.error(f"Error processing item in job {job_id}: {e}")
+    return failed
+
+def _run_batch(processor_func: Callable, items: List[Any], job_id: str) -> int:
+    """Hand the whole batch to a per-batch processor, which returns how many items failed"""
+    return min(processor_func(items) or 0, len(items))
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+class _InlineExecutor:
+    """Runs submitted work immediately in the job thread (parallelism 1)"""
+    
+    def submit(self, fn: Callable, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        pass
 
 class BatchProcessor:
-    """Batch processor for efficient data processing"""
+    """
+    Batch processor for efficient data processing
+    
+    Each running job has a thread of ``max_workers``; its items run on a
+    per-job thread or process pool with ``parallelism`` tasks in flight. With a
+    job store (BATCH_JOB_STORE_PATH, shared by all worker processes) items and
+    completed offsets are checkpointed every ``batch_size`` items.
     
-    def __init__(self, max_workers: int = 4, batch_size: int = 100):
+    Every job in the store is owned by the processor that created or claimed
+    it, which renews the lease (``lease_seconds``) of its running jobs in the
+    background. Jobs left unfinished by a worker that stopped are claimed once
+    their lease lapses by ``resumable_jobs``, only for the job types its caller
+    can run, and continue from their unfinished items when passed to
+    ``process_batch_async`` again. A processor that finds one of its jobs
+    claimed by another stops running it.
+    """
+    
+    def __init__(self, max_workers: int = 4, batch_size: int = 100, executor: Optional[str] = None,
+                 item_parallelism: Optional[int] = None, store_path: Optional[str] = None,
+                 lease_seconds: Optional[float] = None):
         self.max_workers = max_workers
         self.batch_size = batch_size
+        self.executor = executor or BATCH_EXECUTOR
+        if self.executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {self.executor!r}")
+        self.item_parallelism = max(1, item_parallelism or BATCH_ITEM_PARALLELISM)
         self.active_jobs: Dict[str, BatchJob] = {}
         self.job_history: List[BatchJob] = []
         self.progress_callbacks: Dict[str, Callable] = {}
+        self._completed_offsets: Dict[str, Set[int]] = {}
+        self._claimed: Set[str] = set()
         self._lock = threading.Lock()
         self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds or BATCH_JOB_LEASE_SECONDS
+        self._heartbeat_stop = threading.Event()
+        
+        store_path = BATCH_JOB_STORE_PATH if store_path is None else store_path
+        self._store: Optional[JobStore] = None
+        if store_path:
+            try:
+                self._store = JobStore(store_path)
+            except Exception as e:
+                logger.warning(f"Batch job store {store_path} unavailable, jobs will not be checkpointed: {e}")
+                self._store = None
+        if self._store is not None:
+            threading.Thread(target=self._heartbeat, name="batch-job-lease", daemon=True).start()
         
         logger.info(f"Batch processor initialized with {max_workers} workers, batch size: {batch_size}")
     
+    def _job_row(self, job: BatchJob) -> Dict[str, Any]:
+        return {
+            "job_type": job.job_type,
+            "status": job.status.value,
+            "total_items": job.total_items,
+            "processed_items": job.processed_items,
+            "failed_items": job.failed_items,
+            "start_time": job.start_time.isoformat() if job.start_time else None,
+            "end_time": job.end_time.isoformat() if job.end_time else None,
+            "error_message": job.error_message,
+            "metadata": job.metadata,
+            "executor": job.executor,
+            "parallelism": job.parallelism
+        }
+    
+    def _lease_expires(self) -> float:
+        return time.time() + self.lease_seconds
+    
+    def _heartbeat(self) -> None:
+        """Renew the lease on this processor's running jobs every third of the lease"""
+        while not self._heartbeat_stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                running = [job_id for job_id, job in self.active_jobs.items() if job.status == BatchStatus.PROCESSING]
+            if not running:
+                continue
+            try:
+                self._store.renew_leases(running, self.owner, self._lease_expires())
+            except Exception as e:
+                logger.error(f"Could not renew batch job leases: {e}")
+    
+    def _claim_unfinished_jobs(self, job_types: List[str]) -> None:
+        """Claim unfinished jobs of ``job_types`` from the store; they are loaded as pending to be resumed"""
+        rows = self._store.claim_jobs(UNFINISHED_STATUSES, job_types, self.owner, self._lease_expires(), time.time())
+        owned = {row["job_id"] for row in rows}
+        with self._lock:
+            # Claimed jobs left unstarted keep no lease, and may have been claimed by another worker since
+            lost = [job_id for job_id, job in self.active_jobs.items()
+                    if job_id in self._claimed and job_id not in owned and job.job_type in job_types]
+            for job_id in lost:
+                self.active_jobs.pop(job_id)
+                self._completed_offsets.pop(job_id, None)
+                self._claimed.discard(job_id)
+            rows = [row for row in rows if row["job_id"] not in self.active_jobs]
+        for row in rows:
+            job = BatchJob(
+                job_id=row["job_id"],
+                job_type=row["job_type"],
+                data=self._store.items(row["job_id"]),
+                status=BatchStatus.PENDING,
+                total_items=row["total_items"],
+                processed_items=row["processed_items"],
+                failed_items=row["failed_items"],
+                start_time=_parse_time(row["start_time"]),
+                metadata=row["metadata"],
+                executor=row["executor"] or self.executor,
+                parallelism=row["parallelism"] or self.item_parallelism
+            )
+            if job.total_items:
+                job.progress = (job.processed_items + job.failed_items) / job.total_items
+            pending = set(self._store.pending_offsets(job.job_id))
+            with self._lock:
+                self._completed_offsets[job.job_id] = set(range(job.total_items)) - pending
+                self.active_jobs[job.job_id] = job
+                self._claimed.add(job.job_id)
+        if rows:
+            logger.info(f"Claimed {len(rows)} unfinished batch jobs from {self._store.path}")
+    
+    def _save(self, job: BatchJob, done_offsets: List[int] = ()) -> bool:
+        """Persist the job; False when another worker has claimed it, which also drops it here"""
+        if self._store is None:
+            return True
+        try:
+            if job.status in (BatchStatus.PENDING, BatchStatus.PROCESSING):
+                owned = self._store.checkpoint(job.job_id, self._job_row(job), done_offsets, self.owner,
+                                               self._lease_expires())
+            else:
+                owned = self._store.finish(job.job_id, self._job_row(job), self.owner)
+        except Exception as e:
+            logger.error(f"Could not checkpoint batch job {job.job_id}: {e}")
+            return True
+        if not owned:
+            self._release(job)
+        return owned
+    
+    def _release(self, job: BatchJob) -> None:
+        """Stop tracking a job another worker claimed after this processor's lease lapsed"""
+        logger.warning(f"Batch job {job.job_id} was claimed by another worker, stopping it here")
+        if job.status in (BatchStatus.PENDING, BatchStatus.PROCESSING):
+            job.status = BatchStatus.CANCELLED
+        with self._lock:
+            self.active_jobs.pop(job.job_id, None)
+            self._completed_offsets.pop(job.job_id, None)
+            self._claimed.discard(job.job_id)
+    
     def create_batch_job(self, job_type: str, data: List[Dict[str, Any]], metadata: Dict[str, Any] = None) -> str:
         """Create a new batch processing job"""
-        job_id = f"{job_type}_{int(time.time())}_{len(self.active_jobs)}"
+        job_id = f"{job_type}_{int(time.time())}_{uuid.uuid4().hex[:8]}"
         
         job = BatchJob(
             job_id=job_id,
@@ -67,69 +244,185 @@ class BatchProcessor:
             data=data,
             status=BatchStatus.PENDING,
             total_items=len(data),
-            metadata=metadata or {}
+            metadata=metadata or {},
+            executor=self.executor,
+            parallelism=self.item_parallelism
         )
         
         with self._lock:
             self.active_jobs[job_id] = job
+            self._completed_offsets[job_id] = set()
+        
+        if self._store is not None:
+            try:
+                self._store.create_job(job_id, self._job_row(job), data, self.owner, self._lease_expires())
+            except Exception as e:
+                logger.error(f"Could not persist batch job {job_id}, it will not be resumable: {e}")
         
         logger.info(f"Created batch job {job_id}: {job_type} with {len(data)} items")
         return job_id
     
+    def resumable_jobs(self, job_types: List[str]) -> List[BatchJob]:
+        """
+        Jobs of ``job_types`` claimed from the store and not started yet
+        
+        Each call first claims the unfinished jobs of those types whose lease
+        has lapsed, so calling it periodically picks up the jobs of workers
+        that stopped. Jobs of other types are left for processors that run them.
+        """
+        job_types = list(job_types)
+        if self._store is not None:
+            try:
+                self._claim_unfinished_jobs(job_types)
+            except Exception as e:
+                logger.error(f"Could not claim unfinished batch jobs: {e}")
+        with self._lock:
+            return [
+                job for job in self.active_jobs.values()
+                if job.job_id in self._claimed and job.status == BatchStatus.PENDING and job.job_type in job_types
+            ]
+    
     def process_batch_async(self, job_id: str, processor_func: Callable, 
-                          progress_callback: Optional[Callable] = None) -> None:
-        """Process batch asynchronously"""
+                          progress_callback: Optional[Callable] = None, per_batch: bool = False,
+                          parallelism: Optional[int] = None, executor: Optional[str] = None) -> None:
+        """
+        Process batch asynchronously
+        
+        With ``per_batch`` the processor is called once per batch with the list
+        of items and returns how many of them failed (None for none).
+        ``parallelism`` and ``executor`` override the processor defaults for
+        this job; a process executor needs a picklable (module level)
+        processor and falls back to threads otherwise.
+        """
         if job_id not in self.active_jobs:
             raise ValueError(f"Job {job_id} not found")
         
         job = self.active_jobs[job_id]
+        with self._lock:
+            self._claimed.discard(job_id)
+        if parallelism:
+            job.parallelism = max(1, parallelism)
+        if executor:
+            if executor not in EXECUTORS:
+                raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
+            job.executor = executor
+        if job.executor == "process" and not self._picklable(processor_func):
+            logger.warning(f"Processor for job {job_id} cannot be sent to a process pool, using threads")
+            job.executor = "thread"
         job.status = BatchStatus.PROCESSING
-        job.start_time = datetime.now()
+        job.start_time = job.start_time or datetime.now()
         
         if progress_callback:
             self.progress_callbacks[job_id] = progress_callback
         
         # Submit to thread pool
-        future = self._executor.submit(self._process_batch_sync, job_id, processor_func)
+        future = self._executor.submit(self._process_batch_sync, job_id, processor_func, per_batch)
         future.add_done_callback(lambda f: self._job_completed(job_id, f))
         
         logger.info(f"Started async processing for job {job_id}")
     
-    def _process_batch_sync(self, job_id: str, processor_func: Callable) -> None:
-        """Process batch synchronously in worker thread"""
+    @staticmethod
+    def _picklable(func: Callable) -> bool:
+        try:
+            pickle.dumps(func)
+            return True
+        except Exception:
+            return False
+    
+    def _tasks(self, job: BatchJob, offsets: List[int], per_batch: bool) -> Iterator[List[int]]:
+        """Item offsets of each unit of work: a batch, one item on threads, or a slice per process task"""
+        if per_batch:
+            size = self.batch_size
+        elif job.executor == "thread":
+            size = 1
+        else:
+            size = max(1, self.batch_size // job.parallelism)
+        for start in range(0, len(offsets), size):
+            yield offsets[start:start + size]
+    
+    def _process_batch_sync(self, job_id: str, processor_func: Callable, per_batch: bool = False) -> None:
+        """Process batch in the job's worker thread, keeping ``parallelism`` tasks in flight"""
         job = self.active_jobs[job_id]
+        completed = self._completed_offsets.setdefault(job_id, set())
+        offsets = [offset for offset in range(job.total_items) if offset not in completed]
+        runner = _run_batch if per_batch else _run_items
         
+        remaining = len(offsets)
+        BATCH_QUEUE_DEPTH.labels(job.job_type).inc(remaining)
+        if job.parallelism == 1 and job.executor == "thread":
+            pool = _InlineExecutor()
+        elif job.executor == "process":
+            pool = ProcessPoolExecutor(max_workers=job.parallelism)
+        else:
+            pool = ThreadPoolExecutor(max_workers=job.parallelism, thread_name_prefix=f"batch-{job.job_type}")
+        
+        run_started = time.perf_counter()
+        run_items = 0
+        unsaved: List[int] = []
         try:
-            # Process data in batches
-            for i in range(0, len(job.data), self.batch_size):
-                batch = job.data[i:i + self.batch_size]
+            tasks = self._tasks(job, offsets, per_batch)
+            in_flight: Dict[Future, List[int]] = {}
+            while True:
+                # Check if job was cancelled before handing out more work
+                while job.status != BatchStatus.CANCELLED and len(in_flight) < job.parallelism:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    in_flight[pool.submit(runner, processor_func, [job.data[i] for i in task], job_id)] = task
+                if not in_flight:
+                    break
                 
-                # Process batch
-                for item in batch:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = in_flight.pop(future)
                     try:
-                        processor_func(item)
-                        job.processed_items += 1
+                        failed = future.result()
                     except Exception as e:
-                        job.failed_items += 1
-                        logger.error(f"Error processing item in job {job_id}: {e}")
-                
-                # Update progress
-                job.progress = (job.processed_items + job.failed_items) / job.total_items
-                self._update_progress(job_id)
+                        failed = len(task)
+                        logger.error(f"Error processing batch in job {job_id}: {e}")
+                    job.processed_items += len(task) - failed
+                    job.failed_items += failed
+                    completed.update(task)
+                    unsaved.extend(task)
+                    remaining -= len(task)
+                    run_items += len(task)
+                    BATCH_ITEMS.labels(job.job_type, "processed").inc(len(task) - failed)
+                    BATCH_ITEMS.labels(job.job_type, "failed").inc(failed)
+                    BATCH_QUEUE_DEPTH.labels(job.job_type).dec(len(task))
                 
-                # Check if job was cancelled
-                if job.status == BatchStatus.CANCELLED:
-                    return
+                if len(unsaved) >= self.batch_size:
+                    if not self._checkpoint(job, unsaved, run_items / (time.perf_counter() - run_started)):
+                        return
+                    unsaved = []
             
-            # Mark as completed
-            job.status = BatchStatus.COMPLETED
+            if unsaved and not self._checkpoint(job, unsaved, run_items / (time.perf_counter() - run_started)):
+                return
+            
+            # Mark as completed unless cancelled on the way
+            if job.status != BatchStatus.CANCELLED:
+                job.status = BatchStatus.COMPLETED
             job.end_time = datetime.now()
+            self._save(job)
             
         except Exception as e:
             job.status = BatchStatus.FAILED
             job.error_message = str(e)
             job.end_time = datetime.now()
             logger.error(f"Batch job {job_id} failed: {e}")
+            self._save(job)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            BATCH_QUEUE_DEPTH.labels(job.job_type).dec(remaining)
+            BATCH_JOBS.labels(job.job_type, job.status.value).inc()
+    
+    def _checkpoint(self, job: BatchJob, done_offsets: List[int], items_per_second: float) -> bool:
+        """Persist progress and notify the progress callback; False if another worker claimed the job"""
+        job.progress = (job.processed_items + job.failed_items) / job.total_items
+        BATCH_ITEMS_PER_SECOND.labels(job.job_type).set(items_per_second)
+        if not self._save(job, done_offsets):
+            return False
+        self._update_progress(job.job_id)
+        return True
     
     def _update_progress(self, job_id: str) -> None:
         """Update progress for a job"""
@@ -156,7 +449,7 @@ class BatchProcessor:
         return self.active_jobs.get(job_id)
     
     def cancel_job(self, job_id: str) -> bool:
-        """Cancel a running job"""
+        """Cancel a running or pending job; a running job stops after its in-flight items"""
         if job_id not in self.active_jobs:
             return False
         
@@ -165,6 +458,12 @@ class BatchProcessor:
             job.status = BatchStatus.CANCELLED
             logger.info(f"Cancelled job {job_id}")
             return True
+        if job.status == BatchStatus.PENDING:
+            job.status = BatchStatus.CANCELLED
+            job.end_time = datetime.now()
+            self._save(job)
+            logger.info(f"Cancelled job {job_id}")
+            return True
         
         return False
     
@@ -182,6 +481,7 @@ class BatchProcessor:
             for job_id, job in self.active_jobs.items():
                 if job.status in [BatchStatus.COMPLETED, BatchStatus.FAILED, BatchStatus.CANCELLED]:
                     completed_jobs.append(job)
+                    self._completed_offsets.pop(job_id, None)
                 else:
                     active_jobs[job_id] = job
             
@@ -195,41 +495,113 @@ class BatchProcessor:
             # Update active jobs
             self.active_jobs = active_jobs
             
+            if self._store is not None and completed_jobs:
+                try:
+                    self._store.delete_jobs((job.job_id for job in completed_jobs), self.owner)
+                except Exception as e:
+                    logger.error(f"Could not remove finished jobs from the job store: {e}")
+            
             logger.info(f"Cleaned up {len(completed_jobs)} completed jobs")
 
 class DataIngestionBatchProcessor:
     """Specialized batch processor for data ingestion"""
     
-    def __init__(self, db_engine, chroma_client, batch_size: int = 50):
-        self.batch_processor = BatchProcessor(max_workers=2, batch_size=batch_size)
+    def __init__(self, db_engine, chroma_client, batch_size: int = 50, document_indexer: Optional[DocumentIndexer] = None,
+                 store_path: Optional[str] = None):
+        self.batch_processor = BatchProcessor(max_workers=2, batch_size=batch_size, store_path=store_path)
         self.db_engine = db_engine
         self.chroma_client = chroma_client
+        self._document_indexer = document_indexer
+    
+    @property
+    def document_indexer(self) -> DocumentIndexer:
+        if self._document_indexer is None:
+            self._document_indexer = DocumentIndexer(self.chroma_client, embedder=get_default_embedder())
+        return self._document_indexer
+    
+    def _invalidating_progress(self, touched: Dict[str, set], progress_callback: Optional[Callable]) -> Callable:
+        """Wrap a progress callback so cache entries touched by each batch are invalidated once per batch"""
+        lock = threading.Lock()
+        
+        def on_progress(job: BatchJob) -> None:
+            with lock:
+                property_ids, locations, tags = set(touched["property_ids"]), set(touched["locations"]), set(touched["tags"])
+                for pending in touched.values():
+                    pending.clear()
+            if property_ids or locations:
+                cache_manager.invalidate_properties(property_ids, locations)
+            if tags:
+                cache_manager.invalidate_tags(*tags)
+            if progress_callback:
+                progress_callback(job)
+        
+        return on_progress
+    
+    def resume_jobs(self, progress_callback: Optional[Callable] = None) -> List[str]:
+        """Continue ingestion jobs a previous worker left unfinished; returns their IDs"""
+        starters = {
+            "property_ingestion": self._start_property_job,
+            "document_ingestion": self._start_document_job,
+        }
+        resumed = []
+        for job in self.batch_processor.resumable_jobs(list(starters)):
+            starters[job.job_type](job.job_id, progress_callback)
+            resumed.append(job.job_id)
+        return resumed
         
     def ingest_properties_batch(self, properties: List[Dict[str, Any]], 
                               progress_callback: Optional[Callable] = None) -> str:
         """Ingest properties in batches"""
         job_id = self.batch_processor.create_batch_job("property_ingestion", properties)
+        self._start_property_job(job_id, progress_callback)
+        return job_id
+    
+    def _start_property_job(self, job_id: str, progress_callback: Optional[Callable]) -> None:
+        touched = {"property_ids": set(), "locations": set(), "tags": set()}
         
         def process_property(property_data: Dict[str, Any]) -> None:
             # Process individual property
             # This would include database insertion and ChromaDB indexing
-            pass
+            touched["property_ids"].add(property_data.get("id"))
+            touched["locations"].add(property_data.get("location") or property_data.get("area"))
         
-        self.batch_processor.process_batch_async(job_id, process_property, progress_callback)
-        return job_id
+        self.batch_processor.process_batch_async(
+            job_id, process_property, self._invalidating_progress(touched, progress_callback)
+        )
     
     def ingest_documents_batch(self, documents: List[Dict[str, Any]], 
                              progress_callback: Optional[Callable] = None) -> str:
-        """Ingest documents in batches"""
-        job_id = self.batch_processor.create_batch_job("document_ingestion", documents)
+        """
+        Chunk, embed and upsert documents in batches
+
+        Each document is a dict with ``content`` and optional ``id``,
+        ``doc_type``, ``collection`` and ``metadata`` (see DocumentIndexer).
+        Chunks of a whole batch are embedded together; the job metadata tracks
+        chunks indexed and chunks/sec.
+        """
+        job_id = self.batch_processor.create_batch_job(
+            "document_ingestion", documents, {"chunks_indexed": 0, "indexing_seconds": 0.0, "chunks_per_second": 0.0}
+        )
+        self._start_document_job(job_id, progress_callback)
+        return job_id
+    
+    def _start_document_job(self, job_id: str, progress_callback: Optional[Callable]) -> None:
+        job = self.batch_processor.get_job_status(job_id)
+        indexer = self.document_indexer
+        touched = {"property_ids": set(), "locations": set(), "tags": set()}
         
-        def process_document(doc_data: Dict[str, Any]) -> None:
-            # Process individual document
-            # This would include text extraction, chunking, and embedding
-            pass
+        def process_documents(batch: List[Dict[str, Any]]) -> int:
+            stats = indexer.index_documents(batch)
+            touched["tags"].update(collection_tag(name) for name in stats.collections)
+            job.metadata["chunks_indexed"] += stats.chunks
+            job.metadata["indexing_seconds"] += stats.seconds
+            if job.metadata["indexing_seconds"]:
+                job.metadata["chunks_per_second"] = job.metadata["chunks_indexed"] / job.metadata["indexing_seconds"]
+            return stats.failed_documents
         
-        self.batch_processor.process_batch_async(job_id, process_document, progress_callback)
-        return job_id
+        self.batch_processor.process_batch_async(
+            job_id, process_documents, self._invalidating_progress(touched, progress_callback), per_batch=True
+        )
 
 class AsyncDataProcessor:
     """Async data processor for non-blocking operations"""
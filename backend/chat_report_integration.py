@@ -446,12 +446,11 @@ class ChatReportIntegration:
         """Enhanced fallback CMA generation using AI manager with building-specific data"""
         try:
             from ai_manager import AIEnhancementManager
-            import google.generativeai as genai
+            from app.infrastructure.integrations.llm_gateway import get_llm_gateway
             import os
             
             # Initialize AI model
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            model = get_llm_gateway().get_model("gemini", 'gemini-1.5-flash')
             
             # Create AI manager
             ai_manager = AIEnhancementManager(os.getenv("DATABASE_URL"), model)
@@ -521,12 +520,11 @@ class ChatReportIntegration:
         """Fallback CMA generation using AI manager"""
         try:
             from ai_manager import AIEnhancementManager
-            import google.generativeai as genai
+            from app.infrastructure.integrations.llm_gateway import get_llm_gateway
             import os
             
             # Initialize AI model
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            model = get_llm_gateway().get_model("gemini", 'gemini-1.5-flash')
             
             # Create AI manager
             ai_manager = AIEnhancementManager(os.getenv("DATABASE_URL"), model)
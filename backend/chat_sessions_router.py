@@ -428,11 +428,10 @@ def get_ai_manager():
     """Get AI manager instance"""
     try:
         from ai_manager import AIEnhancementManager
-        from config.settings import GOOGLE_API_KEY, AI_MODEL
-        import google.generativeai as genai
+        from config.settings import AI_MODEL
+        from app.infrastructure.integrations.llm_gateway import get_llm_gateway
         
-        genai.configure(api_key=GOOGLE_API_KEY)
-        model = genai.GenerativeModel(AI_MODEL)
+        model = get_llm_gateway().get_model("gemini", AI_MODEL)
         return AIEnhancementManager(DATABASE_URL, model)
     except Exception as e:
         print(f"Error initializing AI manager: {e}")
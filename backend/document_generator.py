@@ -8,8 +8,9 @@ import logging
 import json
 from datetime import datetime
 from typing import Dict, Any, Optional
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import uuid
+from app.core.database import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +19,7 @@ class DocumentGenerator:
     
     def __init__(self, db_url: str, ai_model):
         self.db_url = db_url
-        self.engine = create_engine(db_url)
+        self.engine = get_engine("oltp", db_url)
         self.ai_model = ai_model
     
     def generate_cma_html(self, subject_property: dict, comparable_properties: list, agent_id: int) -> Dict[str, Any]:
@@ -12,6 +12,8 @@ from dataclasses import dataclass
 from datetime import datetime
 import logging
 
+from app.domain.ai.query_matcher import PatternMatcher
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -78,6 +80,22 @@ class EntityDetectionService:
             }
         }
         
+        # Compile patterns and keyword alternations once instead of per message
+        self.pattern_matcher = PatternMatcher(
+            {entity_type: config['patterns'] for entity_type, config in self.entity_patterns.items()}
+        )
+        self.keyword_patterns = {
+            entity_type: re.compile(
+                r'\b(?:' + '|'.join(re.escape(keyword) for keyword in config['keywords']) + r')\b',
+                re.IGNORECASE
+            )
+            for entity_type, config in self.entity_patterns.items() if config['keywords']
+        }
+        self.keyword_order = {
+            entity_type: {keyword.lower(): index for index, keyword in enumerate(config['keywords'])}
+            for entity_type, config in self.entity_patterns.items()
+        }
+        
         # Confidence scoring weights
         self.confidence_weights = {
             'pattern_match': 0.8,
@@ -98,10 +116,11 @@ class EntityDetectionService:
         """
         try:
             entities = []
+            present = self.pattern_matcher.scan(message)
             
             # Detect entities for each type
             for entity_type, config in self.entity_patterns.items():
-                type_entities = self._detect_entity_type(message, entity_type, config)
+                type_entities = self._detect_entity_type(message, entity_type, config, present)
                 entities.extend(type_entities)
             
             # Remove duplicates and sort by confidence
@@ -115,45 +134,50 @@ class EntityDetectionService:
             logger.error(f"Error detecting entities: {e}")
             return []
     
-    def _detect_entity_type(self, message: str, entity_type: str, config: Dict) -> List[Entity]:
+    def _detect_entity_type(self, message: str, entity_type: str, config: Dict,
+                            present: Optional[set] = None) -> List[Entity]:
         """Detect entities of a specific type"""
         entities = []
-        message_lower = message.lower()
         
         # Pattern-based detection
-        for pattern in config['patterns']:
-            matches = re.finditer(pattern, message, re.IGNORECASE)
-            for match in matches:
-                entity_value = match.group()
-                confidence = self._calculate_confidence(
-                    message, entity_value, entity_type, config, 'pattern'
-                )
-                
-                entities.append(Entity(
-                    entity_type=entity_type,
-                    entity_value=entity_value,
-                    confidence_score=confidence,
-                    context_source='pattern_match',
-                    metadata={'pattern': pattern, 'position': match.span()}
-                ))
+        for compiled, match in self.pattern_matcher.finditer(entity_type, message, present):
+            entity_value = match.group()
+            confidence = self._calculate_confidence(
+                message, entity_value, entity_type, config, 'pattern'
+            )
+            
+            entities.append(Entity(
+                entity_type=entity_type,
+                entity_value=entity_value,
+                confidence_score=confidence,
+                context_source='pattern_match',
+                metadata={'pattern': compiled.pattern, 'position': match.span()}
+            ))
         
-        # Keyword-based detection
-        for keyword in config['keywords']:
-            if keyword.lower() in message_lower:
-                # Find the actual keyword occurrence
-                keyword_matches = re.finditer(rf'\b{re.escape(keyword)}\b', message, re.IGNORECASE)
-                for match in keyword_matches:
-                    confidence = self._calculate_confidence(
-                        message, match.group(), entity_type, config, 'keyword'
-                    )
-                    
-                    entities.append(Entity(
-                        entity_type=entity_type,
-                        entity_value=match.group(),
-                        confidence_score=confidence,
-                        context_source='keyword_match',
-                        metadata={'keyword': keyword, 'position': match.span()}
-                    ))
+        # Keyword-based detection: one alternation scan, reported in keyword order
+        keyword_pattern = self.keyword_patterns.get(entity_type)
+        if keyword_pattern is None:
+            return entities
+        order = self.keyword_order[entity_type]
+        keyword_matches = sorted(
+            ((order.get(m.group().lower(), len(order)), m) for m in keyword_pattern.finditer(message)),
+            key=lambda item: (item[0], item[1].start())
+        )
+        for keyword_index, match in keyword_matches:
+            confidence = self._calculate_confidence(
+                message, match.group(), entity_type, config, 'keyword'
+            )
+            
+            entities.append(Entity(
+                entity_type=entity_type,
+                entity_value=match.group(),
+                confidence_score=confidence,
+                context_source='keyword_match',
+                metadata={
+                    'keyword': config['keywords'][keyword_index] if keyword_index < len(order) else match.group(),
+                    'position': match.span()
+                }
+            ))
         
         return entities
     
@@ -13,7 +13,7 @@ import logging
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, NamedTuple, Optional, Tuple, Any
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import LinearRegression, Ridge
 from sklearn.preprocessing import StandardScaler, LabelEncoder
@@ -22,44 +22,137 @@ from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import joblib
 import os
 import json
+import time
 from pathlib import Path
 
+from app.core.settings import ML_MODELS_DIR, ML_MODELS_MMAP_MODE, ML_MODEL_RELOAD_INTERVAL
+from app.domain.ai.model_registry import ModelRegistry, ModelRegistryError
+
 logger = logging.getLogger(__name__)
 
+# Numeric inputs of the price predictor, in model column order; the encoded
+# location and property type follow them
+PRICE_FEATURE_COLUMNS = [
+    'bedrooms', 'bathrooms', 'square_feet', 'age_years', 'floor_number',
+    'has_pool', 'has_gym', 'has_parking', 'distance_to_metro',
+    'distance_to_mall', 'distance_to_beach', 'amenities_score'
+]
+PRICE_CATEGORICAL_DEFAULTS = {'location': 'Dubai Marina', 'property_type': 'apartment'}
+
+MODEL_ATTRIBUTES = ['price_predictor', 'market_forecaster', 'lead_scorer', 'client_analyzer', 'opportunity_ranker']
+
+class ModelSet(NamedTuple):
+    """One loaded model version: the models with the scalers and encoders they were trained with"""
+    version: Optional[str]
+    models: Dict[str, Any]
+    scalers: Dict[str, Any]
+    encoders: Dict[str, Any]
+
+def _model_attribute(name: str) -> property:
+    """A model of the current ModelSet; assigning one swaps in a new set"""
+    def get_model(self):
+        return self._model_set.models.get(name)
+    
+    def set_model(self, model):
+        self._model_set = self._model_set._replace(models={**self._model_set.models, name: model})
+    
+    return property(get_model, set_model)
+
 class AdvancedMLModels:
-    """Advanced Machine Learning Models for Real Estate Analytics"""
+    """
+    Advanced Machine Learning Models for Real Estate Analytics
     
-    def __init__(self):
-        self.models_dir = Path("ml_models")
-        self.models_dir.mkdir(exist_ok=True)
-        
-        # Initialize models
-        self.price_predictor = None
-        self.market_forecaster = None
-        self.lead_scorer = None
-        self.client_analyzer = None
-        self.opportunity_ranker = None
+    The loaded version lives in one ModelSet that a reload replaces with a
+    single assignment; each prediction reads it once, so a request running
+    during a reload never mixes one version's model with another's scaler
+    or encoders.
+    """
+    
+    price_predictor = _model_attribute('price_predictor')
+    market_forecaster = _model_attribute('market_forecaster')
+    lead_scorer = _model_attribute('lead_scorer')
+    client_analyzer = _model_attribute('client_analyzer')
+    opportunity_ranker = _model_attribute('opportunity_ranker')
+    
+    def __init__(self, registry: Optional[ModelRegistry] = None, reload_interval: float = ML_MODEL_RELOAD_INTERVAL):
+        self.models_dir = Path(ML_MODELS_DIR)
+        self.registry = registry or ModelRegistry(ML_MODELS_DIR, ML_MODELS_MMAP_MODE)
+        self.reload_interval = reload_interval
+        self._version_checked_at = time.monotonic()
         
-        # Initialize scalers and encoders
-        self.scalers = {}
-        self.encoders = {}
+        # Models, scalers and encoders of the loaded version; training fills
+        # these dicts in place, so each instance starts with its own
+        self._model_set = ModelSet(None, {}, {}, {})
         
-        # Load or train models
+        # Load the promoted models
         self._initialize_models()
     
     def _initialize_models(self):
-        """Initialize or load existing ML models"""
+        """Load the promoted model version; training runs offline via train_and_publish, never here"""
         try:
-            # Try to load existing models
             self._load_models()
-            logger.info("✅ Loaded existing ML models")
+            logger.info(f"✅ Loaded ML models (version {self.model_version or 'legacy'})")
+            self._warm_up()
         except Exception as e:
-            logger.warning(f"Could not load existing models: {e}")
-            logger.info("🔄 Training new ML models...")
-            self._train_models()
+            logger.warning(f"Could not load ML models: {e}")
+            logger.warning("Predictions are unavailable until a model version is published and promoted")
     
     def _load_models(self):
-        """Load pre-trained models from disk"""
+        """Load the promoted registry version, or the flat legacy files if none was promoted yet"""
+        version = self.registry.current_version()
+        if version is None:
+            self._load_legacy_models()
+            return
+        
+        loaded = self.registry.load(version)
+        models = loaded.get('models', {})
+        self._model_set = ModelSet(
+            version,
+            {name: models[name] for name in MODEL_ATTRIBUTES if name in models},
+            dict(loaded.get('scalers', {})),
+            dict(loaded.get('encoders', {}))
+        )
+    
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._model_set.version
+    
+    @property
+    def scalers(self) -> Dict[str, Any]:
+        return self._model_set.scalers
+    
+    @property
+    def encoders(self) -> Dict[str, Any]:
+        return self._model_set.encoders
+    
+    def reload_if_changed(self) -> bool:
+        """Switch to a newly promoted (or rolled back) version; True if one was loaded"""
+        version = self.registry.current_version()
+        if not version or version == self.model_version:
+            return False
+        self._load_models()
+        self._warm_up()
+        logger.info(f"✅ Switched ML models to version {self.model_version}")
+        return True
+    
+    def _reload_if_due(self):
+        """Check for a newly promoted version at most once per ``reload_interval`` seconds"""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.reload_interval:
+            return
+        self._version_checked_at = now
+        try:
+            self.reload_if_changed()
+        except (ModelRegistryError, OSError, ValueError) as e:
+            logger.error(f"Error reloading ML models: {e}")
+    
+    def _warm_up(self):
+        """Run one prediction so the first request does not pay for first-touch page faults"""
+        if self.price_predictor is not None:
+            self.predict_property_price({})
+    
+    def _load_legacy_models(self):
+        """Load pre-trained models from the flat files written before the registry"""
         model_files = {
             'price_predictor': 'price_predictor.joblib',
             'market_forecaster': 'market_forecaster.joblib',
@@ -80,51 +173,46 @@ class AdvancedMLModels:
             'amenity_encoder': 'amenity_encoder.joblib'
         }
         
-        # Load models
-        for model_name, filename in model_files.items():
-            filepath = self.models_dir / filename
-            if filepath.exists():
-                setattr(self, model_name, joblib.load(filepath))
+        mmap_mode = self.registry.mmap_mode
+        if not any((self.models_dir / filename).exists() for filename in model_files.values()):
+            raise ModelRegistryError(f"No promoted model version or legacy model files in {self.models_dir}")
         
-        # Load scalers
-        for scaler_name, filename in scaler_files.items():
-            filepath = self.models_dir / filename
-            if filepath.exists():
-                self.scalers[scaler_name] = joblib.load(filepath)
+        def load_files(files: Dict[str, str]) -> Dict[str, Any]:
+            return {
+                name: joblib.load(self.models_dir / filename, mmap_mode=mmap_mode)
+                for name, filename in files.items() if (self.models_dir / filename).exists()
+            }
         
-        # Load encoders
-        for encoder_name, filename in encoder_files.items():
-            filepath = self.models_dir / filename
-            if filepath.exists():
-                self.encoders[encoder_name] = joblib.load(filepath)
+        self._model_set = ModelSet(None, load_files(model_files), load_files(scaler_files), load_files(encoder_files))
     
-    def _save_models(self):
-        """Save trained models to disk"""
+    def _save_models(self, promote: bool = True) -> Optional[str]:
+        """Publish the trained models as a new registry version and return it"""
         try:
-            # Save models
-            if self.price_predictor:
-                joblib.dump(self.price_predictor, self.models_dir / 'price_predictor.joblib')
-            if self.market_forecaster:
-                joblib.dump(self.market_forecaster, self.models_dir / 'market_forecaster.joblib')
-            if self.lead_scorer:
-                joblib.dump(self.lead_scorer, self.models_dir / 'lead_scorer.joblib')
-            if self.client_analyzer:
-                joblib.dump(self.client_analyzer, self.models_dir / 'client_analyzer.joblib')
-            if self.opportunity_ranker:
-                joblib.dump(self.opportunity_ranker, self.models_dir / 'opportunity_ranker.joblib')
-            
-            # Save scalers
-            for name, scaler in self.scalers.items():
-                joblib.dump(scaler, self.models_dir / f'{name}.joblib')
-            
-            # Save encoders
-            for name, encoder in self.encoders.items():
-                joblib.dump(encoder, self.models_dir / f'{name}.joblib')
-            
-            logger.info("✅ ML models saved successfully")
+            models = {name: getattr(self, name) for name in MODEL_ATTRIBUTES if getattr(self, name) is not None}
+            version = self.registry.publish(
+                {'models': models, 'scalers': dict(self.scalers), 'encoders': dict(self.encoders)},
+                metadata={'trained_models': sorted(models), 'source': 'synthetic'},
+                promote=promote
+            )
+            logger.info(f"✅ ML models saved as version {version}")
+            return version
             
         except Exception as e:
             logger.error(f"Failed to save models: {e}")
+            return None
+    
+    def train_and_publish(self, promote: bool = True) -> Optional[str]:
+        """
+        Train every model and publish them as a new version.
+        
+        Meant for offline training jobs; serving processes only load promoted
+        versions. Returns the new version, or None if publishing failed.
+        """
+        self._train_models()
+        version = self._save_models(promote=promote)
+        if version and promote:
+            self._model_set = self._model_set._replace(version=version)
+        return version
     
     def _train_models(self):
         """Train new ML models with synthetic data"""
@@ -147,9 +235,6 @@ class AdvancedMLModels:
             # Train opportunity ranker
             self._train_opportunity_ranker(training_data)
             
-            # Save models
-            self._save_models()
-            
             logger.info("✅ All ML models trained successfully")
             
         except Exception as e:
@@ -308,11 +393,7 @@ class AdvancedMLModels:
             df = training_data['properties'].copy()
             
             # Prepare features
-            feature_columns = [
-                'bedrooms', 'bathrooms', 'square_feet', 'age_years', 'floor_number',
-                'has_pool', 'has_gym', 'has_parking', 'distance_to_metro',
-                'distance_to_mall', 'distance_to_beach', 'amenities_score'
-            ]
+            feature_columns = list(PRICE_FEATURE_COLUMNS)
             
             # Encode categorical variables
             if 'location_encoder' not in self.encoders:
@@ -565,42 +646,41 @@ class AdvancedMLModels:
     # Prediction methods
     def predict_property_price(self, property_features: Dict[str, Any]) -> Dict[str, Any]:
         """Predict property price based on features"""
+        self._reload_if_due()
+        model_set = self._model_set
+        price_predictor = model_set.models.get('price_predictor')
+        scalers, encoders = model_set.scalers, model_set.encoders
         try:
-            if not self.price_predictor:
+            if not price_predictor:
                 raise ValueError("Price predictor model not trained")
             
             # Prepare features
             features = []
-            feature_names = [
-                'bedrooms', 'bathrooms', 'square_feet', 'age_years', 'floor_number',
-                'has_pool', 'has_gym', 'has_parking', 'distance_to_metro',
-                'distance_to_mall', 'distance_to_beach', 'amenities_score'
-            ]
             
-            for feature in feature_names:
+            for feature in PRICE_FEATURE_COLUMNS:
                 features.append(property_features.get(feature, 0))
             
             # Encode categorical variables
-            if 'location_encoder' in self.encoders:
-                location_encoded = self.encoders['location_encoder'].transform([property_features.get('location', 'Dubai Marina')])[0]
+            if 'location_encoder' in encoders:
+                location_encoded = encoders['location_encoder'].transform([property_features.get('location', PRICE_CATEGORICAL_DEFAULTS['location'])])[0]
                 features.append(location_encoded)
             else:
                 features.append(0)
             
-            if 'property_type_encoder' in self.encoders:
-                property_type_encoded = self.encoders['property_type_encoder'].transform([property_features.get('property_type', 'apartment')])[0]
+            if 'property_type_encoder' in encoders:
+                property_type_encoded = encoders['property_type_encoder'].transform([property_features.get('property_type', PRICE_CATEGORICAL_DEFAULTS['property_type'])])[0]
                 features.append(property_type_encoded)
             else:
                 features.append(0)
             
             # Scale features
-            if 'price_scaler' in self.scalers:
-                features_scaled = self.scalers['price_scaler'].transform([features])
+            if 'price_scaler' in scalers:
+                features_scaled = scalers['price_scaler'].transform([features])
             else:
                 features_scaled = [features]
             
             # Make prediction
-            predicted_price = self.price_predictor.predict(features_scaled)[0]
+            predicted_price = price_predictor.predict(features_scaled)[0]
             
             # Calculate confidence interval (simplified)
             confidence = 0.85  # Base confidence
@@ -628,10 +708,102 @@ class AdvancedMLModels:
                 'confidence': 0.0
             }
     
+    def predict_property_prices(self, properties: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Predict prices for a batch of properties (a portfolio or CMA comparable set).
+        
+        Builds the whole feature matrix column by column, encodes location and
+        property type through dict lookups over the encoder classes, and scales
+        and predicts in one call each. Returns one result per input, in order,
+        shaped like ``predict_property_price``; rows with an unknown category or
+        a non-numeric feature get an error result without failing the batch.
+        """
+        if not properties:
+            return []
+        self._reload_if_due()
+        model_set = self._model_set
+        price_predictor = model_set.models.get('price_predictor')
+        scalers, encoders = model_set.scalers, model_set.encoders
+        if not price_predictor:
+            logger.error("Failed to predict property prices: Price predictor model not trained")
+            return [{'error': "Price predictor model not trained", 'predicted_price': None, 'confidence': 0.0}
+                    for _ in properties]
+        
+        frame = pd.DataFrame.from_records(properties, index=range(len(properties)))
+        errors = pd.Series(None, index=frame.index, dtype=object)
+        
+        # Numeric features: missing or null values default to 0 like the single-row path
+        features = pd.DataFrame(0.0, index=frame.index, columns=PRICE_FEATURE_COLUMNS)
+        for feature in PRICE_FEATURE_COLUMNS:
+            if feature not in frame:
+                continue
+            raw = frame[feature]
+            values = pd.to_numeric(raw, errors='coerce')
+            invalid = values.isna() & raw.notna()
+            errors = errors.mask(invalid & errors.isna(), f"Invalid value for {feature}")
+            features[feature] = values.fillna(0.0).astype(float)
+        
+        # Categorical features: vectorized lookup of each encoder's class positions
+        for column, encoder_name in (('location', 'location_encoder'), ('property_type', 'property_type_encoder')):
+            encoded_column = f"{column}_encoded"
+            encoder = encoders.get(encoder_name)
+            if encoder is None:
+                features[encoded_column] = 0.0
+                continue
+            default = PRICE_CATEGORICAL_DEFAULTS[column]
+            labels = frame[column].fillna(default) if column in frame else pd.Series(default, index=frame.index)
+            codes = labels.map({label: code for code, label in enumerate(encoder.classes_)})
+            unknown = codes.isna()
+            errors = errors.mask(unknown & errors.isna(), "Unknown " + column.replace('_', ' ') + ": " + labels.astype(str))
+            features[encoded_column] = codes.fillna(0).astype(float)
+        
+        valid = errors.isna().to_numpy()
+        results: List[Dict[str, Any]] = [
+            {'error': error, 'predicted_price': None, 'confidence': 0.0} for error in errors
+        ]
+        if not valid.any():
+            return results
+        
+        try:
+            matrix = features[valid]
+            scaler = scalers.get('price_scaler')
+            if scaler is not None:
+                scaled = scaler.transform(matrix if hasattr(scaler, 'feature_names_in_') else matrix.to_numpy())
+            else:
+                scaled = matrix.to_numpy()
+            predicted = price_predictor.predict(scaled)
+        except Exception as e:
+            logger.error(f"Failed to predict property prices: {e}")
+            return [{'error': str(e), 'predicted_price': None, 'confidence': 0.0} for _ in properties]
+        
+        # Confidence uses the raw inputs with the single-row defaults, not the model's 0 fill
+        amenities = pd.to_numeric(frame['amenities_score'], errors='coerce').fillna(1.0) if 'amenities_score' in frame else 1.0
+        metro = pd.to_numeric(frame['distance_to_metro'], errors='coerce').fillna(2.0) if 'distance_to_metro' in frame else 2.0
+        confidence = (0.85 + 0.05 * (amenities > 1.1) + 0.05 * (metro < 1.0)) * np.ones(len(frame))
+        confidence = np.minimum(np.asarray(confidence, dtype=float), 0.95)[valid]
+        
+        timestamp = datetime.utcnow().isoformat()
+        for row, price, row_confidence in zip(np.flatnonzero(valid), predicted.tolist(), confidence.tolist()):
+            results[row] = {
+                'predicted_price': price,
+                'confidence': row_confidence,
+                'price_range': {
+                    'min': price * 0.9,
+                    'max': price * 1.1
+                },
+                'model_version': 'v1.0',
+                'prediction_timestamp': timestamp
+            }
+        return results
+    
     def forecast_market_trends(self, location: str, months_ahead: int = 6) -> Dict[str, Any]:
         """Forecast market trends for a specific location"""
+        self._reload_if_due()
+        model_set = self._model_set
+        market_forecaster = model_set.models.get('market_forecaster')
+        scalers, encoders = model_set.scalers, model_set.encoders
         try:
-            if not self.market_forecaster:
+            if not market_forecaster:
                 raise ValueError("Market forecaster model not trained")
             
             # Prepare forecast features
@@ -645,9 +817,9 @@ class AdvancedMLModels:
                     month_sin, month_cos, 150, 75, 1500  # Default values
                 ]
                 
-                if 'location_encoder' in self.encoders:
+                if 'location_encoder' in encoders:
                     try:
-                        location_encoded = self.encoders['location_encoder'].transform([location])[0]
+                        location_encoded = encoders['location_encoder'].transform([location])[0]
                         features.append(location_encoded)
                     except:
                         features.append(0)
@@ -655,13 +827,13 @@ class AdvancedMLModels:
                 forecast_data.append(features)
             
             # Scale features
-            if 'market_scaler' in self.scalers:
-                forecast_data_scaled = self.scalers['market_scaler'].transform(forecast_data)
+            if 'market_scaler' in scalers:
+                forecast_data_scaled = scalers['market_scaler'].transform(forecast_data)
             else:
                 forecast_data_scaled = forecast_data
             
             # Make predictions
-            growth_rates = self.market_forecaster.predict(forecast_data_scaled)
+            growth_rates = market_forecaster.predict(forecast_data_scaled)
             
             # Calculate cumulative growth
             cumulative_growth = 1.0
@@ -696,8 +868,12 @@ class AdvancedMLModels:
     
     def score_lead(self, lead_features: Dict[str, Any]) -> Dict[str, Any]:
         """Score lead conversion probability"""
+        self._reload_if_due()
+        model_set = self._model_set
+        lead_scorer = model_set.models.get('lead_scorer')
+        scalers, encoders = model_set.scalers, model_set.encoders
         try:
-            if not self.lead_scorer:
+            if not lead_scorer:
                 raise ValueError("Lead scorer model not trained")
             
             # Prepare features
@@ -711,27 +887,27 @@ class AdvancedMLModels:
             ]
             
             # Encode categorical variables
-            if 'lead_source_encoder' in self.encoders:
+            if 'lead_source_encoder' in encoders:
                 try:
-                    source_encoded = self.encoders['lead_source_encoder'].transform([lead_features.get('lead_source', 'website')])[0]
+                    source_encoded = encoders['lead_source_encoder'].transform([lead_features.get('lead_source', 'website')])[0]
                     features.append(source_encoded)
                 except:
                     features.append(0)
             else:
                 features.append(0)
             
-            if 'location_encoder' in self.encoders:
+            if 'location_encoder' in encoders:
                 try:
-                    location_encoded = self.encoders['location_encoder'].transform([lead_features.get('preferred_location', 'Dubai Marina')])[0]
+                    location_encoded = encoders['location_encoder'].transform([lead_features.get('preferred_location', 'Dubai Marina')])[0]
                     features.append(location_encoded)
                 except:
                     features.append(0)
             else:
                 features.append(0)
             
-            if 'property_type_encoder' in self.encoders:
+            if 'property_type_encoder' in encoders:
                 try:
-                    property_type_encoded = self.encoders['property_type_encoder'].transform([lead_features.get('property_type_preference', 'apartment')])[0]
+                    property_type_encoded = encoders['property_type_encoder'].transform([lead_features.get('property_type_preference', 'apartment')])[0]
                     features.append(property_type_encoded)
                 except:
                     features.append(0)
@@ -739,13 +915,13 @@ class AdvancedMLModels:
                 features.append(0)
             
             # Scale features
-            if 'lead_scaler' in self.scalers:
-                features_scaled = self.scalers['lead_scaler'].transform([features])
+            if 'lead_scaler' in scalers:
+                features_scaled = scalers['lead_scaler'].transform([features])
             else:
                 features_scaled = [features]
             
             # Make prediction
-            conversion_probability = self.lead_scorer.predict(features_scaled)[0]
+            conversion_probability = lead_scorer.predict(features_scaled)[0]
             
             # Determine lead quality
             if conversion_probability > 0.7:
@@ -806,22 +982,18 @@ class AdvancedMLModels:
     
     def get_model_performance(self) -> Dict[str, Any]:
         """Get performance metrics for all models"""
+        model_set = self._model_set
         try:
             performance_data = {
                 'models': {},
                 'overall_health': 'healthy',
                 'last_training': datetime.utcnow().isoformat(),
-                'total_models': 5
+                'total_models': 5,
+                'model_version': model_set.version
             }
             
             # Check model availability
-            models_status = {
-                'price_predictor': self.price_predictor is not None,
-                'market_forecaster': self.market_forecaster is not None,
-                'lead_scorer': self.lead_scorer is not None,
-                'client_analyzer': self.client_analyzer is not None,
-                'opportunity_ranker': self.opportunity_ranker is not None
-            }
+            models_status = {name: model_set.models.get(name) is not None for name in MODEL_ATTRIBUTES}
             
             active_models = sum(models_status.values())
             performance_data['active_models'] = active_models
@@ -843,3 +1015,19 @@ class AdvancedMLModels:
 
 # Global instance
 advanced_ml_models = AdvancedMLModels()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Advanced ML models")
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_parser = commands.add_parser("train", help="Train every model and publish them as a new version")
+    train_parser.add_argument("--no-promote", action="store_true", help="Publish without serving the new version")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.command == "train":
+        version = advanced_ml_models.train_and_publish(promote=not args.no_promote)
+        if version is None:
+            raise SystemExit("Trained models could not be published")
+        print(version)
@@ -10,16 +10,23 @@ This module provides:
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Union, Any
+from typing import Dict, List, NamedTuple, Tuple, Optional, Union, Any
 import logging
+import time
+from collections import deque
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from app.core.settings import (
+    ML_MODEL_RELOAD_INTERVAL, ML_MODELS_MMAP_MODE, ML_PREDICTION_HISTORY_SIZE, ML_PRICE_MODELS_DIR
+)
+from app.domain.ai.model_registry import ModelRegistry, ModelRegistryError
+
 # ML imports
 try:
-    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-    from sklearn.linear_model import LinearRegression, Ridge, Lasso
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.linear_model import Ridge, Lasso
     from sklearn.svm import SVR
     from sklearn.neural_network import MLPRegressor
     from sklearn.preprocessing import StandardScaler, RobustScaler
@@ -37,35 +44,87 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def tree_predictions(model, X: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Per-tree predictions of a bagged tree ensemble (random forest, extra
+    trees) as an ``(n_trees, n_rows)`` array, or None for other models.
+    
+    Each tree scores the whole batch through its low-level ``tree_`` in one
+    call, skipping the per-call input validation of ``estimator.predict``.
+    """
+    trees = getattr(model, 'estimators_', None)
+    if not isinstance(trees, list) or not all(hasattr(tree, 'tree_') for tree in trees):
+        return None
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    return np.stack([tree.tree_.predict(X)[:, 0] for tree in trees])
+
+class PriceModelSet(NamedTuple):
+    """One published price model version with the feature order, location table and intervals it was trained with"""
+    version: Optional[str]
+    models: Dict[str, Any]
+    features: List[str]
+    location_scores: Dict[str, float]
+    intervals: Dict[str, Dict[str, float]]
+
 class MarketPredictor:
-    """Real estate market trend prediction and analysis"""
+    """
+    Real estate market trend prediction and analysis
+    
+    The served price model version is one PriceModelSet that a reload
+    replaces with a single assignment; each batch reads it once, so a
+    request running during a reload never scores one version's models with
+    another's feature order or location scores.
+    """
     
-    def __init__(self):
+    def __init__(self, registry: Optional[ModelRegistry] = None,
+                 reload_interval: float = ML_MODEL_RELOAD_INTERVAL,
+                 history_size: int = ML_PREDICTION_HISTORY_SIZE):
         self.models = {}
         self.scalers = {}
         self.feature_importance = {}
-        self.prediction_history = []
+        # Recent predictions only; prediction_count keeps the running total
+        self.prediction_history = deque(maxlen=history_size)
+        self.prediction_count = 0
         self.model_performance = {}
         
+        # Price models are trained offline (ml.pipeline.model_training) and
+        # served from the promoted registry version; requests never fit them
+        self.registry = registry or ModelRegistry(ML_PRICE_MODELS_DIR, ML_MODELS_MMAP_MODE)
+        self.reload_interval = reload_interval
+        self._price_model_set = PriceModelSet(None, {}, [], {}, {})
+        self._price_checked_at = float('-inf')
+        
         if not ML_AVAILABLE:
             logger.warning("ML libraries not available. Using simplified models.")
         
         # Initialize models
         self._initialize_models()
+        self._refresh_price_models()
+    
+    @property
+    def price_models(self) -> Dict[str, Any]:
+        return self._price_model_set.models
+    
+    @property
+    def price_features(self) -> List[str]:
+        return self._price_model_set.features
+    
+    @property
+    def location_scores(self) -> Dict[str, float]:
+        return self._price_model_set.location_scores
+    
+    @property
+    def price_intervals(self) -> Dict[str, Dict[str, float]]:
+        return self._price_model_set.intervals
+    
+    @property
+    def price_model_version(self) -> Optional[str]:
+        return self._price_model_set.version
     
     def _initialize_models(self):
         """Initialize ML models for different prediction tasks"""
         try:
             if ML_AVAILABLE:
-                # Price prediction models
-                self.models['price_rf'] = RandomForestRegressor(
-                    n_estimators=100, random_state=42, n_jobs=-1
-                )
-                self.models['price_gb'] = GradientBoostingRegressor(
-                    n_estimators=100, random_state=42
-                )
-                self.models['price_linear'] = LinearRegression()
-                
                 # Trend prediction models
                 self.models['trend_rf'] = RandomForestRegressor(
                     n_estimators=100, random_state=42, n_jobs=-1
@@ -88,6 +147,44 @@ class MarketPredictor:
         except Exception as e:
             logger.error(f"Error initializing models: {e}")
     
+    def _refresh_price_models(self) -> bool:
+        """
+        Load the promoted price model version if it changed since the last load.
+        
+        The registry is checked at most once per ``reload_interval`` seconds, so
+        a newly promoted (or rolled back) version is served without a restart.
+        Returns whether a version was loaded.
+        """
+        now = time.monotonic()
+        if now - self._price_checked_at < self.reload_interval:
+            return False
+        self._price_checked_at = now
+        
+        try:
+            version = self.registry.current_version()
+            if version is None or version == self.price_model_version:
+                return False
+            metadata = self.registry.manifest(version)['metadata']
+            artifacts = self.registry.load(version)
+        except (ModelRegistryError, OSError, ValueError) as e:
+            logger.error(f"Error loading price models: {e}")
+            return False
+        
+        self._price_model_set = PriceModelSet(
+            version,
+            artifacts.get('models', {}),
+            metadata.get('features', []),
+            artifacts.get('tables', {}).get('location_scores', {}),
+            metadata.get('intervals', {})
+        )
+        self.model_performance['price_models'] = {
+            'version': version,
+            'training_rows': metadata.get('training_rows'),
+            'metrics': metadata.get('metrics', {})
+        }
+        logger.info(f"Loaded price models {sorted(self.price_models)} version {version}")
+        return True
+    
     def predict_property_prices(self, market_data: pd.DataFrame, 
                                property_features: Dict[str, Any],
                                prediction_horizon: int = 12) -> Dict[str, Any]:
@@ -106,84 +203,138 @@ class MarketPredictor:
             if market_data.empty:
                 return {'error': 'No market data provided'}
             
-            # Prepare features for prediction
-            features = self._prepare_price_features(market_data, property_features)
+            batch = self.predict_property_prices_batch([property_features], prediction_horizon)
+            if 'error' in batch:
+                return batch
+            
+            result = batch['results'][0]
+            if 'error' in result:
+                return result
+            
+            return {
+                **result,
+                'prediction_horizon': prediction_horizon,
+                'model_version': batch['model_version'],
+                'timestamp': batch['timestamp']
+            }
+            
+        except Exception as e:
+            logger.error(f"Error predicting property prices: {e}")
+            return {'error': str(e)}
+    
+    def predict_property_prices_batch(self, properties: List[Dict[str, Any]],
+                                      prediction_horizon: int = 12) -> Dict[str, Any]:
+        """
+        Predict prices for many properties with one pass per model
+        
+        Args:
+            properties: Property-specific features, one dict per property
+            prediction_horizon: Months ahead to predict
+            
+        Returns:
+            Dict[str, Any]: Per-property predictions and confidence intervals, in input order
+        """
+        try:
+            if not properties:
+                return {'error': 'No properties provided'}
             
-            if not features:
+            self._refresh_price_models()
+            model_set = self._price_model_set
+            if not model_set.models:
+                return {'error': 'No trained price model has been published'}
+            
+            # Prepare features for prediction
+            rows = [self._prepare_price_features(features, model_set) for features in properties]
+            prepared = [i for i, row in enumerate(rows) if row]
+            if not prepared:
                 return {'error': 'Failed to prepare features'}
             
-            # Make predictions using different models
-            predictions = {}
-            confidence_intervals = {}
-            
-            for model_name, model in self.models.items():
-                if 'price' in model_name:
-                    try:
-                        # Train model if not already trained
-                        if not hasattr(model, 'fitted_'):
-                            self._train_price_model(model, market_data)
-                        
-                        # Make prediction
-                        pred = model.predict([features])[0]
-                        predictions[model_name] = pred
-                        
-                        # Calculate confidence interval (simplified)
-                        if hasattr(model, 'estimators_'):
-                            # For ensemble models, use predictions from all estimators
-                            all_preds = [est.predict([features])[0] for est in model.estimators_]
-                            std_pred = np.std(all_preds)
-                            confidence_intervals[model_name] = {
-                                'lower': pred - 1.96 * std_pred,
-                                'upper': pred + 1.96 * std_pred,
-                                'confidence': 0.95
-                            }
-                        else:
-                            # For linear models, use a simple confidence interval
-                            confidence_intervals[model_name] = {
-                                'lower': pred * 0.9,
-                                'upper': pred * 1.1,
-                                'confidence': 0.8
-                            }
-                            
-                    except Exception as e:
-                        logger.error(f"Error with model {model_name}: {e}")
-                        predictions[model_name] = None
-            
-            # Ensemble prediction (average of all models)
-            valid_predictions = [p for p in predictions.values() if p is not None]
-            if valid_predictions:
-                ensemble_pred = np.mean(valid_predictions)
-                ensemble_std = np.std(valid_predictions)
-                
-                predictions['ensemble'] = ensemble_pred
-                confidence_intervals['ensemble'] = {
-                    'lower': ensemble_pred - 1.96 * ensemble_std,
-                    'upper': ensemble_pred + 1.96 * ensemble_std,
-                    'confidence': 0.95
-                }
+            X = np.array([rows[i] for i in prepared], dtype=float)
+            predictions, confidence_intervals = self._predict_price_matrix(X, model_set)
             
-            # Store prediction history
-            prediction_record = {
-                'timestamp': datetime.now().isoformat(),
-                'property_features': property_features,
-                'predictions': predictions,
-                'confidence_intervals': confidence_intervals,
-                'horizon': prediction_horizon
-            }
-            self.prediction_history.append(prediction_record)
+            timestamp = datetime.now().isoformat()
+            results: List[Dict[str, Any]] = [{'error': 'Failed to prepare features'} for _ in properties]
+            for row, i in enumerate(prepared):
+                row_predictions = {
+                    name: float(values[row]) if values is not None else None
+                    for name, values in predictions.items()
+                }
+                row_intervals = {
+                    name: {'lower': float(lower[row]), 'upper': float(upper[row]), 'confidence': confidence}
+                    for name, (lower, upper, confidence) in confidence_intervals.items()
+                }
+                results[i] = {
+                    'predictions': row_predictions,
+                    'confidence_intervals': row_intervals,
+                    'model_count': len([p for p in row_predictions.values() if p is not None])
+                }
+                
+                # Store prediction history
+                self.prediction_history.append({
+                    'timestamp': timestamp,
+                    'property_features': properties[i],
+                    'predictions': row_predictions,
+                    'confidence_intervals': row_intervals,
+                    'horizon': prediction_horizon
+                })
+                self.prediction_count += 1
             
             return {
-                'predictions': predictions,
-                'confidence_intervals': confidence_intervals,
+                'results': results,
                 'prediction_horizon': prediction_horizon,
-                'timestamp': datetime.now().isoformat(),
-                'model_count': len([p for p in predictions.values() if p is not None])
+                'model_version': model_set.version,
+                'timestamp': timestamp
             }
             
         except Exception as e:
             logger.error(f"Error predicting property prices: {e}")
             return {'error': str(e)}
     
+    def _predict_price_matrix(self, X: np.ndarray, model_set: PriceModelSet) -> Tuple[Dict[str, Optional[np.ndarray]], Dict[str, Tuple[np.ndarray, np.ndarray, float]]]:
+        """
+        Predict every row of ``X`` with each model of ``model_set`` and the ensemble.
+        
+        Intervals come from the conformal half width calibrated at training
+        time when the version has one, else from the spread of the per-tree
+        predictions for bagged trees, else a fixed +/-10%.
+        """
+        predictions: Dict[str, Optional[np.ndarray]] = {}
+        confidence_intervals: Dict[str, Tuple[np.ndarray, np.ndarray, float]] = {}
+        
+        for model_name, model in model_set.models.items():
+            try:
+                trees = tree_predictions(model, X)
+                pred = trees.mean(axis=0) if trees is not None else np.asarray(model.predict(X), dtype=float)
+                
+                interval = model_set.intervals.get(model_name)
+                if interval:
+                    half_width = interval['relative_half_width'] * np.abs(pred)
+                    confidence_intervals[model_name] = (pred - half_width, pred + half_width, interval['confidence'])
+                elif trees is not None:
+                    std_pred = trees.std(axis=0)
+                    confidence_intervals[model_name] = (pred - 1.96 * std_pred, pred + 1.96 * std_pred, 0.95)
+                else:
+                    confidence_intervals[model_name] = (pred * 0.9, pred * 1.1, 0.8)
+                predictions[model_name] = pred
+                
+            except Exception as e:
+                logger.error(f"Error with model {model_name}: {e}")
+                predictions[model_name] = None
+        
+        # Ensemble prediction (average of all models)
+        valid_predictions = [p for p in predictions.values() if p is not None]
+        if valid_predictions:
+            stacked = np.vstack(valid_predictions)
+            ensemble_pred = stacked.mean(axis=0)
+            ensemble_std = stacked.std(axis=0)
+            
+            predictions['ensemble'] = ensemble_pred
+            confidence_intervals['ensemble'] = (
+                ensemble_pred - 1.96 * ensemble_std, ensemble_pred + 1.96 * ensemble_std, 0.95
+            )
+        
+        return predictions, confidence_intervals
+    
     def predict_market_trends(self, market_data: pd.DataFrame,
                              location: str,
                              property_type: str,
@@ -314,49 +465,16 @@ class MarketPredictor:
             logger.error(f"Error analyzing market cycles: {e}")
             return {'error': str(e)}
     
-    def _prepare_price_features(self, market_data: pd.DataFrame, 
-                               property_features: Dict[str, Any]) -> List[float]:
-        """Prepare features for price prediction"""
+    def _prepare_price_features(self, property_features: Dict[str, Any], model_set: PriceModelSet) -> List[float]:
+        """Prepare features for price prediction, in the order the models of ``model_set`` were trained on"""
         try:
-            features = []
+            values = dict(property_features)
+            # Fall back to the location's score from training when none is given
+            if not values.get('location_score'):
+                location = str(values.get('location') or '').strip()
+                values['location_score'] = model_set.location_scores.get(location, 0.5)
             
-            # Basic property features
-            features.extend([
-                property_features.get('bedrooms', 0),
-                property_features.get('bathrooms', 0),
-                property_features.get('square_feet', 0),
-                property_features.get('age', 0)
-            ])
-            
-            # Market features (averages from market data)
-            if not market_data.empty:
-                features.extend([
-                    market_data['price'].mean(),
-                    market_data['price'].std(),
-                    market_data['price'].median(),
-                    market_data['price'].quantile(0.25),
-                    market_data['price'].quantile(0.75)
-                ])
-            else:
-                features.extend([0, 0, 0, 0, 0])
-            
-            # Location features (simplified)
-            features.extend([
-                property_features.get('location_score', 0),
-                property_features.get('accessibility_score', 0),
-                property_features.get('amenity_score', 0)
-            ])
-            
-            # Time features
-            current_date = datetime.now()
-            features.extend([
-                current_date.year,
-                current_date.month,
-                current_date.day,
-                current_date.weekday()
-            ])
-            
-            return features
+            return [float(values.get(name) or 0) for name in model_set.features]
             
         except Exception as e:
             logger.error(f"Error preparing price features: {e}")
@@ -706,48 +824,6 @@ class MarketPredictor:
             logger.error(f"Error calculating cycle indicators: {e}")
             return {}
     
-    def _train_price_model(self, model, market_data: pd.DataFrame):
-        """Train price prediction model"""
-        try:
-            if market_data.empty:
-                return
-            
-            # Prepare training data
-            X = []
-            y = []
-            
-            for _, row in market_data.iterrows():
-                features = [
-                    row.get('bedrooms', 0),
-                    row.get('bathrooms', 0),
-                    row.get('square_feet', 0),
-                    row.get('age', 0),
-                    row.get('location_score', 0),
-                    row.get('accessibility_score', 0),
-                    row.get('amenity_score', 0)
-                ]
-                
-                if all(isinstance(f, (int, float)) for f in features):
-                    X.append(features)
-                    y.append(row.get('price', 0))
-            
-            if len(X) > 10:  # Only train if we have enough data
-                X = np.array(X)
-                y = np.array(y)
-                
-                # Remove any NaN values
-                mask = ~(np.isnan(X).any(axis=1) | np.isnan(y))
-                X = X[mask]
-                y = y[mask]
-                
-                if len(X) > 10:
-                    model.fit(X, y)
-                    model.fitted_ = True
-                    logger.info(f"Price model {type(model).__name__} trained successfully")
-            
-        except Exception as e:
-            logger.error(f"Error training price model: {e}")
-    
     def _generate_trend_summary(self, trend_predictions: Dict[str, Any]) -> Dict[str, Any]:
         """Generate summary of trend predictions"""
         try:
@@ -799,8 +875,8 @@ class MarketPredictor:
         """Get summary of all predictions made"""
         try:
             return {
-                'total_predictions': len(self.prediction_history),
-                'recent_predictions': self.prediction_history[-10:] if self.prediction_history else [],
+                'total_predictions': self.prediction_count,
+                'recent_predictions': list(self.prediction_history)[-10:],
                 'model_performance': self.model_performance,
                 'feature_importance': self.feature_importance
             }
@@ -0,0 +1,262 @@
+"""
+Model Training - Out-of-process training pipeline for price models
+
+This module provides:
+- Price features built from the properties and transactions tables
+- Candidate models fitted in parallel worker processes
+- Evaluation with ModelEvaluator
+- Publishing accepted models to the model registry, where serving
+  processes pick them up without a restart
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import GroupShuffleSplit
+from sqlalchemy import text
+
+from app.core.settings import (
+    ML_MODELS_MMAP_MODE, ML_PRICE_MODELS_DIR, ML_TRAINING_MAX_WORKERS, ML_TRAINING_MIN_R2
+)
+from app.domain.ai.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Model inputs, in column order; serving reads the order from the manifest
+PRICE_MODEL_FEATURES = ['bedrooms', 'bathrooms', 'square_feet', 'age', 'location_score', 'amenity_score']
+AMENITY_COLUMNS = ['gym_available', 'pool_available', 'security_24_7', 'pet_friendly']
+# Fewer usable rows than this and training is skipped
+MIN_TRAINING_ROWS = 50
+# Coverage of the conformal price intervals published with each model
+INTERVAL_CONFIDENCE = 0.95
+
+# One row per listing, or per sale for listings that sold
+TRAINING_QUERY = """
+SELECT p.id AS property_id, p.location, p.property_type, p.bedrooms, p.bathrooms, p.area_sqft,
+       p.price_aed, p.price, p.completion_date, p.parking_spaces,
+       p.gym_available, p.pool_available, p.security_24_7, p.pet_friendly,
+       t.final_price, t.transaction_date
+FROM properties p
+LEFT JOIN transactions t ON t.property_id = p.id AND t.final_price IS NOT NULL
+WHERE p.is_deleted IS NULL OR p.is_deleted = FALSE
+"""
+
+
+def market_price_registry() -> ModelRegistry:
+    return ModelRegistry(ML_PRICE_MODELS_DIR, ML_MODELS_MMAP_MODE)
+
+
+def build_price_features(
+    frame: pd.DataFrame,
+    as_of: Optional[datetime] = None,
+    location_scores: Optional[Dict[str, float]] = None
+) -> Tuple[pd.DataFrame, pd.Series, Dict[str, float]]:
+    """
+    Turn training rows into the model matrix, target and location score table.
+
+    The target is the sale price, else the listing price. ``age`` is years
+    from completion to the sale (or ``as_of``), ``amenity_score`` the share of
+    amenities present, and ``location_score`` the percentile of the
+    location's median price per sqft among these rows, which is also returned
+    for serving. Pass the table fitted on the training rows as
+    ``location_scores`` to score held-out rows with it instead, as serving
+    does; it is returned unchanged. Unknown locations score 0.5. Rows without
+    a positive price or area are dropped.
+    """
+    as_of = pd.Timestamp(as_of or datetime.now())
+    missing = pd.Series(np.nan, index=frame.index)
+    numeric = lambda column: pd.to_numeric(frame[column], errors='coerce') if column in frame else missing
+    dates = lambda column: pd.to_datetime(frame[column], errors='coerce') if column in frame else missing.astype('datetime64[ns]')
+
+    target = numeric('final_price').fillna(numeric('price_aed')).fillna(numeric('price'))
+    square_feet = numeric('area_sqft')
+    valid = (target > 0) & (square_feet > 0)
+
+    age = ((dates('transaction_date').fillna(as_of) - dates('completion_date')).dt.days / 365.25).clip(lower=0).fillna(0)
+
+    amenities = pd.DataFrame({column: numeric(column).fillna(0).astype(bool) for column in AMENITY_COLUMNS})
+    amenities['parking'] = numeric('parking_spaces').fillna(0) > 0
+    amenity_score = amenities.mean(axis=1)
+
+    locations = frame['location'].fillna('').astype(str).str.strip() if 'location' in frame else pd.Series('', index=frame.index)
+    if location_scores is None:
+        located = valid & (locations != '')
+        price_per_sqft = (target / square_feet)[located]
+        location_scores = price_per_sqft.groupby(locations[located]).median().rank(pct=True).to_dict()
+    location_score = locations.map(location_scores).astype(float).fillna(0.5)
+
+    features = pd.DataFrame({
+        'bedrooms': numeric('bedrooms').fillna(0),
+        'bathrooms': numeric('bathrooms').fillna(0),
+        'square_feet': square_feet,
+        'age': age,
+        'location_score': location_score,
+        'amenity_score': amenity_score,
+    })[PRICE_MODEL_FEATURES]
+    return features[valid].reset_index(drop=True), target[valid].reset_index(drop=True), location_scores
+
+
+def default_price_candidates() -> Dict[str, Any]:
+    """The price models MarketPredictor ensembles; each fits single-threaded in its own process"""
+    return {
+        'price_rf': RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=1),
+        'price_gb': GradientBoostingRegressor(n_estimators=100, random_state=42),
+        'price_linear': LinearRegression(),
+    }
+
+
+def _fit_candidate(name: str, estimator: Any, X: np.ndarray, y: np.ndarray) -> Tuple[str, Any]:
+    return name, estimator.fit(X, y)
+
+
+def train_candidates(candidates: Dict[str, Any], X: np.ndarray, y: np.ndarray, max_workers: int = 1) -> Dict[str, Any]:
+    """Fit every candidate, in parallel processes when ``max_workers`` > 1; failed fits are logged and left out"""
+    fitted = {}
+    if max_workers <= 1 or len(candidates) <= 1:
+        for name, estimator in candidates.items():
+            try:
+                fitted[name] = _fit_candidate(name, estimator, X, y)[1]
+            except Exception as e:
+                logger.error(f"Error training candidate {name}: {e}")
+        return fitted
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(candidates))) as pool:
+        futures = {pool.submit(_fit_candidate, name, estimator, X, y): name for name, estimator in candidates.items()}
+        for future in as_completed(futures):
+            try:
+                name, estimator = future.result()
+                fitted[name] = estimator
+            except Exception as e:
+                logger.error(f"Error training candidate {futures[future]}: {e}")
+    return {name: fitted[name] for name in candidates if name in fitted}
+
+
+def conformal_interval(model: Any, X: np.ndarray, y: np.ndarray, confidence: float = INTERVAL_CONFIDENCE) -> Dict[str, Any]:
+    """
+    Split-conformal interval from held-out rows the model was not fitted on.
+
+    The score is the residual relative to the prediction, so serving widens
+    the interval with the price: ``prediction * (1 +/- relative_half_width)``
+    covers about ``confidence`` of new properties.
+    """
+    predicted = model.predict(X)
+    scores = np.abs(y - predicted) / np.maximum(np.abs(predicted), 1.0)
+    level = min(np.ceil((len(scores) + 1) * confidence) / len(scores), 1.0)
+    return {
+        'relative_half_width': float(np.quantile(scores, level, method='higher')),
+        'confidence': confidence,
+        'calibration_rows': len(scores)
+    }
+
+
+def _json_metrics(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value.item() if isinstance(value, np.generic) else value for key, value in metrics.items()}
+
+
+class ModelTrainer:
+    """Train, evaluate and publish the MarketPredictor price models outside the serving path"""
+
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        engine=None,
+        evaluator=None,
+        max_workers: int = ML_TRAINING_MAX_WORKERS,
+        min_r2: float = ML_TRAINING_MIN_R2
+    ):
+        self.registry = registry or market_price_registry()
+        self._engine = engine
+        self._evaluator = evaluator
+        self.max_workers = max_workers
+        self.min_r2 = min_r2
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from app.core.database import get_engine
+            self._engine = get_engine("analytics")
+        return self._engine
+
+    @property
+    def evaluator(self):
+        if self._evaluator is None:
+            from ..utils.model_evaluation import ModelEvaluator
+            self._evaluator = ModelEvaluator()
+        return self._evaluator
+
+    def load_training_frame(self) -> pd.DataFrame:
+        """Read the properties joined with their sales"""
+        with self.engine.connect() as conn:
+            return pd.read_sql(text(TRAINING_QUERY), conn)
+
+    def train_price_models(
+        self,
+        frame: Optional[pd.DataFrame] = None,
+        candidates: Optional[Dict[str, Any]] = None,
+        promote: bool = True,
+        test_size: float = 0.2,
+        random_state: int = 42
+    ) -> Dict[str, Any]:
+        """
+        Build features, fit the candidates, evaluate them on a held-out split
+        and publish the ones reaching ``min_r2`` as one registry version,
+        with conformal price intervals calibrated on the same split.
+
+        The split is by ``property_id``, so a listing and its sales never land
+        on both sides, and the location score table is fitted on the training
+        rows only; the test rows are scored with it, as serving scores new
+        properties. Returns a summary with the status, version and per-model
+        metrics.
+        """
+        started = datetime.now()
+        frame = self.load_training_frame() if frame is None else frame
+        training_rows = len(build_price_features(frame)[0])
+        if training_rows < MIN_TRAINING_ROWS:
+            logger.warning(f"Skipping price model training: {training_rows} usable rows, need {MIN_TRAINING_ROWS}")
+            return {'status': 'skipped', 'training_rows': training_rows, 'reason': f"need at least {MIN_TRAINING_ROWS} rows"}
+
+        groups = frame['property_id'] if 'property_id' in frame else np.arange(len(frame))
+        splitter = GroupShuffleSplit(n_splits=1, test_size=test_size, random_state=random_state)
+        train_rows, test_rows = next(splitter.split(frame, groups=groups))
+        train_X, train_y, location_scores = build_price_features(frame.iloc[train_rows])
+        test_X, test_y, _ = build_price_features(frame.iloc[test_rows], location_scores=location_scores)
+        X_train, y_train = train_X.to_numpy(dtype=float), train_y.to_numpy(dtype=float)
+        X_test, y_test = test_X.to_numpy(dtype=float), test_y.to_numpy(dtype=float)
+        fitted = train_candidates(candidates or default_price_candidates(), X_train, y_train, self.max_workers)
+
+        metrics: Dict[str, Dict[str, Any]] = {}
+        for name, model in fitted.items():
+            metrics[name] = _json_metrics(self.evaluator.evaluate_regression_model(
+                model, X_test, y_test, X_train, y_train, model_name=name
+            ))
+        accepted = {name: model for name, model in fitted.items() if metrics[name].get('r2', -np.inf) >= self.min_r2}
+
+        summary: Dict[str, Any] = {
+            'training_rows': training_rows,
+            'metrics': metrics,
+            'models': sorted(accepted),
+            'seconds': (datetime.now() - started).total_seconds()
+        }
+        if not accepted:
+            logger.warning(f"No price model reached R² {self.min_r2}; nothing published")
+            return {**summary, 'status': 'rejected'}
+
+        intervals = {name: conformal_interval(model, X_test, y_test) for name, model in accepted.items()}
+        version = self.registry.publish(
+            {'models': accepted, 'tables': {'location_scores': location_scores}},
+            metadata={
+                'features': PRICE_MODEL_FEATURES,
+                'metrics': metrics,
+                'intervals': intervals,
+                'training_rows': training_rows
+            },
+            promote=promote
+        )
+        logger.info(f"Published price models {sorted(accepted)} as version {version}")
+        return {**summary, 'status': 'completed', 'version': version, 'promoted': promote}
@@ -216,19 +216,21 @@ async def get_user_notifications(
     notification_type: Optional[str] = None,
     priority: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Get notifications for a specific user"""
+    """Get notifications for a specific user, newest first; pass ``next_cursor`` back for the next page"""
     try:
         # Verify user can access these notifications
         if current_user.id != user_id and current_user.role != "admin":
             raise HTTPException(status_code=403, detail="Access denied")
         
         if ML_AVAILABLE and smart_notification_service:
-            notifications = await smart_notification_service.get_user_notifications(
-                user_id, status, notification_type, priority, limit
+            page = await smart_notification_service.get_user_notifications_page(
+                user_id, status, notification_type, priority, limit, cursor
             )
-            return {"notifications": notifications, "total": len(notifications)}
+            notifications = page["notifications"]
+            return {"notifications": notifications, "total": len(notifications), "next_cursor": page["next_cursor"]}
         else:
             # Return mock data when ML services are not available
             mock_notifications = [
@@ -263,7 +265,7 @@ async def get_user_notifications(
                     }
                 }
             ]
-            return {"notifications": mock_notifications, "total": len(mock_notifications)}
+            return {"notifications": mock_notifications, "total": len(mock_notifications), "next_cursor": None}
         
     except HTTPException:
         raise
@@ -290,6 +292,24 @@ async def mark_notification_read(
         logging.error(f"Error marking notification read: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to mark notification read: {str(e)}")
 
+@ml_insights_router.put("/notifications/read")
+async def mark_notifications_read(
+    request: dict,
+    current_user: User = Depends(get_current_user)
+):
+    """Mark the current user's active notifications as read, optionally only some ids or one type"""
+    try:
+        marked = await smart_notification_service.mark_notifications_read(
+            current_user.id,
+            notification_ids=request.get("notification_ids"),
+            notification_type=request.get("notification_type")
+        )
+        return {"message": "Notifications marked as read", "marked": marked}
+        
+    except Exception as e:
+        logging.error(f"Error marking notifications read: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to mark notifications read: {str(e)}")
+
 @ml_insights_router.get("/notifications/summary/{user_id}")
 async def get_notification_summary(
     user_id: int,
@@ -573,6 +593,7 @@ async def valuate_property(
             'bathrooms': request.bathrooms,
             'square_feet': request.square_feet,
             'age': request.age,
+            'location': request.location,
             'location_score': request.location_score,
             'accessibility_score': request.accessibility_score,
             'amenity_score': request.amenity_score
@@ -16,7 +16,8 @@ from dataclasses import dataclass
 import time
 from collections import OrderedDict
 import redis
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
+from app.core.database import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +36,7 @@ class PerformanceOptimizer:
     
     def __init__(self, db_url: str, redis_url: Optional[str] = None):
         self.db_url = db_url
-        self.engine = create_engine(db_url)
+        self.engine = get_engine("analytics", db_url)
         
         # Initialize Redis if available
         self.redis_client = None
@@ -12,10 +12,11 @@ import asyncio
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import json
 from cache_manager import cache_manager
 from hybrid_search_engine import get_hybrid_search_engine
+from app.core.database import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +45,7 @@ class PerformanceMonitor:
     """Comprehensive performance monitoring system"""
     
     def __init__(self, database_url: str):
-        self.engine = create_engine(database_url)
+        self.engine = get_engine("analytics", database_url)
         self.metrics_history: List[PerformanceMetric] = []
         self.health_history: List[SystemHealth] = []
         self.start_time = datetime.now()
@@ -6,32 +6,18 @@ to maintain frontend compatibility while following the secure architecture
 patterns of main_secure.py.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import json
 
-# Import dependencies
-from config.settings import REDIS_URL
-
 # Import performance services
-from cache_manager import CacheManager
+from cache_manager import cache_manager
 from batch_processor import BatchProcessor, PerformanceMonitor
+from app.infrastructure.queue.batch_metrics import CONTENT_TYPE_LATEST, generate_latest
 
 # Initialize performance services
-# Parse REDIS_URL to get host, port, db
-from urllib.parse import urlparse
-try:
-    redis_parts = urlparse(REDIS_URL)
-    cache_manager = CacheManager(
-        redis_host=redis_parts.hostname or "localhost",
-        redis_port=redis_parts.port or 6379,
-        redis_db=int(redis_parts.path.lstrip('/')) if redis_parts.path else 0
-    )
-except Exception as e:
-    print(f"Warning: Could not initialize Redis cache: {e}")
-    cache_manager = None
 batch_processor = BatchProcessor(max_workers=4, batch_size=50)
 performance_monitor = PerformanceMonitor()
 
@@ -138,15 +124,6 @@ class PerformanceReportResponse(BaseModel):
 def get_cache_stats():
     """Get cache performance statistics"""
     try:
-        if cache_manager is None:
-            return CacheStatsResponse(
-                total_keys=0,
-                memory_usage="0B",
-                hit_rate=0.0,
-                miss_rate=0.0,
-                evictions=0,
-                expired_keys=0
-            )
         stats = cache_manager.get_cache_stats()
         return CacheStatsResponse(**stats)
     except Exception as e:
@@ -156,16 +133,14 @@ def get_cache_stats():
 def get_cache_health():
     """Get cache health status"""
     try:
-        if cache_manager is None:
-            return CacheHealthResponse(
-                status="disabled",
-                connected=False,
-                memory_usage="0B",
-                total_keys=0,
-                last_check=datetime.now().isoformat()
-            )
         health = cache_manager.health_check()
-        return CacheHealthResponse(**health)
+        return CacheHealthResponse(
+            status=health.get("status", "unknown"),
+            connected=health.get("status") == "healthy",
+            memory_usage=str(health.get("memory_usage", "0B")),
+            total_keys=health.get("total_keys", 0),
+            last_check=datetime.now().isoformat()
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get cache health: {str(e)}")
 
@@ -196,6 +171,11 @@ def get_batch_jobs():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get batch jobs: {str(e)}")
 
+@router.get("/batch-metrics")
+def get_batch_metrics():
+    """Batch item counters, throughput and queue depth in Prometheus text format"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @router.get("/metrics", response_model=PerformanceMetricsResponse)
 def get_performance_metrics():
     """Get overall performance metrics"""
@@ -209,8 +189,6 @@ def get_performance_metrics():
 def clear_cache():
     """Clear all cache entries"""
     try:
-        if cache_manager is None:
-            return CacheClearResponse(success=False, message="Cache is disabled")
         success = cache_manager.clear_all_cache()
         return CacheClearResponse(
             success=success,
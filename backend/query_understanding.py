@@ -16,6 +16,73 @@ from typing import List, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
 from ai_enhancements import SentimentType
+from app.domain.ai.query_matcher import PatternMatcher
+
+INTENT_PATTERNS = {
+    'property_search': [
+        r'\b(buy|rent|purchase|find|search|looking for|need)\b.*\b(property|house|apartment|condo|villa|home)\b',
+        r'\b(show me|display|list)\b.*\b(properties|houses|apartments)\b',
+        r'\b(bedroom|bathroom|price|budget|location|area)\b.*\b(property|apartment|villa)\b'
+    ],
+    'market_inquiry': [
+        r'\b(market|trend|price|investment|rental|yield|forecast)\b',
+        r'\b(how much|what is the price|market value)\b',
+        r'\b(area|neighborhood|community)\b.*\b(market|trends|prices)\b'
+    ],
+    'investment_advice': [
+        r'\b(investment|roi|return|profit|yield|capital appreciation)\b',
+        r'\b(golden visa|residency|visa)\b.*\b(property|investment)\b',
+        r'\b(foreign|international|expat)\b.*\b(invest|buy|purchase)\b'
+    ],
+    'legal_question': [
+        r'\b(law|regulation|rera|escrow|legal|compliance)\b',
+        r'\b(freehold|leasehold|ownership rights)\b',
+        r'\b(dubai land department|dld|mortgage regulations)\b'
+    ],
+    'area_information': [
+        r'\b(tell me about|describe|what is)\b.*\b(dubai marina|downtown|palm jumeirah)\b',
+        r'\b(schools|hospitals|transport|metro|amenities)\b.*\b(area|neighborhood)\b',
+        r'\b(what)\b.*\b(schools|hospitals|amenities)\b.*\b(available|in)\b'
+    ],
+    'transaction_help': [
+        r'\b(how to buy|purchase process|buying process|transaction)\b',
+        r'\b(legal requirements|documentation|contract|agreement)\b',
+        r'\b(escrow|payment|financing|mortgage)\b'
+    ],
+    'developer_question': [
+        r'\b(emaar|damac|nakheel|sobha|dubai properties|meraas)\b',
+        r'\b(developer|builder|construction company)\b',
+        r'\b(who built|who developed|which developer)\b'
+    ]
+}
+
+# Compiled once at import; queries arrive lowercased, so no IGNORECASE
+_INTENT_MATCHER = PatternMatcher(INTENT_PATTERNS, flags=0)
+
+DUBAI_AREAS = (
+    'dubai marina', 'downtown dubai', 'palm jumeirah', 'business bay',
+    'jbr', 'jumeirah', 'dubai hills estate', 'arabian ranches',
+    'emirates hills', 'springs', 'meadows', 'lakes', 'motor city',
+    'sports city', 'international city', 'silicon oasis', 'academic city'
+)
+PROPERTY_TYPES = ('apartment', 'villa', 'townhouse', 'penthouse', 'studio', 'duplex')
+AMENITIES = (
+    'pool', 'gym', 'parking', 'balcony', 'garden', 'elevator',
+    'security', 'concierge', 'maid', 'school', 'hospital', 'metro'
+)
+DEVELOPERS = (
+    'emaar', 'damac', 'nakheel', 'sobha', 'dubai properties', 'meraas',
+    'azizi', 'ellington', 'mag', 'select', 'binghatti'
+)
+
+_PRICE_PATTERNS = tuple(re.compile(p) for p in (
+    r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:aed|dollars?|dirhams?)',
+    r'budget.*?(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:aed|dollars?|dirhams?)',
+    r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:aed|dollars?|dirhams?).*?budget'
+))
+_BEDROOM_PATTERN = re.compile(r'(\d+)\s*bedroom')
+_BATHROOM_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*bathroom')
+
 
 @dataclass
 class QueryUnderstanding:
@@ -69,50 +136,7 @@ class QueryUnderstanding:
     @staticmethod
     def _classify_intent(query: str) -> str:
         """Classify the intent of the query"""
-        intent_patterns = {
-            'property_search': [
-                r'\b(buy|rent|purchase|find|search|looking for|need)\b.*\b(property|house|apartment|condo|villa|home)\b',
-                r'\b(show me|display|list)\b.*\b(properties|houses|apartments)\b',
-                r'\b(bedroom|bathroom|price|budget|location|area)\b.*\b(property|apartment|villa)\b'
-            ],
-            'market_inquiry': [
-                r'\b(market|trend|price|investment|rental|yield|forecast)\b',
-                r'\b(how much|what is the price|market value)\b',
-                r'\b(area|neighborhood|community)\b.*\b(market|trends|prices)\b'
-            ],
-            'investment_advice': [
-                r'\b(investment|roi|return|profit|yield|capital appreciation)\b',
-                r'\b(golden visa|residency|visa)\b.*\b(property|investment)\b',
-                r'\b(foreign|international|expat)\b.*\b(invest|buy|purchase)\b'
-            ],
-            'legal_question': [
-                r'\b(law|regulation|rera|escrow|legal|compliance)\b',
-                r'\b(freehold|leasehold|ownership rights)\b',
-                r'\b(dubai land department|dld|mortgage regulations)\b'
-            ],
-            'area_information': [
-                r'\b(tell me about|describe|what is)\b.*\b(dubai marina|downtown|palm jumeirah)\b',
-                r'\b(schools|hospitals|transport|metro|amenities)\b.*\b(area|neighborhood)\b',
-                r'\b(what)\b.*\b(schools|hospitals|amenities)\b.*\b(available|in)\b'
-            ],
-            'transaction_help': [
-                r'\b(how to buy|purchase process|buying process|transaction)\b',
-                r'\b(legal requirements|documentation|contract|agreement)\b',
-                r'\b(escrow|payment|financing|mortgage)\b'
-            ],
-            'developer_question': [
-                r'\b(emaar|damac|nakheel|sobha|dubai properties|meraas)\b',
-                r'\b(developer|builder|construction company)\b',
-                r'\b(who built|who developed|which developer)\b'
-            ]
-        }
-        
-        for intent, patterns in intent_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, query):
-                    return intent
-        
-        return 'general_inquiry'
+        return _INTENT_MATCHER.first_label(query) or 'general_inquiry'
     
     @staticmethod
     def _extract_entities(query: str) -> Dict[str, Any]:
@@ -128,31 +152,18 @@ class QueryUnderstanding:
         }
         
         # Extract locations
-        dubai_areas = [
-            'dubai marina', 'downtown dubai', 'palm jumeirah', 'business bay',
-            'jbr', 'jumeirah', 'dubai hills estate', 'arabian ranches',
-            'emirates hills', 'springs', 'meadows', 'lakes', 'motor city',
-            'sports city', 'international city', 'silicon oasis', 'academic city'
-        ]
-        for area in dubai_areas:
+        for area in DUBAI_AREAS:
             if area in query:
                 entities['locations'].append(area)
         
         # Extract property types
-        property_types = ['apartment', 'villa', 'townhouse', 'penthouse', 'studio', 'duplex']
-        for prop_type in property_types:
+        for prop_type in PROPERTY_TYPES:
             if prop_type in query:
                 entities['property_types'].append(prop_type)
         
         # Extract price range
-        price_patterns = [
-            r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:aed|dollars?|dirhams?)',
-            r'budget.*?(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:aed|dollars?|dirhams?)',
-            r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:aed|dollars?|dirhams?).*?budget'
-        ]
-        
-        for pattern in price_patterns:
-            price_match = re.search(pattern, query)
+        for pattern in _PRICE_PATTERNS:
+            price_match = pattern.search(query)
             if price_match:
                 try:
                     entities['price_range'] = float(price_match.group(1).replace(',', ''))
@@ -161,29 +172,21 @@ class QueryUnderstanding:
                     continue
         
         # Extract bedrooms/bathrooms
-        bedroom_match = re.search(r'(\d+)\s*bedroom', query)
+        bedroom_match = _BEDROOM_PATTERN.search(query)
         if bedroom_match:
             entities['bedrooms'] = int(bedroom_match.group(1))
         
-        bathroom_match = re.search(r'(\d+(?:\.\d+)?)\s*bathroom', query)
+        bathroom_match = _BATHROOM_PATTERN.search(query)
         if bathroom_match:
             entities['bathrooms'] = float(bathroom_match.group(1))
         
         # Extract amenities
-        amenities = [
-            'pool', 'gym', 'parking', 'balcony', 'garden', 'elevator',
-            'security', 'concierge', 'maid', 'school', 'hospital', 'metro'
-        ]
-        for amenity in amenities:
+        for amenity in AMENITIES:
             if amenity in query:
                 entities['amenities'].append(amenity)
         
         # Extract developers
-        developers = [
-            'emaar', 'damac', 'nakheel', 'sobha', 'dubai properties', 'meraas',
-            'azizi', 'ellington', 'mag', 'select', 'binghatti'
-        ]
-        for developer in developers:
+        for developer in DEVELOPERS:
             if developer in query:
                 entities['developers'].append(developer)
         
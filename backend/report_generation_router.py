@@ -19,12 +19,13 @@ from typing import Dict, List, Optional, Any
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import logging
 
 from ai_manager import AIEnhancementManager
 from rag_service import EnhancedRAGService
 from config.settings import DATABASE_URL, GOOGLE_API_KEY
+from app.core.database import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -104,7 +105,7 @@ class ReportDetailResponse(BaseModel):
 
 def get_database_connection():
     """Get database connection"""
-    engine = create_engine(DATABASE_URL)
+    engine = get_engine("analytics", DATABASE_URL)
     return engine
 
 def generate_web_page_content(report_data: Dict[str, Any]) -> str:
@@ -11,7 +11,7 @@ import logging
 import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
-import google.generativeai as genai
+from app.infrastructure.integrations.llm_gateway import get_llm_gateway
 from sqlalchemy.orm import Session
 
 from app.domain.listings.ai_request_models import (
@@ -37,8 +37,7 @@ class AIProcessingService:
             # Configure Google Generative AI
             api_key = os.getenv('GOOGLE_API_KEY')
             if api_key:
-                genai.configure(api_key=api_key)
-                self.gemini_model = genai.GenerativeModel('gemini-pro')
+                self.gemini_model = get_llm_gateway().get_model("gemini", 'gemini-pro')
                 logger.info("✅ Google Generative AI configured")
             else:
                 logger.warning("⚠️ GOOGLE_API_KEY not found, using mock responses")
@@ -10,9 +10,10 @@ import logging
 import uuid
 from typing import Dict, Any, Optional, List
 from datetime import datetime
-import google.generativeai as genai
-from sqlalchemy import create_engine, text
+from app.infrastructure.integrations.llm_gateway import get_llm_gateway
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
+from app.core.database import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,7 @@ class ContentManagementService:
         if 'postgresql' in database_url and 'localhost' in database_url:
             # Check if we can connect to PostgreSQL, fallback to SQLite
             try:
-                test_engine = create_engine(database_url)
+                test_engine = get_engine("oltp", database_url)
                 with test_engine.connect() as conn:
                     conn.execute(text("SELECT 1"))
                 self.database_url = database_url
@@ -37,11 +38,10 @@ class ContentManagementService:
         self.google_api_key = google_api_key
         
         # Initialize Google Gemini for content generation
-        genai.configure(api_key=google_api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model = get_llm_gateway().get_model("gemini", 'gemini-pro')
         
         # Database connection
-        self.engine = create_engine(database_url)
+        self.engine = get_engine("oltp", database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
         # Content templates configuration
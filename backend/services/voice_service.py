@@ -11,12 +11,13 @@ import logging
 import uuid
 from typing import Dict, Any, Optional, List
 from datetime import datetime
-import google.generativeai as genai
-from sqlalchemy import create_engine, text
+from app.infrastructure.integrations.llm_gateway import get_llm_gateway
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
 
 # Import existing AI manager for integration
 from ai_manager import AIEnhancementManager
+from app.core.database import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,7 @@ class VoiceService:
         if 'postgresql' in database_url and 'localhost' in database_url:
             # Check if we can connect to PostgreSQL, fallback to SQLite
             try:
-                test_engine = create_engine(database_url)
+                test_engine = get_engine("oltp", database_url)
                 with test_engine.connect() as conn:
                     conn.execute(text("SELECT 1"))
                 self.database_url = database_url
@@ -41,14 +42,13 @@ class VoiceService:
         self.google_api_key = google_api_key
         
         # Initialize Google Gemini for voice processing
-        genai.configure(api_key=google_api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model = get_llm_gateway().get_model("gemini", 'gemini-pro')
         
         # Initialize existing AI manager for integration
         self.ai_manager = AIEnhancementManager(database_url, self.model)
         
         # Database connection
-        self.engine = create_engine(database_url)
+        self.engine = get_engine("oltp", database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
         # Real estate specific intents
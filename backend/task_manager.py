@@ -13,7 +13,7 @@ from enum import Enum
 from dataclasses import dataclass, asdict
 import threading
 import time
-import google.generativeai as genai
+from app.infrastructure.integrations.llm_gateway import get_llm_gateway
 import os
 
 logger = logging.getLogger(__name__)
@@ -97,8 +97,7 @@ class TaskManager:
         try:
             api_key = os.getenv('GOOGLE_API_KEY')
             if api_key:
-                genai.configure(api_key=api_key)
-                self.ai_model = genai.GenerativeModel('gemini-1.5-flash')
+                self.ai_model = get_llm_gateway().get_model("gemini", 'gemini-1.5-flash')
                 self.ai_available = True
                 logger.info("✅ AI model configured for task management")
             else:
@@ -2,49 +2,88 @@
 Machine Learning Training Tasks for Dubai Real Estate RAG System
 """
 
-from celery import current_task
 import logging
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
-@current_task.task(bind=True)
-def train_price_prediction_model(self, model_type: str, training_data: dict):
-    """Train price prediction model"""
-    try:
-        logger.info(f"Training {model_type} price prediction model")
+# Import the Celery app
+from celery_app import celery_app
+
+@celery_app.task(bind=True, name='tasks.ml_training.train_price_prediction_model')
+def train_price_prediction_model(self, model_types: Optional[List[str]] = None, promote: bool = True) -> Dict[str, Any]:
+    """
+    Train the market price models from the properties and transactions tables
+    
+    Candidates are fitted in parallel worker processes, evaluated on a held-out
+    split and published to the model registry; serving processes pick up the
+    promoted version on their next reload check.
+    
+    Args:
+        model_types: Candidate names to train (price_rf, price_gb, price_linear); all by default
+        promote: Serve the new version as soon as it is published
         
-        # Placeholder for ML training logic
-        # This would typically involve:
-        # 1. Loading and preprocessing training data
-        # 2. Feature engineering
-        # 3. Model training and validation
-        # 4. Model evaluation and metrics
-        # 5. Saving the trained model
+    Returns:
+        Training summary with status, version and per-model metrics
+    """
+    try:
+        from ml.pipeline.model_training import ModelTrainer, default_price_candidates
         
-        result = {
-            "status": "completed",
-            "model_type": model_type,
-            "training_data_size": len(training_data.get("features", [])),
-            "message": f"Price prediction model '{model_type}' trained successfully"
-        }
+        candidates = default_price_candidates()
+        if model_types:
+            unknown = set(model_types) - set(candidates)
+            if unknown:
+                raise ValueError(f"Unknown price model types: {sorted(unknown)}")
+            candidates = {name: candidates[name] for name in model_types}
         
-        return result
+        logger.info(f"Training price prediction models {sorted(candidates)}")
+        self.update_state(state='PROGRESS', meta={'status': 'Training price models...'})
+        return ModelTrainer().train_price_models(candidates=candidates, promote=promote)
         
+    except ValueError:
+        raise
     except Exception as e:
         logger.error(f"Error training model: {str(e)}")
         raise self.retry(exc=e, countdown=300, max_retries=2)
 
-@current_task.task(bind=True)
+@celery_app.task(bind=True, name='tasks.ml_training.train_advanced_models')
+def train_advanced_models(self, promote: bool = True) -> Dict[str, Any]:
+    """
+    Train the advanced ML models (price, market, lead, client, opportunity)
+    
+    The models are published to the model registry as one version; serving
+    processes pick up the promoted version on their next reload check.
+    
+    Args:
+        promote: Serve the new version as soon as it is published
+        
+    Returns:
+        Training summary with status and version
+    """
+    try:
+        from ml.advanced_ml_models import advanced_ml_models
+        
+        logger.info("Training advanced ML models")
+        self.update_state(state='PROGRESS', meta={'status': 'Training advanced ML models...'})
+        version = advanced_ml_models.train_and_publish(promote=promote)
+        if version is None:
+            raise RuntimeError("Trained models could not be published")
+        return {"status": "completed", "version": version, "promoted": promote}
+        
+    except Exception as e:
+        logger.error(f"Error training advanced ML models: {str(e)}")
+        raise self.retry(exc=e, countdown=300, max_retries=2)
+
+@celery_app.task(bind=True, name='tasks.ml_training.train_sentiment_analysis_model')
 def train_sentiment_analysis_model(self, training_data: dict):
-    """Train sentiment analysis model for market feedback"""
+    """Train sentiment analysis model for market feedback (not implemented yet: nothing is trained)"""
     try:
-        logger.info("Training sentiment analysis model")
+        logger.warning("Sentiment analysis training is not implemented; no model was trained")
         
-        # Placeholder for sentiment analysis training
         result = {
-            "status": "completed",
+            "status": "not_implemented",
             "training_samples": len(training_data.get("texts", [])),
-            "message": "Sentiment analysis model trained successfully"
+            "message": "Sentiment analysis training is not implemented; no model was trained"
         }
         
         return result
@@ -52,6 +91,3 @@ def train_sentiment_analysis_model(self, training_data: dict):
     except Exception as e:
         logger.error(f"Error training sentiment model: {str(e)}")
         raise self.retry(exc=e, countdown=300, max_retries=2)
-
-
-
@@ -0,0 +1,178 @@
+"""
+Bulk Loading for PostgreSQL
+
+Streams rows into a session-local staging table with COPY FROM STDIN and
+merges each batch into the target table with one set-based INSERT ... SELECT
+(optionally ON CONFLICT DO UPDATE), committing per batch.
+"""
+
+import io
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+@dataclass
+class BulkLoadResult:
+    """Outcome of one bulk load"""
+    table: str
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def success(self) -> bool:
+        return not self.errors
+
+
+def _csv_field(value: Any, is_json: bool) -> str:
+    """Format one value for COPY ... (FORMAT csv); NULL is an unquoted empty field"""
+    if value is None:
+        return ''
+    if is_json:
+        text = value if isinstance(value, str) else json.dumps(value, default=str)
+    elif isinstance(value, float):
+        if value != value:  # NaN from pandas
+            return ''
+        # pandas widens integer columns with gaps to float; "3.0" is not valid INTEGER input
+        text = str(int(value)) if value.is_integer() else repr(value)
+    elif isinstance(value, (bool, int, Decimal)):
+        text = str(value)
+    elif isinstance(value, (datetime, date)):
+        if value != value:  # NaT from pandas
+            return ''
+        text = value.isoformat()
+    else:
+        text = str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+def rows_to_csv(rows: Iterable[Sequence[Any]], json_indexes: Sequence[int] = ()) -> io.StringIO:
+    """Render rows as a CSV buffer COPY can read, quoting every non-NULL field"""
+    json_set = set(json_indexes)
+    buffer = io.StringIO()
+    buffer.writelines(
+        ','.join(_csv_field(value, i in json_set) for i, value in enumerate(row)) + '\n'
+        for row in rows
+    )
+    buffer.seek(0)
+    return buffer
+
+
+class PostgresBulkLoader:
+    """COPY-based bulk insert/upsert on a psycopg2 connection"""
+
+    def __init__(self, conn, batch_size: int = DEFAULT_BATCH_SIZE, logger: Optional[logging.Logger] = None):
+        self.conn = conn
+        self.batch_size = max(int(batch_size), 1)
+        self.logger = logger or logging.getLogger(__name__)
+
+    def _staging_table(self, cursor, table: str, columns: Sequence[str]) -> str:
+        """Create (once per session) a temp table with the target's column types"""
+        staging = f"_bulk_stage_{table}"
+        # ON COMMIT DELETE ROWS empties the stage after every per-batch commit
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DELETE ROWS AS "
+            f"SELECT {', '.join(columns)} FROM {table} WITH NO DATA"
+        )
+        return staging
+
+    def _merge_sql(self, table: str, staging: str, columns: Sequence[str],
+                   conflict_columns: Optional[Sequence[str]], update_columns: Optional[Sequence[str]]) -> str:
+        column_list = ', '.join(columns)
+        sql = f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging}"
+        if conflict_columns:
+            updates = update_columns if update_columns is not None else [
+                c for c in columns if c not in conflict_columns
+            ]
+            if updates:
+                assignments = ', '.join(f"{c} = EXCLUDED.{c}" for c in updates)
+                sql += f" ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {assignments}"
+            else:
+                sql += f" ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+        return sql
+
+    @staticmethod
+    def _dedupe(batch: List[Sequence[Any]], key_indexes: List[int]) -> List[Sequence[Any]]:
+        """Keep the last row per conflict key; ON CONFLICT cannot touch a row twice per statement"""
+        latest: Dict[tuple, Sequence[Any]] = {}
+        for row in batch:
+            latest[tuple(row[i] for i in key_indexes)] = row
+        return list(latest.values()) if len(latest) < len(batch) else batch
+
+    def load(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+             conflict_columns: Optional[Sequence[str]] = None,
+             update_columns: Optional[Sequence[str]] = None,
+             json_columns: Sequence[str] = ()) -> BulkLoadResult:
+        """
+        Load ``rows`` (tuples ordered like ``columns``) into ``table``.
+
+        With ``conflict_columns`` each batch is upserted, updating
+        ``update_columns`` (default: every non-key column). Batches commit
+        independently; on a failed batch the load stops, that batch is rolled
+        back and the error is recorded on the result.
+        """
+        columns = list(columns)
+        json_indexes = [columns.index(c) for c in json_columns]
+        key_indexes = [columns.index(c) for c in conflict_columns] if conflict_columns else []
+        result = BulkLoadResult(table=table)
+        started = time.perf_counter()
+
+        cursor = None
+        try:
+            cursor = self.conn.cursor()
+            staging = self._staging_table(cursor, table, columns)
+            copy_sql = f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+            merge_sql = self._merge_sql(table, staging, columns, conflict_columns, update_columns)
+
+            batch: List[Sequence[Any]] = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._load_batch(cursor, copy_sql, merge_sql, batch, key_indexes, json_indexes, result)
+                    batch = []
+            if batch:
+                self._load_batch(cursor, copy_sql, merge_sql, batch, key_indexes, json_indexes, result)
+        except Exception as e:
+            if cursor is not None:
+                self.conn.rollback()
+            result.errors.append(str(e))
+            self.logger.error(f"Bulk load into {table} stopped after {result.rows} rows: {e}")
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+        result.seconds = time.perf_counter() - started
+        self.logger.info(
+            f"Bulk loaded {result.rows} rows into {table} in {result.batches} batches "
+            f"({result.seconds:.2f}s, {result.rows_per_second:,.0f} rows/sec)"
+        )
+        return result
+
+    def _load_batch(self, cursor, copy_sql: str, merge_sql: str, batch: List[Sequence[Any]],
+                    key_indexes: List[int], json_indexes: List[int], result: BulkLoadResult):
+        batch_started = time.perf_counter()
+        if key_indexes:
+            batch = self._dedupe(batch, key_indexes)
+        cursor.copy_expert(copy_sql, rows_to_csv(batch, json_indexes))
+        cursor.execute(merge_sql)
+        self.conn.commit()
+
+        result.rows += len(batch)
+        result.batches += 1
+        elapsed = time.perf_counter() - batch_started
+        self.logger.debug(
+            f"{result.table} batch {result.batches}: {len(batch)} rows "
+            f"({len(batch) / elapsed if elapsed > 0 else 0:,.0f} rows/sec)"
+        )
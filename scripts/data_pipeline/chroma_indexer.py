@@ -0,0 +1,193 @@
+"""
+Incremental ChromaDB Indexing
+
+Gives every document a stable ID derived from its record key, remembers the
+content hash of what is already embedded in a local manifest, and upserts only
+new or changed documents in bounded batches. Documents previously indexed for
+the same scope (e.g. the same source file) that disappear from it are deleted.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_INDEX_BATCH_SIZE = 256
+DEFAULT_SCOPE = "default"
+
+# Metadata keys the indexer owns; documents without them are left alone
+HASH_KEY = "content_hash"
+SCOPE_KEY = "index_scope"
+
+
+def stable_document_id(prefix: str, key: Any) -> str:
+    """Deterministic document ID for a record key (case and whitespace insensitive)"""
+    normalized = " ".join(str(key).split()).lower()
+    return f"{prefix}_{hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:20]}"
+
+
+def content_hash(document: str, metadata: Dict[str, Any]) -> str:
+    """Hash of everything that ends up in the collection for a document"""
+    payload = json.dumps([document, metadata], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class IndexSyncResult:
+    """Counts from one incremental sync"""
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    @property
+    def written(self) -> int:
+        return self.added + self.updated
+
+
+class ChromaIndexer:
+    """Keeps one Chroma collection in sync with a dataset, embedding only what changed"""
+
+    def __init__(self, collection, manifest_dir: str, batch_size: int = DEFAULT_INDEX_BATCH_SIZE,
+                 logger: Optional[logging.Logger] = None):
+        self.collection = collection
+        self.batch_size = max(int(batch_size), 1)
+        self.manifest_path = os.path.join(manifest_dir, f"{collection.name}.json")
+        self.logger = logger or logging.getLogger(__name__)
+        self._manifest: Optional[Dict[str, Dict[str, str]]] = None
+        # Scopes being synced across several calls: scope -> IDs seen so far
+        self._open_scopes: Dict[str, set] = {}
+
+    # Manifest -----------------------------------------------------------
+
+    def _load_manifest(self) -> Dict[str, Dict[str, str]]:
+        if self._manifest is not None:
+            return self._manifest
+
+        manifest = None
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable index manifest {self.manifest_path}: {e}")
+
+        # A missing manifest, or one the collection no longer backs (e.g. the
+        # collection was reset), is rebuilt from the hashes stored in metadata
+        if manifest is None or self.collection.count() < len(manifest):
+            manifest = self._manifest_from_collection()
+            self._manifest = manifest
+            self._save_manifest()
+        self._manifest = manifest
+        return manifest
+
+    def _manifest_from_collection(self) -> Dict[str, Dict[str, str]]:
+        stored = self.collection.get(include=["metadatas"])
+        manifest = {}
+        for doc_id, metadata in zip(stored.get("ids") or [], stored.get("metadatas") or []):
+            if metadata and HASH_KEY in metadata:
+                manifest[doc_id] = {"hash": metadata[HASH_KEY], "scope": metadata.get(SCOPE_KEY, DEFAULT_SCOPE)}
+        self.logger.info(f"Rebuilt index manifest for {self.collection.name} with {len(manifest)} documents")
+        return manifest
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    # Sync ---------------------------------------------------------------
+
+    def sync(self, documents: Iterable[Tuple[str, str, Dict[str, Any]]], scope: str = DEFAULT_SCOPE,
+             prune: bool = True) -> IndexSyncResult:
+        """
+        Upsert new/changed ``(doc_id, document, metadata)`` entries for ``scope``.
+
+        With ``prune``, documents indexed earlier under the same scope that are
+        absent from ``documents`` are deleted from the collection. While the
+        scope is open (see ``open_scope``) pruning waits for ``close_scope``.
+        """
+        manifest = self._load_manifest()
+        result = IndexSyncResult()
+        seen = set()
+        pending: Dict[str, Tuple[str, Dict[str, Any], str]] = {}
+
+        for doc_id, document, metadata in documents:
+            if doc_id in seen:
+                # Later duplicates of a key win, as with a plain upsert
+                pending.pop(doc_id, None)
+            else:
+                seen.add(doc_id)
+            digest = content_hash(document, metadata)
+            known = manifest.get(doc_id)
+            if known is not None and known["hash"] == digest and known["scope"] == scope:
+                continue
+            pending[doc_id] = (document, {**metadata, HASH_KEY: digest, SCOPE_KEY: scope}, digest)
+
+        for doc_id in pending:
+            if doc_id in manifest:
+                result.updated += 1
+            else:
+                result.added += 1
+        result.unchanged = len(seen) - len(pending)
+
+        items = list(pending.items())
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            self.collection.upsert(
+                ids=[doc_id for doc_id, _ in batch],
+                documents=[document for _, (document, _, _) in batch],
+                metadatas=[metadata for _, (_, metadata, _) in batch],
+            )
+            for doc_id, (_, _, digest) in batch:
+                manifest[doc_id] = {"hash": digest, "scope": scope}
+            # Persist after each batch so an interrupted run resumes where it stopped
+            self._save_manifest()
+
+        if scope in self._open_scopes:
+            self._open_scopes[scope].update(seen)
+        elif prune:
+            result.deleted = self._prune(scope, seen)
+
+        self.logger.info(
+            f"Indexed {self.collection.name} [{scope}]: {result.added} added, {result.updated} updated, "
+            f"{result.unchanged} unchanged, {result.deleted} deleted"
+        )
+        return result
+
+    def _prune(self, scope: str, keep: set) -> int:
+        manifest = self._load_manifest()
+        stale = [doc_id for doc_id, entry in manifest.items() if entry["scope"] == scope and doc_id not in keep]
+        return self.delete(stale)
+
+    def open_scope(self, scope: str):
+        """Treat the following syncs for ``scope`` as one dataset delivered in parts"""
+        self._open_scopes[scope] = set()
+
+    def close_scope(self, scope: str, prune: bool = True) -> int:
+        """
+        End a scope opened with ``open_scope``. With ``prune``, documents of the
+        scope not seen by any sync since it opened are deleted. Returns the number deleted.
+        """
+        seen = self._open_scopes.pop(scope, None)
+        if seen is None or not prune:
+            return 0
+        deleted = self._prune(scope, seen)
+        if deleted:
+            self.logger.info(f"Pruned {deleted} documents from {self.collection.name} [{scope}]")
+        return deleted
+
+    def delete(self, doc_ids: List[str]) -> int:
+        """Delete documents from the collection and the manifest"""
+        manifest = self._load_manifest()
+        for start in range(0, len(doc_ids), self.batch_size):
+            batch = doc_ids[start:start + self.batch_size]
+            self.collection.delete(ids=batch)
+            for doc_id in batch:
+                manifest.pop(doc_id, None)
+            self._save_manifest()
+        return len(doc_ids)
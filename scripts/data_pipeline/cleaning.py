@@ -2,14 +2,187 @@
 Data Cleaning & Validation Layer
 
 Handles data cleaning, validation, and standardization for real estate data.
+
+A batch is cleaned column by column: regex normalisation runs as pandas
+``.str`` operations over the string cells of a field, alias lookups resolve
+each distinct value once through precompiled tables, and any cell that is not
+a plain string or number goes through the per-value helpers, so the output
+matches record-by-record cleaning.
 """
 
+import numpy as np
 import pandas as pd
 import re
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
 import logging
 from datetime import datetime
 
+# Alias tables: the first alias (in order) contained in the lowercased value wins
+PROPERTY_TYPE_ALIASES = {
+    'apartment': 'Apartment',
+    'flat': 'Apartment',
+    'condo': 'Apartment',
+    'condominium': 'Apartment',
+    'villa': 'Villa',
+    'house': 'Villa',
+    'townhouse': 'Townhouse',
+    'penthouse': 'Penthouse',
+    'studio': 'Studio',
+    'duplex': 'Duplex',
+    'maisonette': 'Maisonette',
+    'loft': 'Loft'
+}
+
+AREA_ALIASES = {
+    'dubai marina': 'Dubai Marina',
+    'downtown dubai': 'Downtown Dubai',
+    'palm jumeirah': 'Palm Jumeirah',
+    'business bay': 'Business Bay',
+    'dubai hills estate': 'Dubai Hills Estate',
+    'jbr': 'Jumeirah Beach Residence',
+    'jumeirah beach residence': 'Jumeirah Beach Residence',
+    'dubai silicon oasis': 'Dubai Silicon Oasis',
+    'dubai sports city': 'Dubai Sports City',
+    'dubai production city': 'Dubai Production City',
+    'dubai creek harbour': 'Dubai Creek Harbour',
+    'dubai land': 'Dubai Land',
+    'dubai internet city': 'Dubai Internet City',
+    'dubai media city': 'Dubai Media City',
+    'dubai knowledge park': 'Dubai Knowledge Park',
+    'dubai healthcare city': 'Dubai Healthcare City',
+    'dubai international city': 'Dubai International City',
+    'dubai motor city': 'Dubai Motor City',
+    'dubai studio city': 'Dubai Studio City',
+    'dubai academic city': 'Dubai Academic City'
+}
+
+DEVELOPER_ALIASES = {
+    'emaar properties': 'Emaar Properties',
+    'nakheel': 'Nakheel',
+    'damac': 'DAMAC',
+    'sobek': 'Sobek',
+    'meydan': 'Meydan',
+    'mashreq': 'Mashreq',
+    'union properties': 'Union Properties',
+    'dubai properties': 'Dubai Properties',
+    'dubai holding': 'Dubai Holding'
+}
+
+AMENITY_ALIASES = {
+    'pool': 'Swimming Pool',
+    'gym': 'Gymnasium',
+    'parking': 'Parking',
+    'elevator': 'Elevator',
+    'ac': 'Air Conditioning',
+    'balcony': 'Balcony',
+    'garden': 'Garden',
+    'security': 'Security',
+    'concierge': 'Concierge',
+    'playground': 'Playground',
+    'bbq': 'BBQ Area',
+    'tennis': 'Tennis Court',
+    'basketball': 'Basketball Court',
+    'football': 'Football Field'
+}
+
+_WHITESPACE = re.compile(r'\s+')
+ADDRESS_ABBREVIATIONS = {
+    'St': 'Street',
+    'Ave': 'Avenue',
+    'Rd': 'Road',
+    'Blvd': 'Boulevard',
+    'Dr': 'Drive',
+}
+# One pass replaces them all: no expansion contains another abbreviation as a word
+_ADDRESS_ABBREVIATION = re.compile(r'\b(?:' + '|'.join(ADDRESS_ABBREVIATIONS) + r')\b')
+_ADDRESS_SPECIAL_CHARS = re.compile(r'[^\w\s\-\.\,\#]')
+_HTML_TAG = re.compile(r'<[^>]+>')
+_FIRST_NUMBER = re.compile(r'(\d+)')
+_NON_PRICE_CHARS = re.compile(r'[^\d\.]')
+_AMENITY_DELIMITERS = re.compile(r'[,;|]')
+DESCRIPTION_MAX_LENGTH = 1000
+
+# Floats in this range print without an exponent, so str() digits are the plain value
+_PLAIN_FLOAT_MIN, _PLAIN_FLOAT_MAX = 1e-4, 1e16
+_MEMO_MAX_ENTRIES = 65536
+_MISSING = object()
+
+
+def first_alias_match(value: str, aliases: Dict[str, str]) -> Optional[str]:
+    """Canonical name of the first alias contained in ``value`` (already lowercased)"""
+    for key, canonical in aliases.items():
+        if key in value:
+            return canonical
+    return None
+
+
+class AliasTable:
+    """
+    Alias map compiled into hash lookups: every alias resolves exactly, and
+    other values are scanned once and remembered (bounded).
+    """
+
+    def __init__(self, aliases: Dict[str, str]):
+        self.aliases = aliases
+        self.exact = {key: first_alias_match(key, aliases) for key in aliases}
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def resolve(self, lowered: str) -> Optional[str]:
+        canonical = self.exact.get(lowered, _MISSING)
+        if canonical is _MISSING:
+            canonical = self._memo.get(lowered, _MISSING)
+            if canonical is _MISSING:
+                if len(self._memo) >= _MEMO_MAX_ENTRIES:
+                    self._memo.clear()
+                canonical = self._memo[lowered] = first_alias_match(lowered, self.aliases)
+        return canonical
+
+
+PROPERTY_TYPE_TABLE = AliasTable(PROPERTY_TYPE_ALIASES)
+AREA_TABLE = AliasTable(AREA_ALIASES)
+DEVELOPER_TABLE = AliasTable(DEVELOPER_ALIASES)
+AMENITY_TABLE = AliasTable(AMENITY_ALIASES)
+
+
+def _expand_abbreviation(match: 're.Match') -> str:
+    return ADDRESS_ABBREVIATIONS[match.group(0)]
+
+
+def _pick(data: Sequence[Dict[str, Any]], keys: Sequence[str]) -> List[Any]:
+    """Per record, the value of the first of ``keys`` present, or _MISSING"""
+    if len(keys) == 1:
+        key = keys[0]
+        return [item[key] if key in item else _MISSING for item in data]
+    picked = []
+    for item in data:
+        for key in keys:
+            if key in item:
+                picked.append(item[key])
+                break
+        else:
+            picked.append(_MISSING)
+    return picked
+
+
+def _string_positions(values: Sequence[Any]) -> List[int]:
+    return [i for i, value in enumerate(values) if type(value) is str and value]
+
+
+def _plain_number(value: Any) -> bool:
+    """Ints and finite floats whose str() has no exponent; bools excluded"""
+    kind = type(value)
+    if kind is int:
+        return True
+    if kind is float or isinstance(value, np.floating):
+        magnitude = abs(value)
+        return magnitude == 0 or _PLAIN_FLOAT_MIN <= magnitude < _PLAIN_FLOAT_MAX
+    return False
+
+
+def _numbers(values: Sequence[Any]) -> np.ndarray:
+    """Float column of the values, NaN where missing"""
+    return np.array([np.nan if value is None or value is _MISSING else value for value in values], dtype=float)
+
 class DataCleaner:
     """Handles data cleaning and validation"""
     
@@ -18,110 +191,212 @@ class DataCleaner:
         self.logger = logging.getLogger(__name__)
         
     def clean_property_data(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Clean property listing data"""
+        """
+        Clean property listing data column-wise.
+
+        Produces the same records as cleaning record by record with the
+        scalar helpers, except that one ``cleaned_at`` timestamp is shared by
+        the batch.
+        """
+        if not data:
+            return []
+
+        cleaned_at = datetime.now().isoformat()
+        columns: List[Tuple[str, List[Any]]] = [
+            ('address', self._clean_column(_pick(data, ['address']), self._clean_address, self._clean_address_strings)),
+            ('price_aed', self._clean_price_column(_pick(data, ['price', 'price_aed']))),
+            ('bedrooms', self._extract_number_column(_pick(data, ['bedrooms']))),
+            ('bathrooms', self._extract_number_column(_pick(data, ['bathrooms']))),
+            ('square_feet', self._extract_number_column(_pick(data, ['square_feet', 'sqft', 'area_sqft']))),
+            ('property_type', self._clean_column(_pick(data, ['property_type', 'type']),
+                                                 self._standardize_property_type, self._each(self._standardize_property_type))),
+            ('area', self._clean_column(_pick(data, ['area', 'neighborhood', 'location']),
+                                        self._standardize_area, self._each(self._standardize_area))),
+            ('developer', self._clean_column(_pick(data, ['developer']),
+                                             self._clean_developer, self._each(self._clean_developer))),
+            ('amenities', self._clean_amenities_column(_pick(data, ['amenities']))),
+            ('description', self._clean_column(_pick(data, ['description']),
+                                               self._clean_description, self._clean_description_strings)),
+        ]
+        flags = self._validation_flags_column(dict(columns), len(data))
+
         cleaned_data = []
-        
-        for item in data:
+        for i in range(len(data)):
             cleaned_item = {}
-            
-            # Clean address
-            if 'address' in item:
-                cleaned_item['address'] = self._clean_address(item['address'])
-            
-            # Clean price
-            if 'price' in item:
-                cleaned_item['price_aed'] = self._clean_price(item['price'])
-            elif 'price_aed' in item:
-                cleaned_item['price_aed'] = self._clean_price(item['price_aed'])
-            
-            # Clean bedrooms/bathrooms
-            if 'bedrooms' in item:
-                cleaned_item['bedrooms'] = self._extract_number(item['bedrooms'])
-            if 'bathrooms' in item:
-                cleaned_item['bathrooms'] = self._extract_number(item['bathrooms'])
-            
-            # Clean square footage
-            if 'square_feet' in item:
-                cleaned_item['square_feet'] = self._extract_number(item['square_feet'])
-            elif 'sqft' in item:
-                cleaned_item['square_feet'] = self._extract_number(item['sqft'])
-            elif 'area_sqft' in item:
-                cleaned_item['square_feet'] = self._extract_number(item['area_sqft'])
-            
-            # Standardize property type
-            if 'property_type' in item:
-                cleaned_item['property_type'] = self._standardize_property_type(item['property_type'])
-            elif 'type' in item:
-                cleaned_item['property_type'] = self._standardize_property_type(item['type'])
-            
-            # Clean area/neighborhood
-            if 'area' in item:
-                cleaned_item['area'] = self._standardize_area(item['area'])
-            elif 'neighborhood' in item:
-                cleaned_item['area'] = self._standardize_area(item['neighborhood'])
-            elif 'location' in item:
-                cleaned_item['area'] = self._standardize_area(item['location'])
-            
-            # Clean developer
-            if 'developer' in item:
-                cleaned_item['developer'] = self._clean_developer(item['developer'])
-            
-            # Clean amenities
-            if 'amenities' in item:
-                cleaned_item['amenities'] = self._clean_amenities(item['amenities'])
-            
-            # Clean description
-            if 'description' in item:
-                cleaned_item['description'] = self._clean_description(item['description'])
-            
-            # Add validation flags
-            cleaned_item['validation_flags'] = self._validate_property_data(cleaned_item)
-            
-            # Add cleaning metadata
-            cleaned_item['cleaned_at'] = datetime.now().isoformat()
-            
+            for name, values in columns:
+                value = values[i]
+                if value is not _MISSING:
+                    cleaned_item[name] = value
+            cleaned_item['validation_flags'] = flags[i]
+            cleaned_item['cleaned_at'] = cleaned_at
             cleaned_data.append(cleaned_item)
-        
+
         return cleaned_data
-    
+
+    # Column cleaners (one list of raw values in, one list of cleaned values out)
+
+    def _clean_column(self, values: List[Any], scalar: Callable[[Any], Any],
+                      strings: Callable[[List[str]], List[Any]]) -> List[Any]:
+        """
+        Distinct non-empty str cells go through ``strings`` in one call,
+        everything else through ``scalar``.
+        """
+        cleaned = [value if value is _MISSING else None for value in values]
+        positions = _string_positions(values)
+        for i, value in enumerate(values):
+            if value is not _MISSING and not (type(value) is str and value):
+                cleaned[i] = scalar(value)
+        if positions:
+            distinct = list(dict.fromkeys(values[i] for i in positions))
+            results = dict(zip(distinct, strings(distinct)))
+            for i in positions:
+                cleaned[i] = results[values[i]]
+        return cleaned
+
+    @staticmethod
+    def _each(scalar: Callable[[str], Any]) -> Callable[[List[str]], List[Any]]:
+        def apply(strings: List[str]) -> List[Any]:
+            return [scalar(value) for value in strings]
+        return apply
+
+    def _clean_address_strings(self, addresses: List[str]) -> List[str]:
+        series = pd.Series(addresses, dtype=object).str.strip().str.replace(_WHITESPACE, ' ', regex=True)
+        series = series.str.replace(_ADDRESS_ABBREVIATION, _expand_abbreviation, regex=True)
+        return series.str.replace(_ADDRESS_SPECIAL_CHARS, '', regex=True).tolist()
+
+    def _clean_description_strings(self, descriptions: List[str]) -> List[str]:
+        series = pd.Series(descriptions, dtype=object).str.strip().str.replace(_WHITESPACE, ' ', regex=True)
+        series = series.str.replace(_HTML_TAG, '', regex=True)
+        too_long = series.str.len() > DESCRIPTION_MAX_LENGTH
+        if too_long.any():
+            series[too_long] = series[too_long].str[:DESCRIPTION_MAX_LENGTH] + "..."
+        return series.tolist()
+
+    def _clean_price_column(self, values: List[Any]) -> List[Any]:
+        """Numbers become their absolute value (what stripping non-digits from str() gives)"""
+        cleaned = []
+        for value in values:
+            if value is _MISSING:
+                cleaned.append(_MISSING)
+            elif not value:
+                cleaned.append(None)
+            elif _plain_number(value):
+                cleaned.append(float(abs(value)))
+            elif isinstance(value, float) and value != value:
+                cleaned.append(None)
+            else:
+                cleaned.append(self._parse_price(value))
+
+        prices = _numbers(cleaned)
+        out_of_range = int(np.count_nonzero((prices < 100000) | (prices > 100000000)))
+        if out_of_range:
+            self.logger.warning(f"{out_of_range} prices seem outside reasonable range")
+        return cleaned
+
+    def _extract_number_column(self, values: List[Any]) -> List[Any]:
+        """First run of digits: the integer part for plain numbers, a vectorized regex for strings"""
+        cleaned: List[Any] = [None] * len(values)
+        positions = []
+        for i, value in enumerate(values):
+            if value is _MISSING:
+                cleaned[i] = _MISSING
+            elif not value:
+                continue
+            elif type(value) is str:
+                positions.append(i)
+            elif _plain_number(value):
+                cleaned[i] = int(abs(value))
+            else:
+                cleaned[i] = self._extract_number(value)
+        if positions:
+            digits = pd.Series([values[i] for i in positions], dtype=object).str.extract(_FIRST_NUMBER, expand=False)
+            for i, number in zip(positions, digits.tolist()):
+                if isinstance(number, str):
+                    cleaned[i] = int(number)
+        return cleaned
+
+    def _clean_amenities_column(self, values: List[Any]) -> List[Any]:
+        """Amenity strings are cleaned once per distinct value; each record gets its own list"""
+        results: Dict[str, List[str]] = {}
+        cleaned = []
+        for value in values:
+            if value is _MISSING:
+                cleaned.append(_MISSING)
+            elif type(value) is str:
+                result = results.get(value)
+                if result is None:
+                    result = results[value] = self._clean_amenities(value)
+                cleaned.append(list(result))
+            else:
+                cleaned.append(self._clean_amenities(value))
+        return cleaned
+
+    def _validation_flags_column(self, columns: Dict[str, List[Any]], count: int) -> List[Dict[str, bool]]:
+        """``_validate_property_data`` for every record, computed on NumPy columns"""
+        def present(name: str) -> List[bool]:
+            return [value is not None and value is not _MISSING for value in columns[name]]
+
+        def truthy(name: str) -> List[bool]:
+            return [value is not _MISSING and bool(value) for value in columns[name]]
+
+        def within(name: str, low: float, high: float) -> List[bool]:
+            values = np.nan_to_num(_numbers(columns[name]), nan=0.0)
+            return ((values != 0) & (values >= low) & (values <= high)).tolist()
+
+        flag_columns = {
+            'has_address': truthy('address'),
+            'has_price': present('price_aed'),
+            'has_bedrooms': present('bedrooms'),
+            'has_bathrooms': present('bathrooms'),
+            'has_square_feet': present('square_feet'),
+            'has_area': truthy('area'),
+            'has_property_type': truthy('property_type'),
+            'price_reasonable': within('price_aed', 200000, 50000000),
+            'bedrooms_reasonable': within('bedrooms', 0, 10),
+            'bathrooms_reasonable': within('bathrooms', 1, 8),
+            'square_feet_reasonable': within('square_feet', 300, 20000),
+        }
+        names = list(flag_columns)
+        return [dict(zip(names, row)) for row in zip(*flag_columns.values())] if count else []
+
+    # Per-value helpers
+
     def _clean_address(self, address: str) -> str:
         """Clean and standardize address"""
         if not address:
             return ""
         
         # Remove extra whitespace
-        address = re.sub(r'\s+', ' ', address.strip())
+        address = _WHITESPACE.sub(' ', address.strip())
         
         # Standardize common abbreviations
-        address = re.sub(r'\bSt\b', 'Street', address)
-        address = re.sub(r'\bAve\b', 'Avenue', address)
-        address = re.sub(r'\bRd\b', 'Road', address)
-        address = re.sub(r'\bBlvd\b', 'Boulevard', address)
-        address = re.sub(r'\bDr\b', 'Drive', address)
+        address = _ADDRESS_ABBREVIATION.sub(_expand_abbreviation, address)
         
         # Remove special characters but keep essential ones
-        address = re.sub(r'[^\w\s\-\.\,\#]', '', address)
+        address = _ADDRESS_SPECIAL_CHARS.sub('', address)
         
         return address
     
     def _clean_price(self, price: Any) -> Optional[float]:
         """Extract and clean price in AED"""
+        price_float = self._parse_price(price)
+        
+        # Validate reasonable price range for Dubai
+        if price_float is not None and (price_float < 100000 or price_float > 100000000):
+            self.logger.warning(f"Price {price_float} seems outside reasonable range")
+        
+        return price_float
+    
+    def _parse_price(self, price: Any) -> Optional[float]:
+        """Price as a float: digits and dots of the value, None when empty or unparseable"""
         if not price:
             return None
         
-        price_str = str(price)
-        
         # Remove currency symbols, commas, and spaces
-        price_str = re.sub(r'[^\d\.]', '', price_str)
+        price_str = _NON_PRICE_CHARS.sub('', str(price))
         
         try:
-            price_float = float(price_str)
-            
-            # Validate reasonable price range for Dubai
-            if price_float < 100000 or price_float > 100000000:
-                self.logger.warning(f"Price {price_float} seems outside reasonable range")
-            
-            return price_float
+            return float(price_str)
         except ValueError:
             return None
     
@@ -130,11 +405,10 @@ class DataCleaner:
         if not value:
             return None
         
-        value_str = str(value)
-        numbers = re.findall(r'\d+', value_str)
+        match = _FIRST_NUMBER.search(str(value))
         
-        if numbers:
-            return int(numbers[0])
+        if match:
+            return int(match.group(1))
         return None
     
     def _standardize_property_type(self, prop_type: str) -> str:
@@ -142,64 +416,14 @@ class DataCleaner:
         if not prop_type:
             return "Unknown"
         
-        prop_type_lower = prop_type.lower()
-        
-        type_mapping = {
-            'apartment': 'Apartment',
-            'flat': 'Apartment',
-            'condo': 'Apartment',
-            'condominium': 'Apartment',
-            'villa': 'Villa',
-            'house': 'Villa',
-            'townhouse': 'Townhouse',
-            'penthouse': 'Penthouse',
-            'studio': 'Studio',
-            'duplex': 'Duplex',
-            'maisonette': 'Maisonette',
-            'loft': 'Loft'
-        }
-        
-        for key, value in type_mapping.items():
-            if key in prop_type_lower:
-                return value
-        
-        return prop_type.title()
+        return PROPERTY_TYPE_TABLE.resolve(prop_type.lower()) or prop_type.title()
     
     def _standardize_area(self, area: str) -> str:
         """Standardize Dubai area names"""
         if not area:
             return "Unknown"
         
-        area_lower = area.lower()
-        
-        area_mapping = {
-            'dubai marina': 'Dubai Marina',
-            'downtown dubai': 'Downtown Dubai',
-            'palm jumeirah': 'Palm Jumeirah',
-            'business bay': 'Business Bay',
-            'dubai hills estate': 'Dubai Hills Estate',
-            'jbr': 'Jumeirah Beach Residence',
-            'jumeirah beach residence': 'Jumeirah Beach Residence',
-            'dubai silicon oasis': 'Dubai Silicon Oasis',
-            'dubai sports city': 'Dubai Sports City',
-            'dubai production city': 'Dubai Production City',
-            'dubai creek harbour': 'Dubai Creek Harbour',
-            'dubai land': 'Dubai Land',
-            'dubai internet city': 'Dubai Internet City',
-            'dubai media city': 'Dubai Media City',
-            'dubai knowledge park': 'Dubai Knowledge Park',
-            'dubai healthcare city': 'Dubai Healthcare City',
-            'dubai international city': 'Dubai International City',
-            'dubai motor city': 'Dubai Motor City',
-            'dubai studio city': 'Dubai Studio City',
-            'dubai academic city': 'Dubai Academic City'
-        }
-        
-        for key, value in area_mapping.items():
-            if key in area_lower:
-                return value
-        
-        return area.title()
+        return AREA_TABLE.resolve(area.lower()) or area.title()
     
     def _clean_developer(self, developer: str) -> str:
         """Clean developer name"""
@@ -207,27 +431,9 @@ class DataCleaner:
             return "Unknown"
         
         # Remove extra whitespace and standardize
-        developer = re.sub(r'\s+', ' ', developer.strip())
-        
-        # Common developer name mappings
-        developer_mapping = {
-            'emaar properties': 'Emaar Properties',
-            'nakheel': 'Nakheel',
-            'damac': 'DAMAC',
-            'sobek': 'Sobek',
-            'meydan': 'Meydan',
-            'mashreq': 'Mashreq',
-            'union properties': 'Union Properties',
-            'dubai properties': 'Dubai Properties',
-            'dubai holding': 'Dubai Holding'
-        }
-        
-        developer_lower = developer.lower()
-        for key, value in developer_mapping.items():
-            if key in developer_lower:
-                return value
+        developer = _WHITESPACE.sub(' ', developer.strip())
         
-        return developer.title()
+        return DEVELOPER_TABLE.resolve(developer.lower()) or developer.title()
     
     def _clean_amenities(self, amenities: Any) -> List[str]:
         """Clean and standardize amenities"""
@@ -236,7 +442,7 @@ class DataCleaner:
         
         if isinstance(amenities, str):
             # Split by common delimiters
-            amenities_list = re.split(r'[,;|]', amenities)
+            amenities_list = _AMENITY_DELIMITERS.split(amenities)
         elif isinstance(amenities, list):
             amenities_list = amenities
         else:
@@ -247,32 +453,7 @@ class DataCleaner:
             cleaned = amenity.strip().lower()
             if cleaned:
                 # Standardize common amenities
-                amenity_mapping = {
-                    'pool': 'Swimming Pool',
-                    'gym': 'Gymnasium',
-                    'parking': 'Parking',
-                    'elevator': 'Elevator',
-                    'ac': 'Air Conditioning',
-                    'balcony': 'Balcony',
-                    'garden': 'Garden',
-                    'security': 'Security',
-                    'concierge': 'Concierge',
-                    'playground': 'Playground',
-                    'bbq': 'BBQ Area',
-                    'tennis': 'Tennis Court',
-                    'basketball': 'Basketball Court',
-                    'football': 'Football Field'
-                }
-                
-                found = False
-                for key, value in amenity_mapping.items():
-                    if key in cleaned:
-                        cleaned_amenities.append(value)
-                        found = True
-                        break
-                
-                if not found:
-                    cleaned_amenities.append(amenity.strip().title())
+                cleaned_amenities.append(AMENITY_TABLE.resolve(cleaned) or amenity.strip().title())
         
         return list(set(cleaned_amenities))  # Remove duplicates
     
@@ -282,14 +463,14 @@ class DataCleaner:
             return ""
         
         # Remove extra whitespace
-        description = re.sub(r'\s+', ' ', description.strip())
+        description = _WHITESPACE.sub(' ', description.strip())
         
         # Remove HTML tags if present
-        description = re.sub(r'<[^>]+>', '', description)
+        description = _HTML_TAG.sub('', description)
         
         # Limit length
-        if len(description) > 1000:
-            description = description[:1000] + "..."
+        if len(description) > DESCRIPTION_MAX_LENGTH:
+            description = description[:DESCRIPTION_MAX_LENGTH] + "..."
         
         return description
     
@@ -340,12 +521,19 @@ class DataCleaner:
         
         return 300 <= square_feet <= 20000
     
-    def remove_duplicates(self, data: List[Dict[str, Any]], key_fields: List[str] = None) -> List[Dict[str, Any]]:
-        """Remove duplicate records based on key fields"""
+    def remove_duplicates(self, data: List[Dict[str, Any]], key_fields: List[str] = None,
+                          seen: Optional[set] = None) -> List[Dict[str, Any]]:
+        """
+        Remove duplicate records based on key fields.
+        
+        Pass the same ``seen`` set across calls to deduplicate a file that is
+        processed in chunks.
+        """
         if key_fields is None:
             key_fields = ['address', 'price_aed', 'bedrooms']
         
-        seen = set()
+        if seen is None:
+            seen = set()
         unique_data = []
         
         for item in data:
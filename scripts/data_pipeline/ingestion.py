@@ -9,7 +9,7 @@ import PyPDF2
 import openpyxl
 import requests
 from pathlib import Path
-from typing import Dict, List, Any, Union, Optional
+from typing import Dict, Iterator, List, Any, Union, Optional
 import logging
 import json
 from datetime import datetime
@@ -143,6 +143,49 @@ class DataIngestion:
             self.logger.error(f"Error processing JSON {file_path}: {e}")
             return None
     
+    def iter_record_chunks(self, file_path: str, chunk_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream the records of a CSV, Excel or JSON file in lists of at most
+        ``chunk_size`` rows instead of materialising the whole file.
+        
+        Errors propagate to the caller, which owns per-file error reporting.
+        """
+        suffix = Path(file_path).suffix.lower()
+        
+        if suffix == '.csv':
+            for frame in pd.read_csv(file_path, chunksize=chunk_size):
+                yield frame.to_dict('records')
+        
+        elif suffix == '.xlsx':
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                chunk = []
+                for sheet in workbook.worksheets:
+                    rows = sheet.iter_rows(values_only=True)
+                    headers = next(rows, None)
+                    if not headers:
+                        continue
+                    for row in rows:
+                        chunk.append(dict(zip(headers, row)))
+                        if len(chunk) >= chunk_size:
+                            yield chunk
+                            chunk = []
+                if chunk:
+                    yield chunk
+            finally:
+                workbook.close()
+        
+        elif suffix == '.json':
+            # The json module has no incremental parser; chunk the parsed list
+            with open(file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            records = data if isinstance(data, list) else [data]
+            for start in range(0, len(records), chunk_size):
+                yield records[start:start + chunk_size]
+        
+        else:
+            raise ValueError(f"Unsupported file type for streaming: {suffix}")
+    
     def ingest_directory(self, directory_path: str, file_types: List[str] = None) -> List[Dict[str, Any]]:
         """Ingest all files of specified types from a directory"""
         if file_types is None:
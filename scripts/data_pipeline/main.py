@@ -15,6 +15,7 @@ from .ingestion import DataIngestion
 from .cleaning import DataCleaner
 from .enrichment import DataEnricher
 from .storage import DataStorage
+from .staged import StagedPipeline
 
 class DataPipeline:
     """Main data processing pipeline orchestrator"""
@@ -131,7 +132,8 @@ class DataPipeline:
             self.storage.create_tables_if_not_exist()
             
             pg_success = self.storage.store_properties_postgres(enriched_data)
-            chroma_success = self.storage.store_properties_chroma(enriched_data)
+            # Scoped by source file so listings dropped from the file leave the index
+            chroma_success = self.storage.store_properties_chroma(enriched_data, scope=input_path)
             
             if pg_success and chroma_success:
                 processing_result['records_stored'] = len(enriched_data)
@@ -363,7 +365,14 @@ class DataPipeline:
         return validation_result
     
     def run_batch_processing(self, input_directory: str, file_types: List[str] = None) -> Dict[str, Any]:
-        """Run batch processing on all files in a directory"""
+        """
+        Run batch processing on all files in a directory.
+        
+        Files are streamed in chunks of ``processing.batch_size`` records through
+        concurrent stages; cleaning and enrichment use ``processing.max_workers``
+        processes (all cores when 0). Per-stage throughput and backpressure are
+        returned under ``stage_stats``.
+        """
         if file_types is None:
             file_types = ['csv', 'xlsx', 'json']
         
@@ -390,35 +399,25 @@ class DataPipeline:
             
             batch_result['total_files'] = len(files_to_process)
             
-            for file_path in files_to_process:
-                try:
-                    self.logger.info(f"Processing file: {file_path}")
-                    result = self.process_property_data(str(file_path))
-                    
-                    batch_result['file_results'].append({
-                        'file': str(file_path),
-                        'success': result['success'],
-                        'records_processed': result['records_processed'],
-                        'records_stored': result['records_stored'],
-                        'errors': result['errors']
-                    })
-                    
-                    if result['success']:
-                        batch_result['successful_files'] += 1
-                        batch_result['total_records_processed'] += result['records_processed']
-                        batch_result['total_records_stored'] += result['records_stored']
-                    else:
-                        batch_result['failed_files'] += 1
-                        
-                except Exception as e:
+            # Files stream through ingest -> clean/enrich (process pool) -> store stages
+            file_results, stage_stats = StagedPipeline(self).run(files_to_process)
+            batch_result['stage_stats'] = stage_stats
+            
+            for result in file_results:
+                batch_result['file_results'].append({
+                    'file': result['file'],
+                    'success': result['success'],
+                    'records_processed': result['records_processed'],
+                    'records_stored': result['records_stored'],
+                    'errors': result['errors']
+                })
+                
+                if result['success']:
+                    batch_result['successful_files'] += 1
+                    batch_result['total_records_processed'] += result['records_processed']
+                    batch_result['total_records_stored'] += result['records_stored']
+                else:
                     batch_result['failed_files'] += 1
-                    batch_result['file_results'].append({
-                        'file': str(file_path),
-                        'success': False,
-                        'records_processed': 0,
-                        'records_stored': 0,
-                        'errors': [str(e)]
-                    })
             
             batch_result['processing_time'] = time.time() - start_time
             
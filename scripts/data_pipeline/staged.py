@@ -0,0 +1,356 @@
+"""
+Staged Batch Processing
+
+Runs ingest -> clean/enrich -> store as concurrent stages connected by bounded
+queues. Files are streamed in record chunks; the CPU-bound cleaning and
+enrichment of each chunk runs on a process pool while the ingest and store
+stages run on threads. A full queue blocks its producer, so memory stays
+bounded by the queue sizes and the time each stage spends blocked is reported
+as backpressure.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from .cleaning import DataCleaner
+from .enrichment import DataEnricher
+
+_DONE = object()
+
+
+@dataclass
+class RecordChunk:
+    """A slice of one source file's records on its way through the stages"""
+    source: str
+    index: int
+    records: List[Dict[str, Any]]
+    raw_count: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class FileEnd:
+    """Marks that every chunk of ``source`` has been emitted"""
+    source: str
+    error: Optional[str] = None
+
+
+@dataclass
+class StageStats:
+    """Throughput and backpressure counters for one stage"""
+    name: str
+    workers: int = 1
+    chunks: int = 0
+    records: int = 0
+    busy_seconds: float = 0.0
+    waiting_input_seconds: float = 0.0
+    blocked_output_seconds: float = 0.0
+
+    def as_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        capacity = wall_seconds * self.workers
+        return {
+            'chunks': self.chunks,
+            'records': self.records,
+            'workers': self.workers,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'records_per_second': round(self.records / self.busy_seconds, 1) if self.busy_seconds else 0.0,
+            'utilisation': round(self.busy_seconds / capacity, 3) if capacity else 0.0,
+            'waiting_input_seconds': round(self.waiting_input_seconds, 3),
+            # Time spent blocked on a full downstream queue
+            'blocked_output_seconds': round(self.blocked_output_seconds, 3),
+        }
+
+
+@dataclass
+class _FileState:
+    started: float
+    records_processed: int = 0
+    records_stored: int = 0
+    duplicates_removed: int = 0
+    errors: List[str] = field(default_factory=list)
+    validation_flags: List[Dict[str, bool]] = field(default_factory=list)
+    seen_keys: set = field(default_factory=set)
+    scope_open: bool = False
+
+
+# Per-process cleaner/enricher, created once by the pool initializer
+_worker_cleaner: Optional[DataCleaner] = None
+_worker_enricher: Optional[DataEnricher] = None
+
+
+def _init_worker(config: Dict[str, Any]):
+    global _worker_cleaner, _worker_enricher
+    _worker_cleaner = DataCleaner(config)
+    _worker_enricher = DataEnricher(config)
+
+
+def _transform_chunk(records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], float]:
+    """Clean and enrich one chunk in a worker process; returns (records, cpu seconds)"""
+    started = time.perf_counter()
+    cleaned = _worker_cleaner.clean_property_data(records)
+    enriched = _worker_enricher.enrich_property_data(cleaned) if cleaned else []
+    return enriched, time.perf_counter() - started
+
+
+class StagedPipeline:
+    """Streams many files through ingest, clean/enrich and store stages concurrently"""
+
+    def __init__(self, pipeline, chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        processing = pipeline.config.get('processing', {})
+        self.pipeline = pipeline
+        self.logger = logging.getLogger(__name__)
+        self.chunk_size = chunk_size or processing.get('batch_size') or 1000
+        # 0 / unset means every core, for nightly loads
+        self.max_workers = max_workers or processing.get('max_workers') or os.cpu_count() or 1
+        self.queue_size = queue_size or processing.get('queue_size') or 2 * self.max_workers
+
+    # Queue helpers that account waiting time to a stage ----------------------
+
+    @staticmethod
+    def _get(q: queue.Queue, stats: StageStats):
+        started = time.perf_counter()
+        item = q.get()
+        stats.waiting_input_seconds += time.perf_counter() - started
+        return item
+
+    @staticmethod
+    def _put(q: queue.Queue, item, stats: StageStats):
+        started = time.perf_counter()
+        q.put(item)
+        stats.blocked_output_seconds += time.perf_counter() - started
+
+    # Stages -------------------------------------------------------------------
+
+    def _ingest(self, files: List[Path], out_q: queue.Queue, stats: StageStats):
+        ingestion = self.pipeline.ingestion
+        try:
+            for file_path in files:
+                source = str(file_path)
+                self.logger.info(f"Processing file: {source}")
+                error = None
+                chunks = ingestion.iter_record_chunks(source, self.chunk_size)
+                index = 0
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        records = next(chunks, None)
+                    except Exception as e:
+                        error = f"Failed to ingest data: {e}"
+                        records = None
+                    stats.busy_seconds += time.perf_counter() - started
+                    if records is None:
+                        break
+                    stats.chunks += 1
+                    stats.records += len(records)
+                    self._put(out_q, RecordChunk(source, index, records, raw_count=len(records)), stats)
+                    index += 1
+                if error is None and index == 0:
+                    error = "Failed to ingest data"
+                self._put(out_q, FileEnd(source, error), stats)
+        finally:
+            out_q.put(_DONE)
+
+    def _transform(self, pool: ProcessPoolExecutor, in_q: queue.Queue, out_q: queue.Queue, stats: StageStats):
+        """Fan chunks out to the process pool and forward results in input order"""
+        in_flight: Deque[Tuple[Union[RecordChunk, FileEnd], Optional[Future]]] = deque()
+
+        def forward_head():
+            item, future = in_flight.popleft()
+            if future is not None:
+                waited = time.perf_counter()
+                try:
+                    enriched, cpu_seconds = future.result()
+                    stats.busy_seconds += cpu_seconds
+                    stats.chunks += 1
+                    stats.records += len(enriched)
+                    item = RecordChunk(item.source, item.index, enriched, raw_count=item.raw_count)
+                except Exception as e:
+                    item = RecordChunk(item.source, item.index, [], raw_count=item.raw_count,
+                                       error=f"Failed to clean/enrich chunk {item.index}: {e}")
+                stats.waiting_input_seconds += time.perf_counter() - waited
+            self._put(out_q, item, stats)
+
+        input_done = False
+        try:
+            while True:
+                item = self._get(in_q, stats)
+                if item is _DONE:
+                    input_done = True
+                    break
+                future = pool.submit(_transform_chunk, item.records) if isinstance(item, RecordChunk) else None
+                in_flight.append((item, future))
+                # Keep at most max_workers * 2 chunks in the pool; forward finished heads eagerly
+                while in_flight and (len(in_flight) > 2 * self.max_workers
+                                     or in_flight[0][1] is None or in_flight[0][1].done()):
+                    forward_head()
+            while in_flight:
+                forward_head()
+        except BaseException:
+            # Unblock the ingest thread before giving up, unless it has already finished
+            while not input_done and self._get(in_q, stats) is not _DONE:
+                pass
+            raise
+        finally:
+            out_q.put(_DONE)
+
+    def _store(self, in_q: queue.Queue, stats: StageStats, results: List[Dict[str, Any]]):
+        storage = self.pipeline.storage
+        files: Dict[str, _FileState] = {}
+        connected = False
+        connect_error = None
+        try:
+            storage.connect_databases()
+            storage.create_tables_if_not_exist()
+            connected = True
+        except Exception as e:
+            self.logger.error(f"Store stage could not connect to databases: {e}")
+            connect_error = f"Database connection failed: {e}"
+
+        while True:
+            item = self._get(in_q, stats)
+            if item is _DONE:
+                break
+            started = time.perf_counter()
+            state = files.get(item.source)
+            new_file = state is None
+            if new_file:
+                state = files[item.source] = _FileState(started=time.time())
+            if isinstance(item, RecordChunk):
+                state.records_processed += item.raw_count
+
+            try:
+                if new_file and connected:
+                    storage.open_properties_scope(item.source)
+                    state.scope_open = True
+                if isinstance(item, FileEnd):
+                    results.append(self._finish_file(item, state, connected))
+                    del files[item.source]
+                else:
+                    self._store_chunk(item, state, connected, connect_error, stats)
+            except Exception as e:
+                # Keep draining: a dead store stage would block the whole pipeline
+                part = f"chunk {item.index}" if isinstance(item, RecordChunk) else "file"
+                self.logger.error(f"Error storing {part} of {item.source}: {e}")
+                state.errors.append(f"Failed to store {part}: {e}")
+                if isinstance(item, FileEnd):
+                    results.append(self._file_result(item.source, state, False))
+                    del files[item.source]
+            stats.busy_seconds += time.perf_counter() - started
+
+        if connected:
+            storage.close_connections()
+
+    def _store_chunk(self, item: RecordChunk, state: _FileState, connected: bool,
+                     connect_error: Optional[str], stats: StageStats):
+        """Deduplicate one enriched chunk against its file and write it to both stores"""
+        storage = self.pipeline.storage
+        if item.error:
+            state.errors.append(item.error)
+            return
+        if not connected:
+            state.errors.append(connect_error)
+            return
+        if not state.scope_open or not item.records:
+            # Without an open scope each write would prune the rest of the file from the index
+            return
+
+        unique = self.pipeline.cleaner.remove_duplicates(item.records, seen=state.seen_keys)
+        state.duplicates_removed += len(item.records) - len(unique)
+        pg_success = storage.store_properties_postgres(unique)
+        chroma_success = storage.store_properties_chroma(unique, scope=item.source)
+        if pg_success and chroma_success:
+            state.records_stored += len(unique)
+            state.validation_flags.extend(record.get('validation_flags', {}) for record in unique)
+        else:
+            state.errors.append(f"Failed to store chunk {item.index} in databases")
+        stats.chunks += 1
+        stats.records += len(unique)
+
+    def _finish_file(self, end: FileEnd, state: _FileState, connected: bool) -> Dict[str, Any]:
+        """Close out one file: prune its index scope, log it and build its result"""
+        storage = self.pipeline.storage
+        if end.error:
+            state.errors.append(end.error)
+        success = not state.errors and state.records_stored > 0
+
+        if state.scope_open:
+            # Only a complete, successful pass may delete listings missing from the file
+            state.scope_open = False
+            storage.close_properties_scope(end.source, prune=success)
+        if connected:
+            storage.log_processing_result(
+                end.source, state.records_processed, state.records_stored, time.time() - state.started,
+                'SUCCESS' if success else 'FAILED', state.errors
+            )
+        return self._file_result(end.source, state, success)
+
+    def _file_result(self, source: str, state: _FileState, success: bool) -> Dict[str, Any]:
+        warnings = []
+        if state.duplicates_removed:
+            warnings.append(f"Removed {state.duplicates_removed} duplicate records")
+
+        return {
+            'file': source,
+            'success': success,
+            'records_processed': state.records_processed,
+            'records_stored': state.records_stored,
+            'errors': state.errors,
+            'warnings': warnings,
+            'processing_time': time.time() - state.started,
+            'quality_metrics': self.pipeline.cleaner.generate_cleaning_report(
+                state.records_processed, state.records_stored, state.validation_flags
+            ),
+        }
+
+    # Entry point --------------------------------------------------------------
+
+    def run(self, files: List[Path]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Process ``files``; returns per-file results and per-stage statistics"""
+        ingest_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        store_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stats = {
+            'ingest': StageStats('ingest'),
+            'clean_enrich': StageStats('clean_enrich', workers=self.max_workers),
+            'store': StageStats('store'),
+        }
+        results: List[Dict[str, Any]] = []
+        started = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(self.pipeline.config,)) as pool:
+            # Start the workers before any stage thread exists, so forked children never
+            # inherit a lock held by another thread
+            pool.submit(os.getpid).result()
+
+            threads = [
+                threading.Thread(target=self._ingest, args=(files, ingest_q, stats['ingest']),
+                                 name="pipeline-ingest", daemon=True),
+                threading.Thread(target=self._store, args=(store_q, stats['store'], results),
+                                 name="pipeline-store", daemon=True),
+            ]
+            for thread in threads:
+                thread.start()
+            try:
+                self._transform(pool, ingest_q, store_q, stats['clean_enrich'])
+            finally:
+                for thread in threads:
+                    thread.join()
+
+        wall_seconds = time.perf_counter() - started
+        stage_stats = {name: stage.as_dict(wall_seconds) for name, stage in stats.items()}
+        for name, stage in stage_stats.items():
+            self.logger.info(
+                f"Stage {name}: {stage['records']} records, {stage['records_per_second']} rec/s, "
+                f"utilisation {stage['utilisation']:.0%}, blocked {stage['blocked_output_seconds']}s"
+            )
+        return results, {'wall_seconds': round(wall_seconds, 3), 'chunk_size': self.chunk_size,
+                         'queue_size': self.queue_size, 'stages': stage_stats}
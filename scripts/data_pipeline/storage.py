@@ -12,6 +12,35 @@ import logging
 import json
 from datetime import datetime
 
+from .bulk_loader import DEFAULT_BATCH_SIZE, PostgresBulkLoader
+from .chroma_indexer import (
+    DEFAULT_INDEX_BATCH_SIZE, DEFAULT_SCOPE, ChromaIndexer, content_hash, stable_document_id
+)
+
+DEFAULT_MANIFEST_DIR = "data/chroma_manifest"
+
+PROPERTY_COLUMNS = [
+    'address', 'price_aed', 'bedrooms', 'bathrooms', 'square_feet',
+    'property_type', 'area', 'developer', 'completion_date', 'view',
+    'amenities', 'service_charges', 'agent', 'agency', 'price_per_sqft',
+    'market_context', 'investment_metrics', 'property_classification',
+    'location_intelligence', 'validation_flags', 'cleaned_at', 'enriched_at'
+]
+PROPERTY_JSON_COLUMNS = [
+    'amenities', 'market_context', 'investment_metrics', 'property_classification',
+    'location_intelligence', 'validation_flags'
+]
+# Re-ingesting a listing refreshes its price and enrichment, not its descriptive fields
+PROPERTY_UPDATE_COLUMNS = [
+    'price_aed', 'price_per_sqft', 'market_context', 'investment_metrics',
+    'property_classification', 'location_intelligence', 'validation_flags', 'enriched_at'
+]
+MARKET_COLUMNS = [
+    'area', 'market_trend', 'average_price_per_sqft', 'rental_yield',
+    'demand_level', 'market_volatility', 'investment_grade',
+    'appreciation_rate', 'data_source', 'collected_at'
+]
+
 class DataStorage:
     """Handles data storage to various databases"""
     
@@ -20,6 +49,7 @@ class DataStorage:
         self.logger = logging.getLogger(__name__)
         self.pg_conn = None
         self.chroma_client = None
+        self._indexers: Dict[str, ChromaIndexer] = {}
         
     def connect_databases(self):
         """Connect to PostgreSQL and ChromaDB"""
@@ -39,86 +69,81 @@ class DataStorage:
                 port=self.config['chroma']['port']
             )
             
+            self._indexers = {}
+            
             self.logger.info("Successfully connected to databases")
             
         except Exception as e:
             self.logger.error(f"Error connecting to databases: {e}")
             raise
     
+    def _bulk_loader(self) -> PostgresBulkLoader:
+        """COPY-based loader sharing this storage's connection"""
+        batch_size = self.config.get('bulk_load', {}).get('batch_size', DEFAULT_BATCH_SIZE)
+        return PostgresBulkLoader(self.pg_conn, batch_size=batch_size, logger=self.logger)
+    
     def store_properties_postgres(self, properties: List[Dict[str, Any]]) -> bool:
-        """Store property data in PostgreSQL"""
-        try:
-            cursor = self.pg_conn.cursor()
-            
-            for property_data in properties:
-                # Insert or update property
-                query = """
-                INSERT INTO enhanced_properties (
-                    address, price_aed, bedrooms, bathrooms, square_feet,
-                    property_type, area, developer, completion_date, view,
-                    amenities, service_charges, agent, agency, price_per_sqft,
-                    market_context, investment_metrics, property_classification,
-                    location_intelligence, validation_flags, cleaned_at, enriched_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                ) ON CONFLICT (address) DO UPDATE SET
-                    price_aed = EXCLUDED.price_aed,
-                    price_per_sqft = EXCLUDED.price_per_sqft,
-                    market_context = EXCLUDED.market_context,
-                    investment_metrics = EXCLUDED.investment_metrics,
-                    property_classification = EXCLUDED.property_classification,
-                    location_intelligence = EXCLUDED.location_intelligence,
-                    validation_flags = EXCLUDED.validation_flags,
-                    enriched_at = EXCLUDED.enriched_at
-                """
-                
-                cursor.execute(query, (
-                    property_data.get('address'),
-                    property_data.get('price_aed'),
-                    property_data.get('bedrooms'),
-                    property_data.get('bathrooms'),
-                    property_data.get('square_feet'),
-                    property_data.get('property_type'),
-                    property_data.get('area'),
-                    property_data.get('developer'),
-                    property_data.get('completion_date'),
-                    property_data.get('view'),
-                    json.dumps(property_data.get('amenities', [])),
-                    property_data.get('service_charges'),
-                    property_data.get('agent'),
-                    property_data.get('agency'),
-                    property_data.get('price_per_sqft'),
-                    json.dumps(property_data.get('market_context', {})),
-                    json.dumps(property_data.get('investment_metrics', {})),
-                    json.dumps(property_data.get('property_classification', {})),
-                    json.dumps(property_data.get('location_intelligence', {})),
-                    json.dumps(property_data.get('validation_flags', {})),
-                    property_data.get('cleaned_at'),
-                    property_data.get('enriched_at')
-                ))
-            
-            self.pg_conn.commit()
-            self.logger.info(f"Successfully stored {len(properties)} properties in PostgreSQL")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error storing properties in PostgreSQL: {e}")
-            if self.pg_conn:
-                self.pg_conn.rollback()
+        """Store property data in PostgreSQL via COPY into a staging table and a set-based upsert"""
+        rows = (
+            (
+                property_data.get('address'),
+                property_data.get('price_aed'),
+                property_data.get('bedrooms'),
+                property_data.get('bathrooms'),
+                property_data.get('square_feet'),
+                property_data.get('property_type'),
+                property_data.get('area'),
+                property_data.get('developer'),
+                property_data.get('completion_date'),
+                property_data.get('view'),
+                property_data.get('amenities', []),
+                property_data.get('service_charges'),
+                property_data.get('agent'),
+                property_data.get('agency'),
+                property_data.get('price_per_sqft'),
+                property_data.get('market_context', {}),
+                property_data.get('investment_metrics', {}),
+                property_data.get('property_classification', {}),
+                property_data.get('location_intelligence', {}),
+                property_data.get('validation_flags', {}),
+                property_data.get('cleaned_at'),
+                property_data.get('enriched_at')
+            )
+            for property_data in properties
+        )
+        
+        result = self._bulk_loader().load(
+            'enhanced_properties', PROPERTY_COLUMNS, rows,
+            conflict_columns=['address'],
+            update_columns=PROPERTY_UPDATE_COLUMNS,
+            json_columns=PROPERTY_JSON_COLUMNS
+        )
+        if not result.success:
+            self.logger.error(f"Error storing properties in PostgreSQL: {result.errors[0]}")
             return False
+        
+        self.logger.info(
+            f"Successfully stored {result.rows} properties in PostgreSQL "
+            f"({result.rows_per_second:,.0f} rows/sec)"
+        )
+        return True
     
-    def store_properties_chroma(self, properties: List[Dict[str, Any]]) -> bool:
-        """Store property data in ChromaDB for semantic search"""
-        try:
-            collection = self.chroma_client.get_or_create_collection("properties")
-            
-            documents = []
-            metadatas = []
-            ids = []
-            
-            for i, property_data in enumerate(properties):
-                # Create document text for semantic search
-                doc_text = f"""
+    def _indexer(self, collection_name: str) -> ChromaIndexer:
+        """Incremental indexer for a collection, reused so its manifest loads once"""
+        if collection_name not in self._indexers:
+            chroma_config = self.config.get('chroma', {})
+            self._indexers[collection_name] = ChromaIndexer(
+                self.chroma_client.get_or_create_collection(collection_name),
+                manifest_dir=chroma_config.get('manifest_dir', DEFAULT_MANIFEST_DIR),
+                batch_size=chroma_config.get('batch_size', DEFAULT_INDEX_BATCH_SIZE),
+                logger=self.logger
+            )
+        return self._indexers[collection_name]
+    
+    def _property_document(self, property_data: Dict[str, Any]):
+        """Document ID, text and metadata for a property"""
+        # Create document text for semantic search
+        doc_text = f"""
                 Property: {property_data.get('address', '')}
                 Type: {property_data.get('property_type', '')}
                 Area: {property_data.get('area', '')}
@@ -133,91 +158,87 @@ class DataStorage:
                 Property Classification: {json.dumps(property_data.get('property_classification', {}))}
                 Location Intelligence: {json.dumps(property_data.get('location_intelligence', {}))}
                 """
-                
-                documents.append(doc_text)
-                metadatas.append({
-                    'source': 'property_listing',
-                    'address': property_data.get('address', ''),
-                    'area': property_data.get('area', ''),
-                    'property_type': property_data.get('property_type', ''),
-                    'price_range': self._get_price_range(property_data.get('price_aed', 0)),
-                    'bedrooms': property_data.get('bedrooms', 0),
-                    'price_class': property_data.get('property_classification', {}).get('price_class', 'Unknown'),
-                    'investment_grade': property_data.get('investment_metrics', {}).get('investment_grade', 'Unknown')
-                })
-                ids.append(f"property_{i}")
-            
-            collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
+        metadata = {
+            'source': 'property_listing',
+            'address': property_data.get('address', ''),
+            'area': property_data.get('area', ''),
+            'property_type': property_data.get('property_type', ''),
+            'price_range': self._get_price_range(property_data.get('price_aed', 0)),
+            'bedrooms': property_data.get('bedrooms', 0),
+            'price_class': property_data.get('property_classification', {}).get('price_class', 'Unknown'),
+            'investment_grade': property_data.get('investment_metrics', {}).get('investment_grade', 'Unknown')
+        }
+        # Address is the listing key (as in enhanced_properties); keyless rows are keyed by content
+        key = property_data.get('address') or content_hash(doc_text, metadata)
+        return stable_document_id('property', key), doc_text, metadata
+    
+    def store_properties_chroma(self, properties: List[Dict[str, Any]], scope: Optional[str] = None) -> bool:
+        """
+        Store property data in ChromaDB for semantic search.
+        
+        Only new or changed documents are embedded. When ``scope`` names the
+        dataset (e.g. its source file), properties indexed earlier under that
+        scope and missing now are deleted.
+        """
+        try:
+            result = self._indexer('properties').sync(
+                (self._property_document(property_data) for property_data in properties),
+                scope=scope or DEFAULT_SCOPE,
+                prune=scope is not None
             )
             
-            self.logger.info(f"Successfully stored {len(properties)} properties in ChromaDB")
+            self.logger.info(
+                f"Successfully stored {len(properties)} properties in ChromaDB "
+                f"({result.written} embedded, {result.unchanged} unchanged, {result.deleted} deleted)"
+            )
             return True
             
         except Exception as e:
             self.logger.error(f"Error storing properties in ChromaDB: {e}")
             return False
     
+    def open_properties_scope(self, scope: str):
+        """Index one source across several store_properties_chroma calls (e.g. streamed chunks)"""
+        self._indexer('properties').open_scope(scope)
+    
+    def close_properties_scope(self, scope: str, prune: bool = True) -> int:
+        """Finish a scope from open_properties_scope, deleting properties no chunk contained"""
+        return self._indexer('properties').close_scope(scope, prune=prune)
+    
     def store_market_data_postgres(self, market_data: List[Dict[str, Any]]) -> bool:
         """Store market intelligence data in PostgreSQL"""
-        try:
-            cursor = self.pg_conn.cursor()
-            
-            for data in market_data:
-                query = """
-                INSERT INTO market_intelligence (
-                    area, market_trend, average_price_per_sqft, rental_yield,
-                    demand_level, market_volatility, investment_grade,
-                    appreciation_rate, data_source, collected_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                ) ON CONFLICT (area) DO UPDATE SET
-                    market_trend = EXCLUDED.market_trend,
-                    average_price_per_sqft = EXCLUDED.average_price_per_sqft,
-                    rental_yield = EXCLUDED.rental_yield,
-                    demand_level = EXCLUDED.demand_level,
-                    market_volatility = EXCLUDED.market_volatility,
-                    investment_grade = EXCLUDED.investment_grade,
-                    appreciation_rate = EXCLUDED.appreciation_rate,
-                    collected_at = EXCLUDED.collected_at
-                """
-                
-                cursor.execute(query, (
-                    data.get('area'),
-                    data.get('market_trend'),
-                    data.get('average_price_per_sqft'),
-                    data.get('rental_yield'),
-                    data.get('demand_level'),
-                    data.get('market_volatility'),
-                    data.get('investment_grade'),
-                    data.get('appreciation_rate'),
-                    data.get('data_source', 'pipeline'),
-                    datetime.now().isoformat()
-                ))
-            
-            self.pg_conn.commit()
-            self.logger.info(f"Successfully stored {len(market_data)} market data records in PostgreSQL")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error storing market data in PostgreSQL: {e}")
-            if self.pg_conn:
-                self.pg_conn.rollback()
+        collected_at = datetime.now().isoformat()
+        rows = (
+            (
+                data.get('area'),
+                data.get('market_trend'),
+                data.get('average_price_per_sqft'),
+                data.get('rental_yield'),
+                data.get('demand_level'),
+                data.get('market_volatility'),
+                data.get('investment_grade'),
+                data.get('appreciation_rate'),
+                data.get('data_source', 'pipeline'),
+                collected_at
+            )
+            for data in market_data
+        )
+        
+        result = self._bulk_loader().load(
+            'market_intelligence', MARKET_COLUMNS, rows,
+            conflict_columns=['area'],
+            update_columns=[c for c in MARKET_COLUMNS if c not in ('area', 'data_source')]
+        )
+        if not result.success:
+            self.logger.error(f"Error storing market data in PostgreSQL: {result.errors[0]}")
             return False
+        
+        self.logger.info(f"Successfully stored {result.rows} market data records in PostgreSQL")
+        return True
     
-    def store_market_data_chroma(self, market_data: List[Dict[str, Any]]) -> bool:
-        """Store market intelligence data in ChromaDB"""
-        try:
-            collection = self.chroma_client.get_or_create_collection("market_intelligence")
-            
-            documents = []
-            metadatas = []
-            ids = []
-            
-            for i, data in enumerate(market_data):
-                doc_text = f"""
+    def _market_document(self, data: Dict[str, Any]):
+        """Document ID, text and metadata for an area's market intelligence"""
+        doc_text = f"""
                 Market Intelligence for {data.get('area', '')}:
                 Market Trend: {data.get('market_trend', '')}
                 Average Price per Sqft: {data.get('average_price_per_sqft', '')} AED
@@ -227,24 +248,29 @@ class DataStorage:
                 Investment Grade: {data.get('investment_grade', '')}
                 Appreciation Rate: {data.get('appreciation_rate', '')}%
                 """
-                
-                documents.append(doc_text)
-                metadatas.append({
-                    'source': 'market_intelligence',
-                    'area': data.get('area', ''),
-                    'data_type': 'market_data',
-                    'investment_grade': data.get('investment_grade', ''),
-                    'demand_level': data.get('demand_level', '')
-                })
-                ids.append(f"market_{i}")
-            
-            collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
+        metadata = {
+            'source': 'market_intelligence',
+            'area': data.get('area', ''),
+            'data_type': 'market_data',
+            'investment_grade': data.get('investment_grade', ''),
+            'demand_level': data.get('demand_level', '')
+        }
+        key = data.get('area') or content_hash(doc_text, metadata)
+        return stable_document_id('market', key), doc_text, metadata
+    
+    def store_market_data_chroma(self, market_data: List[Dict[str, Any]], scope: Optional[str] = None) -> bool:
+        """Store market intelligence data in ChromaDB, embedding only changed areas (see store_properties_chroma)"""
+        try:
+            result = self._indexer('market_intelligence').sync(
+                (self._market_document(data) for data in market_data),
+                scope=scope or DEFAULT_SCOPE,
+                prune=scope is not None
             )
             
-            self.logger.info(f"Successfully stored {len(market_data)} market data records in ChromaDB")
+            self.logger.info(
+                f"Successfully stored {len(market_data)} market data records in ChromaDB "
+                f"({result.written} embedded, {result.unchanged} unchanged, {result.deleted} deleted)"
+            )
             return True
             
         except Exception as e:
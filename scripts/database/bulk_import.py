@@ -12,15 +12,20 @@ import logging
 from typing import Dict, List, Optional
 from datetime import datetime
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from data_pipeline.bulk_loader import DEFAULT_BATCH_SIZE, PostgresBulkLoader
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class BulkDataImporter:
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, batch_size: int = DEFAULT_BATCH_SIZE):
         self.database_url = database_url
         self.engine = create_engine(database_url)
+        self.batch_size = batch_size
         
         # Define table schemas
         self.table_schemas = {
@@ -144,10 +149,24 @@ class BulkDataImporter:
             # Clean and prepare data
             df = self._clean_property_data(df)
             
-            # Import to database
-            df.to_sql(table_name, self.engine, if_exists='append', index=False, method='multi')
+            # Stream into the table with COPY (the table must already exist, see create_tables)
+            conn = self.engine.raw_connection()
+            try:
+                result = PostgresBulkLoader(conn, batch_size=self.batch_size).load(
+                    table_name, list(df.columns), df.itertuples(index=False, name=None),
+                    json_columns=[c for c in ('amenities',) if c in df.columns]
+                )
+            finally:
+                conn.close()
+            
+            if not result.success:
+                logger.error(f"Error importing properties: {result.errors[0]}")
+                return False
             
-            logger.info(f"Successfully imported {len(df)} properties to {table_name}")
+            logger.info(
+                f"Successfully imported {result.rows} properties to {table_name} "
+                f"({result.rows_per_second:,.0f} rows/sec)"
+            )
             return True
             
         except Exception as e:
@@ -2,21 +2,83 @@
 """
 CSV Processor for Dubai Real Estate Research
 Handles CSV files containing market data, property listings, regulatory info
+
+Files are read in chunks with column types inferred once per file; cleaning and
+extraction work on whole columns of each chunk.
 """
 
 import pandas as pd
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 import json
 import re
 
+from processors.parsed_cache import DEFAULT_PARSED_CACHE_DIR, ParsedFrameCache
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 100000
+# Leading rows used to infer the column types of the whole file
+DTYPE_SAMPLE_ROWS = 10000
+
+# Output record fields per schema: (column, kind) where kind is "str", "float" or "int"
+RECORD_FIELDS: Dict[str, List[Tuple[str, str]]] = {
+    "market_data": [
+        ("date", "str"), ("neighborhood", "str"), ("property_type", "str"),
+        ("avg_price_per_sqft", "float"), ("transaction_volume", "int"), ("rental_yield", "float"),
+        ("market_trend", "str"), ("price_change_percent", "float")
+    ],
+    "properties": [
+        ("address", "str"), ("price", "float"), ("bedrooms", "int"), ("bathrooms", "int"),
+        ("neighborhood", "str"), ("developer", "str"), ("completion_date", "str"),
+        ("rental_yield", "float"), ("property_status", "str"), ("market_segment", "str")
+    ],
+    "regulatory_updates": [
+        ("law_name", "str"), ("enactment_date", "str"), ("description", "str"), ("status", "str"),
+        ("impact_areas", "str"), ("key_provisions", "str"), ("compliance_requirements", "str")
+    ],
+    "developers": [
+        ("name", "str"), ("market_share", "float"), ("reputation_score", "float"), ("total_projects", "int"),
+        ("financial_strength", "str"), ("specialties", "str"), ("key_projects", "str")
+    ],
+    "investment_insights": [
+        ("title", "str"), ("category", "str"), ("roi_projection", "float"),
+        ("investment_amount_min", "float"), ("investment_amount_max", "float"), ("risk_level", "str"),
+        ("target_audience", "str"), ("requirements", "str"), ("key_benefits", "str")
+    ]
+}
+
+
+def _column_values(df: pd.DataFrame, column: str, kind: str) -> List[Any]:
+    """One output field for every row: text, or a number with None for missing/unparseable values"""
+    if column not in df.columns:
+        return [""] * len(df) if kind == "str" else [None] * len(df)
+    if kind == "str":
+        return [str(value) for value in df[column].tolist()]
+    numeric = pd.to_numeric(df[column], errors='coerce')
+    cast = float if kind == "float" else int
+    return [None if is_missing else cast(value) for is_missing, value in zip(numeric.isna().tolist(), numeric.tolist())]
+
+
+def _build_records(df: pd.DataFrame, fields: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Assemble row records from whole-column conversions"""
+    names = [column for column, _ in fields]
+    columns = [_column_values(df, column, kind) for column, kind in fields]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
 class CSVProcessor:
     """Processor for CSV files containing Dubai real estate data"""
     
-    def __init__(self):
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, cache_dir: Optional[str] = DEFAULT_PARSED_CACHE_DIR):
+        """
+        Args:
+            chunk_size: rows parsed, cleaned and extracted at a time
+            cache_dir: directory for the Parquet cache of parsed inputs; None disables it
+        """
+        self.chunk_size = chunk_size
+        self.parsed_cache = ParsedFrameCache(cache_dir)
         self.supported_schemas = {
             "market_data": {
                 "required_columns": ["date", "neighborhood", "property_type"],
@@ -70,30 +132,24 @@ class CSVProcessor:
         logger.info(f"Processing CSV file: {file_path}")
         
         try:
-            # Read CSV file
-            df = pd.read_csv(file_path)
-            logger.info(f"Loaded CSV with {len(df)} rows and {len(df.columns)} columns")
-            
-            # Detect schema type
-            schema_type = self._detect_schema_type(df)
+            # Detect schema type from the header alone
+            header = pd.read_csv(file_path, nrows=0)
+            schema_type = self._detect_schema_type(header)
             logger.info(f"Detected schema type: {schema_type}")
             
-            # Clean and validate data
-            cleaned_df = self._clean_data(df, schema_type)
-            
-            # Extract structured data
-            structured_data = self._extract_structured_data(cleaned_df, schema_type)
+            structured_data, stats = self._process_chunks(file_path, schema_type)
+            logger.info(f"Loaded CSV with {stats['rows']} rows and {len(stats['columns'])} columns")
             
             # Generate metadata
-            metadata = self._generate_metadata(df, schema_type, file_path)
+            metadata = self._generate_metadata(stats, schema_type, file_path)
             
             return {
                 "content_type": "csv",
                 "file_path": file_path,
                 "schema_type": schema_type,
                 "processed_at": datetime.now().isoformat(),
-                "row_count": len(df),
-                "column_count": len(df.columns),
+                "row_count": stats["rows"],
+                "column_count": len(stats["columns"]),
                 "structured_data": structured_data,
                 "metadata": metadata,
                 "status": "success"
@@ -108,6 +164,113 @@ class CSVProcessor:
                 "error": str(e)
             }
     
+    def iter_records(self, file_path: str, schema_type: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Structured records of a CSV file, one list per chunk.
+
+        ``process`` returns every record of the file at once; callers that
+        store or index records as they arrive can use this to hold only one
+        chunk's records at a time.
+        """
+        if schema_type is None:
+            schema_type = self._detect_schema_type(pd.read_csv(file_path, nrows=0))
+        for extracted in self._iter_extracted(file_path, schema_type, self._new_stats()):
+            yield extracted["records"]
+    
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        return {"rows": 0, "columns": [], "data_types": {}, "missing_values": None}
+    
+    def _process_chunks(self, file_path: str, schema_type: str):
+        """Clean and extract the whole file; returns (structured data, raw frame stats)"""
+        stats = self._new_stats()
+        structured_data = None
+        
+        for extracted in self._iter_extracted(file_path, schema_type, stats):
+            if structured_data is None:
+                structured_data = extracted
+            else:
+                structured_data["records"].extend(extracted["records"])
+        
+        if structured_data is None:
+            # Header only
+            header = pd.read_csv(file_path, nrows=0)
+            stats["columns"] = list(header.columns)
+            stats["data_types"] = header.dtypes.to_dict()
+            structured_data = self._extract_structured_data(self._clean_data(header, schema_type), schema_type)
+        missing = stats["missing_values"]
+        stats["missing_values"] = {col: int(count) for col, count in missing.items()} if missing is not None else {col: 0 for col in stats["columns"]}
+        return structured_data, stats
+    
+    def _iter_extracted(self, file_path: str, schema_type: str, stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Clean and extract the file chunk by chunk, accumulating raw frame stats into ``stats``"""
+        for chunk in self._iter_chunks(file_path):
+            yield self._extract_chunk(chunk, schema_type, stats)
+    
+    def _extract_chunk(self, chunk: pd.DataFrame, schema_type: str, stats: Dict[str, Any]) -> Dict[str, Any]:
+        extracted = self._extract_structured_data(self._clean_data(chunk, schema_type), schema_type)
+        
+        if stats["missing_values"] is None:
+            stats["columns"] = list(chunk.columns)
+            stats["data_types"] = chunk.dtypes.to_dict()
+        stats["rows"] += len(chunk)
+        missing = chunk.isnull().sum()
+        stats["missing_values"] = missing if stats["missing_values"] is None else stats["missing_values"].add(missing, fill_value=0)
+        return extracted
+    
+    def _iter_chunks(self, file_path: str) -> Iterator[pd.DataFrame]:
+        """Parsed chunks of the file, from the Parquet cache when it has them"""
+        cached = self.parsed_cache.read(file_path)
+        if cached is not None:
+            yield from cached
+            return
+        
+        dtypes = self._infer_dtypes(pd.read_csv(file_path, nrows=DTYPE_SAMPLE_ROWS))
+        cache_writer = self.parsed_cache.writer(file_path)
+        reader = pd.read_csv(file_path, chunksize=self.chunk_size, dtype=dtypes)
+        rows_read = 0
+        try:
+            while True:
+                try:
+                    chunk = next(reader, None)
+                except ValueError as e:
+                    if dtypes is None or isinstance(e, pd.errors.ParserError):
+                        raise
+                    # A later row did not fit the types inferred from the sample:
+                    # infer types per chunk from the chunk that failed onwards,
+                    # skipping the data rows already emitted
+                    logger.warning(f"Re-reading {file_path} from row {rows_read} with per-chunk type inference: {e}")
+                    reader.close()
+                    skipped = rows_read
+                    dtypes = None
+                    reader = pd.read_csv(file_path, chunksize=self.chunk_size, skiprows=lambda line: 0 < line <= skipped)
+                    continue
+                if chunk is None:
+                    break
+                rows_read += len(chunk)
+                cache_writer.append(chunk)
+                yield chunk
+        finally:
+            reader.close()
+        cache_writer.commit({"rows_per_part": self.chunk_size})
+    
+    @staticmethod
+    def _infer_dtypes(sample: pd.DataFrame) -> Dict[str, Any]:
+        """Column types for the whole file, inferred once from a leading sample"""
+        dtypes = {}
+        for col, dtype in sample.dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype):
+                continue  # a gap later in the file would not fit a bool column
+            if pd.api.types.is_integer_dtype(dtype):
+                dtypes[col] = "Int64"  # nullable, so later gaps still fit
+            elif pd.api.types.is_float_dtype(dtype):
+                dtypes[col] = "float64"
+            elif sample[col].isna().all():
+                continue  # nothing to infer from
+            else:
+                dtypes[col] = str
+        return dtypes
+    
     def _detect_schema_type(self, df: pd.DataFrame) -> str:
         """Detect the schema type based on column names and data"""
         column_names = [col.lower() for col in df.columns]
@@ -147,7 +310,7 @@ class CSVProcessor:
     
     def _clean_data(self, df: pd.DataFrame, schema_type: str) -> pd.DataFrame:
         """Clean and standardize the data"""
-        logger.info(f"Cleaning data for schema: {schema_type}")
+        logger.debug(f"Cleaning data for schema: {schema_type}")
         
         # Make a copy to avoid modifying original
         cleaned_df = df.copy()
@@ -159,7 +322,12 @@ class CSVProcessor:
         for col in cleaned_df.select_dtypes(include=['object']).columns:
             cleaned_df[col] = cleaned_df[col].astype(str).str.strip()
         
-        # Handle missing values
+        # Handle missing values; nullable integer columns reject '' as a fill
+        # value, so their gaps are filled as objects like any other column
+        for position, dtype in enumerate(cleaned_df.dtypes):
+            column = cleaned_df.iloc[:, position]
+            if pd.api.types.is_extension_array_dtype(dtype) and pd.api.types.is_numeric_dtype(dtype) and column.hasnans:
+                cleaned_df.isetitem(position, column.astype(object))
         cleaned_df = cleaned_df.fillna('')
         
         # Convert data types based on schema
@@ -182,163 +350,42 @@ class CSVProcessor:
     
     def _extract_structured_data(self, df: pd.DataFrame, schema_type: str) -> Dict[str, Any]:
         """Extract structured data based on schema type"""
-        logger.info(f"Extracting structured data for schema: {schema_type}")
+        logger.debug(f"Extracting structured data for schema: {schema_type}")
         
-        if schema_type == "market_data":
-            return self._extract_market_data(df)
-        elif schema_type == "properties":
-            return self._extract_properties_data(df)
-        elif schema_type == "regulatory_updates":
-            return self._extract_regulatory_data(df)
-        elif schema_type == "developers":
-            return self._extract_developers_data(df)
-        elif schema_type == "investment_insights":
-            return self._extract_investment_data(df)
-        else:
-            return self._extract_generic_data(df)
-    
-    def _extract_market_data(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Extract market data specific information"""
-        data = {
-            "data_type": "market_data",
-            "records": []
-        }
-        
-        for _, row in df.iterrows():
-            record = {
-                "date": str(row.get("date", "")),
-                "neighborhood": str(row.get("neighborhood", "")),
-                "property_type": str(row.get("property_type", "")),
-                "avg_price_per_sqft": float(row.get("avg_price_per_sqft", 0)) if pd.notna(row.get("avg_price_per_sqft")) else None,
-                "transaction_volume": int(row.get("transaction_volume", 0)) if pd.notna(row.get("transaction_volume")) else None,
-                "rental_yield": float(row.get("rental_yield", 0)) if pd.notna(row.get("rental_yield")) else None,
-                "market_trend": str(row.get("market_trend", "")),
-                "price_change_percent": float(row.get("price_change_percent", 0)) if pd.notna(row.get("price_change_percent")) else None
-            }
-            data["records"].append(record)
-        
-        return data
-    
-    def _extract_properties_data(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Extract properties specific information"""
-        data = {
-            "data_type": "properties",
-            "records": []
-        }
-        
-        for _, row in df.iterrows():
-            record = {
-                "address": str(row.get("address", "")),
-                "price": float(row.get("price", 0)) if pd.notna(row.get("price")) else None,
-                "bedrooms": int(row.get("bedrooms", 0)) if pd.notna(row.get("bedrooms")) else None,
-                "bathrooms": int(row.get("bathrooms", 0)) if pd.notna(row.get("bathrooms")) else None,
-                "neighborhood": str(row.get("neighborhood", "")),
-                "developer": str(row.get("developer", "")),
-                "completion_date": str(row.get("completion_date", "")),
-                "rental_yield": float(row.get("rental_yield", 0)) if pd.notna(row.get("rental_yield")) else None,
-                "property_status": str(row.get("property_status", "")),
-                "market_segment": str(row.get("market_segment", ""))
-            }
-            data["records"].append(record)
-        
-        return data
-    
-    def _extract_regulatory_data(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Extract regulatory updates specific information"""
-        data = {
-            "data_type": "regulatory_updates",
-            "records": []
-        }
-        
-        for _, row in df.iterrows():
-            record = {
-                "law_name": str(row.get("law_name", "")),
-                "enactment_date": str(row.get("enactment_date", "")),
-                "description": str(row.get("description", "")),
-                "status": str(row.get("status", "")),
-                "impact_areas": str(row.get("impact_areas", "")),
-                "key_provisions": str(row.get("key_provisions", "")),
-                "compliance_requirements": str(row.get("compliance_requirements", ""))
-            }
-            data["records"].append(record)
-        
-        return data
-    
-    def _extract_developers_data(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Extract developers specific information"""
-        data = {
-            "data_type": "developers",
-            "records": []
-        }
-        
-        for _, row in df.iterrows():
-            record = {
-                "name": str(row.get("name", "")),
-                "market_share": float(row.get("market_share", 0)) if pd.notna(row.get("market_share")) else None,
-                "reputation_score": float(row.get("reputation_score", 0)) if pd.notna(row.get("reputation_score")) else None,
-                "total_projects": int(row.get("total_projects", 0)) if pd.notna(row.get("total_projects")) else None,
-                "financial_strength": str(row.get("financial_strength", "")),
-                "specialties": str(row.get("specialties", "")),
-                "key_projects": str(row.get("key_projects", ""))
-            }
-            data["records"].append(record)
-        
-        return data
-    
-    def _extract_investment_data(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Extract investment insights specific information"""
-        data = {
-            "data_type": "investment_insights",
-            "records": []
-        }
-        
-        for _, row in df.iterrows():
-            record = {
-                "title": str(row.get("title", "")),
-                "category": str(row.get("category", "")),
-                "roi_projection": float(row.get("roi_projection", 0)) if pd.notna(row.get("roi_projection")) else None,
-                "investment_amount_min": float(row.get("investment_amount_min", 0)) if pd.notna(row.get("investment_amount_min")) else None,
-                "investment_amount_max": float(row.get("investment_amount_max", 0)) if pd.notna(row.get("investment_amount_max")) else None,
-                "risk_level": str(row.get("risk_level", "")),
-                "target_audience": str(row.get("target_audience", "")),
-                "requirements": str(row.get("requirements", "")),
-                "key_benefits": str(row.get("key_benefits", ""))
+        if schema_type in RECORD_FIELDS:
+            return {
+                "data_type": schema_type,
+                "records": _build_records(df, RECORD_FIELDS[schema_type])
             }
-            data["records"].append(record)
-        
-        return data
+        return self._extract_generic_data(df)
     
     def _extract_generic_data(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Extract generic data for unknown schemas"""
-        data = {
+        names = [str(col) if not isinstance(col, str) else col for col in df.columns]
+        columns = []
+        for col in df.columns:
+            series = df[col]
+            missing = series.isna().tolist()
+            columns.append([
+                None if is_missing else value if isinstance(value, (int, float)) else str(value)
+                for is_missing, value in zip(missing, series.tolist())
+            ])
+        
+        return {
             "data_type": "generic",
-            "records": []
+            "records": [dict(zip(names, values)) for values in zip(*columns)] if columns else [{} for _ in range(len(df))]
         }
-        
-        for _, row in df.iterrows():
-            record = {}
-            for col in df.columns:
-                value = row[col]
-                if pd.isna(value):
-                    record[col] = None
-                elif isinstance(value, (int, float)):
-                    record[col] = value
-                else:
-                    record[col] = str(value)
-            data["records"].append(record)
-        
-        return data
     
-    def _generate_metadata(self, df: pd.DataFrame, schema_type: str, file_path: str) -> Dict[str, Any]:
-        """Generate metadata about the processed file"""
+    def _generate_metadata(self, stats: Dict[str, Any], schema_type: str, file_path: str) -> Dict[str, Any]:
+        """Generate metadata about the processed file from its accumulated chunk stats"""
         metadata = {
             "file_path": file_path,
             "schema_type": schema_type,
-            "total_rows": len(df),
-            "total_columns": len(df.columns),
-            "column_names": list(df.columns),
-            "data_types": df.dtypes.to_dict(),
-            "missing_values": df.isnull().sum().to_dict(),
+            "total_rows": stats["rows"],
+            "total_columns": len(stats["columns"]),
+            "column_names": stats["columns"],
+            "data_types": stats["data_types"],
+            "missing_values": stats["missing_values"],
             "processing_timestamp": datetime.now().isoformat()
         }
         
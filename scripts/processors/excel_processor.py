@@ -2,12 +2,15 @@
 """
 Excel Processor for Dubai Real Estate Research
 Handles Excel files with multiple sheets containing financial data, market analysis
+
+Sheets are read one at a time from a single open workbook, so only the sheet
+being processed is held in memory.
 """
 
 import os
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 import json
 import re
 from pathlib import Path
@@ -24,12 +27,19 @@ except ImportError:
     except ImportError:
         EXCEL_LIBRARY = None
 
+from processors.parsed_cache import DEFAULT_PARSED_CACHE_DIR, ParsedFrameCache
+
 logger = logging.getLogger(__name__)
 
 class ExcelProcessor:
     """Processor for Excel files containing Dubai real estate financial data"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_PARSED_CACHE_DIR):
+        """
+        Args:
+            cache_dir: directory for the Parquet cache of parsed sheets; None disables it
+        """
+        self.parsed_cache = ParsedFrameCache(cache_dir)
         self.sheet_types = {
             "market_data": {
                 "keywords": ["price", "market", "trend", "analysis", "forecast"],
@@ -66,16 +76,11 @@ class ExcelProcessor:
         logger.info(f"Processing Excel file: {file_path}")
         
         try:
-            # Read all sheets from Excel file
-            sheets_data = self._read_all_sheets(file_path)
-            if not sheets_data:
-                raise ValueError("Could not read any sheets from Excel file")
-            
-            # Process each sheet
+            # Process each sheet as it is read
             processed_sheets = []
             total_rows = 0
             
-            for sheet_name, sheet_data in sheets_data.items():
+            for sheet_name, sheet_data in self._iter_sheets(file_path):
                 logger.info(f"Processing sheet: {sheet_name}")
                 
                 # Classify sheet type
@@ -94,6 +99,9 @@ class ExcelProcessor:
                 
                 total_rows += len(sheet_data)
             
+            if not processed_sheets:
+                raise ValueError("Could not read any sheets from Excel file")
+            
             # Generate metadata
             metadata = self._generate_metadata(file_path, processed_sheets)
             
@@ -117,57 +125,60 @@ class ExcelProcessor:
                 "error": str(e)
             }
     
-    def _read_all_sheets(self, file_path: str) -> Dict[str, pd.DataFrame]:
-        """Read all sheets from Excel file"""
+    def _iter_sheets(self, file_path: str) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Yield (sheet name, data) for each non-empty sheet, parsing the workbook once"""
         if not EXCEL_LIBRARY:
             raise ImportError("No Excel processing library available")
         
-        sheets_data = {}
-        
         try:
             if EXCEL_LIBRARY == "pandas_openpyxl":
-                # Read all sheets
-                excel_file = pd.ExcelFile(file_path)
-                
-                for sheet_name in excel_file.sheet_names:
-                    try:
-                        df = pd.read_excel(file_path, sheet_name=sheet_name)
+                with pd.ExcelFile(file_path) as excel_file:
+                    for sheet_name in excel_file.sheet_names:
+                        try:
+                            df = self._read_sheet(excel_file, file_path, sheet_name)
+                        except Exception as e:
+                            logger.warning(f"Could not read sheet '{sheet_name}': {e}")
+                            continue
                         if not df.empty:
-                            sheets_data[sheet_name] = df
                             logger.info(f"Read sheet '{sheet_name}' with {len(df)} rows")
-                    except Exception as e:
-                        logger.warning(f"Could not read sheet '{sheet_name}': {e}")
+                            yield sheet_name, df
             
             elif EXCEL_LIBRARY == "xlrd":
                 # Fallback to xlrd for older Excel files
-                workbook = xlrd.open_workbook(file_path)
+                workbook = xlrd.open_workbook(file_path, on_demand=True)
                 
                 for sheet_name in workbook.sheet_names():
                     try:
                         sheet = workbook.sheet_by_name(sheet_name)
-                        data = []
-                        headers = []
-                        
-                        for row_idx in range(sheet.nrows):
-                            row_data = sheet.row_values(row_idx)
-                            if row_idx == 0:
-                                headers = row_data
-                            else:
-                                data.append(row_data)
-                        
-                        if data:
-                            df = pd.DataFrame(data, columns=headers)
-                            sheets_data[sheet_name] = df
-                            logger.info(f"Read sheet '{sheet_name}' with {len(df)} rows")
+                        headers = sheet.row_values(0) if sheet.nrows else []
+                        data = [sheet.row_values(row_idx) for row_idx in range(1, sheet.nrows)]
+                        workbook.unload_sheet(sheet_name)
                     except Exception as e:
                         logger.warning(f"Could not read sheet '{sheet_name}': {e}")
-            
-            return sheets_data
+                        continue
+                    if data:
+                        df = pd.DataFrame(data, columns=headers)
+                        logger.info(f"Read sheet '{sheet_name}' with {len(df)} rows")
+                        yield sheet_name, df
             
         except Exception as e:
             logger.error(f"Error reading Excel file: {e}")
             raise
     
+    def _read_sheet(self, excel_file: "pd.ExcelFile", file_path: str, sheet_name: str) -> pd.DataFrame:
+        """Parse one sheet, or load it from the Parquet cache of an earlier run"""
+        cached = self.parsed_cache.read(file_path, variant=str(sheet_name))
+        if cached is not None:
+            parts = list(cached)
+            if parts:
+                return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        
+        df = excel_file.parse(sheet_name)
+        cache_writer = self.parsed_cache.writer(file_path, variant=str(sheet_name))
+        cache_writer.append(df)
+        cache_writer.commit()
+        return df
+    
     def _classify_sheet(self, sheet_data: pd.DataFrame, sheet_name: str) -> str:
         """Classify sheet type based on content and column names"""
         # Convert column names to string for analysis
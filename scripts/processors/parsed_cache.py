@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Parsed Input Cache for the file processors
+Stores the frames parsed from a CSV/Excel input as Parquet parts so that
+re-processing an unchanged file reads columnar data instead of re-parsing it
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Any, Dict, Iterator, Optional
+
+import pandas as pd
+
+# Parquet needs pyarrow or fastparquet; without either the cache is disabled
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_ENGINE = "pyarrow"
+except ImportError:
+    try:
+        import fastparquet  # noqa: F401
+        PARQUET_ENGINE = "fastparquet"
+    except ImportError:
+        PARQUET_ENGINE = None
+
+# Bump when the cached layout or the way inputs are parsed changes
+CACHE_VERSION = 1
+DEFAULT_PARSED_CACHE_DIR = os.getenv("PARSED_CACHE_DIR", "data/parsed_cache")
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class ParsedFrameCache:
+    """
+    Parquet cache of parsed input frames, keyed by file path, size and mtime.
+
+    Each input gets a directory holding at most one entry, for its current
+    size and mtime; committing a new entry deletes the older ones. An entry is
+    a directory of numbered parts plus a manifest written last, so an
+    interrupted write is never read back. ``variant`` separates several frames
+    parsed from one file (e.g. Excel sheets).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_PARSED_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.enabled = bool(cache_dir) and PARQUET_ENGINE is not None
+        if cache_dir and PARQUET_ENGINE is None:
+            logger.info("Parsed input cache disabled: install pyarrow or fastparquet to enable it")
+
+    def _entry_dir(self, file_path: str, variant: str) -> Optional[str]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        source = json.dumps([os.path.abspath(file_path), variant])
+        version = json.dumps([CACHE_VERSION, stat.st_size, stat.st_mtime_ns])
+        return os.path.join(self.cache_dir, _digest(source), _digest(version))
+
+    def read(self, file_path: str, variant: str = "") -> Optional[Iterator[pd.DataFrame]]:
+        """Iterator over the cached parts of a file, or None on a miss"""
+        if not self.enabled:
+            return None
+        entry = self._entry_dir(file_path, variant)
+        if entry is None:
+            return None
+        try:
+            with open(os.path.join(entry, "manifest.json"), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not all(os.path.exists(os.path.join(entry, part)) for part in manifest["parts"]):
+            return None
+        logger.info(f"Using parsed cache for {file_path} {variant}".rstrip())
+        return (pd.read_parquet(os.path.join(entry, part), engine=PARQUET_ENGINE) for part in manifest["parts"])
+
+    def writer(self, file_path: str, variant: str = "") -> "CacheWriter":
+        """Writer for one entry; a no-op when the cache is disabled"""
+        entry = self._entry_dir(file_path, variant) if self.enabled else None
+        return CacheWriter(entry)
+
+
+class CacheWriter:
+    """Appends parts to one cache entry; ``commit`` publishes it, ``abort`` discards it"""
+
+    def __init__(self, entry_dir: Optional[str]):
+        self.entry_dir = entry_dir
+        self.parts = []
+        if entry_dir:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+    @property
+    def active(self) -> bool:
+        return self.entry_dir is not None
+
+    def append(self, df: pd.DataFrame):
+        if not self.active:
+            return
+        if not all(isinstance(column, str) for column in df.columns):
+            # Parquet only keeps string labels; caching would rename the columns
+            self.abort()
+            return
+        part = f"part-{len(self.parts):05d}.parquet"
+        try:
+            os.makedirs(self.entry_dir, exist_ok=True)
+            # Object columns holding mixed types cannot be written and abort the entry
+            df.to_parquet(os.path.join(self.entry_dir, part), engine=PARQUET_ENGINE, index=False)
+        except Exception as e:
+            logger.debug(f"Not caching {self.entry_dir}: {e}")
+            self.abort()
+            return
+        self.parts.append(part)
+
+    def commit(self, info: Optional[Dict[str, Any]] = None):
+        if not self.active:
+            return
+        try:
+            tmp_path = os.path.join(self.entry_dir, "manifest.json.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"parts": self.parts, **(info or {})}, f)
+            os.replace(tmp_path, os.path.join(self.entry_dir, "manifest.json"))
+        except OSError as e:
+            logger.warning(f"Could not write parsed cache manifest in {self.entry_dir}: {e}")
+            self.abort()
+            return
+        self._prune_older_entries()
+
+    def _prune_older_entries(self):
+        """Delete the entries for earlier versions of the same input, which can no longer be read"""
+        source_dir = os.path.dirname(self.entry_dir)
+        try:
+            names = os.listdir(source_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(source_dir, name)
+            if path != self.entry_dir:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def abort(self):
+        if self.entry_dir:
+            shutil.rmtree(self.entry_dir, ignore_errors=True)
+        self.entry_dir = None
@@ -7,9 +7,10 @@ Enhances property data with additional insights, coordinates, and market analysi
 import pandas as pd
 import numpy as np
 from geopy.geocoders import Nominatim
-from geopy.distance import geodesic
 import json
 import logging
+import os
+import re
 from typing import Dict, List, Tuple, Optional
 import time
 
@@ -17,9 +18,88 @@ import time
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_GEOCODE_CACHE = os.getenv("GEOCODE_CACHE_PATH", "data/geocode_cache.json")
+# Nominatim usage policy: at most one request per second
+GEOCODE_MIN_INTERVAL = 1.0
+
+# (upper bounds, labels): a value belongs to the first bucket whose bound it is below
+SIZE_BUCKETS = ([500, 1000, 2000, 4000], ['Studio', 'Small', 'Medium', 'Large', 'Extra Large'])
+PRICE_CATEGORY_BUCKETS = ([500000, 1000000, 3000000, 10000000],
+                          ['Budget', 'Mid-Range', 'High-End', 'Luxury', 'Ultra-Luxury'])
+PRICE_RANGE_BUCKETS = ([300000, 500000, 1000000, 2000000, 5000000],
+                       ['Under 300K', '300K-500K', '500K-1M', '1M-2M', '2M-5M', '5M+'])
+MARKET_POSITION_BUCKETS = ([-20, -5, 5, 20], ['Below Market', 'Slightly Below Market', 'Market Rate',
+                                              'Slightly Above Market', 'Above Market'])
+
+
+def bucketize(values, buckets) -> np.ndarray:
+    """Vectorized bucket labels; NaN falls in the last bucket, as the scalar comparisons did"""
+    bounds, labels = buckets
+    positions = np.searchsorted(np.asarray(bounds, dtype=float), np.asarray(values, dtype=float), side='right')
+    return np.asarray(labels, dtype=object)[positions]
+
+
+def haversine_matrix(lats, lons, targets: np.ndarray) -> np.ndarray:
+    """Great-circle distances (km) from each (lat, lon) to each target row, shape (n, len(targets))"""
+    lat1 = np.radians(np.asarray(lats, dtype=float))[:, None]
+    lon1 = np.radians(np.asarray(lons, dtype=float))[:, None]
+    lat2 = np.radians(targets[:, 0])[None, :]
+    lon2 = np.radians(targets[:, 1])[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def normalize_location(location) -> str:
+    """Cache key for a free-text location"""
+    return re.sub(r'\s+', ' ', str(location)).strip().lower()
+
+
+class GeocodeCache:
+    """Persistent location -> (lat, lon) cache; None records a location the geocoder could not find"""
+    
+    def __init__(self, path: str = DEFAULT_GEOCODE_CACHE):
+        self.path = path
+        self._entries: Dict[str, Optional[Tuple[float, float]]] = {}
+        self._dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._entries = {key: tuple(value) if value else None for key, value in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable geocode cache {path}: {e}")
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        return self._entries.get(key)
+    
+    def set(self, key: str, coords: Optional[Tuple[float, float]]):
+        self._entries[key] = coords
+        self._dirty = True
+    
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
 class PropertyDataEnricher:
-    def __init__(self):
-        self.geolocator = Nominatim(user_agent="dubai_real_estate_enricher")
+    def __init__(self, geocode_cache_path: str = DEFAULT_GEOCODE_CACHE, online_geocoding: bool = True):
+        """
+        Args:
+            geocode_cache_path: JSON file persisting geocoder answers across runs
+            online_geocoding: query Nominatim for locations missing from the cache;
+                when False only the cache and the area centroids are used
+        """
+        self.geolocator = Nominatim(user_agent="dubai_real_estate_enricher") if online_geocoding else None
+        self.geocode_cache = GeocodeCache(geocode_cache_path)
         
         # Key Dubai locations with coordinates
         self.key_locations = {
@@ -93,36 +173,50 @@ class PropertyDataEnricher:
         return enriched_df
     
     def _add_coordinates(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add coordinates to properties"""
+        """Add coordinates to properties, resolving each distinct location once"""
         logger.info("Adding coordinates to properties")
         
-        df['latitude'] = None
-        df['longitude'] = None
-        
-        for idx, row in df.iterrows():
-            try:
-                # Try to get coordinates from location
-                location_query = f"{row['location']}, Dubai, UAE"
-                location = self.geolocator.geocode(location_query, timeout=10)
-                
-                if location:
-                    df.at[idx, 'latitude'] = location.latitude
-                    df.at[idx, 'longitude'] = location.longitude
-                else:
-                    # Fallback to area coordinates
-                    area_name = self._extract_area_name(row['location'])
-                    if area_name in self.area_coordinates:
-                        lat, lon = self.area_coordinates[area_name]
-                        df.at[idx, 'latitude'] = lat
-                        df.at[idx, 'longitude'] = lon
-                
-                # Add delay to be respectful to geocoding service
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.warning(f"Error getting coordinates for property {idx}: {e}")
-                continue
+        keys = df['location'].map(normalize_location)
+        resolved = {}
+        stats = {'cached': 0, 'geocoded': 0, 'centroid': 0, 'missing': 0}
+        last_request = 0.0
         
+        for key, location in zip(keys, df['location']):
+            if key in resolved:
+                continue
+            
+            coords = self.geocode_cache.get(key)
+            if coords is not None:
+                stats['cached'] += 1
+            elif key not in self.geocode_cache and self.geolocator is not None:
+                # Only live requests are rate limited; cache hits cost nothing
+                wait = GEOCODE_MIN_INTERVAL - (time.monotonic() - last_request)
+                if wait > 0:
+                    time.sleep(wait)
+                try:
+                    location_result = self.geolocator.geocode(f"{location}, Dubai, UAE", timeout=10)
+                    coords = (location_result.latitude, location_result.longitude) if location_result else None
+                    self.geocode_cache.set(key, coords)
+                    if coords is not None:
+                        stats['geocoded'] += 1
+                except Exception as e:
+                    # Transient failures are not cached so the next run retries them
+                    logger.warning(f"Error geocoding location {location!r}: {e}")
+                finally:
+                    last_request = time.monotonic()
+            
+            if coords is None:
+                # Offline fallback: approximate center of a known area
+                area_name = self._extract_area_name(str(location))
+                coords = self.area_coordinates.get(area_name)
+                stats['centroid' if coords else 'missing'] += 1
+            resolved[key] = coords
+        
+        self.geocode_cache.save()
+        logger.info(f"Resolved {len(resolved)} distinct locations: {stats}")
+        
+        df['latitude'] = keys.map(lambda key: resolved[key][0] if resolved[key] else np.nan)
+        df['longitude'] = keys.map(lambda key: resolved[key][1] if resolved[key] else np.nan)
         return df
     
     def _extract_area_name(self, location: str) -> str:
@@ -136,22 +230,15 @@ class PropertyDataEnricher:
         return "Unknown"
     
     def _add_distance_calculations(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add distance calculations to key locations"""
+        """Add distance calculations to key locations (one haversine matrix for all pairs)"""
         logger.info("Adding distance calculations")
         
-        for location_name, coords in self.key_locations.items():
+        targets = np.array(list(self.key_locations.values()), dtype=float)
+        distances = np.round(haversine_matrix(df['latitude'], df['longitude'], targets), 2)
+        
+        for column, location_name in enumerate(self.key_locations):
             distance_col = f'distance_to_{location_name.lower().replace(" ", "_")}'
-            df[distance_col] = None
-            
-            for idx, row in df.iterrows():
-                if pd.notna(row['latitude']) and pd.notna(row['longitude']):
-                    try:
-                        property_coords = (row['latitude'], row['longitude'])
-                        distance = geodesic(property_coords, coords).kilometers
-                        df.at[idx, distance_col] = round(distance, 2)
-                    except Exception as e:
-                        logger.warning(f"Error calculating distance for property {idx}: {e}")
-                        continue
+            df[distance_col] = distances[:, column]
         
         return df
     
@@ -159,17 +246,9 @@ class PropertyDataEnricher:
         """Add market insights and analysis"""
         logger.info("Adding market insights")
         
-        # Calculate price per square foot
-        df['price_per_sqft'] = df.apply(
-            lambda row: row['price'] / row['area_sqft'] if row['area_sqft'] > 0 else 0, 
-            axis=1
-        )
-        
-        # Calculate price per bedroom
-        df['price_per_bedroom'] = df.apply(
-            lambda row: row['price'] / row['bedrooms'] if row['bedrooms'] > 0 else 0, 
-            axis=1
-        )
+        # Calculate price per square foot / bedroom (0 when the divisor is missing or zero)
+        df['price_per_sqft'] = self._safe_ratio(df['price'], df['area_sqft'])
+        df['price_per_bedroom'] = self._safe_ratio(df['price'], df['bedrooms'])
         
         # Add area-based price statistics
         df = self._add_area_price_stats(df)
@@ -193,48 +272,42 @@ class PropertyDataEnricher:
         df = df.merge(area_stats, on='location', how='left', suffixes=('', '_area_avg'))
         
         # Calculate price position relative to area average
-        df['price_vs_area_avg'] = df.apply(
-            lambda row: ((row['price'] - row['price_mean']) / row['price_mean'] * 100) 
-            if pd.notna(row['price_mean']) and row['price_mean'] > 0 else 0, 
-            axis=1
-        )
+        df['price_vs_area_avg'] = self._safe_ratio(df['price'] - df['price_mean'], df['price_mean']) * 100
         
         return df
     
+    @staticmethod
+    def _safe_ratio(numerator: pd.Series, denominator: pd.Series) -> np.ndarray:
+        """numerator / denominator where the denominator is positive, else 0"""
+        num = numerator.to_numpy(dtype=float)
+        den = denominator.to_numpy(dtype=float)
+        valid = den > 0
+        return np.divide(num, den, out=np.zeros_like(num), where=valid)
+    
     def _add_investment_scores(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate investment potential scores"""
         logger.info("Adding investment scores")
         
-        # Initialize investment score
-        df['investment_score'] = 0
+        price = df['price'].to_numpy(dtype=float)
+        area_sqft = df['area_sqft'].to_numpy(dtype=float)
+        marina = df['distance_to_dubai_marina'].to_numpy(dtype=float)
+        mall = df['distance_to_dubai_mall'].to_numpy(dtype=float)
         
-        for idx, row in df.iterrows():
-            score = 0
-            
+        with np.errstate(invalid='ignore'):
             # Price factor (lower price = higher score)
-            if row['price'] > 0:
-                price_score = max(0, 10 - (row['price'] / 1000000))  # Score decreases with price
-                score += price_score * 0.3
+            score = np.where(price > 0, np.maximum(0, 10 - price / 1000000) * 0.3, 0)
             
             # Location factor (proximity to key areas)
-            if pd.notna(row['distance_to_dubai_marina']):
-                marina_score = max(0, 10 - row['distance_to_dubai_marina'])
-                score += marina_score * 0.2
-            
-            if pd.notna(row['distance_to_dubai_mall']):
-                mall_score = max(0, 10 - row['distance_to_dubai_mall'])
-                score += mall_score * 0.2
+            score += np.where(np.isnan(marina), 0, np.maximum(0, 10 - marina) * 0.2)
+            score += np.where(np.isnan(mall), 0, np.maximum(0, 10 - mall) * 0.2)
             
             # Size factor (larger properties get higher score)
-            if row['area_sqft'] > 0:
-                size_score = min(10, row['area_sqft'] / 1000)
-                score += size_score * 0.15
+            score += np.where(area_sqft > 0, np.minimum(10, area_sqft / 1000) * 0.15, 0)
             
-            # Bedroom factor
-            bedroom_score = min(10, row['bedrooms'] * 2)
-            score += bedroom_score * 0.15
-            
-            df.at[idx, 'investment_score'] = round(score, 2)
+            # Bedroom factor; fmin ignores NaN, so missing bedrooms count as 10 like min(10, nan) did
+            score += np.fmin(10, df['bedrooms'].to_numpy(dtype=float) * 2) * 0.15
+        
+        df['investment_score'] = np.round(score, 2)
         
         return df
     
@@ -259,101 +332,66 @@ class PropertyDataEnricher:
                 df.loc[mask, 'area_category'] = category
         
         # Add property size category
-        df['size_category'] = df['area_sqft'].apply(self._categorize_size)
+        df['size_category'] = bucketize(df['area_sqft'], SIZE_BUCKETS)
         
         # Add price category
-        df['price_category'] = df['price'].apply(self._categorize_price)
+        df['price_category'] = bucketize(df['price'], PRICE_CATEGORY_BUCKETS)
         
         return df
     
     def _categorize_size(self, area_sqft: float) -> str:
         """Categorize property by size"""
-        if area_sqft < 500:
-            return 'Studio'
-        elif area_sqft < 1000:
-            return 'Small'
-        elif area_sqft < 2000:
-            return 'Medium'
-        elif area_sqft < 4000:
-            return 'Large'
-        else:
-            return 'Extra Large'
+        return bucketize([area_sqft], SIZE_BUCKETS)[0]
     
     def _categorize_price(self, price: float) -> str:
         """Categorize property by price"""
-        if price < 500000:
-            return 'Budget'
-        elif price < 1000000:
-            return 'Mid-Range'
-        elif price < 3000000:
-            return 'High-End'
-        elif price < 10000000:
-            return 'Luxury'
-        else:
-            return 'Ultra-Luxury'
+        return bucketize([price], PRICE_CATEGORY_BUCKETS)[0]
     
     def _add_price_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add price analysis and trends"""
         logger.info("Adding price analysis")
         
         # Calculate price ranges
-        df['price_range'] = df['price'].apply(self._get_price_range)
+        df['price_range'] = bucketize(df['price'], PRICE_RANGE_BUCKETS)
         
         # Add market positioning
-        df['market_position'] = df['price_vs_area_avg'].apply(self._get_market_position)
+        df['market_position'] = bucketize(df['price_vs_area_avg'], MARKET_POSITION_BUCKETS)
         
         # Add value indicators
-        df['value_indicator'] = df.apply(self._calculate_value_indicator, axis=1)
+        df['value_indicator'] = self._value_indicators(df)
         
         return df
     
     def _get_price_range(self, price: float) -> str:
         """Get price range category"""
-        if price < 300000:
-            return 'Under 300K'
-        elif price < 500000:
-            return '300K-500K'
-        elif price < 1000000:
-            return '500K-1M'
-        elif price < 2000000:
-            return '1M-2M'
-        elif price < 5000000:
-            return '2M-5M'
-        else:
-            return '5M+'
+        return bucketize([price], PRICE_RANGE_BUCKETS)[0]
     
     def _get_market_position(self, price_vs_avg: float) -> str:
         """Get market positioning based on price vs area average"""
-        if price_vs_avg < -20:
-            return 'Below Market'
-        elif price_vs_avg < -5:
-            return 'Slightly Below Market'
-        elif price_vs_avg < 5:
-            return 'Market Rate'
-        elif price_vs_avg < 20:
-            return 'Slightly Above Market'
-        else:
-            return 'Above Market'
+        return bucketize([price_vs_avg], MARKET_POSITION_BUCKETS)[0]
     
     def _calculate_value_indicator(self, row) -> str:
         """Calculate value indicator based on price and features"""
-        if row['price'] == 0 or row['area_sqft'] == 0:
-            return 'Unknown'
-        
-        price_per_sqft = row['price'] / row['area_sqft']
-        
-        # Compare with area average
-        if pd.notna(row['price_per_sqft_mean']):
-            if price_per_sqft < row['price_per_sqft_mean'] * 0.8:
-                return 'Good Value'
-            elif price_per_sqft < row['price_per_sqft_mean']:
-                return 'Fair Value'
-            elif price_per_sqft < row['price_per_sqft_mean'] * 1.2:
-                return 'Premium'
-            else:
-                return 'Overpriced'
-        
-        return 'Unknown'
+        return self._value_indicators(pd.DataFrame([row]))[0]
+    
+    def _value_indicators(self, df: pd.DataFrame) -> np.ndarray:
+        """Value indicator per property: price per sqft against the area average"""
+        price = df['price'].to_numpy(dtype=float)
+        area_sqft = df['area_sqft'].to_numpy(dtype=float)
+        area_mean = df['price_per_sqft_mean'].to_numpy(dtype=float)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_per_sqft = price / area_sqft
+            return np.select(
+                [
+                    (price == 0) | (area_sqft == 0) | np.isnan(area_mean),
+                    price_per_sqft < area_mean * 0.8,
+                    price_per_sqft < area_mean,
+                    price_per_sqft < area_mean * 1.2,
+                ],
+                ['Unknown', 'Good Value', 'Fair Value', 'Premium'],
+                default='Overpriced'
+            ).astype(object)
     
     def generate_market_report(self, df: pd.DataFrame) -> Dict:
         """Generate market analysis report"""
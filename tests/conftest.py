@@ -1,9 +1,203 @@
+"""
+Shared fixtures and helpers for the test suite
+
+Tests and benchmarks load the code they exercise by path, since several
+package __init__ files pull in clients and services a test does not need.
+They import these helpers as ``conftest``, which works under pytest and when
+a benchmark is run directly.
+"""
+import gc
+import importlib.util
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import pandas as pd
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from backend.app.core.models import Base
 
 TEST_DATABASE_URL = "sqlite:///./test.db"
+LISTINGS_PATH = os.path.join(REPO_ROOT, 'data_simulation', 'generated_data', 'property_listings.csv')
+AMENITIES = ['pool', 'Gym', 'covered parking', 'Balcony', 'sauna', 'kids playground', 'BBQ area', 'concierge']
+PROPERTY_TYPES = ['Apartment', 'Villa', 'Studio', 'Penthouse', 'Townhouse', 'Office']
+
+
+def load_module(name, relative_path, workdir=None):
+    """
+    Load ``relative_path`` (from the repository root) as module ``name``.
+
+    With ``workdir`` the module body runs from that directory, for modules
+    whose global instances read or create directories relative to the CWD.
+    """
+    path = os.path.join(REPO_ROOT, relative_path)
+    cwd = os.getcwd()
+    if workdir is not None:
+        os.chdir(workdir)
+    try:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module  # so worker processes can unpickle its functions
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+    return module
+
+
+def load_package(name, relative_dir):
+    """
+    Register package ``name`` at ``relative_dir`` without running its
+    __init__, so its submodules (and their relative imports) load on demand.
+    """
+    if name not in sys.modules:
+        path = os.path.join(REPO_ROOT, relative_dir)
+        spec = importlib.util.spec_from_file_location(
+            name, os.path.join(path, '__init__.py'), submodule_search_locations=[path])
+        sys.modules[name] = importlib.util.module_from_spec(spec)
+    return sys.modules[name]
+
+
+def best_seconds(fn, repeats=3):
+    """Best of ``repeats`` calls of ``fn``, each starting from a collected heap"""
+    best = float('inf')
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def load_listings(rows=None):
+    """The simulated listings from data_simulation/ as the pipeline ingests them"""
+    return pd.read_csv(LISTINGS_PATH, nrows=rows).to_dict('records')
+
+
+def messy_records(listings, count, seed=11):
+    """Resample listings into ``count`` records in the raw formats scraped sources use"""
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        listing = rng.choice(listings)
+        records.append({
+            'address': f"{rng.randint(1, 999)} {listing['building']} St, {listing['location']}",
+            'price': rng.choice([listing['price_aed'], f"AED {listing['price_aed']:,}", f"{listing['price_aed']} aed", None]),
+            'bedrooms': rng.choice([listing['bedrooms'], f"{listing['bedrooms']} BR", str(listing['bedrooms'])]),
+            'bathrooms': listing['bathrooms'],
+            'sqft': rng.choice([listing['area_sqft'], f"{listing['area_sqft']:,} sqft"]),
+            'type': listing['property_type'],
+            'neighborhood': rng.choice([listing['location'], listing['location'].upper(), f" {listing['location']} area"]),
+            'developer': rng.choice([listing['developer'], f"  {listing['developer'].lower()}  "]),
+            'amenities': ", ".join(rng.sample(AMENITIES, rng.randint(0, 4))),
+            'description': listing['description'],
+        })
+    return records
+
+
+def clean_per_record(cleaner, data):
+    """DataCleaner.clean_property_data as it was before the batch path: one helper call per field per record"""
+    cleaned_data = []
+    for item in data:
+        cleaned_item = {}
+        if 'address' in item:
+            cleaned_item['address'] = cleaner._clean_address(item['address'])
+        if 'price' in item:
+            cleaned_item['price_aed'] = cleaner._clean_price(item['price'])
+        elif 'price_aed' in item:
+            cleaned_item['price_aed'] = cleaner._clean_price(item['price_aed'])
+        if 'bedrooms' in item:
+            cleaned_item['bedrooms'] = cleaner._extract_number(item['bedrooms'])
+        if 'bathrooms' in item:
+            cleaned_item['bathrooms'] = cleaner._extract_number(item['bathrooms'])
+        for key in ('square_feet', 'sqft', 'area_sqft'):
+            if key in item:
+                cleaned_item['square_feet'] = cleaner._extract_number(item[key])
+                break
+        for key in ('property_type', 'type'):
+            if key in item:
+                cleaned_item['property_type'] = cleaner._standardize_property_type(item[key])
+                break
+        for key in ('area', 'neighborhood', 'location'):
+            if key in item:
+                cleaned_item['area'] = cleaner._standardize_area(item[key])
+                break
+        if 'developer' in item:
+            cleaned_item['developer'] = cleaner._clean_developer(item['developer'])
+        if 'amenities' in item:
+            cleaned_item['amenities'] = cleaner._clean_amenities(item['amenities'])
+        if 'description' in item:
+            cleaned_item['description'] = cleaner._clean_description(item['description'])
+        cleaned_item['validation_flags'] = cleaner._validate_property_data(cleaned_item)
+        cleaned_item['cleaned_at'] = datetime.now().isoformat()
+        cleaned_data.append(cleaned_item)
+    return cleaned_data
+
+
+def make_enrichment_records(areas, count, seed=7):
+    """Records in ``areas`` with missing, zero and precomputed price fields, as DataEnricher receives them"""
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        price = rng.choice([0, None, rng.uniform(4e5, 2.5e7)])
+        square_feet = rng.choice([0, rng.uniform(350, 9000)])
+        record = {
+            'area': rng.choice(areas),
+            'price_aed': price,
+            'square_feet': square_feet,
+            'bedrooms': rng.choice([None, 0, 1, 2, 3, 4, 5]),
+            'property_type': rng.choice(PROPERTY_TYPES),
+        }
+        if price and square_feet and rng.random() < 0.8:
+            record['price_per_sqft'] = price / square_feet
+        records.append(record)
+    return records
+
+
+def enrich_per_record(enricher, data):
+    """DataEnricher.enrich_property_data as it was before the batch path: one helper call per field per record"""
+    enriched_data = []
+    for item in data:
+        enriched_item = item.copy()
+        if item.get('price_aed') and item.get('square_feet'):
+            enriched_item['price_per_sqft'] = item['price_aed'] / item['square_feet']
+        enriched_item['market_context'] = enricher._get_market_context(item)
+        enriched_item['investment_metrics'] = enricher._calculate_investment_metrics(item)
+        enriched_item['property_classification'] = enricher._classify_property(item)
+        enriched_item['location_intelligence'] = enricher._get_location_intelligence(item)
+        enriched_item['enriched_at'] = datetime.now().isoformat()
+        enriched_data.append(enriched_item)
+    return enriched_data
+
+
+def valuation_portfolio(locations, property_types, count, seed=7, missing_location_rate=0.0):
+    """``count`` properties to value across ``locations`` and ``property_types``, some fields left out"""
+    rng = random.Random(seed)
+    properties = []
+    for _ in range(count):
+        bedrooms = rng.randint(1, 5)
+        prop = {
+            'location': rng.choice(locations),
+            'property_type': rng.choice(property_types),
+            'bedrooms': bedrooms,
+            'bathrooms': max(1, bedrooms + rng.randint(-1, 1)),
+            'square_feet': bedrooms * 300 + rng.randint(200, 800),
+            'age_years': rng.randint(0, 15),
+            'has_parking': rng.choice([0, 1]),
+        }
+        if rng.random() < 0.7:
+            prop.update(amenities_score=rng.uniform(0.7, 1.3), distance_to_metro=rng.uniform(0.1, 3.0))
+        if rng.random() < missing_location_rate:
+            del prop['location']
+        properties.append(prop)
+    return properties
+
 
 @pytest.fixture(scope="session")
 def test_engine():
@@ -17,4 +211,4 @@ def db_session(test_engine):
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
     session = TestingSessionLocal()
     yield session
-    session.close()
\ No newline at end of file
+    session.close()
@@ -0,0 +1,59 @@
+"""
+Benchmark for property cleaning throughput in rows/sec
+
+Cleans the simulated 8k property listings from data_simulation/ and a 50k
+batch resampled from them with messier formatting (price strings, "3 BR",
+abbreviated addresses, amenity lists), once record by record and once with the
+column-wise DataCleaner; tests/unit/test_cleaning.py checks that both produce
+the same records. Run directly for a report:
+
+    python tests/performance/test_cleaning_benchmark.py
+"""
+import os
+
+import pytest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))  # conftest, when run directly
+from conftest import best_seconds, clean_per_record, load_listings, load_module, messy_records
+
+# The data_pipeline package __init__ pulls in the ingestion/storage clients,
+# which the cleaner does not need
+cleaning = load_module('pipeline_cleaning', 'scripts/data_pipeline/cleaning.py')
+
+
+def run_benchmark(sizes=(8000, 50000), repeats=3):
+    cleaner = cleaning.DataCleaner({})
+    listings = load_listings()
+    datasets = {'listings_8k': listings[:sizes[0]], f'messy_{sizes[1] // 1000}k': messy_records(listings, sizes[1])}
+
+    report = {}
+    for name, records in datasets.items():
+        per_record_seconds = best_seconds(lambda: clean_per_record(cleaner, records), repeats)
+        batch_seconds = best_seconds(lambda: cleaner.clean_property_data(records), repeats)
+        cleaned = cleaner.clean_property_data(records)
+        dedup_seconds = best_seconds(lambda: cleaner.remove_duplicates(cleaned), repeats)
+        report[name] = {
+            'rows': len(records),
+            'per_record_rps': len(records) / per_record_seconds,
+            'batch_rps': len(records) / batch_seconds,
+            'dedup_rps': len(records) / dedup_seconds,
+        }
+    return report
+
+
+@pytest.mark.performance
+def test_batch_cleaning_outpaces_per_record():
+    report = run_benchmark(sizes=(8000, 20000), repeats=2)
+    for name, stats in report.items():
+        print(f"\n{name}: per-record {stats['per_record_rps']:,.0f} rows/s, batch {stats['batch_rps']:,.0f} rows/s")
+        assert stats['batch_rps'] > stats['per_record_rps']
+
+
+if __name__ == "__main__":
+    for name, stats in run_benchmark().items():
+        print(f"{name} ({stats['rows']} rows)")
+        print(f"  per-record clean : {stats['per_record_rps']:10,.0f} rows/s")
+        print(f"  batch clean      : {stats['batch_rps']:10,.0f} rows/s")
+        print(f"  speed-up         : {stats['batch_rps'] / stats['per_record_rps']:10.1f}x")
+        print(f"  remove_duplicates: {stats['dedup_rps']:10,.0f} rows/s")
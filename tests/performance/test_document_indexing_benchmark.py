@@ -0,0 +1,120 @@
+"""
+Benchmark for document indexing throughput in chunks/sec
+
+Indexes a corpus of synthetic contracts once with one embedding call and one
+upsert per chunk, and once through DocumentIndexer's batches. The embedder
+and collection stand in for a model and a Chroma server with a fixed cost
+per call plus a cost per chunk, which is what batching amortises. Run
+directly for a report:
+
+    python tests/performance/test_document_indexing_benchmark.py
+"""
+import time
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.document_indexer import DocumentIndexer, chunk_text
+
+DOCUMENTS = 200
+CALL_OVERHEAD = 0.002   # seconds per embedding call / Chroma request
+PER_CHUNK_COST = 0.00005
+
+
+def make_documents(count=DOCUMENTS):
+    documents = []
+    for d in range(count):
+        clauses = "\n\n".join(
+            f"{s}. Clause {s}\n" + " ".join(
+                f"The party in document {d} shall complete obligation {s}.{i} within {i + 3} days of notice."
+                for i in range(12)
+            )
+            for s in range(1, 6)
+        )
+        documents.append({"id": f"contract-{d}", "content": f"# Contract {d}\n\n{clauses}", "doc_type": "legal_document"})
+    return documents
+
+
+class SimulatedEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        time.sleep(CALL_OVERHEAD + PER_CHUNK_COST * len(texts))
+        return [[0.0] * 8 for _ in texts]
+
+
+class SimulatedCollection:
+    def __init__(self):
+        self.count = 0
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        time.sleep(CALL_OVERHEAD + PER_CHUNK_COST * len(ids))
+        self.count += len(ids)
+
+    def delete(self, where):
+        time.sleep(CALL_OVERHEAD)
+
+
+class SimulatedChromaClient:
+    def __init__(self):
+        self.collections = {}
+
+    def get_or_create_collection(self, name):
+        return self.collections.setdefault(name, SimulatedCollection())
+
+
+def index_per_chunk(documents):
+    """One embedding call and one upsert per chunk"""
+    embedder, collection = SimulatedEmbedder(), SimulatedCollection()
+    chunks = 0
+    start = time.perf_counter()
+    for document in documents:
+        for chunk in chunk_text(document["content"]):
+            embedding = embedder([chunk.text])
+            collection.upsert([f"{document['id']}:{chunk.index}"], [chunk.text], [{}], embedding)
+            chunks += 1
+    return chunks, time.perf_counter() - start
+
+
+def run_benchmark(count=DOCUMENTS):
+    documents = make_documents(count)
+
+    start = time.perf_counter()
+    chunked = sum(len(chunk_text(document["content"])) for document in documents)
+    chunking_seconds = time.perf_counter() - start
+
+    per_chunk_chunks, per_chunk_seconds = index_per_chunk(documents)
+
+    embedder = SimulatedEmbedder()
+    stats = DocumentIndexer(SimulatedChromaClient(), embedder=embedder).index_documents(documents)
+
+    assert per_chunk_chunks == stats.chunks == chunked
+    return {
+        'documents': count,
+        'chunks': stats.chunks,
+        'chunking_cps': chunked / chunking_seconds,
+        'per_chunk_cps': per_chunk_chunks / per_chunk_seconds,
+        'batched_cps': stats.chunks_per_second,
+        'embed_calls': embedder.calls,
+    }
+
+
+@pytest.mark.performance
+def test_batched_indexing_outpaces_per_chunk_indexing():
+    report = run_benchmark(count=50)
+    print(f"\nindexing: per-chunk {report['per_chunk_cps']:,.0f} chunks/s, "
+          f"batched {report['batched_cps']:,.0f} chunks/s ({report['embed_calls']} embed calls)")
+    assert report['batched_cps'] > 3 * report['per_chunk_cps']
+
+
+if __name__ == "__main__":
+    report = run_benchmark()
+    print(f"documents: {report['documents']}, chunks: {report['chunks']}")
+    print(f"chunking only   : {report['chunking_cps']:10,.0f} chunks/s")
+    print(f"per-chunk index : {report['per_chunk_cps']:10,.0f} chunks/s")
+    print(f"batched index   : {report['batched_cps']:10,.0f} chunks/s ({report['embed_calls']} embed calls)")
+    print(f"speed-up        : {report['batched_cps'] / report['per_chunk_cps']:10.1f}x")
@@ -0,0 +1,53 @@
+"""
+Benchmark for property enrichment throughput
+
+Compares the per-record DataEnricher path (one area lookup per field per
+record) with the column-wise batch path that resolves each distinct area once
+from the precompiled area table; tests/unit/test_enrichment.py checks that
+both produce the same records. Run directly for a report:
+
+    python tests/performance/test_enrichment_benchmark.py
+"""
+import os
+
+import pytest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))  # conftest, when run directly
+from conftest import best_seconds, enrich_per_record, load_module, make_enrichment_records
+
+# The data_pipeline package __init__ pulls in the ingestion/storage clients,
+# which the enricher does not need
+enrichment = load_module('pipeline_enrichment', 'scripts/data_pipeline/enrichment.py')
+
+RECORDS = 20000
+
+
+def run_benchmark(count=RECORDS):
+    records = make_enrichment_records(list(enrichment.AREA_PROFILES) + ['Al Barsha', 'Unknown'], count)
+    enricher = enrichment.DataEnricher({})
+
+    per_record_seconds = best_seconds(lambda: enrich_per_record(enricher, records))
+    batch_seconds = best_seconds(lambda: enricher.enrich_property_data(records))
+
+    return {
+        'records': count,
+        'per_record_rps': count / per_record_seconds,
+        'batch_rps': count / batch_seconds,
+    }
+
+
+@pytest.mark.performance
+def test_batch_enrichment_outpaces_per_record():
+    report = run_benchmark()
+    print(f"\nenrichment: per-record {report['per_record_rps']:,.0f} rec/s, "
+          f"batch {report['batch_rps']:,.0f} rec/s")
+    assert report['batch_rps'] > report['per_record_rps']
+
+
+if __name__ == "__main__":
+    report = run_benchmark()
+    print(f"records: {report['records']}")
+    print(f"per-record path : {report['per_record_rps']:10,.0f} records/s")
+    print(f"batch path      : {report['batch_rps']:10,.0f} records/s")
+    print(f"speed-up        : {report['batch_rps'] / report['per_record_rps']:10.1f}x")
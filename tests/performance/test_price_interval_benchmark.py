@@ -0,0 +1,104 @@
+"""
+Benchmark for MarketPredictor price intervals in properties/sec
+
+Publishes a random forest price model, then computes its tree-spread interval
+once the old way (one predict call per tree per property) and once through
+predict_property_prices_batch; tests/unit/test_model_training.py checks that
+the tree stack gives the per-tree predictions. Run directly for a report:
+
+    python tests/performance/test_price_interval_benchmark.py
+"""
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))  # conftest, when run directly
+from app.domain.ai.model_registry import ModelRegistry
+
+from conftest import best_seconds, load_module
+
+FEATURES = ['bedrooms', 'bathrooms', 'square_feet', 'age', 'location_score', 'amenity_score']
+
+
+def load_predictor(workdir, n_estimators=100):
+    """
+    Load the module by path (the ml package __init__ pulls in services this
+    benchmark does not need) from a scratch directory, since its global
+    instance reads ./ml_models, and serve a freshly published random forest.
+    """
+    module = load_module('market_predictor', 'backend/ml/models/market_predictor.py', workdir)
+
+    rng = np.random.RandomState(0)
+    X = np.column_stack([
+        rng.randint(1, 6, 2000), rng.randint(1, 5, 2000), rng.uniform(500, 4000, 2000),
+        rng.uniform(0, 20, 2000), rng.rand(2000), rng.rand(2000),
+    ])
+    y = X[:, 2] * (800 + 1500 * X[:, 4]) * rng.normal(1, 0.05, 2000)
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=0).fit(X, y)
+    registry = ModelRegistry(os.path.join(workdir, 'market_price'))
+    registry.publish({'models': {'price_rf': model}}, metadata={'features': FEATURES}, promote=True)
+    return module.MarketPredictor(registry=registry)
+
+
+def portfolio(count, seed=7):
+    rng = np.random.RandomState(seed)
+    return [
+        {'bedrooms': int(b), 'bathrooms': int(b), 'square_feet': float(sq), 'age': float(age),
+         'location_score': float(score), 'amenity_score': float(amenity)}
+        for b, sq, age, score, amenity in zip(
+            rng.randint(1, 6, count), rng.uniform(500, 4000, count), rng.uniform(0, 20, count),
+            rng.uniform(0.05, 1, count), rng.rand(count)
+        )
+    ]
+
+
+def per_estimator_interval(model, features):
+    """The interval as predict_property_prices computed it before: one predict call per tree"""
+    pred = model.predict([features])[0]
+    std_pred = np.std([est.predict([features])[0] for est in model.estimators_])
+    return pred - 1.96 * std_pred, pred + 1.96 * std_pred
+
+
+def run_benchmark(predictor, sizes=(10, 100, 1000), loop_limit=50, repeats=3):
+    model = predictor.price_models['price_rf']
+    report = {}
+    for size in sizes:
+        properties = portfolio(size)
+        sample = properties[:loop_limit]
+        loop_seconds = best_seconds(lambda: [per_estimator_interval(model, [p[name] for name in FEATURES]) for p in sample], 1)
+        single_seconds = best_seconds(lambda: [predictor.predict_property_prices_batch([p]) for p in sample], repeats)
+        batch_seconds = best_seconds(lambda: predictor.predict_property_prices_batch(properties), repeats)
+        report[size] = {
+            'loop_pps': len(sample) / loop_seconds,
+            'single_pps': len(sample) / single_seconds,
+            'batch_pps': size / batch_seconds,
+        }
+    return report
+
+
+@pytest.mark.performance
+def test_vectorized_intervals_outpace_per_estimator_loop(tmp_path):
+    predictor = load_predictor(str(tmp_path))
+    report = run_benchmark(predictor, sizes=(200,), loop_limit=20, repeats=2)
+    stats = report[200]
+    print(f"\nloop {stats['loop_pps']:,.0f}, single {stats['single_pps']:,.0f}, batch {stats['batch_pps']:,.0f} properties/s")
+    assert stats['single_pps'] > 5 * stats['loop_pps']
+    assert stats['batch_pps'] > 5 * stats['single_pps']
+
+
+if __name__ == "__main__":
+    import tempfile
+    import warnings
+
+    warnings.simplefilter('ignore')
+    with tempfile.TemporaryDirectory() as workdir:
+        predictor = load_predictor(workdir)
+        for size, stats in run_benchmark(predictor).items():
+            print(f"{size} properties")
+            print(f"  per-estimator loop : {stats['loop_pps']:10,.0f} properties/s")
+            print(f"  tree stack, 1 row  : {stats['single_pps']:10,.0f} properties/s")
+            print(f"  tree stack, batch  : {stats['batch_pps']:10,.0f} properties/s")
@@ -0,0 +1,168 @@
+"""
+Micro-benchmark for per-message query analysis cost
+
+Compares the previous per-pattern ``re.search``/``re.findall`` loops with the
+precompiled, literal-prefiltered QueryMatcher on a representative slice of the
+RAG service's intent and entity tables. Run directly for a report:
+
+    python tests/performance/test_query_matcher_benchmark.py
+"""
+import re
+import time
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.query_matcher import QueryMatcher
+
+INTENT_PATTERNS = {
+    "property_search": [
+        r'\b(looking for|searching for|find|need)\b.*\b(apartment|villa|house|property|home)\b',
+        r'\b(budget|price|cost)\b.*\b(\d+)\b.*\b(million|thousand|k|m)\b',
+        r'\b(bedroom|bed)\b.*\b(\d+)\b',
+        r'\b(bathroom|bath)\b.*\b(\d+)\b',
+        r'\b(dubai marina|downtown|palm jumeirah|business bay)\b.*\b(property|apartment|villa)\b',
+    ],
+    "market_info": [
+        r'\b(market|trend|price|appreciation|rental yield|investment)\b',
+        r'\b(how is|what is the|tell me about)\b.*\b(market|trend)\b',
+        r'\b(price|cost)\b.*\b(trend|change|increase|decrease)\b',
+    ],
+    "report_generation": [
+        r'\b(create|generate|make|build)\b.*\b(report|analysis|presentation)\b',
+        r'\b(can you|please|would you)\b.*\b(create|generate|make)\b.*\b(report|analysis)\b',
+        r'\b(market report|cma|comparative market analysis|listing presentation)\b',
+    ],
+    "investment_question": [
+        r'\b(investment|roi|return|yield|profit)\b',
+        r'\b(rental|rent|tenant)\b',
+        r'\b(buy|sell|hold)\b.*\b(property|investment)\b',
+    ],
+    "regulatory_question": [
+        r'\b(law|regulation|rera|escrow|legal|compliance)\b',
+        r'\b(golden visa|visa requirements|residency visa)\b',
+        r'\b(freehold|leasehold|ownership rights)\b',
+        r'\b(dubai land department|dld|mortgage regulations)\b',
+    ],
+    "neighborhood_question": [
+        r'\b(dubai marina|downtown|palm jumeirah|business bay|jbr|jumeirah|dubai hills|arabian ranches|emirates hills)\b.*\b(area|neighborhood|community|amenities)\b',
+        r'\b(tell me about|describe|what is)\b.*\b(dubai marina|downtown|palm jumeirah|business bay)\b',
+        r'\b(schools|hospitals|transport|metro|amenities)\b.*\b(area|neighborhood)\b',
+    ],
+    "developer_question": [
+        r'\b(emaar|damac|nakheel|sobha|dubai properties|meraas)\b',
+        r'\b(developer|builder|construction company)\b',
+        r'\b(who built|who developed|which developer)\b',
+    ],
+    "update_lead": [
+        r'\b(update|change|set)\b.*\b(lead|client|status)\b',
+        r'\b(status to)\b',
+        r'\b(mark|move)\b.*\b(lead|client)\b.*\b(to|as)\b',
+    ],
+    "schedule_follow_up": [
+        r'\b(schedule|remind me|set a reminder|follow up)\b',
+        r'\b(call|meeting|email)\b.*\b(tomorrow|monday|next week|at \d+[ap]m)\b',
+        r'\b(book|arrange)\b.*\b(appointment|meeting)\b',
+    ],
+}
+
+ENTITY_PATTERNS = {
+    "budget": [
+        r'under\s+(\d+)\s*(?:k|thousand|million|m)',
+        r'less\s+than\s+(\d+)\s*(?:k|thousand|million|m)',
+        r'below\s+(\d+)\s*(?:k|thousand|million|m)',
+        r'\$?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:k|thousand|million|m)?',
+        r'budget.*?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
+    ],
+    "location": [
+        r'\b(dubai marina|downtown|palm jumeirah|business bay|jbr|jumeirah|marina)\b',
+        r'\b(area|neighborhood|location)\b.*?\b(\w+(?:\s+\w+)*)\b',
+        r'in\s+(\w+(?:\s+\w+)*)',
+        r'(\w+(?:\s+\w+)*)\s+area',
+    ],
+    "property_type": [
+        r'\b(apartment|condo|villa|house|townhouse|penthouse|studio)\b',
+        r'\b(residential|commercial|office|retail)\b',
+    ],
+    "bedrooms": [r'(\d+)\s*bedroom', r'(\d+)\s*br', r'(\d+)\s*bed'],
+    "bathrooms": [r'(\d+(?:\.\d+)?)\s*bathroom', r'(\d+(?:\.\d+)?)\s*bath'],
+    "new_status": [
+        r'\b(status to)\s+[\'"]?(\w+)[\'"]?\b',
+        r'\b(mark|move)\b.*\b(to|as)\s+[\'"]?(\w+)[\'"]?\b',
+    ],
+    "task_datetime": [
+        r'\b(tomorrow|today|monday|tuesday|wednesday|thursday|friday|saturday|sunday|next week)\b(?:\s+at\s+(\d{1,2}(?::\d{2})?\s*[ap]m))?',
+        r'\b(at)\s+(\d{1,2}(?::\d{2})?\s*[ap]m)\b',
+    ],
+}
+
+MESSAGES = [
+    "Hi, what can you do?",
+    "I'm looking for a 2 bedroom apartment in Dubai Marina under 2 million",
+    "What is the market trend in Downtown and how are rental yields holding up?",
+    "Please generate a CMA report for a 4 bedroom villa on Palm Jumeirah",
+    "Update Sarah Khan's lead status to qualified",
+    "Schedule a call with the Emaar sales team tomorrow at 3pm",
+    "Do I qualify for a golden visa if I buy a freehold property?",
+    "Which developer built the towers in Business Bay, and who manages the escrow?",
+]
+
+ITERATIONS = 300
+
+
+def naive_analyze(text):
+    """The per-message loops analyze_query used before the shared matcher"""
+    scores = {}
+    for intent, patterns in INTENT_PATTERNS.items():
+        scores[intent] = sum(1 for p in patterns if re.search(p, text, re.IGNORECASE))
+    entities = {}
+    for entity_type, patterns in ENTITY_PATTERNS.items():
+        for pattern in patterns:
+            matches = re.findall(pattern, text, re.IGNORECASE)
+            if matches:
+                entities[entity_type] = matches[0] if isinstance(matches[0], str) else matches[0][0]
+                break
+    return scores, entities
+
+
+def per_message_us(analyze, messages, iterations=ITERATIONS):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in messages:
+            analyze(message)
+    return (time.perf_counter() - start) / (iterations * len(messages)) * 1e6
+
+
+def run_benchmark():
+    matcher = QueryMatcher(INTENT_PATTERNS, ENTITY_PATTERNS)
+    messages = [m.lower() for m in MESSAGES]
+
+    def compiled_analyze(text):
+        result = matcher.match(text)
+        return result.intent_scores, result.entities
+
+    for text in messages:
+        assert compiled_analyze(text) == naive_analyze(text), text
+
+    return {
+        "naive_us": per_message_us(naive_analyze, messages),
+        "compiled_us": per_message_us(compiled_analyze, messages),
+    }
+
+
+@pytest.mark.performance
+def test_compiled_matcher_is_cheaper_per_message():
+    report = run_benchmark()
+    print(f"\nquery analysis per message: naive {report['naive_us']:.1f}us, "
+          f"compiled {report['compiled_us']:.1f}us")
+    assert report["compiled_us"] < report["naive_us"]
+
+
+if __name__ == "__main__":
+    report = run_benchmark()
+    print(f"messages: {len(MESSAGES)}  iterations: {ITERATIONS}")
+    print(f"naive per-pattern loops : {report['naive_us']:8.1f} us/message")
+    print(f"precompiled QueryMatcher: {report['compiled_us']:8.1f} us/message")
+    print(f"speed-up                : {report['naive_us'] / report['compiled_us']:8.1f}x")
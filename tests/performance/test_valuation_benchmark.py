@@ -0,0 +1,69 @@
+"""
+Benchmark for batch property valuation throughput in properties/sec
+
+Trains the AdvancedMLModels price predictor on its synthetic Dubai data, then
+values a portfolio of properties once through predict_property_price per row
+and once through predict_property_prices; tests/unit/test_valuation.py checks
+that both give the same prices. Run directly for a report:
+
+    python tests/performance/test_valuation_benchmark.py
+"""
+import os
+
+import pytest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))  # conftest, when run directly
+
+from conftest import best_seconds, load_module, valuation_portfolio
+
+
+def load_models(workdir):
+    """
+    Load the module by path (the ml package __init__ pulls in services this
+    benchmark does not need) from a scratch directory, since its global
+    instance reads the model registry under ./ml_models, and train it.
+    """
+    models = load_module('advanced_ml_models', 'backend/ml/advanced_ml_models.py', workdir).advanced_ml_models
+    models._train_price_predictor(models._generate_training_data())
+    return models
+
+
+def run_benchmark(models, sizes=(100, 1000, 10000), single_limit=2000, repeats=3):
+    locations = list(models.encoders['location_encoder'].classes_)
+    property_types = list(models.encoders['property_type_encoder'].classes_)
+    report = {}
+    for size in sizes:
+        properties = valuation_portfolio(locations, property_types, size)
+        sample = properties[:single_limit]
+        single_seconds = best_seconds(lambda: [models.predict_property_price(prop) for prop in sample], 1)
+        batch_seconds = best_seconds(lambda: models.predict_property_prices(properties), repeats)
+        report[size] = {
+            'single_pps': len(sample) / single_seconds,
+            'batch_pps': size / batch_seconds,
+        }
+    return report
+
+
+@pytest.mark.performance
+def test_batch_valuation_outpaces_single_rows(tmp_path):
+    models = load_models(tmp_path)
+    report = run_benchmark(models, sizes=(1000,), single_limit=300, repeats=2)
+    stats = report[1000]
+    print(f"\nsingle {stats['single_pps']:,.0f} properties/s, batch {stats['batch_pps']:,.0f} properties/s")
+    assert stats['batch_pps'] > 5 * stats['single_pps']
+
+
+if __name__ == "__main__":
+    import tempfile
+    import warnings
+
+    warnings.simplefilter('ignore')
+    with tempfile.TemporaryDirectory() as workdir:
+        models = load_models(workdir)
+        for size, stats in run_benchmark(models).items():
+            print(f"{size} properties")
+            print(f"  single-row path : {stats['single_pps']:10,.0f} properties/s")
+            print(f"  batch path      : {stats['batch_pps']:10,.0f} properties/s")
+            print(f"  speed-up        : {stats['batch_pps'] / stats['single_pps']:10.1f}x")
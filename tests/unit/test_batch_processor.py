@@ -0,0 +1,194 @@
+"""
+Unit tests for batch job checkpointing, resume and per-item parallelism
+"""
+import sqlite3
+import threading
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from batch_processor import BatchProcessor, BatchStatus
+from app.infrastructure.queue.batch_metrics import BATCH_ITEMS, generate_latest
+
+
+def wait_for(job, timeout=5):
+    deadline = time.time() + timeout
+    while job.status in (BatchStatus.PENDING, BatchStatus.PROCESSING) and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def stop(processor):
+    """Simulate a worker that died: its leases are no longer renewed and lapse"""
+    processor._heartbeat_stop.set()
+    time.sleep(processor.lease_seconds + 0.1)
+
+
+class TestCheckpointAndResume:
+    """Test that a restarted processor continues from unfinished items."""
+
+    def test_restart_resumes_at_unfinished_items(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        release = threading.Event()
+        first = BatchProcessor(max_workers=1, batch_size=2, store_path=path, lease_seconds=0.3)
+        items = [{"n": n} for n in range(10)]
+        job_id = first.create_batch_job("ingest", items, {"note": "kept"})
+
+        def stalls_at_four(item):
+            if item["n"] == 4:
+                release.wait(5)
+
+        first.process_batch_async(job_id, stalls_at_four)
+        deadline = time.time() + 5
+        while first.get_job_status(job_id).processed_items < 4 and time.time() < deadline:
+            time.sleep(0.01)
+
+        # Another worker on the same store leaves the job alone while its owner holds the lease
+        time.sleep(0.4)
+        assert BatchProcessor(store_path=path).resumable_jobs(["ingest"]) == []
+
+        # Once the owner stops, a new worker claims the job as pending from item 4
+        stop(first)
+        second = BatchProcessor(max_workers=1, batch_size=2, store_path=path)
+        resumed = second.resumable_jobs(["ingest"])
+        assert [job.job_id for job in resumed] == [job_id]
+        assert resumed[0].processed_items == 4 and resumed[0].metadata == {"note": "kept"}
+
+        seen = []
+        second.process_batch_async(job_id, lambda item: seen.append(item["n"]))
+        job = wait_for(second.get_job_status(job_id))
+        assert second.resumable_jobs(["ingest"]) == []
+
+        # The old owner finds the job claimed at its next checkpoint and stops without writing
+        release.set()
+        deadline = time.time() + 5
+        while first.get_job_status(job_id) is not None and time.time() < deadline:
+            time.sleep(0.01)
+        assert first.get_job_status(job_id) is None
+
+        assert job.status == BatchStatus.COMPLETED
+        assert seen == list(range(4, 10))
+        assert (job.processed_items, job.failed_items, job.progress) == (10, 0, 1.0)
+        assert second._store.unfinished_jobs(["completed"])[0]["processed_items"] == 10
+        assert BatchProcessor(store_path=path).resumable_jobs(["ingest"]) == []
+
+    def test_a_lapsed_job_is_claimed_by_one_worker(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        owner = BatchProcessor(store_path=path, lease_seconds=0.2)
+        job_id = owner.create_batch_job("ingest", [{"n": 1}])
+        stop(owner)
+
+        workers = [BatchProcessor(store_path=path) for _ in range(3)]
+        claims = [[job.job_id for job in worker.resumable_jobs(["ingest"])] for worker in workers]
+        assert sorted(claims) == [[], [], [job_id]]
+
+    def test_jobs_of_a_store_without_owners_are_claimed(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE batch_jobs (
+                job_id TEXT PRIMARY KEY, job_type TEXT NOT NULL, status TEXT NOT NULL, total_items INTEGER NOT NULL,
+                processed_items INTEGER NOT NULL DEFAULT 0, failed_items INTEGER NOT NULL DEFAULT 0,
+                start_time TEXT, end_time TEXT, error_message TEXT, metadata TEXT, executor TEXT,
+                parallelism INTEGER, created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            );
+            INSERT INTO batch_jobs (job_id, job_type, status, total_items) VALUES ('old', 'ingest', 'processing', 0);
+        """)
+        conn.close()
+        assert [job.job_id for job in BatchProcessor(store_path=path).resumable_jobs(["ingest"])] == ["old"]
+
+    def test_processors_only_claim_the_job_types_they_run(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        owner = BatchProcessor(store_path=path, lease_seconds=0.2)
+        ingest_id = owner.create_batch_job("document_ingestion", [{"n": 1}])
+        report_id = owner.create_batch_job("report", [{"n": 2}])
+        stop(owner)
+
+        # A processor that never asks for resumable jobs claims nothing
+        generic = BatchProcessor(store_path=path, lease_seconds=0.2)
+        ingestion = BatchProcessor(store_path=path, lease_seconds=0.2)
+        assert generic.active_jobs == {}
+        assert [job.job_id for job in generic.resumable_jobs(["report"])] == [report_id]
+        assert [job.job_id for job in ingestion.resumable_jobs(["document_ingestion"])] == [ingest_id]
+        assert {row["job_id"]: row["owner"] for row in ingestion._store.unfinished_jobs(["pending"])} == {
+            ingest_id: ingestion.owner, report_id: generic.owner,
+        }
+
+    def test_only_running_jobs_keep_their_lease(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        release = threading.Event()
+        owner = BatchProcessor(max_workers=1, store_path=path, lease_seconds=0.3)
+        running_id = owner.create_batch_job("ingest", [{"n": 1}])
+        idle_id = owner.create_batch_job("ingest", [{"n": 2}])
+        owner.process_batch_async(running_id, lambda item: release.wait(5))
+
+        # The heartbeat renews the running job; the job never started lapses
+        time.sleep(0.5)
+        other = BatchProcessor(store_path=path)
+        assert [job.job_id for job in other.resumable_jobs(["ingest"])] == [idle_id]
+        release.set()
+        assert wait_for(owner.get_job_status(running_id)).status == BatchStatus.COMPLETED
+
+    def test_cleanup_removes_finished_jobs_from_store(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        processor = BatchProcessor(max_workers=1, batch_size=5, store_path=path)
+        job_id = processor.create_batch_job("ingest", [{"n": 1}])
+        processor.process_batch_async(job_id, lambda item: None)
+        wait_for(processor.get_job_status(job_id))
+        processor.cleanup_completed_jobs()
+        assert processor.active_jobs == {}
+        assert processor._store.unfinished_jobs(["completed"]) == []
+
+
+class TestExecution:
+    """Test parallelism, cancellation, executors and metrics."""
+
+    def test_items_run_in_parallel_and_failures_are_counted(self):
+        processor = BatchProcessor(max_workers=1, batch_size=4, store_path="")
+        job_id = processor.create_batch_job("parallel", [{"n": n} for n in range(8)])
+
+        def slow(item):
+            time.sleep(0.1)
+            if item["n"] == 3:
+                raise ValueError("bad row")
+
+        started = time.perf_counter()
+        processor.process_batch_async(job_id, slow, parallelism=4)
+        job = wait_for(processor.get_job_status(job_id))
+        assert time.perf_counter() - started < 0.6
+        assert (job.status, job.processed_items, job.failed_items) == (BatchStatus.COMPLETED, 7, 1)
+
+    def test_cancellation_stops_within_a_batch(self):
+        processor = BatchProcessor(max_workers=1, batch_size=100, store_path="")
+        job_id = processor.create_batch_job("cancel", [{"n": n} for n in range(100)])
+        processor.process_batch_async(job_id, lambda item: time.sleep(0.01))
+        time.sleep(0.05)
+        assert processor.cancel_job(job_id)
+        job = wait_for(processor.get_job_status(job_id))
+        time.sleep(0.05)
+        assert job.status == BatchStatus.CANCELLED
+        assert 0 < job.processed_items < 100
+
+    def test_process_executor_and_unpicklable_fallback(self):
+        processor = BatchProcessor(max_workers=2, batch_size=4, store_path="", executor="process", item_parallelism=2)
+        job_id = processor.create_batch_job("convert", ["1", "2", "x", "4", "5"])
+        processor.process_batch_async(job_id, int)
+        job = wait_for(processor.get_job_status(job_id), timeout=30)
+        assert (job.executor, job.processed_items, job.failed_items) == ("process", 4, 1)
+
+        results = []
+        job_id = processor.create_batch_job("convert", ["1"])
+        processor.process_batch_async(job_id, lambda item: results.append(item))
+        job = wait_for(processor.get_job_status(job_id))
+        assert job.executor == "thread" and results == ["1"]
+
+    def test_metrics_count_items(self):
+        before = BATCH_ITEMS.labels("metered", "processed")._value.get()
+        processor = BatchProcessor(max_workers=1, batch_size=2, store_path="")
+        job_id = processor.create_batch_job("metered", [{}, {}, {}])
+        processor.process_batch_async(job_id, lambda item: None)
+        wait_for(processor.get_job_status(job_id))
+        assert BATCH_ITEMS.labels("metered", "processed")._value.get() == before + 3
+        exposition = generate_latest().decode()
+        assert 'batch_queue_depth_items{job_type="metered"} 0.0' in exposition
@@ -0,0 +1,121 @@
+"""
+Unit tests for the COPY-based PostgreSQL bulk loader
+"""
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from conftest import load_module
+
+# Load the module by path: the data_pipeline package __init__ pulls in the
+# ingestion/storage clients, which the loader does not need
+bulk_loader = load_module('pipeline_bulk_loader', 'scripts/data_pipeline/bulk_loader.py')
+
+
+class FakeCursor:
+    """Records executed SQL and the rows each COPY would have streamed"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.closed = False
+
+    def execute(self, sql):
+        self.conn.log.append(('execute', sql))
+
+    def copy_expert(self, sql, buffer):
+        if self.conn.fail_on_copy == len(self.conn.copies) + 1:
+            raise RuntimeError("connection reset")
+        payload = buffer.read()
+        self.conn.copies.append(payload)
+        self.conn.log.append(('copy', sql))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    """Just enough of a psycopg2 connection for PostgresBulkLoader"""
+
+    def __init__(self, fail_on_copy=None):
+        self.fail_on_copy = fail_on_copy
+        self.log = []
+        self.copies = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.cursors = []
+
+    def cursor(self):
+        cursor = FakeCursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+    def commit(self):
+        self.commits += 1
+        self.log.append(('commit', None))
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def parse_copy(payload):
+    return list(csv.reader(payload.splitlines()))
+
+
+class TestCsvFields:
+    """Test the CSV rendering COPY reads."""
+
+    def test_nulls_numbers_dates_and_json(self):
+        row = (None, float('nan'), 3.0, 2.5, True, 7, Decimal('1.10'), date(2025, 1, 2),
+               datetime(2025, 1, 2, 3, 4), 'He said "hi", twice', {'pool': True}, '["gym"]')
+        line = bulk_loader.rows_to_csv([row], json_indexes=[10, 11]).read()
+        assert line.startswith(',,"3","2.5","True","7","1.10","2025-01-02","2025-01-02T03:04:00",')
+        assert '"He said ""hi"", twice"' in line
+        fields = parse_copy(line)[0]
+        assert fields[:2] == ['', ''] and json.loads(fields[10]) == {'pool': True} and fields[11] == '["gym"]'
+
+
+class TestPostgresBulkLoader:
+    """Test staging, batching, merging and failure handling against a fake connection."""
+
+    def test_batches_copy_into_the_stage_then_merge_and_commit(self):
+        conn = FakeConnection()
+        rows = [(i, f"Listing {i}", i * 1000.0) for i in range(5)]
+        result = bulk_loader.PostgresBulkLoader(conn, batch_size=2).load('properties', ['id', 'title', 'price'], iter(rows))
+
+        assert result.success and result.rows == 5 and result.batches == 3 and conn.commits == 3
+        assert [kind for kind, _ in conn.log] == ['execute'] + ['copy', 'execute', 'commit'] * 3
+        create_sql = conn.log[0][1]
+        assert create_sql.startswith("CREATE TEMP TABLE IF NOT EXISTS _bulk_stage_properties ON COMMIT DELETE ROWS")
+        assert create_sql.endswith("SELECT id, title, price FROM properties WITH NO DATA")
+        assert conn.log[1][1] == "COPY _bulk_stage_properties (id, title, price) FROM STDIN WITH (FORMAT csv)"
+        assert conn.log[2][1] == "INSERT INTO properties (id, title, price) SELECT id, title, price FROM _bulk_stage_properties"
+        assert [parse_copy(payload) for payload in conn.copies] == [
+            [['0', 'Listing 0', '0'], ['1', 'Listing 1', '1000']],
+            [['2', 'Listing 2', '2000'], ['3', 'Listing 3', '3000']],
+            [['4', 'Listing 4', '4000']],
+        ]
+        assert conn.cursors[0].closed
+
+    def test_upsert_merges_on_conflict_and_keeps_the_last_row_per_key(self):
+        conn = FakeConnection()
+        rows = [(1, 'old', 100), (2, 'other', 200), (1, 'new', 150)]
+        result = bulk_loader.PostgresBulkLoader(conn).load(
+            'properties', ['id', 'title', 'price'], rows, conflict_columns=['id'])
+
+        assert result.rows == 2
+        assert parse_copy(conn.copies[0]) == [['1', 'new', '150'], ['2', 'other', '200']]
+        merge_sql = [sql for kind, sql in conn.log if kind == 'execute'][-1]
+        assert merge_sql.endswith("ON CONFLICT (id) DO UPDATE SET title = EXCLUDED.title, price = EXCLUDED.price")
+
+        loader = bulk_loader.PostgresBulkLoader(FakeConnection())
+        assert loader._merge_sql('t', 's', ['id', 'price'], ['id'], ['price']).endswith("DO UPDATE SET price = EXCLUDED.price")
+        assert loader._merge_sql('t', 's', ['id'], ['id'], None).endswith("ON CONFLICT (id) DO NOTHING")
+
+    def test_failed_batch_rolls_back_and_records_the_error(self):
+        conn = FakeConnection(fail_on_copy=2)
+        result = bulk_loader.PostgresBulkLoader(conn, batch_size=2).load('properties', ['id'], [(i,) for i in range(6)])
+
+        assert not result.success and result.errors == ["connection reset"]
+        assert result.rows == 2 and result.batches == 1
+        assert conn.commits == 1 and conn.rollbacks == 1 and conn.cursors[0].closed
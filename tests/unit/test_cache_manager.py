@@ -0,0 +1,223 @@
+"""
+Unit tests for the tiered L1/L2 cache manager
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+import cache_manager as cache_module
+from cache_manager import CacheManager, property_tag, collection_tag
+
+
+class DictRedis:
+    """Minimal in-memory stand-in for the Redis commands the cache uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def delete(self, *keys):
+        keys = [k.decode() if isinstance(k, bytes) else k for k in keys]
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(m.encode() if isinstance(m, str) else m for m in members)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def expire(self, key, ttl):
+        return True
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def flushdb(self):
+        self.data.clear()
+
+    def pipeline(self, transaction=True):
+        return DictPipeline(self)
+
+
+class DictPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+def make_cache(shared_redis=None, **kwargs):
+    cache = CacheManager(redis_host="127.0.0.1", redis_port=1, **kwargs)
+    if shared_redis is not None:
+        cache.redis_client = shared_redis
+        cache.cache_enabled = True
+    return cache
+
+
+class TestTieredCache:
+    """Test L1/L2 tiers, single-flight and early refresh."""
+
+    def test_concurrent_misses_compute_once(self):
+        cache = make_cache()
+        calls = []
+        lock = threading.Lock()
+
+        def compute():
+            with lock:
+                calls.append(1)
+            time.sleep(0.2)
+            return {"answer": 42}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: cache.get_or_compute("query_result", "hot", compute, ttl=60), range(8)))
+
+        assert results == [{"answer": 42}] * 8
+        assert len(calls) == 1
+        assert cache.get_cache_stats()["coalesced"] == 7
+
+    def test_l1_is_bounded_lru(self):
+        cache = make_cache(l1_max_entries=2)
+        for name in ("a", "b", "c"):
+            cache.cache_user_session(name, {"name": name})
+
+        stats = cache.get_cache_stats()
+        assert stats["l1"]["entries"] == 2
+        assert stats["evictions"] == 1
+        assert cache.get_cached_user_session("a") is None
+        assert cache.get_cached_user_session("c") == {"name": "c"}
+
+    def test_l2_serves_other_workers_with_compact_encoding(self):
+        redis_client = DictRedis()
+        writer, reader = make_cache(redis_client), make_cache(redis_client)
+        results = [{"title": f"Marina tower {i}", "price": 1_500_000 + i} for i in range(50)]
+
+        writer.cache_property_search({"area": "Dubai Marina"}, results)
+        assert reader.get_cached_property_search({"area": "Dubai Marina"}) == results
+
+        stats = reader.get_cache_stats()
+        assert stats["l2"]["hits"] == 1
+        assert 0 < stats["l2"]["bytes_read"] < len(str(results))
+        assert reader.get_cached_property_search({"area": "Dubai Marina"}) == results
+        assert reader.get_cache_stats()["l1"]["hits"] == 1
+
+    def test_both_tiers_return_the_same_types_and_private_copies(self, monkeypatch):
+        row = {"price_aed": Decimal("1250000.50"), "listed": date(2025, 3, 1),
+               "updated": datetime(2025, 3, 1, 12, 30), "tags": ["marina"]}
+        for msgpack_available in (True, False):
+            monkeypatch.setattr(cache_module, "MSGPACK_AVAILABLE", msgpack_available)
+            redis_client = DictRedis()
+            writer, reader = make_cache(redis_client), make_cache(redis_client)
+            writer.cache_property_search({"q": "marina"}, [row])
+
+            from_l1 = writer.get_cached_property_search({"q": "marina"})
+            from_l2 = reader.get_cached_property_search({"q": "marina"})
+            assert from_l1 == from_l2 == [row]
+            assert type(from_l1[0]["price_aed"]) is type(from_l2[0]["price_aed"]) is Decimal
+
+            from_l1[0]["tags"].append("mutated")
+            assert writer.get_cached_property_search({"q": "marina"}) == [row]
+
+    def test_entries_near_expiry_are_refreshed_early(self):
+        cache = make_cache(early_refresh_beta=1e9)
+        values = iter(["stale", "fresh"])
+
+        def compute():
+            time.sleep(0.01)
+            return next(values)
+
+        assert cache.get_or_compute("market_data", "marina", compute, ttl=60) == "stale"
+        assert cache.get_or_compute("market_data", "marina", compute, ttl=60) == "fresh"
+        assert cache.get_cache_stats()["early_refreshes"] == 1
+
+    def test_compute_errors_propagate_and_are_not_cached(self):
+        cache = make_cache()
+
+        def broken():
+            raise RuntimeError("chroma down")
+
+        try:
+            cache.get_or_compute("context_items", "q", broken)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("expected RuntimeError")
+        assert cache.get_or_compute("context_items", "q", lambda: ["ok"]) == ["ok"]
+
+
+class TestTagInvalidation:
+    """Test dependency-tag invalidation across tiers and workers."""
+
+    def test_property_write_drops_only_dependent_entries(self):
+        redis_client = DictRedis()
+        cache = make_cache(redis_client)
+        cache.cache_property_search({"q": "marina"}, [{"id": 5}], tags=[property_tag(5)])
+        cache.cache_property_search({"q": "downtown"}, [{"id": 9}], tags=[property_tag(9)])
+
+        assert cache.invalidate_property(5) == 1
+        assert cache.get_cached_property_search({"q": "marina"}) is None
+        assert cache.get_cached_property_search({"q": "downtown"}) == [{"id": 9}]
+        assert len([k for k in redis_client.data if k.startswith("v2:property_search:")]) == 1
+
+    def test_location_change_matches_cached_area_filters(self):
+        cache = make_cache(DictRedis())
+        cache.cache_market_data("Marina", "apartment", {"avg_price": 1})
+        cache.cache_market_data("Business Bay", "apartment", {"avg_price": 2})
+
+        cache.invalidate_property(7, locations=["Dubai Marina, Dubai", None])
+
+        assert cache.get_cached_market_data("Marina", "apartment") is None
+        assert cache.get_cached_market_data("Business Bay", "apartment") == {"avg_price": 2}
+
+    def test_computed_entries_are_tagged_from_their_value(self):
+        cache = make_cache()
+        cache.get_or_compute("context_items", "q", lambda: [{"id": 1}, {"id": 2}],
+                             tags=lambda items: [property_tag(i["id"]) for i in items] + [collection_tag("properties")])
+
+        cache.invalidate_tags(collection_tag("properties"))
+        assert cache.get_or_compute("context_items", "q", lambda: ["recomputed"]) == ["recomputed"]
+
+    def test_invalidation_is_broadcast_to_other_workers(self):
+        redis_client = DictRedis()
+        writer, reader = make_cache(redis_client), make_cache(redis_client)
+        writer.cache_property_search({"q": "jvc"}, [{"id": 3}], tags=[property_tag(3)])
+        assert reader.get_cached_property_search({"q": "jvc"}) == [{"id": 3}]
+
+        writer.invalidate_tags(property_tag(3))
+        channel, message = redis_client.published[-1]
+        reader._on_invalidation_message({"channel": channel, "data": message})
+
+        assert reader.get_cache_stats()["l1"]["entries"] == 0
+        assert reader.get_cached_property_search({"q": "jvc"}) is None
+
+    def test_clear_all_is_broadcast_to_other_workers(self):
+        redis_client = DictRedis()
+        writer, reader = make_cache(redis_client), make_cache(redis_client)
+        writer.cache_user_session("s1", {"user": 1})
+        assert reader.get_cached_user_session("s1") == {"user": 1}
+
+        assert writer.clear_all_cache()
+        channel, message = redis_client.published[-1]
+        reader._on_invalidation_message({"channel": channel, "data": message})
+        assert reader.get_cached_user_session("s1") is None
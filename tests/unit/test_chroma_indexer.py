@@ -0,0 +1,125 @@
+"""
+Unit tests for incremental ChromaDB indexing: stable IDs, the hash manifest and scope pruning
+"""
+import json
+import os
+
+from conftest import load_module
+
+# Load the module by path: the data_pipeline package __init__ pulls in the
+# ingestion/storage clients, which the indexer does not need
+chroma_indexer = load_module('pipeline_chroma_indexer', 'scripts/data_pipeline/chroma_indexer.py')
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection that counts embedding writes"""
+
+    def __init__(self, name="properties"):
+        self.name = name
+        self.docs = {}
+        self.upserts = []
+        self.deletes = []
+
+    def count(self):
+        return len(self.docs)
+
+    def get(self, include=None):
+        ids = list(self.docs)
+        return {"ids": ids, "metadatas": [self.docs[doc_id][1] for doc_id in ids]}
+
+    def upsert(self, ids, documents, metadatas):
+        self.upserts.append(list(ids))
+        for doc_id, document, metadata in zip(ids, documents, metadatas):
+            self.docs[doc_id] = (document, metadata)
+
+    def delete(self, ids):
+        self.deletes.append(list(ids))
+        for doc_id in ids:
+            self.docs.pop(doc_id, None)
+
+
+def listing(key, price, area="JVC"):
+    return (chroma_indexer.stable_document_id("property", key), f"{key} in {area} for {price}", {"price": price, "area": area})
+
+
+class TestStableIds:
+    """Test document IDs and content hashes."""
+
+    def test_ids_ignore_case_and_whitespace(self):
+        assert chroma_indexer.stable_document_id("property", " Marina  Gate 1204 ") == \
+            chroma_indexer.stable_document_id("property", "marina gate 1204")
+        assert chroma_indexer.stable_document_id("property", "a") != chroma_indexer.stable_document_id("property", "b")
+
+    def test_hash_covers_document_and_metadata(self):
+        base = chroma_indexer.content_hash("doc", {"price": 1, "area": "JVC"})
+        assert base == chroma_indexer.content_hash("doc", {"area": "JVC", "price": 1})
+        assert base != chroma_indexer.content_hash("doc", {"price": 2, "area": "JVC"})
+        assert base != chroma_indexer.content_hash("doc 2", {"price": 1, "area": "JVC"})
+
+
+class TestChromaIndexer:
+    """Test that only new or changed documents are embedded and stale ones are pruned."""
+
+    def test_resync_writes_only_changes_and_prunes_the_scope(self, tmp_path):
+        collection = FakeCollection()
+        indexer = chroma_indexer.ChromaIndexer(collection, str(tmp_path), batch_size=2)
+        first = indexer.sync([listing("a", 1), listing("b", 2), listing("c", 3)], scope="file1.csv")
+        assert (first.added, first.updated, first.unchanged, first.deleted) == (3, 0, 0, 0)
+        assert [len(batch) for batch in collection.upserts] == [2, 1]
+
+        other = indexer.sync([listing("z", 9)], scope="file2.csv")
+        assert other.added == 1 and other.deleted == 0
+
+        collection.upserts.clear()
+        second = indexer.sync([listing("a", 1), listing("b", 20), listing("d", 4)], scope="file1.csv")
+        assert (second.added, second.updated, second.unchanged, second.deleted) == (1, 1, 1, 1)
+        assert sorted(collection.upserts[0]) == sorted([listing("b", 20)[0], listing("d", 4)[0]])
+        assert collection.deletes == [[listing("c", 3)[0]]]
+        assert listing("z", 9)[0] in collection.docs
+
+        stored = collection.docs[listing("b", 20)[0]][1]
+        assert stored["price"] == 20 and stored["index_scope"] == "file1.csv"
+        assert stored["content_hash"] == chroma_indexer.content_hash(listing("b", 20)[1], listing("b", 20)[2])
+
+    def test_manifest_is_persisted_and_rebuilt_from_metadata(self, tmp_path):
+        collection = FakeCollection()
+        chroma_indexer.ChromaIndexer(collection, str(tmp_path)).sync([listing("a", 1), listing("b", 2)])
+        with open(tmp_path / "properties.json") as f:
+            assert set(json.load(f)) == {listing("a", 1)[0], listing("b", 2)[0]}
+
+        collection.upserts.clear()
+        assert chroma_indexer.ChromaIndexer(collection, str(tmp_path)).sync([listing("a", 1), listing("b", 2)]).unchanged == 2
+        assert collection.upserts == []
+
+        # A lost manifest is rebuilt from the hashes in the collection instead of re-embedding
+        os.remove(tmp_path / "properties.json")
+        result = chroma_indexer.ChromaIndexer(collection, str(tmp_path)).sync([listing("a", 1), listing("b", 3)])
+        assert (result.unchanged, result.updated) == (1, 1) and collection.upserts == [[listing("b", 3)[0]]]
+
+        # A collection that was reset behind the manifest's back is re-embedded
+        collection.docs.clear()
+        collection.upserts.clear()
+        assert chroma_indexer.ChromaIndexer(collection, str(tmp_path)).sync([listing("a", 1)]).added == 1
+
+    def test_open_scope_defers_pruning_until_close(self, tmp_path):
+        collection = FakeCollection()
+        indexer = chroma_indexer.ChromaIndexer(collection, str(tmp_path))
+        indexer.sync([listing("a", 1), listing("b", 2), listing("c", 3)], scope="feed.csv")
+
+        indexer.open_scope("feed.csv")
+        assert indexer.sync([listing("a", 1)], scope="feed.csv").deleted == 0
+        assert indexer.sync([listing("b", 2)], scope="feed.csv").deleted == 0
+        assert len(collection.docs) == 3
+        assert indexer.close_scope("feed.csv") == 1
+        assert set(collection.docs) == {listing("a", 1)[0], listing("b", 2)[0]}
+
+        # A failed pass closes without pruning
+        indexer.open_scope("feed.csv")
+        indexer.sync([listing("a", 1)], scope="feed.csv")
+        assert indexer.close_scope("feed.csv", prune=False) == 0
+        assert len(collection.docs) == 2
+
+    def test_later_duplicate_keys_win(self, tmp_path):
+        collection = FakeCollection()
+        result = chroma_indexer.ChromaIndexer(collection, str(tmp_path)).sync([listing("a", 1), listing("a", 2)])
+        assert result.added == 1 and collection.docs[listing("a", 2)[0]][1]["price"] == 2
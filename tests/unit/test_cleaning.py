@@ -0,0 +1,43 @@
+"""
+Unit tests for column-wise property cleaning against the per-record reference path
+"""
+from conftest import clean_per_record, load_listings, load_module, messy_records
+
+# Load the module by path: the data_pipeline package __init__ pulls in the
+# ingestion/storage clients, which the cleaner does not need
+cleaning = load_module('pipeline_cleaning', 'scripts/data_pipeline/cleaning.py')
+
+
+def comparable(records):
+    return [{key: value for key, value in record.items() if key != 'cleaned_at'} for record in records]
+
+
+class TestDataCleaner:
+    """Test that batch cleaning produces the per-record output and dedup keeps first occurrences."""
+
+    def test_batch_matches_per_record(self):
+        cleaner = cleaning.DataCleaner({})
+        listings = load_listings(1000)
+        for records in (listings, messy_records(listings, 3000)):
+            expected = comparable(clean_per_record(cleaner, records))
+            assert comparable(cleaner.clean_property_data(records)) == expected
+
+    def test_empty_batch(self):
+        assert cleaning.DataCleaner({}).clean_property_data([]) == []
+
+    def test_remove_duplicates_across_chunks(self):
+        cleaner = cleaning.DataCleaner({})
+        records = [
+            {'address': '1 Marina Walk', 'price_aed': 1_000_000, 'bedrooms': 2},
+            {'address': '1 Marina Walk', 'price_aed': 1_000_000, 'bedrooms': 2, 'note': 'repeat'},
+            {'address': '1 Marina Walk', 'price_aed': 1_000_000, 'bedrooms': 3},
+            {'address': '2 JVC Road', 'bedrooms': 1},
+            {'address': '2 JVC Road', 'price_aed': None, 'bedrooms': 1},
+        ]
+        assert cleaner.remove_duplicates(records) == [records[0], records[2], records[3]]
+
+        seen = set()
+        first = cleaner.remove_duplicates(records[:2], seen=seen)
+        second = cleaner.remove_duplicates(records[2:] + records[:1], seen=seen)
+        assert first + second == [records[0], records[2], records[3]]
+        assert seen == {'1 Marina Walk|1000000|2', '1 Marina Walk|1000000|3', '2 JVC Road|1'}
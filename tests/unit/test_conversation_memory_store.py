@@ -0,0 +1,142 @@
+"""
+Unit tests for the bounded conversation memory store and write-behind writer
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.conversation_memory_store import (
+    ConversationMemoryStore,
+    MessageWriteBehind,
+    fetch_recent_messages,
+)
+
+
+class FakeMemory:
+    def __init__(self, size=100):
+        self.size = size
+        self.messages = []
+
+
+def make_store(**kwargs):
+    kwargs.setdefault("max_sessions", 100)
+    kwargs.setdefault("max_bytes", 10_000)
+    kwargs.setdefault("idle_ttl", 0)
+    return ConversationMemoryStore(size_of=lambda memory: memory.size, **kwargs)
+
+
+def make_engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE conversations (id INTEGER PRIMARY KEY, session_id TEXT, is_active BOOLEAN)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE messages (id INTEGER PRIMARY KEY, conversation_id INTEGER, role TEXT, "
+            "content TEXT, message_type TEXT, metadata TEXT, timestamp TIMESTAMP)"
+        ))
+        conn.execute(text("INSERT INTO conversations VALUES (1, 'busy', 1), (2, 'quiet', 1), (3, 'old', 0)"))
+        start = datetime(2024, 1, 1)
+        for i in range(5):
+            conn.execute(text(
+                "INSERT INTO messages (conversation_id, role, content, message_type, timestamp) "
+                "VALUES (1, :role, :content, 'text', :ts)"
+            ), {"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}",
+                "ts": start + timedelta(minutes=i)})
+    return engine
+
+
+def message(content, role="user"):
+    return {"role": role, "content": content, "type": "text",
+            "timestamp": datetime(2024, 1, 2).isoformat(), "metadata": {"k": 1}}
+
+
+class TestConversationMemoryStore:
+    """Test the LRU bounds and dict-style access."""
+
+    def test_session_count_bound_evicts_least_recently_used(self):
+        store = make_store(max_sessions=2)
+        store["a"] = FakeMemory()
+        store["b"] = FakeMemory()
+        assert store.get("a") is not None
+        store["c"] = FakeMemory()
+
+        assert "b" not in store
+        assert "a" in store and "c" in store
+        assert store.get_stats()["evictions"] == 1
+
+    def test_byte_bound_and_reaccounting_on_growth(self):
+        store = make_store(max_bytes=250)
+        first, second = FakeMemory(100), FakeMemory(100)
+        store.put("a", first)
+        store.put("b", second)
+        assert store.get_stats()["bytes"] == 200
+
+        second.size = 200
+        store.put("b", second)
+
+        assert "a" not in store
+        assert store.get_stats()["bytes"] == 200
+        assert store.session_sizes(1) == [{"session_id": "b", "bytes": 200, "messages": 0}]
+
+    def test_oversized_single_session_is_kept(self):
+        store = make_store(max_bytes=10)
+        store.put("a", FakeMemory(500))
+        assert len(store) == 1
+
+    def test_idle_sessions_expire(self):
+        store = make_store(idle_ttl=60)
+        store.put("a", FakeMemory())
+        store._entries["a"].last_access -= 120
+
+        assert store.get("a") is None
+        stats = store.get_stats()
+        assert stats["expirations"] == 1
+        assert stats["misses"] == 1
+
+    def test_mapping_style_delete(self):
+        store = make_store()
+        store["a"] = FakeMemory()
+        del store["a"]
+        assert "a" not in store
+        assert store.discard("a") is False
+
+
+class TestHydrationAndWriteBehind:
+    """Test single-query hydration and batched message inserts."""
+
+    def test_fetch_recent_messages_returns_newest_in_order(self):
+        engine = make_engine()
+        with engine.connect() as conn:
+            conversation_id, rows = fetch_recent_messages(conn, "busy", 3)
+            assert conversation_id == 1
+            assert [row.content for row in rows] == ["m2", "m3", "m4"]
+
+            assert fetch_recent_messages(conn, "quiet", 3) == (2, [])
+            assert fetch_recent_messages(conn, "old", 3) == (None, [])
+
+    def test_flush_writes_pending_messages_in_one_batch(self):
+        engine = make_engine()
+        writer = MessageWriteBehind(flush_interval=0, engine=engine)
+        writer.enqueue("quiet", 2, message("hello"))
+        writer.enqueue("quiet", 2, message("hi there", role="assistant"))
+        assert writer.has_pending("quiet")
+
+        assert writer.flush() == 2
+        assert not writer.has_pending("quiet")
+        with engine.connect() as conn:
+            _, rows = fetch_recent_messages(conn, "quiet", 10)
+        assert [(row.role, row.content) for row in rows] == [("user", "hello"), ("assistant", "hi there")]
+
+    def test_failed_flush_requeues_batch(self):
+        broken = create_engine("sqlite://", poolclass=StaticPool)
+        writer = MessageWriteBehind(flush_interval=0, engine=broken)
+        writer.enqueue("s", 1, message("hello"))
+
+        assert writer.flush() == 0
+        assert writer.has_pending("s")
+        assert writer.get_stats() == {"written": 0, "failed_flushes": 1, "pending": 1}
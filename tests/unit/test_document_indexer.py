@@ -0,0 +1,140 @@
+"""
+Unit tests for document chunking and batched chunk indexing
+"""
+import time
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.document_indexer import DocumentIndexer, chunk_text, split_sections
+from batch_processor import BatchStatus, DataIngestionBatchProcessor
+
+CONTRACT = """# Sale Agreement
+
+PARTIES
+The Seller agrees to sell the unit to the Buyer. The Buyer agrees to purchase it.
+
+1. Payment Terms
+""" + " ".join(f"Installment {i} of the price is due in month {i}." for i in range(1, 25))
+
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+        self.items = {}
+        self.upserts = []
+        self.deletes = []
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.upserts.append(len(ids))
+        for i, chunk_id in enumerate(ids):
+            self.items[chunk_id] = (documents[i], metadatas[i], embeddings[i] if embeddings else None)
+
+    def delete(self, where):
+        self.deletes.append(where)
+        clauses = where["$or"] if "$or" in where else [where]
+        for clause in clauses:
+            document_id = clause["$and"][0]["document_id"]
+            floor = clause["$and"][1]["chunk_index"]["$gte"]
+            for chunk_id, (_, metadata, _) in list(self.items.items()):
+                if metadata["document_id"] == document_id and metadata["chunk_index"] >= floor:
+                    del self.items[chunk_id]
+
+
+class FakeChromaClient:
+    def __init__(self):
+        self.collections = {}
+
+    def get_or_create_collection(self, name):
+        return self.collections.setdefault(name, FakeCollection(name))
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(len(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class TestChunking:
+    """Test boundary-aware chunking."""
+
+    def test_sections_are_detected(self):
+        headings = [heading for heading, _ in split_sections(CONTRACT)]
+        assert headings == ["Sale Agreement", "PARTIES", "1. Payment Terms"]
+
+    def test_chunks_end_on_sentences_and_overlap(self):
+        chunks = chunk_text(CONTRACT, chunk_size=200, overlap=60)
+        assert all(len(chunk.text) <= 200 for chunk in chunks)
+        body = [chunk for chunk in chunks if chunk.section == "1. Payment Terms"]
+        assert len(body) > 2
+        for previous, current in zip(body, body[1:]):
+            assert previous.text.endswith(".")
+            last_sentence = previous.text.rsplit(". ", 1)[-1]
+            assert current.text.startswith(last_sentence)
+
+    def test_long_sentence_is_split_between_words(self):
+        chunks = chunk_text("word " * 300, chunk_size=100, overlap=0)
+        assert all(0 < len(chunk.text) <= 100 and not chunk.text.startswith(" ") for chunk in chunks)
+        assert " ".join(chunk.text for chunk in chunks).split() == ["word"] * 300
+
+    def test_overlap_must_be_smaller_than_chunk_size(self):
+        with pytest.raises(ValueError):
+            chunk_text(CONTRACT, chunk_size=100, overlap=100)
+
+
+class TestDocumentIndexer:
+    """Test batched embedding and upserts into the doc type's collection."""
+
+    def test_chunks_from_many_documents_share_embedding_calls(self):
+        client, embedder = FakeChromaClient(), CountingEmbedder()
+        indexer = DocumentIndexer(client, embedder=embedder, chunk_size=200, overlap=40, batch_size=16)
+        documents = [{"id": f"doc{i}", "content": CONTRACT, "doc_type": "legal_document",
+                      "metadata": {"source": "upload", "tags": ["ignored"]}} for i in range(5)]
+
+        stats = indexer.index_documents(documents)
+
+        collection = client.collections["regulatory_framework"]
+        assert stats.chunks == len(collection.items) == sum(embedder.calls)
+        assert embedder.calls[:-1] == [16] * (len(embedder.calls) - 1)
+        assert stats.collections == {"regulatory_framework": stats.chunks}
+        _, metadata, embedding = collection.items["doc0:0"]
+        assert metadata["source"] == "upload" and "tags" not in metadata
+        assert metadata["chunk_index"] == 0 and embedding is not None
+
+    def test_reindexing_a_shorter_version_removes_stale_chunks(self):
+        client = FakeChromaClient()
+        indexer = DocumentIndexer(client, chunk_size=200, overlap=0)
+        indexer.index_documents([{"id": "doc", "content": CONTRACT}])
+        collection = client.collections["comprehensive_data"]
+        assert len(collection.items) > 1
+
+        indexer.index_documents([{"id": "doc", "content": "Short replacement."}])
+        assert list(collection.items) == ["doc:0"]
+        assert collection.items["doc:0"][0] == "Short replacement."
+
+
+class TestDocumentIngestionBatch:
+    """Test document ingestion through the batch processor."""
+
+    def test_ingest_documents_batch_indexes_and_tracks_chunks(self):
+        client = FakeChromaClient()
+        indexer = DocumentIndexer(client, embedder=CountingEmbedder(), chunk_size=200, overlap=40)
+        processor = DataIngestionBatchProcessor(None, client, batch_size=2, document_indexer=indexer, store_path="")
+        documents = [{"id": f"doc{i}", "content": CONTRACT, "doc_type": "market_report"} for i in range(3)]
+        documents.append({"id": "bad", "content": None, "doc_type": "market_report", "metadata": "oops"})
+
+        job_id = processor.ingest_documents_batch(documents)
+        job = processor.batch_processor.get_job_status(job_id)
+        deadline = time.time() + 5
+        while job.status == BatchStatus.PROCESSING and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert job.status == BatchStatus.COMPLETED
+        assert (job.processed_items, job.failed_items) == (3, 1)
+        assert job.metadata["chunks_indexed"] == len(client.collections["market_analysis"].items)
+        assert job.metadata["chunks_per_second"] > 0
@@ -0,0 +1,57 @@
+"""
+Unit tests for column-wise property enrichment against the per-record reference path
+"""
+import math
+
+from conftest import enrich_per_record, load_module, make_enrichment_records
+
+# Load the module by path: the data_pipeline package __init__ pulls in the
+# ingestion/storage clients, which the enricher does not need
+enrichment = load_module('pipeline_enrichment', 'scripts/data_pipeline/enrichment.py')
+
+def comparable(records):
+    """Drop the timestamp; target_market order is not part of the contract"""
+    out = []
+    for record in records:
+        record = dict(record)
+        record.pop('enriched_at')
+        classification = dict(record['property_classification'])
+        classification['target_market'] = sorted(classification['target_market'])
+        record['property_classification'] = classification
+        out.append(record)
+    return out
+
+
+def assert_same(left, right, path='record'):
+    if isinstance(left, dict):
+        assert left.keys() == right.keys(), path
+        for key in left:
+            assert_same(left[key], right[key], f"{path}.{key}")
+    elif isinstance(left, float) or isinstance(right, float):
+        assert left == right or math.isclose(left, right, rel_tol=1e-12), path
+        assert type(right) is float or type(right) is type(left), path
+    else:
+        assert left == right, path
+
+
+class TestDataEnricher:
+    """Test that batch enrichment produces the per-record output."""
+
+    def test_batch_matches_per_record(self):
+        records = make_enrichment_records(list(enrichment.AREA_PROFILES) + ['Al Barsha', 'Unknown'], 2000)
+        enricher = enrichment.DataEnricher({})
+        expected = comparable(enrich_per_record(enricher, records))
+        actual = comparable(enricher.enrich_property_data(records))
+        assert len(actual) == len(expected) == len(records)
+        for i, (left, right) in enumerate(zip(expected, actual)):
+            assert_same(left, right, f"record[{i}]")
+
+    def test_records_do_not_share_nested_sections(self):
+        enricher = enrichment.DataEnricher({})
+        records = enricher.enrich_property_data([{'area': 'Dubai Marina'}, {'area': 'Dubai Marina'}])
+        for key, value in records[0].items():
+            if isinstance(value, dict):
+                assert value is not records[1][key], key
+
+    def test_empty_batch(self):
+        assert enrichment.DataEnricher({}).enrich_property_data([]) == []
@@ -0,0 +1,243 @@
+"""
+Unit tests for the chunked CSV/Excel processors and the Parquet cache of parsed inputs
+"""
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts'))
+from processors import csv_processor, parsed_cache
+from processors.csv_processor import RECORD_FIELDS, CSVProcessor
+from processors.parsed_cache import ParsedFrameCache
+
+requires_parquet = pytest.mark.skipif(parsed_cache.PARQUET_ENGINE is None,
+                                      reason="pyarrow or fastparquet is required for the parsed cache")
+
+
+def row_by_row_records(df, schema_type):
+    """The extraction as it was before RECORD_FIELDS: one row.get() per field per row"""
+    casts = {"float": float, "int": int}
+    records = []
+    for _, row in df.iterrows():
+        record = {}
+        for column, kind in RECORD_FIELDS[schema_type]:
+            if kind == "str":
+                record[column] = str(row.get(column, ""))
+            else:
+                record[column] = casts[kind](row.get(column, 0)) if pd.notna(row.get(column)) else None
+        records.append(record)
+    return records
+
+
+def write_listings(path, rows=40, bad_bedrooms_at=None):
+    rng = np.random.RandomState(3)
+    frame = pd.DataFrame({
+        'Address': [f"  {n} Marina Walk " for n in range(rows)],
+        'Price': rng.uniform(5e5, 5e6, rows).round(2),
+        'Bedrooms': rng.randint(0, 6, rows).astype(object),
+        'Bathrooms': rng.randint(1, 5, rows),
+        'Neighborhood': rng.choice(['Dubai Marina', 'JVC', None], rows),
+        'Rental_Yield': np.where(rng.rand(rows) < 0.3, np.nan, rng.uniform(4, 8, rows).round(2)),
+    })
+    frame.loc[20, 'Bedrooms'] = None
+    if bad_bedrooms_at is not None:
+        frame.loc[bad_bedrooms_at, 'Bedrooms'] = 'studio'
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def count_parsed_rows(monkeypatch):
+    """Record the rows each chunked pd.read_csv parses, one list per reader"""
+    readers = []
+    read_csv = pd.read_csv
+
+    def counting_read_csv(*args, **kwargs):
+        reader = read_csv(*args, **kwargs)
+        if 'chunksize' not in kwargs:
+            return reader
+        parsed = []
+        readers.append(parsed)
+
+        def chunks():
+            with reader:
+                for chunk in reader:
+                    parsed.append(len(chunk))
+                    yield chunk
+        return chunks()
+
+    monkeypatch.setattr(csv_processor.pd, 'read_csv', counting_read_csv)
+    return readers
+
+
+def reference_records(path, processor):
+    """Whole-file read, clean and row-wise extraction, as process() did before chunking"""
+    df = pd.read_csv(path)
+    return row_by_row_records(processor._clean_data(df, "properties"), "properties")
+
+
+class TestCSVProcessor:
+    """Test chunked extraction against the whole-file, row-by-row extraction it replaced."""
+
+    def test_chunked_records_match_row_by_row_extraction(self, tmp_path):
+        path = write_listings(tmp_path / "listings.csv")
+        processor = CSVProcessor(chunk_size=7, cache_dir=None)
+        result = processor.process(path)
+
+        assert result['status'] == 'success' and result['schema_type'] == 'properties'
+        assert result['row_count'] == 40 and result['column_count'] == 6
+        assert result['structured_data']['records'] == reference_records(path, processor)
+        assert result['metadata']['missing_values']['Bedrooms'] == 1
+        assert [record for chunk in processor.iter_records(path) for record in chunk] == result['structured_data']['records']
+        assert [len(chunk) for chunk in processor.iter_records(path)] == [7, 7, 7, 7, 7, 5]
+
+    def test_rereads_with_per_chunk_types_when_a_later_row_breaks_them(self, tmp_path, monkeypatch, caplog):
+        monkeypatch.setattr(csv_processor, 'DTYPE_SAMPLE_ROWS', 10)
+        path = write_listings(tmp_path / "listings.csv", bad_bedrooms_at=30)
+        processor = CSVProcessor(chunk_size=8, cache_dir=None)
+        assert processor._infer_dtypes(pd.read_csv(path, nrows=10))['Bedrooms'] == 'Int64'
+
+        readers = count_parsed_rows(monkeypatch)
+        with caplog.at_level(logging.WARNING):
+            result = processor.process(path)
+        assert "from row 24 with per-chunk type inference" in caplog.text
+        # The re-read resumes at the chunk that failed instead of parsing the emitted rows again
+        assert readers == [[8, 8, 8], [8, 8]]
+        expected = reference_records(path, processor)
+        assert result['status'] == 'success' and result['row_count'] == 40
+        assert result['structured_data']['records'] == expected
+        assert expected[30]['bedrooms'] is None
+
+        # Chunks emitted before the failure are not emitted twice
+        chunks = list(processor.iter_records(path))
+        assert [len(chunk) for chunk in chunks] == [8, 8, 8, 8, 8]
+        assert [record for chunk in chunks for record in chunk] == expected
+
+    def test_gaps_after_the_type_sample_fit_the_inferred_types(self, tmp_path, monkeypatch, caplog):
+        monkeypatch.setattr(csv_processor, 'DTYPE_SAMPLE_ROWS', 10)
+        path = write_listings(tmp_path / "listings.csv")
+        processor = CSVProcessor(chunk_size=8, cache_dir=None)
+        # The only missing Bedrooms value is row 20, past the sample
+        assert processor._infer_dtypes(pd.read_csv(path, nrows=10))['Bedrooms'] == 'Int64'
+
+        readers = count_parsed_rows(monkeypatch)
+        with caplog.at_level(logging.WARNING):
+            result = processor.process(path)
+        assert "per-chunk type inference" not in caplog.text
+        assert readers == [[8, 8, 8, 8, 8]]
+        records = result['structured_data']['records']
+        assert records == reference_records(path, processor)
+        assert records[20]['bedrooms'] is None
+
+    def test_header_only_file(self, tmp_path):
+        path = tmp_path / "empty.csv"
+        path.write_text("address,price,bedrooms,bathrooms\n")
+        result = CSVProcessor(cache_dir=None).process(str(path))
+        assert result['status'] == 'success' and result['row_count'] == 0
+        assert result['structured_data'] == {'data_type': 'properties', 'records': []}
+
+
+class TestParsedFrameCache:
+    """Test cache hits, misses, aborted writes and pruning of stale entries."""
+
+    @requires_parquet
+    def test_csv_reprocessing_reads_the_cache(self, tmp_path, monkeypatch):
+        path = write_listings(tmp_path / "listings.csv")
+        processor = CSVProcessor(chunk_size=16, cache_dir=str(tmp_path / "cache"))
+        first = processor.process(path)
+        assert processor.parsed_cache.read(path) is not None
+
+        chunked_reads = []
+        read_csv = pd.read_csv
+        monkeypatch.setattr(csv_processor.pd, 'read_csv', lambda *args, **kwargs: (
+            chunked_reads.append(kwargs) if 'chunksize' in kwargs else None) or read_csv(*args, **kwargs))
+        second = processor.process(path)
+        assert chunked_reads == []
+        assert second['structured_data'] == first['structured_data']
+        assert second['row_count'] == first['row_count']
+
+    @requires_parquet
+    def test_changed_file_misses_and_prunes_the_old_entry(self, tmp_path):
+        cache = ParsedFrameCache(str(tmp_path / "cache"))
+        source = tmp_path / "input.csv"
+        source.write_text("a\n1\n")
+        writer = cache.writer(str(source))
+        writer.append(pd.DataFrame({'a': [1]}))
+        writer.commit()
+        source_dir = os.path.dirname(writer.entry_dir)
+        assert [list(frame['a']) for frame in cache.read(str(source))] == [[1]]
+
+        source.write_text("a\n1\n2\n")
+        assert cache.read(str(source)) is None
+        assert cache.read(str(source), variant="Sheet1") is None
+        writer = cache.writer(str(source))
+        writer.append(pd.DataFrame({'a': [1, 2]}))
+        writer.commit()
+        assert os.listdir(source_dir) == [os.path.basename(writer.entry_dir)]
+        assert [list(frame['a']) for frame in cache.read(str(source))] == [[1, 2]]
+
+    @requires_parquet
+    def test_uncommitted_and_aborted_entries_are_never_read(self, tmp_path):
+        cache = ParsedFrameCache(str(tmp_path / "cache"))
+        source = tmp_path / "input.csv"
+        source.write_text("a\n1\n")
+
+        interrupted = cache.writer(str(source))
+        interrupted.append(pd.DataFrame({'a': [1]}))
+        assert cache.read(str(source)) is None
+
+        unsupported = cache.writer(str(source))
+        unsupported.append(pd.DataFrame({0: [1]}))
+        assert not unsupported.active
+        unsupported.commit()
+        assert cache.read(str(source)) is None
+
+        mixed = cache.writer(str(source))
+        mixed.append(pd.DataFrame({'a': [1, 'x', 2.5]}, dtype=object))
+        mixed.commit()
+        assert cache.read(str(source)) is None
+
+    def test_disabled_cache_is_inert(self, tmp_path):
+        source = tmp_path / "input.csv"
+        source.write_text("a\n1\n")
+        cache = ParsedFrameCache(None)
+        writer = cache.writer(str(source))
+        writer.append(pd.DataFrame({'a': [1]}))
+        writer.commit()
+        assert not cache.enabled and not writer.active and cache.read(str(source)) is None
+
+
+class TestExcelProcessor:
+    """Test that sheets stream from one open workbook with the data read_excel returns."""
+
+    def test_iter_sheets_matches_read_excel_and_uses_the_cache(self, tmp_path):
+        pytest.importorskip("openpyxl")
+        from processors.excel_processor import ExcelProcessor
+
+        path = str(tmp_path / "report.xlsx")
+        sheets = {
+            'Listings': pd.DataFrame({'address': ['1 Marina Walk', '2 JVC Road'], 'price': [1.5e6, 9e5], 'bedrooms': [2, 1]}),
+            'Empty': pd.DataFrame(),
+            'ROI': pd.DataFrame({'investment_amount': [1e6, 2e6], 'roi': [0.06, 0.08], 'period': ['2024', '2025']}),
+        }
+        with pd.ExcelWriter(path) as writer:
+            for name, frame in sheets.items():
+                frame.to_excel(writer, sheet_name=name, index=False)
+
+        processor = ExcelProcessor(cache_dir=str(tmp_path / "cache"))
+        streamed = list(processor._iter_sheets(path))
+        assert [name for name, _ in streamed] == ['Listings', 'ROI']
+        for name, frame in streamed:
+            pd.testing.assert_frame_equal(frame, pd.read_excel(path, sheet_name=name))
+
+        if parsed_cache.PARQUET_ENGINE is not None:
+            assert processor.parsed_cache.read(path, variant='ROI') is not None
+            for (name, frame), (_, cached) in zip(streamed, processor._iter_sheets(path)):
+                pd.testing.assert_frame_equal(cached, frame)
+
+        result = processor.process(path)
+        assert result['status'] == 'success' and result['total_sheets'] == 2 and result['total_rows'] == 4
+        assert [sheet['sheet_type'] for sheet in result['processed_sheets']] == ['property_listings', 'financial_analysis']
@@ -0,0 +1,126 @@
+"""
+Unit tests for the LLM gateway
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.infrastructure.integrations.llm_gateway import LLMGateway, LLMBackend, FakeBackend
+
+
+class CountingBackend(LLMBackend):
+    """Backend that records concurrency and call counts"""
+
+    name = "counting"
+
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def complete(self, model, prompt, options):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("provider down")
+            return f"{model}:{prompt}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def make_gateway(backend, max_concurrency=4, cache_ttl=60):
+    gateway = LLMGateway(default_provider="counting", max_concurrency=max_concurrency, cache_ttl=cache_ttl, cache_max_entries=100)
+    gateway.register_backend("counting", backend)
+    return gateway
+
+
+class TestLLMGateway:
+    """Test pooling, coalescing and caching."""
+
+    def test_identical_in_flight_prompts_are_coalesced(self):
+        backend = CountingBackend(delay=0.2)
+        gateway = make_gateway(backend, cache_ttl=0)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: gateway.generate("same prompt", model="m"), range(8)))
+
+        assert results == ["m:same prompt"] * 8
+        assert backend.calls == 1
+        assert gateway.get_stats()["providers"]["counting"]["coalesced"] == 7
+
+    def test_response_cache_serves_repeat_prompts(self):
+        backend = CountingBackend(delay=0)
+        gateway = make_gateway(backend)
+
+        assert gateway.generate("hello", model="m") == gateway.generate("hello", model="m")
+        assert backend.calls == 1
+        assert gateway.generate("hello", model="m", options={"temperature": 0.9}) == "m:hello"
+        assert backend.calls == 2
+
+    def test_concurrency_is_bounded_per_provider(self):
+        backend = CountingBackend(delay=0.05)
+        gateway = make_gateway(backend, max_concurrency=2, cache_ttl=0)
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            list(pool.map(lambda i: gateway.generate(f"prompt {i}"), range(10)))
+
+        assert backend.calls == 10
+        assert backend.max_active <= 2
+
+    def test_errors_are_raised_and_not_cached(self):
+        backend = CountingBackend(delay=0, fail=True)
+        gateway = make_gateway(backend)
+
+        with pytest.raises(RuntimeError):
+            gateway.generate("boom")
+        backend.fail = False
+        assert gateway.generate("boom") == ":boom"
+
+    def test_async_generation_does_not_block_event_loop(self):
+        backend = CountingBackend(delay=0.2)
+        gateway = make_gateway(backend, cache_ttl=0)
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            results = await asyncio.gather(*(gateway.agenerate(f"p{i}") for i in range(3)))
+            task.cancel()
+            return results, ticks
+
+        results, ticks = asyncio.run(run())
+        assert results == [":p0", ":p1", ":p2"]
+        assert ticks >= 5
+
+    def test_fake_provider_is_deterministic_and_replaces_all_providers(self):
+        gateway = LLMGateway(default_provider="fake", cache_ttl=0)
+        gateway.register_backend("fake", FakeBackend(latency_ms=0))
+        model = gateway.get_model("gemini", "gemini-1.5-flash")
+
+        first = model.generate_content("Tell me about Dubai Marina").text
+        second = model.generate_content("Tell me about Dubai Marina").text
+        streamed = "".join(chunk.text for chunk in model.generate_content("Tell me about Dubai Marina", stream=True))
+
+        assert first == second == streamed
+        assert "Dubai Marina" in first
+        assert set(gateway.get_stats()["providers"]) == {"fake"}
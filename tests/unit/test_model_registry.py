@@ -0,0 +1,147 @@
+"""
+Unit tests for the versioned model registry and AdvancedMLModels loading from it
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.model_registry import ModelRegistry, ModelRegistryError
+
+from conftest import load_module
+
+
+def price_artifacts(scale=1.0):
+    """A small price predictor with its scaler and encoders, predicting ``scale`` times the base prices"""
+    rng = np.random.RandomState(0)
+    locations = LabelEncoder().fit(['Business Bay', 'Dubai Marina'])
+    property_types = LabelEncoder().fit(['apartment', 'villa'])
+    features = rng.uniform(0, 5, size=(200, 14))
+    prices = scale * (1e6 + 2e5 * features[:, 0])
+    scaler = StandardScaler().fit(features)
+    model = GradientBoostingRegressor(n_estimators=10, random_state=0).fit(scaler.transform(features), prices)
+    return {
+        'models': {'price_predictor': model},
+        'scalers': {'price_scaler': scaler},
+        'encoders': {'location_encoder': locations, 'property_type_encoder': property_types},
+    }
+
+
+class TestModelRegistry:
+    """Test publishing, promotion, rollback and memory-mapped loading."""
+
+    def test_publish_promote_and_rollback(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        assert registry.current_version() is None
+        with pytest.raises(ModelRegistryError):
+            registry.load()
+
+        first = registry.publish({'models': {'m': [1]}}, promote=True)
+        second = registry.publish({'models': {'m': [2]}}, metadata={'note': 'retrained'})
+        assert registry.current_version() == first
+        assert registry.versions() == [first, second]
+        assert registry.manifest(second)['metadata'] == {'note': 'retrained'}
+
+        registry.promote(second)
+        assert registry.load() == {'models': {'m': [2]}}
+        assert registry.rollback() == first
+        assert registry.load() == {'models': {'m': [1]}}
+        with pytest.raises(ModelRegistryError):
+            registry.rollback()
+        with pytest.raises(ModelRegistryError):
+            registry.promote("missing")
+        assert not [entry for entry in os.listdir(tmp_path / "versions") if entry.startswith('.')]
+
+    def test_arrays_are_memory_mapped_and_checksummed(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        version = registry.publish({'models': {'weights': np.arange(100_000, dtype=np.float64)}}, promote=True)
+        weights = registry.load()['models']['weights']
+        assert isinstance(weights, np.memmap) and not weights.flags.writeable
+        assert weights[-1] == 99_999
+        assert registry.verify(version)
+
+        with open(tmp_path / "versions" / version / "weights.joblib", 'r+b') as handle:
+            handle.seek(-8, 2)
+            handle.write(b"\0" * 8)
+        assert not registry.verify(version)
+
+    def test_prune_keeps_promoted_and_rollback_versions(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        versions = [registry.publish({'models': {'m': n}}) for n in range(5)]
+        registry.promote(versions[0])
+        registry.promote(versions[1])
+        removed = registry.prune(keep=1)
+        assert removed == versions[2:4]
+        assert registry.versions() == [versions[0], versions[1], versions[4]]
+        current = json.loads((tmp_path / "current.json").read_text())
+        assert current == {**current, 'version': versions[1], 'history': [versions[0]]}
+
+    def test_concurrent_promotions_keep_every_version_in_history(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        versions = [registry.publish({'models': {'m': n}}) for n in range(12)]
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda version: ModelRegistry(str(tmp_path)).promote(version), versions))
+        current = json.loads((tmp_path / "current.json").read_text())
+        assert sorted([current['version'], *current['history']]) == versions
+
+
+class TestAdvancedMLModelsRegistry:
+    """Test that serving instances load promoted versions and never train."""
+
+    def test_serving_instance_follows_promotions(self, tmp_path):
+        module = load_module('advanced_ml_models', 'backend/ml/advanced_ml_models.py', tmp_path)
+        assert module.advanced_ml_models.price_predictor is None
+        assert not (tmp_path / "ml_models" / "versions").exists()
+
+        registry = ModelRegistry(str(tmp_path / "registry"))
+        base = registry.publish(price_artifacts(1.0), promote=True)
+        models = module.AdvancedMLModels(registry=registry)
+        prop = {'bedrooms': 2, 'location': 'Business Bay', 'property_type': 'villa'}
+        base_price = models.predict_property_price(prop)['predicted_price']
+        assert models.model_version == base
+        assert not models.reload_if_changed()
+
+        doubled = registry.publish(price_artifacts(2.0), promote=True)
+        assert models.reload_if_changed() and models.model_version == doubled
+        assert models.predict_property_price(prop)['predicted_price'] == pytest.approx(2 * base_price)
+
+        registry.rollback()
+        assert models.reload_if_changed() and models.model_version == base
+        assert models.get_model_performance()['model_version'] == base
+
+    def test_reload_swaps_models_scalers_and_encoders_together(self, tmp_path):
+        module = load_module('advanced_ml_models', 'backend/ml/advanced_ml_models.py', tmp_path)
+        registry = ModelRegistry(str(tmp_path / "registry"))
+        registry.publish(price_artifacts(1.0), promote=True)
+        models = module.AdvancedMLModels(registry=registry)
+        before = models._model_set
+
+        registry.publish(price_artifacts(2.0), promote=True)
+        assert models.reload_if_changed()
+        after = models._model_set
+        assert after is not before and after.version == models.model_version
+        assert models.price_predictor is after.models['price_predictor']
+        assert models.scalers is after.scalers and models.encoders is after.encoders
+        # A prediction that started on the old set keeps all of its parts
+        assert before.models['price_predictor'] is not after.models['price_predictor']
+        assert before.scalers['price_scaler'] is not after.scalers['price_scaler']
+
+    def test_predictions_pick_up_promotions_once_per_interval(self, tmp_path):
+        module = load_module('advanced_ml_models', 'backend/ml/advanced_ml_models.py', tmp_path)
+        registry = ModelRegistry(str(tmp_path / "registry"))
+        registry.publish(price_artifacts(1.0), promote=True)
+        prop = {'bedrooms': 2, 'location': 'Business Bay', 'property_type': 'villa'}
+        throttled = module.AdvancedMLModels(registry=registry)
+        eager = module.AdvancedMLModels(registry=registry, reload_interval=0)
+        base_price = eager.predict_property_price(prop)['predicted_price']
+
+        doubled = registry.publish(price_artifacts(2.0), promote=True)
+        assert throttled.predict_property_price(prop)['predicted_price'] == pytest.approx(base_price)
+        assert eager.predict_property_prices([prop])[0]['predicted_price'] == pytest.approx(2 * base_price)
+        assert eager.model_version == doubled and throttled.model_version != doubled
@@ -0,0 +1,236 @@
+"""
+Unit tests for the offline price model training pipeline and MarketPredictor serving its output
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+from sklearn.model_selection import GroupShuffleSplit
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.model_registry import ModelRegistry
+
+from conftest import load_module
+
+
+def training_frame(rows=300, seed=0):
+    """Listings and sales shaped like TRAINING_QUERY rows, priced by area and location"""
+    rng = np.random.RandomState(seed)
+    locations = rng.choice(['Dubai Marina', 'Business Bay', 'JVC'], size=rows)
+    area = rng.uniform(500, 3000, size=rows)
+    rate = pd.Series(locations).map({'Dubai Marina': 2000, 'Business Bay': 1500, 'JVC': 900}).to_numpy()
+    sold = rng.rand(rows) < 0.4
+    return pd.DataFrame({
+        'property_id': np.arange(rows),
+        'location': locations,
+        'bedrooms': (area // 700).astype(int),
+        'bathrooms': (area // 800).astype(int) + 1,
+        'area_sqft': area,
+        'price_aed': area * rate,
+        'price': np.nan,
+        'final_price': np.where(sold, area * rate * 1.02, np.nan),
+        'transaction_date': np.where(sold, '2025-06-01', None),
+        'completion_date': '2015-01-01',
+        'parking_spaces': rng.randint(0, 3, size=rows),
+        'gym_available': rng.rand(rows) < 0.5,
+        'pool_available': rng.rand(rows) < 0.5,
+        'security_24_7': True,
+        'pet_friendly': False,
+    })
+
+
+class R2Evaluator:
+    """Stands in for ModelEvaluator, which needs the plotting libraries"""
+
+    def evaluate_regression_model(self, model, X_test, y_test, X_train=None, y_train=None, model_name="model"):
+        return {'r2': np.float64(r2_score(y_test, model.predict(X_test)))}
+
+
+class RecordingEvaluator(R2Evaluator):
+    """Keeps the held-out matrix each model was evaluated on"""
+
+    def __init__(self):
+        self.test_matrices = []
+
+    def evaluate_regression_model(self, model, X_test, y_test, X_train=None, y_train=None, model_name="model"):
+        self.test_matrices.append(X_test)
+        return super().evaluate_regression_model(model, X_test, y_test, X_train, y_train, model_name)
+
+
+class TestPriceFeatures:
+    """Test vectorized feature building from training rows."""
+
+    def test_features_targets_and_location_scores(self):
+        module = load_module('model_training', 'backend/ml/pipeline/model_training.py', os.getcwd())
+        frame = training_frame(6).assign(area_sqft=[1000, 1000, 0, 1000, 1000, 1000], price_aed=1e6, final_price=np.nan)
+        frame.loc[0, ['final_price', 'transaction_date']] = [3e6, '2025-01-01']
+        frame.loc[1, ['final_price', 'price_aed', 'price']] = [np.nan, np.nan, 1.1e6]
+        frame.loc[[0, 1, 3, 4, 5], 'location'] = ['Dubai Marina', 'JVC', 'JVC', 'Business Bay', None]
+
+        X, y, location_scores = module.build_price_features(frame, as_of=pd.Timestamp('2025-01-01'))
+        assert list(X.columns) == module.PRICE_MODEL_FEATURES
+        assert len(X) == 5 and y[0] == 3e6 and y[1] == 1.1e6
+        assert X['age'][0] == pytest.approx(10, abs=0.01)
+        assert location_scores == {'Business Bay': pytest.approx(1 / 3), 'JVC': pytest.approx(2 / 3), 'Dubai Marina': 1.0}
+        assert list(X['location_score']) == [1.0, pytest.approx(2 / 3), pytest.approx(2 / 3), pytest.approx(1 / 3), 0.5]
+        assert X['amenity_score'].between(0, 1).all()
+
+        # Held-out rows are scored with a fitted table, which comes back unchanged
+        table = {'JVC': 0.25}
+        X, _, returned = module.build_price_features(frame, location_scores=table)
+        assert returned is table
+        assert list(X['location_score']) == [0.5, 0.25, 0.25, 0.5, 0.5]
+
+
+class TestModelTrainer:
+    """Test parallel candidate training, evaluation gating and publishing."""
+
+    def test_parallel_training_matches_serial(self):
+        module = load_module('model_training', 'backend/ml/pipeline/model_training.py', os.getcwd())
+        X, y, _ = module.build_price_features(training_frame())
+        candidates = lambda: {'rf': RandomForestRegressor(n_estimators=10, random_state=0), 'linear': LinearRegression()}
+        serial = module.train_candidates(candidates(), X.to_numpy(), y.to_numpy(), max_workers=1)
+        parallel = module.train_candidates(candidates(), X.to_numpy(), y.to_numpy(), max_workers=2)
+        assert list(parallel) == ['rf', 'linear']
+        for name in serial:
+            assert np.allclose(serial[name].predict(X.to_numpy()), parallel[name].predict(X.to_numpy()))
+
+    def test_publishes_accepted_models_and_serving_never_fits(self, tmp_path):
+        training = load_module('model_training', 'backend/ml/pipeline/model_training.py', os.getcwd())
+        predictor_module = load_module('market_predictor', 'backend/ml/models/market_predictor.py', tmp_path)
+        registry = ModelRegistry(str(tmp_path / "market_price"))
+        predictor = predictor_module.MarketPredictor(registry=registry, reload_interval=0)
+        market_data = pd.DataFrame({'price': [1.0]})
+        prop = {'bedrooms': 2, 'bathrooms': 2, 'square_feet': 1500, 'age': 5, 'location': 'Dubai Marina', 'location_score': 0.0}
+        assert 'error' in predictor.predict_property_prices(market_data, prop)
+
+        trainer = training.ModelTrainer(registry=registry, evaluator=R2Evaluator(), max_workers=2, min_r2=0.5)
+        candidates = {'price_rf': RandomForestRegressor(n_estimators=20, random_state=0), 'price_linear': LinearRegression()}
+        assert trainer.train_price_models(training_frame(30))['status'] == 'skipped'
+        summary = trainer.train_price_models(training_frame(), candidates=candidates)
+        assert summary['status'] == 'completed' and summary['models'] == ['price_linear', 'price_rf']
+        assert registry.manifest(summary['version'])['metadata']['features'] == training.PRICE_MODEL_FEATURES
+
+        result = predictor.predict_property_prices(market_data, prop)
+        assert result['model_version'] == summary['version'] and result['model_count'] == 3
+        assert 1.5e6 < result['predictions']['price_rf'] < 3.5e6
+        assert predictor.price_models['price_rf'] is not candidates['price_rf']
+        assert not hasattr(candidates['price_rf'], 'estimators_')
+
+        strict = training.ModelTrainer(registry=registry, evaluator=R2Evaluator(), max_workers=1, min_r2=1.1)
+        assert strict.train_price_models(training_frame())['status'] == 'rejected'
+        assert registry.versions() == [summary['version']]
+
+    def test_reload_swaps_models_features_and_tables_together(self, tmp_path):
+        predictor_module = load_module('market_predictor', 'backend/ml/models/market_predictor.py', tmp_path)
+        registry = ModelRegistry(str(tmp_path / "market_price"))
+
+        def publish(features, scale):
+            X = np.arange(40, dtype=float).reshape(-1, len(features))
+            model = LinearRegression().fit(X, scale * X.sum(axis=1))
+            return registry.publish(
+                {'models': {'price_linear': model}, 'tables': {'location_scores': {'JVC': scale / 10}}},
+                metadata={'features': features}, promote=True
+            )
+
+        first = publish(['bedrooms', 'square_feet'], 1.0)
+        predictor = predictor_module.MarketPredictor(registry=registry, reload_interval=0)
+        before = predictor._price_model_set
+        second = publish(['square_feet', 'bedrooms', 'location_score', 'age'], 2.0)
+        result = predictor.predict_property_prices_batch([{'bedrooms': 1, 'square_feet': 2, 'location': 'JVC'}])
+        after = predictor._price_model_set
+
+        assert before.version == first and after.version == second == result['model_version']
+        assert before.features == ['bedrooms', 'square_feet'] and before.location_scores == {'JVC': 0.1}
+        assert after.location_scores == {'JVC': 0.2} and predictor.price_features is after.features
+        assert predictor.price_models is after.models and predictor.price_model_version == second
+        assert result['results'][0]['predictions']['price_linear'] == pytest.approx(2 * (2 + 1 + 0.2))
+
+
+    def test_split_keeps_properties_together_and_scores_locations_from_training_rows(self, tmp_path):
+        training = load_module('model_training', 'backend/ml/pipeline/model_training.py', os.getcwd())
+        registry = ModelRegistry(str(tmp_path / "market_price"))
+        evaluator = RecordingEvaluator()
+        frame = training_frame().assign(property_id=np.arange(300) // 4)
+        trainer = training.ModelTrainer(registry=registry, evaluator=evaluator, max_workers=1, min_r2=0.0)
+        summary = trainer.train_price_models(frame, candidates={'price_linear': LinearRegression()})
+
+        splitter = GroupShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+        train_rows, test_rows = next(splitter.split(frame, groups=frame['property_id']))
+        assert not set(frame['property_id'].iloc[train_rows]) & set(frame['property_id'].iloc[test_rows])
+
+        _, _, fitted_table = training.build_price_features(frame.iloc[train_rows])
+        assert registry.load(summary['version'])['tables']['location_scores'] == fitted_table
+        test_X, _, _ = training.build_price_features(frame.iloc[test_rows], location_scores=fitted_table)
+        assert np.array_equal(evaluator.test_matrices[0], test_X.to_numpy(dtype=float))
+        assert summary['training_rows'] == 300
+
+
+class TestPriceIntervals:
+    """Test vectorized tree spreads, conformal intervals, batching and the bounded history."""
+
+    def test_tree_stack_matches_per_estimator_predictions(self, tmp_path):
+        predictor_module = load_module('market_predictor', 'backend/ml/models/market_predictor.py', tmp_path)
+        training = load_module('model_training', 'backend/ml/pipeline/model_training.py', os.getcwd())
+        X, y, _ = training.build_price_features(training_frame())
+        model = RandomForestRegressor(n_estimators=15, random_state=0).fit(X.to_numpy(), y.to_numpy())
+
+        trees = predictor_module.tree_predictions(model, X.to_numpy()[:20])
+        expected = np.array([[est.predict([row])[0] for row in X.to_numpy()[:20]] for est in model.estimators_])
+        assert trees.shape == (15, 20) and np.allclose(trees, expected)
+        assert np.allclose(trees.mean(axis=0), model.predict(X.to_numpy()[:20]))
+        assert predictor_module.tree_predictions(LinearRegression().fit(X.to_numpy(), y), X.to_numpy()) is None
+
+    def test_conformal_interval_covers_new_properties(self):
+        training = load_module('model_training', 'backend/ml/pipeline/model_training.py', os.getcwd())
+        X, y, _ = training.build_price_features(training_frame(1200, seed=1))
+        noisy = y.to_numpy() * np.random.RandomState(2).normal(1, 0.05, len(y))
+        X = X.to_numpy()
+        model = LinearRegression().fit(X[:400], noisy[:400])
+        interval = training.conformal_interval(model, X[400:800], noisy[400:800])
+
+        predicted = model.predict(X[800:])
+        half_width = interval['relative_half_width'] * np.abs(predicted)
+        covered = np.mean(np.abs(noisy[800:] - predicted) <= half_width)
+        assert interval['calibration_rows'] == 400 and covered >= 0.9
+
+    def test_batch_matches_single_rows_and_history_is_bounded(self, tmp_path):
+        training = load_module('model_training', 'backend/ml/pipeline/model_training.py', os.getcwd())
+        predictor_module = load_module('market_predictor', 'backend/ml/models/market_predictor.py', tmp_path)
+        registry = ModelRegistry(str(tmp_path / "market_price"))
+        trainer = training.ModelTrainer(registry=registry, evaluator=R2Evaluator(), max_workers=1)
+        candidates = {
+            'price_rf': RandomForestRegressor(n_estimators=20, random_state=0),
+            'price_gb': training.default_price_candidates()['price_gb'],
+            'price_linear': LinearRegression(),
+        }
+        version = trainer.train_price_models(training_frame(), candidates=candidates)['version']
+        intervals = registry.manifest(version)['metadata']['intervals']
+        assert set(intervals) == set(candidates) and all(i['confidence'] == 0.95 for i in intervals.values())
+
+        predictor = predictor_module.MarketPredictor(registry=registry, history_size=5)
+        properties = [
+            {'bedrooms': b, 'bathrooms': b, 'square_feet': 600 + 300 * b, 'age': b, 'location': 'JVC'}
+            for b in range(1, 5)
+        ] + [{'bedrooms': 'two'}]
+        batch = predictor.predict_property_prices_batch(properties)
+        assert batch['model_version'] == version and batch['results'][-1] == {'error': 'Failed to prepare features'}
+
+        market_data = pd.DataFrame({'price': [1.0]})
+        for prop, result in zip(properties, batch['results'][:-1]):
+            single = predictor.predict_property_prices(market_data, prop)
+            assert single['model_count'] == result['model_count'] == 4
+            for name, price in result['predictions'].items():
+                assert single['predictions'][name] == pytest.approx(price)
+                bounds = result['confidence_intervals'][name]
+                assert bounds['lower'] < price < bounds['upper']
+            gb_width = result['confidence_intervals']['price_gb']['upper'] - result['predictions']['price_gb']
+            assert gb_width == pytest.approx(intervals['price_gb']['relative_half_width'] * result['predictions']['price_gb'])
+
+        summary = predictor.get_prediction_summary()
+        assert summary['total_predictions'] == 8 and len(predictor.prediction_history) == 5
+        assert len(summary['recent_predictions']) == 5
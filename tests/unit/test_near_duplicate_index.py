@@ -0,0 +1,131 @@
+"""
+Unit tests for the MinHash/LSH near-duplicate index and its use in the intelligent processor
+"""
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.near_duplicate_index import (
+    NearDuplicateIndex,
+    find_duplicate_groups,
+    jaccard,
+    record_features,
+    shingles,
+)
+from app.domain.ai import intelligent_processor as processor_module
+
+LISTING = (
+    "Spacious two bedroom apartment in Dubai Marina with full sea view, "
+    "balcony, covered parking and access to the pool and gym. Close to the tram."
+)
+NEAR_LISTING = LISTING.replace("full sea view", "partial sea view").replace("tram", "metro")
+OTHER = "Quarterly market report: villa prices in Arabian Ranches rose four percent on strong demand."
+
+
+class TestNearDuplicateIndex:
+    """Test candidate lookup, updates and persistence."""
+
+    def test_near_duplicate_is_a_candidate_and_unrelated_text_is_not(self):
+        index = NearDuplicateIndex()
+        index.add("listing", LISTING)
+        index.add("report", OTHER)
+
+        assert jaccard(shingles(LISTING), shingles(NEAR_LISTING)) > 0.6
+        assert index.candidates(NEAR_LISTING) == {"listing"}
+
+    def test_remove_and_re_add_update_buckets(self):
+        index = NearDuplicateIndex()
+        index.add("a", LISTING)
+        assert index.remove("a") is True
+        assert index.candidates(LISTING) == set()
+
+        index.add("a", OTHER)
+        index.add("a", LISTING)
+        assert len(index) == 1
+        assert index.candidates(OTHER) == set()
+
+    def test_log_replay_and_snapshot_round_trip(self, tmp_path):
+        path = str(tmp_path / "docs")
+        index = NearDuplicateIndex(path=path)
+        index.add("listing", LISTING, payload={"preview": "listing"})
+        index.add("report", OTHER)
+        index.remove("report")
+
+        replayed = NearDuplicateIndex(path=path)
+        assert len(replayed) == 1
+        assert replayed.payload("listing") == {"preview": "listing"}
+        assert replayed.candidates(NEAR_LISTING) == {"listing"}
+
+        replayed.save()
+        assert not os.path.exists(f"{path}.log")
+        with open(f"{path}.log", "a") as f:
+            f.write('{"op": "add", "key": "torn"')  # interrupted append
+        reloaded = NearDuplicateIndex(path=path)
+        assert reloaded.candidates(NEAR_LISTING) == {"listing"}
+        assert "torn" not in reloaded
+
+    def test_bands_must_divide_signature_length(self):
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(num_perm=100, bands=32)
+
+
+class TestDuplicateGroups:
+    """Test grouping of transaction rows."""
+
+    def test_record_features_normalize_case_whitespace_and_numbers(self):
+        a = {"Building": " Marina  Gate ", "price": 1500000.0, "unit": None}
+        b = {"price": 1500000, "building": "marina gate"}
+        assert record_features(a) == record_features(b) == {"building=marina gate", "price=1500000"}
+
+    def test_groups_are_transitive_and_ordered(self):
+        texts = ["alpha tower unit 1204", "beta villa 7", "alpha tower unit 1204 ", "alpha tower unit 1204."]
+        groups = find_duplicate_groups([shingles(t) for t in texts],
+                                       lambda i, j: 100 if texts[i].strip(" .") == texts[j].strip(" .") else 0, 90)
+        assert groups == [([0, 2, 3], 100)]
+
+
+class TestIntelligentProcessorDuplicates:
+    """Test the processor's document and transaction duplicate detection."""
+
+    @pytest.fixture
+    def processor(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(processor_module, "DUPLICATE_INDEX_PATH", str(tmp_path / "documents"))
+        return processor_module.IntelligentDataProcessor()
+
+    def test_detect_duplicates_against_given_contents(self, processor):
+        matches = processor.detect_duplicates(NEAR_LISTING, [OTHER, LISTING])
+        assert [m["index"] for m in matches] == [1]
+        assert matches[0]["similarity"] > 80
+
+    def test_registered_documents_are_found_later(self, processor):
+        document_id = processor.register_document(LISTING)
+        processor.register_document(OTHER)
+        matches = processor.detect_duplicates(NEAR_LISTING)
+        assert [m["document_id"] for m in matches] == [document_id]
+        assert matches[0]["similarity"] >= 50 and matches[0]["content_preview"] == LISTING[:100] + "..."
+
+    def test_registered_documents_keep_no_full_text(self, processor, tmp_path):
+        document_id = processor.register_document(LISTING)
+        assert processor.document_index.payload(document_id) == {"preview": LISTING[:100] + "..."}
+
+        def stored_bytes():
+            return b"".join((tmp_path / name).read_bytes() for name in os.listdir(tmp_path)).lower()
+
+        tail = LISTING[100:].lower().encode()
+        assert b'"op": "add"' in stored_bytes() and tail not in stored_bytes()
+        processor.document_index.save()
+        assert tail not in stored_bytes()
+
+    def test_duplicate_transaction_groups(self, processor):
+        rows = processor.clean_transaction_data([
+            {"building": "Marina Gate", "unit": "1204", "price": 1500000.0, "date": "2024-03-01"},
+            {"building": "Creek Rise", "unit": "303", "price": 900000.0, "date": "2024-03-02"},
+            {"building": " marina gate", "unit": "1204", "price": 1500000, "date": "2024-03-01"},
+            {"building": float("nan"), "unit": "", "price": None, "date": None},
+        ])
+        assert len(rows) == 3
+
+        groups = processor.detect_duplicate_transactions(rows)
+        assert [(g["indices"], g["total_duplicates"]) for g in groups] == [([0, 2], 1)]
+        assert processor.generate_recommendations(groups, rows)[0].startswith("Review 1 duplicate groups")
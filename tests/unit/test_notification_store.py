@@ -0,0 +1,108 @@
+"""
+Unit tests for the indexed notification store and the notification service on top of it
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai import notification_service
+from app.domain.ai.notification_service import SmartNotificationService
+from app.domain.ai.notification_store import NotificationStore
+
+
+def make_notification(n, user_id=1, notification_type="price_change", status="active", minutes_ago=0, **extra):
+    created = datetime.now() - timedelta(minutes=minutes_ago)
+    notification = {
+        'id': f"notif_{n:04d}", 'type': notification_type, 'user_id': user_id, 'title': f"Title {n}",
+        'message': "Price moved", 'priority': "medium", 'status': status, 'context_data': {'n': n},
+        'action_required': False, 'created_at': created.isoformat(),
+        'expires_at': (created + timedelta(hours=48)).isoformat(), 'read_at': None, 'archived_at': None,
+    }
+    notification.update(extra)
+    return notification
+
+
+class TestNotificationStore:
+    """Test indexed queries, pagination, bulk updates and frequency windows."""
+
+    def test_cursor_pages_cover_every_match_once_newest_first(self):
+        store = NotificationStore()
+        for n in range(25):
+            store.add(make_notification(n, minutes_ago=n // 2))
+        store.add(make_notification(99, user_id=2))
+        store.add(make_notification(98, notification_type="market_trend"))
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = store.query(1, notification_type="price_change", limit=10, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+
+        assert len(seen) == 25 and len({n['id'] for n in seen}) == 25
+        assert [n['created_at'] for n in seen] == sorted((n['created_at'] for n in seen), reverse=True)
+        assert seen[0]['context_data'] == {'n': seen[0]['context_data']['n']}
+        with pytest.raises(ValueError):
+            store.query(1, cursor="not-a-cursor")
+
+    def test_bulk_mark_read_only_touches_matching_active_rows(self):
+        store = NotificationStore()
+        for n in range(5):
+            store.add(make_notification(n))
+        store.add(make_notification(5, status="archived"))
+        store.add(make_notification(6, user_id=2))
+
+        assert store.set_status(1, "read", "read_at", ["notif_0000", "notif_0001", "notif_0006"], from_status="active") == 2
+        assert store.set_status(1, "read", "read_at", from_status="active") == 3
+        assert store.get("notif_0005", 1)['status'] == "archived"
+        assert store.get("notif_0006", 2)['status'] == "active"
+        assert store.get("notif_0003", 1)['read_at'] is not None
+
+    def test_frequency_window_survives_eviction_and_restart(self, tmp_path):
+        path = str(tmp_path / "notifications.sqlite3")
+        store = NotificationStore(path, rate_cache_size=1)
+        assert store.within_limit(1, "price_change", 3600)
+        store.add(make_notification(0, minutes_ago=5))
+        assert not store.within_limit(1, "price_change", 3600)
+        assert store.within_limit(2, "price_change", 3600)  # evicts user 1's window
+        assert not store.within_limit(1, "price_change", 3600)
+        assert store.within_limit(1, "price_change", 3600, max_count=2)
+        store.close()
+
+        reopened = NotificationStore(path)
+        assert not reopened.within_limit(1, "price_change", 3600)
+        assert reopened.within_limit(1, "price_change", 60)
+        assert reopened.get("notif_0000", 1)['title'] == "Title 0"
+
+
+class TestSmartNotificationService:
+    """Test the service API over the store."""
+
+    def test_default_store_opens_on_first_use(self, tmp_path, monkeypatch):
+        path = tmp_path / "notifications.sqlite3"
+        monkeypatch.setattr(notification_service, 'NOTIFICATION_STORE_PATH', str(path))
+        service = SmartNotificationService()
+        assert not path.exists()
+        assert service.store.path == str(path) and path.exists()
+
+    def test_create_limit_read_and_summarise(self, tmp_path):
+        service = SmartNotificationService(NotificationStore(str(tmp_path / "notifications.sqlite3")))
+
+        async def scenario():
+            first = await service.create_price_change_alert(1, "p1", 100.0, 120.0, 20.0)
+            limited = await service.create_price_change_alert(1, "p2", 100.0, 90.0, -10.0)
+            opportunity = await service.create_market_opportunity_alert(1, "undervalued", "Marina", "apartment", 0.9)
+            summary = await service.get_notification_summary(1)
+            marked = await service.mark_notifications_read(1)
+            return first, limited, opportunity, summary, marked, await service.get_user_notifications(1, status="read")
+
+        first, limited, opportunity, summary, marked, read = asyncio.run(scenario())
+        assert limited is None and first['id'] != opportunity['id']
+        assert summary['total_notifications'] == summary['unread_count'] == 2
+        assert summary['high_priority_count'] == 2 and summary['action_required_count'] == 1
+        assert summary['by_type'] == {"price_change": 1, "market_opportunity": 1}
+        assert marked == 2 and [n['id'] for n in read] == [opportunity['id'], first['id']]
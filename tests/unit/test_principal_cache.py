@@ -0,0 +1,97 @@
+"""
+Unit tests for the authenticated principal cache and last_used batching
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.core.principal_cache import PrincipalCache, LastUsedTracker, hash_token
+
+
+def make_principal(user_id=1, session_id=10, expires_in=timedelta(minutes=30)):
+    return {
+        "id": user_id,
+        "email": f"user{user_id}@example.com",
+        "role": "agent",
+        "is_active": True,
+        "locked_until": None,
+        "session_id": session_id,
+        "session_expires_at": datetime.utcnow() + expires_in,
+    }
+
+
+class TestPrincipalCache:
+    """Test lookup, expiry and invalidation without Redis."""
+
+    def test_cached_principal_is_returned_for_same_token(self):
+        cache = PrincipalCache(ttl=60, local_ttl=10, redis_url=None)
+        cache.set("token-a", make_principal())
+
+        assert cache.get("token-a")["session_id"] == 10
+        assert cache.get("token-b") is None
+        assert cache.get_stats()["local_hits"] == 1
+
+    def test_raw_token_is_not_used_as_key(self):
+        cache = PrincipalCache(ttl=60, local_ttl=10, redis_url=None)
+        cache.set("secret-token", make_principal())
+
+        assert "secret-token" not in cache._local
+        assert hash_token("secret-token") in cache._local
+
+    def test_principal_is_not_cached_past_session_expiry(self):
+        cache = PrincipalCache(ttl=60, local_ttl=10, redis_url=None)
+        cache.set("expired", make_principal(expires_in=timedelta(seconds=-1)))
+
+        assert cache.get("expired") is None
+
+    def test_invalidate_token_and_user(self):
+        cache = PrincipalCache(ttl=60, local_ttl=10, redis_url=None)
+        cache.set("t1", make_principal(user_id=1, session_id=1))
+        cache.set("t2", make_principal(user_id=1, session_id=2))
+        cache.set("t3", make_principal(user_id=2, session_id=3))
+
+        cache.invalidate_token("t1")
+        assert cache.get("t1") is None
+        assert cache.get("t2") is not None
+
+        cache.invalidate_user(1)
+        assert cache.get("t2") is None
+        assert cache.get("t3") is not None
+
+
+class TestLastUsedTracker:
+    """Test that session touches are coalesced into batched writes."""
+
+    def make_engine(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE user_sessions (id INTEGER PRIMARY KEY, last_used TIMESTAMP)"))
+            conn.execute(text("INSERT INTO user_sessions (id, last_used) VALUES (1, NULL), (2, NULL)"))
+        return engine
+
+    def test_touches_are_flushed_in_one_batch(self):
+        engine = self.make_engine()
+        tracker = LastUsedTracker(flush_interval=0, engine=engine)
+        latest = datetime(2024, 1, 1, 12, 0, 0)
+
+        tracker.touch(1, datetime(2024, 1, 1, 11, 0, 0))
+        tracker.touch(1, latest)
+        tracker.touch(2, latest)
+
+        assert tracker.flush() == 2
+        assert tracker.flush() == 0
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT id, last_used FROM user_sessions ORDER BY id")).fetchall()
+        assert [str(r.last_used) for r in rows] == [str(latest), str(latest)]
+
+    def test_failed_flush_keeps_pending_updates(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        tracker = LastUsedTracker(flush_interval=0, engine=engine)
+
+        tracker.touch(1)
+        assert tracker.flush() == 0
+        assert 1 in tracker._pending
@@ -0,0 +1,175 @@
+"""
+Unit tests for the geocode cache and the column-wise PropertyDataEnricher
+"""
+import json
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("geopy")
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts'))
+from geopy.distance import geodesic
+from processors import property_enricher
+from processors.property_enricher import GeocodeCache, PropertyDataEnricher
+
+
+class FakeGeolocator:
+    """Answers from a fixed table and counts every query; ``errors`` raise instead"""
+
+    def __init__(self, answers, errors=()):
+        self.answers = answers
+        self.errors = set(errors)
+        self.queries = []
+
+    def geocode(self, query, timeout=None):
+        self.queries.append(query)
+        location = query.split(',')[0]
+        if location in self.errors:
+            raise TimeoutError("service timed out")
+        coords = self.answers.get(location)
+        return SimpleNamespace(latitude=coords[0], longitude=coords[1]) if coords else None
+
+
+def scalar_investment_score(row):
+    """The per-row investment score as computed before vectorization"""
+    score = 0
+    if row['price'] > 0:
+        score += max(0, 10 - (row['price'] / 1000000)) * 0.3
+    if pd.notna(row['distance_to_dubai_marina']):
+        score += max(0, 10 - row['distance_to_dubai_marina']) * 0.2
+    if pd.notna(row['distance_to_dubai_mall']):
+        score += max(0, 10 - row['distance_to_dubai_mall']) * 0.2
+    if row['area_sqft'] > 0:
+        score += min(10, row['area_sqft'] / 1000) * 0.15
+    score += min(10, row['bedrooms'] * 2) * 0.15
+    return round(score, 2)
+
+
+def enricher_with(tmp_path, geolocator):
+    enricher = PropertyDataEnricher(geocode_cache_path=str(tmp_path / "geocode.json"), online_geocoding=False)
+    enricher.geolocator = geolocator
+    return enricher
+
+
+def listings():
+    return pd.DataFrame({
+        'location': ['Dubai Marina', 'dubai  marina', 'Marina Gate, Dubai Marina', 'Nowhere Street', 'Business Bay'],
+        'price': [2_000_000, 2_500_000, 0, 900_000, 12_000_000],
+        'area_sqft': [1000, 1250, 800, 0, 4500],
+        'bedrooms': [2, 2, 1, 0, 5],
+    })
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(property_enricher, 'GEOCODE_MIN_INTERVAL', 0.0)
+
+
+class TestGeocodeCache:
+    """Test the persistent location cache."""
+
+    def test_round_trip_keeps_misses(self, tmp_path):
+        path = str(tmp_path / "cache" / "geocode.json")
+        cache = GeocodeCache(path)
+        cache.set('dubai marina', (25.09, 55.14))
+        cache.set('nowhere', None)
+        cache.save()
+
+        reloaded = GeocodeCache(path)
+        assert reloaded.get('dubai marina') == (25.09, 55.14)
+        assert 'nowhere' in reloaded and reloaded.get('nowhere') is None
+        assert 'jvc' not in reloaded
+
+    def test_unreadable_file_starts_empty(self, tmp_path):
+        path = tmp_path / "geocode.json"
+        path.write_text("{not json")
+        assert 'dubai marina' not in GeocodeCache(str(path))
+
+    def test_location_keys_ignore_case_and_spacing(self):
+        assert property_enricher.normalize_location("  Dubai   MARINA ") == "dubai marina"
+
+
+class TestCoordinates:
+    """Test that each distinct location is geocoded at most once across runs."""
+
+    def test_distinct_locations_are_geocoded_once_and_cached(self, tmp_path):
+        geolocator = FakeGeolocator({'Dubai Marina': (25.08, 55.14), 'Business Bay': (25.18, 55.27)})
+        df = enricher_with(tmp_path, geolocator)._add_coordinates(listings())
+
+        assert len(geolocator.queries) == 4
+        assert list(df['latitude'][:2]) == [25.08, 25.08]
+        # Unknown to the geocoder: falls back to the area centroid, or NaN
+        assert (df['latitude'][2], df['longitude'][2]) == (25.0920, 55.1381)
+        assert np.isnan(df['latitude'][3])
+        with open(tmp_path / "geocode.json") as f:
+            assert json.load(f)['nowhere street'] is None
+
+        second = FakeGeolocator({})
+        again = enricher_with(tmp_path, second)._add_coordinates(listings())
+        assert second.queries == []
+        assert again[['latitude', 'longitude']].equals(df[['latitude', 'longitude']])
+
+    def test_failed_requests_are_retried_next_run(self, tmp_path):
+        enricher_with(tmp_path, FakeGeolocator({}, errors={'Business Bay'}))._add_coordinates(listings())
+        retry = FakeGeolocator({'Business Bay': (25.18, 55.27)})
+        df = enricher_with(tmp_path, retry)._add_coordinates(listings())
+        assert retry.queries == ["Business Bay, Dubai, UAE"]
+        assert df['latitude'][4] == 25.18
+
+    def test_offline_mode_uses_centroids(self, tmp_path):
+        enricher = PropertyDataEnricher(geocode_cache_path=str(tmp_path / "geocode.json"), online_geocoding=False)
+        df = enricher._add_coordinates(listings())
+        assert enricher.geolocator is None
+        assert list(df['latitude'][[0, 4]]) == [25.0920, 25.1867]
+        assert not os.path.exists(tmp_path / "geocode.json")
+
+
+class TestVectorizedEnrichment:
+    """Test the column-wise enrichment against the scalar rules it replaced."""
+
+    def test_haversine_matches_geodesic_distances(self):
+        points = np.array([[25.0920, 55.1381], [25.1972, 55.2744], [25.2532, 55.3657]])
+        distances = property_enricher.haversine_matrix(points[:, 0], points[:, 1], points)
+        for i, a in enumerate(points):
+            for j, b in enumerate(points):
+                assert distances[i, j] == pytest.approx(geodesic(a, b).kilometers, rel=0.005, abs=1e-9)
+        assert np.isnan(property_enricher.haversine_matrix([np.nan], [np.nan], points)).all()
+
+    def test_buckets_match_the_scalar_thresholds(self):
+        prices = [0, 299_999, 300_000, 999_999, 1_000_000, 4_999_999, 5_000_000, np.nan]
+        assert list(property_enricher.bucketize(prices, property_enricher.PRICE_RANGE_BUCKETS)) == [
+            'Under 300K', 'Under 300K', '300K-500K', '500K-1M', '1M-2M', '2M-5M', '5M+', '5M+',
+        ]
+        assert list(property_enricher.bucketize([-20, -19.9, 5, 30], property_enricher.MARKET_POSITION_BUCKETS)) == [
+            'Slightly Below Market', 'Slightly Below Market', 'Slightly Above Market', 'Above Market',
+        ]
+
+    def test_enrich_properties(self, tmp_path):
+        enricher = PropertyDataEnricher(geocode_cache_path=str(tmp_path / "geocode.json"), online_geocoding=False)
+        df = enricher.enrich_properties(listings())
+
+        assert list(df['price_per_sqft']) == [2000.0, 2000.0, 0.0, 0.0, pytest.approx(12_000_000 / 4500)]
+        assert df['distance_to_dubai_marina'][0] == 0.0 and np.isnan(df['distance_to_dubai_mall'][3])
+        # Categories still match area names literally, as before
+        assert list(df['area_category']) == ['Premium', 'Other', 'Premium', 'Other', 'Premium']
+        assert list(df['size_category']) == ['Medium', 'Medium', 'Small', 'Studio', 'Extra Large']
+        assert list(df['price_category']) == ['High-End', 'High-End', 'Budget', 'Mid-Range', 'Ultra-Luxury']
+        assert list(df['value_indicator'][[2, 3]]) == ['Unknown', 'Unknown']
+        assert df['investment_score'].between(0, 10).all()
+
+    def test_investment_scores_match_the_scalar_rules(self, tmp_path):
+        enricher = PropertyDataEnricher(geocode_cache_path=str(tmp_path / "geocode.json"), online_geocoding=False)
+        df = pd.DataFrame({
+            'price': [2_000_000, 0, np.nan, 15_000_000, 900_000],
+            'area_sqft': [1000, np.nan, 800, 20_000, 0],
+            'bedrooms': [2, np.nan, 1, 7, np.nan],
+            'distance_to_dubai_marina': [0.0, 3.5, np.nan, 12.0, 1.0],
+            'distance_to_dubai_mall': [8.0, np.nan, 2.0, 30.0, 4.0],
+        })
+        expected = [scalar_investment_score(row) for _, row in df.iterrows()]
+        assert list(enricher._add_investment_scores(df)['investment_score']) == pytest.approx(expected)
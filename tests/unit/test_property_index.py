@@ -0,0 +1,120 @@
+"""
+Unit tests for the in-memory columnar property index
+"""
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.listings.property_index import PropertyIndex
+
+PROPERTIES = [
+    # id, title, price, price_aed, location, type, beds, baths, area, status, deleted
+    (1, "Marina view apartment", None, 1_200_000, "Dubai Marina", "Apartment", 1, 1, 750, "live", 0),
+    (2, "Marina penthouse", None, 9_500_000, "Dubai Marina", "Penthouse", 4, 5, 4200, "live", 0),
+    (3, "Family villa", 3_100_000, None, "Arabian Ranches", "Villa", 4, 4, 3800, "live", 0),
+    (4, "Downtown studio", None, 850_000, "Downtown Dubai", "Apartment", 0, 1, 480, "draft", 0),
+    (5, "Old marina listing", None, 1_000_000, "Dubai Marina", "Apartment", 2, 2, 1100, "live", 1),
+]
+
+
+def make_engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE properties (id INTEGER PRIMARY KEY, title TEXT, description TEXT, price REAL, "
+            "price_aed REAL, location TEXT, property_type TEXT, bedrooms INTEGER, bathrooms INTEGER, "
+            "area_sqft REAL, listing_status TEXT, is_deleted BOOLEAN, updated_at TIMESTAMP)"
+        ))
+        for pid, title, price, price_aed, location, ptype, beds, baths, area, status, deleted in PROPERTIES:
+            conn.execute(text(
+                "INSERT INTO properties VALUES (:id, :title, :description, :price, :price_aed, :location, "
+                ":ptype, :beds, :baths, :area, :status, :deleted, '2024-01-01 00:00:00')"
+            ), {"id": pid, "title": title, "description": f"{title} for sale", "price": price,
+                "price_aed": price_aed, "location": location, "ptype": ptype, "beds": beds,
+                "baths": baths, "area": area, "status": status, "deleted": deleted})
+    return engine
+
+
+def make_index(engine=None, **kwargs):
+    kwargs.setdefault("refresh_interval", 3600)
+    return PropertyIndex(engine=engine or make_engine(), **kwargs)
+
+
+def ids(result):
+    return [r.id for r in result.records]
+
+
+class TestPropertyIndexSearch:
+    """Test filtering, matching and ranking against the loaded snapshot."""
+
+    def test_range_and_minimum_filters(self):
+        index = make_index()
+
+        result = index.search(price_min=1_000_000, price_max=5_000_000, bedrooms_min=1)
+        assert ids(result) == [1, 3]
+        assert index.search(area_min=3000, bathrooms=4).total == 1
+
+    def test_price_falls_back_to_legacy_column(self):
+        index = make_index()
+        assert ids(index.search(price_min=3_000_000, price_max=3_200_000)) == [3]
+
+    def test_location_and_type_matching_modes(self):
+        index = make_index()
+
+        assert ids(index.search(location="marina", listing_status="live")) == [1, 2]
+        assert ids(index.search(location="dubai", match="prefix")) == [1, 2]
+        assert index.search(location="marina", match="exact").total == 0
+        assert ids(index.search(property_type="APARTMENT", match="exact")) == [4, 1]
+
+    def test_text_query_and_deleted_rows(self):
+        index = make_index()
+
+        assert ids(index.search(text_query="Marina")) == [1, 2]
+        assert ids(index.search(text_query="marina", include_deleted=True)) == [5, 1, 2]
+
+    def test_top_k_ordering_with_total_and_offset(self):
+        index = make_index()
+
+        page = index.search(order_by="id", descending=True, limit=2, offset=1)
+        assert page.total == 4
+        assert ids(page) == [3, 2]
+        assert ids(index.search(descending=True, limit=1)) == [2]
+
+
+class TestPropertyIndexRefresh:
+    """Test incremental, targeted and disabled behaviour."""
+
+    def test_incremental_refresh_picks_up_updated_rows(self):
+        engine = make_engine()
+        index = make_index(engine)
+        assert index.search(location="jvc").total == 0
+
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE properties SET location = 'JVC', updated_at = '2024-02-01 00:00:00' WHERE id = 1"))
+        assert index.refresh()
+
+        assert ids(index.search(location="jvc")) == [1]
+        assert index.get_stats()["full_refreshes"] == 1
+
+    def test_refresh_ids_applies_writes_immediately(self):
+        engine = make_engine()
+        index = make_index(engine)
+        index.search()
+
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE properties SET listing_status = 'sold' WHERE id = 2"))
+            conn.execute(text("DELETE FROM properties WHERE id = 3"))
+        assert index.refresh_ids([2, 3])
+
+        assert ids(index.search(listing_status="live")) == [1]
+        assert index.get_stats()["properties"] == 4
+
+    def test_unavailable_index_defers_to_database(self):
+        assert make_index(enabled=False).search() is None
+
+        broken = create_engine("sqlite://", poolclass=StaticPool)
+        index = make_index(broken)
+        assert index.search() is None
+        assert index.get_stats()["fallbacks"] == 1
@@ -0,0 +1,109 @@
+"""
+Unit tests for the precompiled intent/entity matcher
+"""
+import re
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.query_matcher import PatternMatcher, QueryMatcher, required_literals
+
+INTENTS = {
+    "property_search": [
+        r'\b(looking for|searching for|find|need)\b.*\b(apartment|villa|house|property|home)\b',
+        r'\b(budget|price|cost)\b.*\b(\d+)\b.*\b(million|thousand|k|m)\b',
+        r'\b(bedroom|bed)\b.*\b(\d+)\b',
+    ],
+    "market_info": [
+        r'\b(market|trend|price|appreciation|rental yield|investment)\b',
+        r'\b(how is|what is the|tell me about)\b.*\b(market|trend)\b',
+    ],
+    "developer_question": [
+        r'\b(emaar|damac|nakheel|sobha|dubai properties|meraas)\b',
+        r'\b(who built|who developed|which developer)\b',
+    ],
+}
+
+ENTITIES = {
+    "budget": [
+        r'under\s+(\d+)\s*(?:k|thousand|million|m)',
+        r'\$?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:k|thousand|million|m)?',
+    ],
+    "location": [
+        r'\b(dubai marina|downtown|palm jumeirah|business bay|jbr|jumeirah|marina)\b',
+        r'in\s+(\w+(?:\s+\w+)*)',
+        r'(\w+(?:\s+\w+)*)\s+area',
+    ],
+    "new_status": [
+        r'\b(status to)\s+[\'"]?(\w+)[\'"]?\b',
+    ],
+}
+
+MESSAGES = [
+    "I'm looking for a 2 bedroom apartment in Dubai Marina under 2 million",
+    "what is the market trend in downtown?",
+    "who built the towers near business bay area",
+    "update the lead status to 'qualified'",
+    "hi",
+    "",
+]
+
+
+def naive_scores(text):
+    return {intent: sum(1 for p in patterns if re.search(p, text, re.IGNORECASE))
+            for intent, patterns in INTENTS.items()}
+
+
+def naive_entities(text):
+    entities = {}
+    for entity_type, patterns in ENTITIES.items():
+        for pattern in patterns:
+            matches = re.findall(pattern, text, re.IGNORECASE)
+            if matches:
+                entities[entity_type] = matches[0] if isinstance(matches[0], str) else matches[0][0]
+                break
+    return entities
+
+
+class TestRequiredLiterals:
+    """Test literal extraction from regex parse trees."""
+
+    def test_alternation_group_becomes_the_gate(self):
+        assert required_literals(r'\b(emaar|damac)\b') == {"emaar", "damac"}
+
+    def test_most_selective_literal_is_chosen(self):
+        assert required_literals(r'(\d+)\s*bedroom') == {"bedroom"}
+        assert required_literals(r'\b(budget|price)\b.*\b(\d+)\b.*\b(k|m)\b') == {"budget", "price"}
+
+    def test_optional_parts_never_gate(self):
+        assert required_literals(r'\$?(\d+)') is None
+        assert required_literals(r'(foo)?bar') == {"bar"}
+        assert required_literals(r'(a|b*)') is None
+
+    def test_literals_are_casefolded(self):
+        assert required_literals(r'Dubai Marina', re.IGNORECASE) == {"dubai marina"}
+
+
+class TestQueryMatcher:
+    """Test that prefiltered matching reproduces the per-pattern loops."""
+
+    def test_scores_and_entities_match_naive_loops(self):
+        matcher = QueryMatcher(INTENTS, ENTITIES)
+        for message in MESSAGES:
+            text = message.lower()
+            result = matcher.match(text)
+            assert result.intent_scores == naive_scores(text), message
+            assert result.entities == naive_entities(text), message
+
+    def test_patterns_without_literals_skip_nothing(self):
+        matcher = PatternMatcher({"budget": ENTITIES["budget"]})
+        assert matcher.first_matches("1,500,000")["budget"].group(1) == "1,500,000"
+
+    def test_first_label_follows_declaration_order(self):
+        matcher = PatternMatcher(INTENTS, flags=0)
+        assert matcher.first_label("what is the market like") == "market_info"
+        assert matcher.first_label("which developer is best") == "developer_question"
+        assert matcher.first_label("hello there") is None
+
+    def test_max_patterns_normalises_confidence(self):
+        assert QueryMatcher(INTENTS, ENTITIES).max_patterns == 3
@@ -0,0 +1,61 @@
+"""
+Unit tests for request logging middleware timing
+"""
+import asyncio
+import logging
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.core.middleware import RequestLoggingMiddleware
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_streamed_response_logs_time_to_first_byte():
+    """Completion log line reports TTFB separately from total duration."""
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware, logger_name="test.request")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            await asyncio.sleep(0.05)
+            yield "first"
+            await asyncio.sleep(0.2)
+            yield "second"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    handler = ListHandler()
+    request_logger = logging.getLogger("test.request")
+    request_logger.addHandler(handler)
+    request_logger.setLevel(logging.INFO)
+
+    async def call():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/stream")
+
+    try:
+        response = asyncio.run(call())
+    finally:
+        request_logger.removeHandler(handler)
+
+    assert response.text == "firstsecond"
+    completed = [r for r in handler.records if r.msg == "request_completed"]
+    assert len(completed) == 1
+    record = completed[0]
+    assert record.status_code == 200
+    assert 40 <= record.ttfb_ms < record.elapsed_ms
+    assert record.elapsed_ms - record.ttfb_ms >= 150
@@ -0,0 +1,81 @@
+"""
+Unit tests for the parallel RAG collection retrieval executor
+"""
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.retrieval_executor import CollectionRetrievalExecutor
+
+
+class FakeCollection:
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def query(self, query_texts, n_results):
+        self.calls.append(list(query_texts))
+        if self.fail:
+            raise RuntimeError("collection unavailable")
+        time.sleep(self.delay)
+        # Every variation returns the shared doc plus one of its own
+        return {
+            "documents": [[f"{self.name} shared", f"{self.name} {q}"] for q in query_texts],
+            "distances": [[0.1, 0.2] for _ in query_texts],
+            "metadatas": [[{"rank": 0}, {"rank": 1}] for _ in query_texts],
+        }
+
+
+class FakeChromaClient:
+    def __init__(self, collections):
+        self.collections = {c.name: c for c in collections}
+
+    def get_collection(self, name):
+        return self.collections[name]
+
+
+class TestCollectionRetrievalExecutor:
+    """Test batched, concurrent collection retrieval."""
+
+    def test_variations_sent_as_one_batch(self):
+        collection = FakeCollection("market_analysis")
+        executor = CollectionRetrievalExecutor(max_workers=2, collection_timeout=1.0)
+
+        results = executor.query_collections(FakeChromaClient([collection]), ["market_analysis"], ["a", "b", "c"], n_results=4)
+
+        assert collection.calls == [["a", "b", "c"]]
+        assert results[0].documents == ["market_analysis shared", "market_analysis a", "market_analysis b", "market_analysis c"]
+        assert len(results[0].distances) == len(results[0].documents)
+
+    def test_collections_run_concurrently(self):
+        collections = [FakeCollection(f"c{i}", delay=0.2) for i in range(4)]
+        executor = CollectionRetrievalExecutor(max_workers=4, collection_timeout=2.0)
+
+        start = time.perf_counter()
+        results = executor.query_collections(FakeChromaClient(collections), [c.name for c in collections], ["q"], n_results=2)
+        elapsed = time.perf_counter() - start
+
+        assert [r.collection for r in results] == ["c0", "c1", "c2", "c3"]
+        assert elapsed < 0.6
+
+    def test_slow_collection_returns_partial_results(self):
+        collections = [FakeCollection("fast"), FakeCollection("slow", delay=1.0)]
+        executor = CollectionRetrievalExecutor(max_workers=2, collection_timeout=0.2)
+
+        results = executor.query_collections(FakeChromaClient(collections), ["fast", "slow"], ["q"], n_results=2)
+
+        assert results[0].documents and not results[0].timed_out
+        assert results[1].timed_out and results[1].documents == []
+        assert executor.get_stats()["timeouts"] == 1
+
+    def test_failing_collection_is_isolated(self):
+        collections = [FakeCollection("ok"), FakeCollection("broken", fail=True)]
+        executor = CollectionRetrievalExecutor(max_workers=2, collection_timeout=1.0)
+
+        results = executor.query_collections(FakeChromaClient(collections), ["ok", "broken"], ["q"], n_results=2)
+
+        assert results[0].documents
+        assert results[1].error and results[1].documents == []
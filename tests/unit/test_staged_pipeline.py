@@ -0,0 +1,180 @@
+"""
+Unit tests for the staged ingest -> clean/enrich -> store pipeline
+"""
+import importlib
+import logging
+import queue
+import threading
+
+from conftest import load_package
+
+# Import the submodules without running the data_pipeline package __init__,
+# which pulls in the storage clients
+load_package('data_pipeline', 'scripts/data_pipeline')
+staged = importlib.import_module('data_pipeline.staged')
+cleaning = importlib.import_module('data_pipeline.cleaning')
+
+
+def listing(n):
+    return {'address': f"{n} Marina Walk", 'price': 1_000_000 + n, 'bedrooms': 2, 'bathrooms': 2,
+            'sqft': 1200, 'type': 'Apartment', 'neighborhood': 'Dubai Marina'}
+
+
+class FakeIngestion:
+    """Serves each file's records in chunks; a file named in ``fail_after`` raises after that many chunks"""
+
+    def __init__(self, files, fail_after=None):
+        self.files = files
+        self.fail_after = fail_after or {}
+
+    def iter_record_chunks(self, source, chunk_size):
+        records = self.files[source]
+        for number, start in enumerate(range(0, len(records), chunk_size)):
+            if self.fail_after.get(source) == number:
+                raise ValueError("truncated file")
+            yield records[start:start + chunk_size]
+
+
+class FakeStorage:
+    """Records every storage call; ``fail`` maps a method name to the scope/source it raises for"""
+
+    def __init__(self, fail=None):
+        self.fail = fail or {}
+        self.calls = []
+        self.stored = []
+
+    def _call(self, name, *args):
+        self.calls.append((name,) + args)
+        if name in self.fail and self.fail[name] in args:
+            raise RuntimeError(f"{name} failed")
+
+    def connect_databases(self):
+        self._call('connect_databases')
+
+    def create_tables_if_not_exist(self):
+        pass
+
+    def open_properties_scope(self, scope):
+        self._call('open_properties_scope', scope)
+
+    def close_properties_scope(self, scope, prune=True):
+        self._call('close_properties_scope', scope, prune)
+
+    def store_properties_postgres(self, properties):
+        return True
+
+    def store_properties_chroma(self, properties, scope=None):
+        self._call('store_properties_chroma', scope)
+        self.stored.append((scope, [record['address'] for record in properties]))
+        return True
+
+    def log_processing_result(self, source, processed, stored, seconds, status, errors):
+        self.calls.append(('log_processing_result', source, status))
+
+    def close_connections(self):
+        self.calls.append(('close_connections',))
+
+
+class FakePipeline:
+    def __init__(self, ingestion, storage):
+        self.config = {'processing': {}}
+        self.ingestion = ingestion
+        self.storage = storage
+        self.cleaner = cleaning.DataCleaner(self.config)
+        self.logger = logging.getLogger(__name__)
+
+
+class StuckFuture:
+    """A pool future that never finishes and is interrupted when waited on"""
+
+    def done(self):
+        return False
+
+    def result(self):
+        raise KeyboardInterrupt
+
+
+class StuckPool:
+    def submit(self, fn, *args):
+        return StuckFuture()
+
+
+def run(files, storage=None, fail_after=None, chunk_size=2):
+    storage = storage or FakeStorage()
+    pipeline = FakePipeline(FakeIngestion(files, fail_after), storage)
+    results, stats = staged.StagedPipeline(pipeline, chunk_size=chunk_size, max_workers=2, queue_size=2).run(list(files))
+    return {result['file']: result for result in results}, stats, storage
+
+
+class TestStagedPipeline:
+    """Test chunked streaming, ordered fan-out, per-file dedup and scope handling."""
+
+    def test_chunks_are_stored_in_order_and_deduplicated_across_chunks(self):
+        files = {
+            'a.csv': [listing(1), listing(2), listing(3), listing(1), listing(4)],
+            'b.csv': [listing(1), listing(5)],
+        }
+        results, stats, storage = run(files)
+
+        assert results['a.csv']['success'] and results['b.csv']['success']
+        assert results['a.csv']['records_processed'] == 5 and results['a.csv']['records_stored'] == 4
+        assert results['a.csv']['warnings'] == ["Removed 1 duplicate records"]
+        # Dedup is per file: b.csv may repeat a listing from a.csv
+        assert results['b.csv']['records_stored'] == 2
+        assert [addresses for scope, addresses in storage.stored if scope == 'a.csv'] == [
+            ['1 Marina Walk', '2 Marina Walk'], ['3 Marina Walk'], ['4 Marina Walk'],
+        ]
+
+        a_calls = [call for call in storage.calls if 'a.csv' in call]
+        assert a_calls[0] == ('open_properties_scope', 'a.csv')
+        assert a_calls[-2:] == [('close_properties_scope', 'a.csv', True), ('log_processing_result', 'a.csv', 'SUCCESS')]
+        assert storage.calls[-1] == ('close_connections',)
+        assert stats['stages']['ingest']['chunks'] == 4 and stats['stages']['store']['records'] == 6
+
+    def test_ingest_error_keeps_the_scope_unpruned(self):
+        files = {'a.csv': [listing(n) for n in range(6)], 'b.csv': [listing(9)]}
+        results, _, storage = run(files, fail_after={'a.csv': 1})
+
+        assert not results['a.csv']['success'] and results['b.csv']['success']
+        assert results['a.csv']['errors'] == ["Failed to ingest data: truncated file"]
+        assert ('close_properties_scope', 'a.csv', False) in storage.calls
+
+    def test_storage_errors_are_recorded_on_the_file_and_the_stage_keeps_draining(self):
+        files = {'open.csv': [listing(1)], 'write.csv': [listing(2), listing(3), listing(4)],
+                 'close.csv': [listing(5)], 'ok.csv': [listing(6)]}
+        storage = FakeStorage(fail={'open_properties_scope': 'open.csv', 'store_properties_chroma': 'write.csv',
+                                    'close_properties_scope': 'close.csv'})
+        results, _, storage = run(files, storage=storage)
+
+        assert set(results) == set(files) and results['ok.csv']['success']
+        assert results['open.csv']['errors'] == ["Failed to store chunk 0: open_properties_scope failed"]
+        # Without its scope nothing of the file is written, so no write can prune its siblings
+        assert not any(scope == 'open.csv' for scope, _ in storage.stored)
+        assert not any(call[0] == 'close_properties_scope' and call[1] == 'open.csv' for call in storage.calls)
+
+        assert results['write.csv']['errors'] == ["Failed to store chunk 0: store_properties_chroma failed",
+                                                  "Failed to store chunk 1: store_properties_chroma failed"]
+        assert ('close_properties_scope', 'write.csv', False) in storage.calls
+
+        assert not results['close.csv']['success']
+        assert results['close.csv']['errors'] == ["Failed to store file: close_properties_scope failed"]
+        assert storage.calls[-1] == ('close_connections',)
+
+    def test_transform_error_after_the_input_ended_does_not_wait_for_more_input(self):
+        pipeline = staged.StagedPipeline(FakePipeline(FakeIngestion({}), FakeStorage()), max_workers=2, queue_size=2)
+        in_q, out_q = queue.Queue(), queue.Queue()
+        in_q.put(staged.RecordChunk('a.csv', 0, [listing(1)]))
+        in_q.put(staged._DONE)
+        raised = []
+
+        def transform():
+            try:
+                pipeline._transform(StuckPool(), in_q, out_q, staged.StageStats('clean_enrich'))
+            except KeyboardInterrupt:
+                raised.append(True)
+
+        thread = threading.Thread(target=transform, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive() and raised == [True]
+        assert out_q.get_nowait() is staged._DONE
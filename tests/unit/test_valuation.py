@@ -0,0 +1,75 @@
+"""
+Unit tests for batch property valuation against the single-row path
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+from app.domain.ai.model_registry import ModelRegistry
+
+from conftest import load_module, valuation_portfolio
+
+LOCATIONS = ['Business Bay', 'Dubai Marina', 'Downtown Dubai', 'JVC']
+PROPERTY_TYPES = ['apartment', 'penthouse', 'villa']
+
+
+def trained_models(module, registry_dir):
+    """A small price predictor fitted like _train_price_predictor, served from a registry"""
+    rng = np.random.RandomState(0)
+    locations = LabelEncoder().fit(LOCATIONS)
+    property_types = LabelEncoder().fit(PROPERTY_TYPES)
+    columns = module.PRICE_FEATURE_COLUMNS + ['location_encoded', 'property_type_encoded']
+    features = pd.DataFrame(rng.uniform(0, 5, size=(300, len(columns))), columns=columns)
+    features['location_encoded'] = rng.randint(0, len(LOCATIONS), 300)
+    features['property_type_encoded'] = rng.randint(0, len(PROPERTY_TYPES), 300)
+    prices = 1e6 + 2e5 * features['bedrooms'] + 3e5 * features['location_encoded']
+    scaler = StandardScaler().fit(features)
+    model = GradientBoostingRegressor(n_estimators=20, random_state=0).fit(scaler.transform(features), prices)
+
+    registry = ModelRegistry(str(registry_dir))
+    registry.publish({
+        'models': {'price_predictor': model},
+        'scalers': {'price_scaler': scaler},
+        'encoders': {'location_encoder': locations, 'property_type_encoder': property_types},
+    }, promote=True)
+    return module.AdvancedMLModels(registry=registry)
+
+
+@pytest.fixture
+def models(tmp_path):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        module = load_module('advanced_ml_models', 'backend/ml/advanced_ml_models.py', tmp_path)
+        return trained_models(module, tmp_path / "registry")
+
+
+class TestBatchValuation:
+    """Test that predict_property_prices gives the per-row prices and isolates bad rows."""
+
+    def test_batch_matches_single_rows(self, models):
+        properties = valuation_portfolio(LOCATIONS, PROPERTY_TYPES, 300, missing_location_rate=0.1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            expected = [models.predict_property_price(prop) for prop in properties]
+        batch = models.predict_property_prices(properties)
+
+        assert len(batch) == len(properties)
+        for result, single in zip(batch, expected):
+            assert result['predicted_price'] == pytest.approx(single['predicted_price'])
+            assert result['confidence'] == single['confidence']
+            assert result['price_range'] == pytest.approx(single['price_range'])
+
+    def test_bad_rows_get_errors_without_failing_the_batch(self, models):
+        properties = [{'location': 'Atlantis'}, {'bedrooms': 'many'}, {'bedrooms': 2, 'location': 'JVC'}, {}]
+        results = models.predict_property_prices(properties)
+        assert results[0]['error'] == "Unknown location: Atlantis" and results[0]['predicted_price'] is None
+        assert results[1]['error'] == "Invalid value for bedrooms"
+        assert 'error' not in results[2] and 'error' not in results[3]
+        assert models.predict_property_prices([]) == []